@@ -0,0 +1,549 @@
+import csv
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from utils import CSV_PATH, HEADERS, garantir_diretorio, gerar_hash_evento, limpar_csv
+from indice_csv import IndiceHashes
+
+# Configurações
+DB_PATH = os.path.join("data", "corridas.db")
+ARMAZENAMENTO_PADRAO = "sqlite"
+# Exporte KADENCE_ARMAZENAMENTO=csv (ou use --armazenamento csv) para gravar direto no CSV
+VARIAVEL_ARMAZENAMENTO = "KADENCE_ARMAZENAMENTO"
+TAMANHO_LOTE = 500  # eventos por consulta/INSERT (abaixo do limite de variáveis do SQLite)
+VERSAO_ESQUEMA = 4
+CAMPOS_COMPARADOS = ("Título", "Data", "Local", "Link", "Fonte", "Hash")
+# CSV exportado do banco: as colunas de sempre mais as publicações de cada evento ("fonte|link ; fonte|link"),
+# que num evento fundido trazem o link de todas as fontes
+CABECALHO_EXPORTADO = HEADERS + ["Links"]
+SEPARADOR_LINKS = " ; "
+
+ESQUEMA_V1 = """
+CREATE TABLE IF NOT EXISTS eventos (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    titulo TEXT NOT NULL,
+    data TEXT NOT NULL,
+    data_iso TEXT,
+    local TEXT NOT NULL,
+    link TEXT NOT NULL,
+    fonte TEXT NOT NULL,
+    salvo_em TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_eventos_hash ON eventos(hash);
+CREATE INDEX IF NOT EXISTS idx_eventos_data ON eventos(data_iso);
+CREATE INDEX IF NOT EXISTS idx_eventos_fonte ON eventos(fonte);
+"""
+
+# v2: identidade estável (upsert) e datas de primeira/última vez vistos e de atualização
+ESQUEMA_V2 = """
+ALTER TABLE eventos RENAME COLUMN salvo_em TO first_seen;
+ALTER TABLE eventos ADD COLUMN identidade TEXT;
+ALTER TABLE eventos ADD COLUMN last_seen TEXT;
+ALTER TABLE eventos ADD COLUMN updated_at TEXT;
+UPDATE eventos SET last_seen = first_seen, updated_at = first_seen;
+DROP INDEX IF EXISTS idx_eventos_hash;
+CREATE INDEX IF NOT EXISTS idx_eventos_hash ON eventos(hash);
+"""
+
+# v3: links que já foram de mais de um evento da fonte continuam fora da identidade nas próximas gravações
+ESQUEMA_V3 = """
+CREATE TABLE IF NOT EXISTS links_ambiguos (
+    fonte TEXT NOT NULL,
+    link TEXT NOT NULL,
+    PRIMARY KEY (fonte, link)
+) WITHOUT ROWID;
+"""
+
+# v4: todas as publicações (fonte, link) de cada evento; um evento fundido (duplicatas.py) tem várias
+ESQUEMA_V4 = """
+CREATE TABLE IF NOT EXISTS links_evento (
+    evento_id INTEGER NOT NULL,
+    fonte TEXT NOT NULL,
+    link TEXT NOT NULL,
+    identidade TEXT NOT NULL,
+    PRIMARY KEY (evento_id, fonte, link)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_links_evento_identidade ON links_evento(identidade);
+INSERT OR IGNORE INTO links_evento (evento_id, fonte, link, identidade) SELECT id, fonte, link, identidade FROM eventos;
+"""
+
+def data_iso(data: str) -> Optional[str]:
+    """'dd/mm/aaaa' -> 'aaaa-mm-dd' (ordenável no índice), ou None se não for uma data"""
+    try:
+        return datetime.strptime(data.strip(), "%d/%m/%Y").strftime("%Y-%m-%d")
+    except (ValueError, AttributeError):
+        return None
+
+def linha_evento(evento: Dict) -> Dict:
+    """Evento do scraper -> linha no formato do CSV (HEADERS)"""
+    titulo = evento.get('titulo', 'Sem título')
+    data = evento.get('data', 'Data não informada')
+    local = evento.get('local', 'Local não informado')
+    return {
+        "Título": titulo,
+        "Data": data,
+        "Local": local,
+        "Link": evento.get('link', ''),
+        "Fonte": evento.get('fonte', 'Fonte desconhecida'),
+        "Hash": evento.get('hash') or gerar_hash_evento(titulo, data, local),
+    }
+
+def link_especifico(link: str) -> bool:
+    """True se o link aponta para uma página própria (não é só a raiz do site)"""
+    try:
+        partes = urlsplit(link.strip())
+    except (ValueError, AttributeError):
+        return False
+    return bool(partes.hostname) and bool(partes.path.strip("/") or partes.query)
+
+def normalizar_link(link: str) -> str:
+    """Link sem âncora nem barra final, como entra na identidade"""
+    return link.strip().split("#")[0].rstrip("/")
+
+def identidade_evento(linha: Dict, links_ambiguos: Set[Tuple[str, str]] = frozenset()) -> str:
+    """
+    Chave estável do evento: fonte + link quando o link é a página do evento
+    (título, data e local podem mudar sem criar outra linha); senão o hash
+    """
+    link = normalizar_link(linha["Link"])
+    if link_especifico(link) and (linha["Fonte"], link) not in links_ambiguos:
+        return f"{linha['Fonte']}|{link}"
+    return f"hash|{linha['Hash']}"
+
+def links_evento(evento: Dict) -> List[Tuple[str, str]]:
+    """(fonte, link) de todas as publicações do evento: as do grupo fundido (`links`) ou a própria"""
+    links = [(item.get("fonte") or "", item.get("link") or "") for item in evento.get("links") or []]
+    return links or [(evento.get('fonte', 'Fonte desconhecida'), evento.get('link', ''))]
+
+def identidades_links(linha: Dict, links: List[Tuple[str, str]],
+                      links_ambiguos: Set[Tuple[str, str]] = frozenset()) -> List[str]:
+    """Identidade que cada publicação do evento teria sozinha (acha o evento mesmo se o canônico mudar)"""
+    return [identidade_evento({**linha, "Fonte": fonte, "Link": link}, links_ambiguos) for fonte, link in links]
+
+def texto_links(links: List[Tuple[str, str]]) -> str:
+    """Coluna "Links" do CSV exportado: 'fonte|link' de cada publicação, separados por SEPARADOR_LINKS"""
+    return SEPARADOR_LINKS.join(f"{fonte}|{link}" for fonte, link in links)
+
+def ler_links(texto: str) -> List[Tuple[str, str]]:
+    """Inverso de texto_links"""
+    return [tuple(item.split("|", 1)) for item in texto.split(SEPARADOR_LINKS) if "|" in item]
+
+def links_repetidos(linhas: List[Dict]) -> Set[Tuple[str, str]]:
+    """(fonte, link) usados por eventos diferentes (ex.: a listagem como link de todos): não servem de identidade"""
+    hashes_por_link = {}
+    for linha in linhas:
+        chave = (linha["Fonte"], normalizar_link(linha["Link"]))
+        hashes_por_link.setdefault(chave, set()).add(linha["Hash"])
+    return {chave for chave, hashes in hashes_por_link.items() if len(hashes) > 1}
+
+def links_ambiguos_gravados(conexao: sqlite3.Connection) -> Set[Tuple[str, str]]:
+    """(fonte, link) já marcados como ambíguos no banco (vazio se a tabela ainda não existe)"""
+    try:
+        return set(conexao.execute("SELECT fonte, link FROM links_ambiguos"))
+    except sqlite3.OperationalError:
+        return set()
+
+class ResultadoGravacao:
+    """Linhas de uma gravação separadas em inseridas, atualizadas e inalteradas"""
+
+    def __init__(self):
+        self.inseridas = []
+        self.atualizadas = []
+        self.inalteradas = []
+        self.ids_alterados = []  # id no banco das linhas inseridas ou atualizadas (SQLite)
+        self.ids_links_alterados = []  # linhas já gravadas cujas publicações mudaram (SQLite)
+
+    def resumo(self) -> str:
+        return (f"{len(self.inseridas)} inseridos, {len(self.atualizadas)} atualizados, "
+                f"{len(self.inalteradas)} inalterados")
+
+def _lotes(itens: List, tamanho: int = TAMANHO_LOTE) -> Iterator[List]:
+    for inicio in range(0, len(itens), tamanho):
+        yield itens[inicio:inicio + tamanho]
+
+class ArmazenamentoCSV:
+    """Formato original: CSV só de acréscimo; os hashes já gravados vêm do índice ao lado (indice_csv.py)"""
+
+    nome = "csv"
+
+    def __init__(self, caminho: str = CSV_PATH):
+        self.caminho = caminho
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+    def descricao(self) -> str:
+        return f"CSV ({self.caminho})"
+
+    def gravar(self, eventos: List[Dict]) -> ResultadoGravacao:
+        """Acrescenta as linhas com hash inédito (o CSV nunca atualiza linhas: repetidas ficam inalteradas)"""
+        garantir_diretorio()
+        if not os.path.exists(self.caminho):
+            limpar_csv(self.caminho)
+
+        resultado = ResultadoGravacao()
+        with IndiceHashes.abrir(self.caminho) as indice:
+            novos = set()
+            for evento in eventos:
+                linha = linha_evento(evento)
+                if linha["Hash"] in novos or linha["Hash"] in indice:
+                    resultado.inalteradas.append(linha)
+                else:
+                    novos.add(linha["Hash"])
+                    resultado.inseridas.append(linha)
+            _anexar_csv(self.caminho, resultado.inseridas)
+            indice.registrar([linha["Hash"] for linha in resultado.inseridas])
+        return resultado
+
+    def linhas(self) -> Iterator[Dict]:
+        if not os.path.exists(self.caminho):
+            return
+        with open(self.caminho, "r", newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+
+    def contar(self) -> int:
+        return sum(1 for _ in self.linhas())
+
+    def limpar(self):
+        limpar_csv(self.caminho)
+
+    def fechar(self):
+        pass
+
+class ArmazenamentoSQLite:
+    """
+    Banco SQLite com uma linha por evento, chaveada pela identidade estável (índice único),
+    com índices por hash, data e fonte (WAL, gravações em lote numa transação).
+    O CSV continua existindo como exportação: inserções são acrescentadas a ele e,
+    quando alguma linha muda, `exportar_csv` o reescreve a partir do banco
+    """
+
+    nome = "sqlite"
+
+    def __init__(self, caminho: str = DB_PATH, csv_exportado: Optional[str] = CSV_PATH):
+        self.caminho = caminho
+        self.csv_exportado = csv_exportado
+        garantir_diretorio()
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self._migrar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+    def descricao(self) -> str:
+        return f"SQLite ({self.caminho})"
+
+    def _migrar(self):
+        """Cria/atualiza o esquema conforme PRAGMA user_version e importa o CSV antigo na primeira vez"""
+        versao = self.conexao.execute("PRAGMA user_version").fetchone()[0]
+        if versao >= VERSAO_ESQUEMA:
+            return
+        if versao < 1:
+            self.conexao.executescript(ESQUEMA_V1)
+        if versao < 2:
+            self.conexao.executescript(ESQUEMA_V2)
+            self._preencher_identidades()
+        if versao < 3:
+            self.conexao.executescript(ESQUEMA_V3)
+            self._marcar_links_ambiguos()
+        if versao < 4:
+            self.conexao.executescript(ESQUEMA_V4)
+        self.conexao.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+        if versao == 0 and self.csv_exportado and os.path.exists(self.csv_exportado):
+            linhas = list(ArmazenamentoCSV(self.csv_exportado).linhas())
+            # CSV exportado por uma versão com a coluna Links: as publicações dos eventos fundidos voltam junto
+            links = [ler_links(linha.get("Links") or "") or [(linha["Fonte"], linha["Link"])] for linha in linhas]
+            resultado = self._gravar_linhas(linhas, links)
+            print(f"📥 {len(resultado.inseridas)} eventos importados de {self.csv_exportado} para o SQLite")
+
+    def _preencher_identidades(self):
+        """Calcula a identidade das linhas gravadas antes da v2 e cria o índice único"""
+        linhas = [(id_linha, dict(zip(HEADERS, registro))) for id_linha, *registro in self.conexao.execute(
+            "SELECT id, titulo, data, local, link, fonte, hash FROM eventos")]
+        ambiguos = links_repetidos([linha for _, linha in linhas])
+        with self.conexao:
+            self.conexao.executemany("UPDATE eventos SET identidade = ? WHERE id = ?",
+                                     [(identidade_evento(linha, ambiguos), id_linha) for id_linha, linha in linhas])
+            self.conexao.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_eventos_identidade ON eventos(identidade)")
+
+    def _marcar_links_ambiguos(self):
+        """Links específicos gravados antes da v3 com identidade pelo hash já foram ambíguos: continuam"""
+        pares = set()
+        for fonte, link in self.conexao.execute("SELECT fonte, link FROM eventos WHERE identidade LIKE 'hash|%'"):
+            link = normalizar_link(link)
+            if link_especifico(link):
+                pares.add((fonte, link))
+        with self.conexao:
+            self.conexao.executemany("INSERT OR IGNORE INTO links_ambiguos (fonte, link) VALUES (?, ?)", sorted(pares))
+
+    def _existentes(self, coluna: str, chaves: List[str]) -> Dict[str, tuple]:
+        """Linhas do banco cuja `coluna` está em `chaves` (uma consulta pelo índice): chave -> (id, campos...)"""
+        if not chaves:
+            return {}
+        marcadores = ",".join("?" * len(chaves))
+        encontradas = {}
+        for registro in self.conexao.execute(
+                f"SELECT {coluna}, id, titulo, data, local, link, fonte, hash FROM eventos "
+                f"WHERE {coluna} IN ({marcadores}) ORDER BY id", chaves):
+            encontradas.setdefault(registro[0], registro[1:])
+        return encontradas
+
+    def _por_link(self, identidades: List[str]) -> Dict[str, int]:
+        """Eventos que já têm uma publicação com essas identidades: identidade -> id"""
+        encontrados = {}
+        for lote in _lotes(identidades):
+            encontrados.update(self.conexao.execute(
+                f"SELECT identidade, MIN(evento_id) FROM links_evento WHERE identidade IN ({','.join('?' * len(lote))}) "
+                f"GROUP BY identidade", lote))
+        return encontrados
+
+    def _links_gravados(self, ids: List[int]) -> Dict[int, Set[Tuple[str, str]]]:
+        gravados = {}
+        for lote in _lotes(ids):
+            for id_linha, fonte, link in self.conexao.execute(
+                    f"SELECT evento_id, fonte, link FROM links_evento WHERE evento_id IN ({','.join('?' * len(lote))})",
+                    lote):
+                gravados.setdefault(id_linha, set()).add((fonte, link))
+        return gravados
+
+    def _gravar_links(self, substituir: Dict[int, List[Tuple[str, str]]],
+                      acrescentar: Dict[int, List[Tuple[str, str]]], ambiguos: Set[Tuple[str, str]]) -> List[int]:
+        """
+        Troca as publicações dos eventos em `substituir` e soma as de `acrescentar` às já gravadas;
+        devolve os ids cujas publicações mudaram
+        """
+        ids = sorted(set(substituir) | set(acrescentar))
+        antes = self._links_gravados(ids)
+        for lote in _lotes(list(substituir)):
+            self.conexao.execute(f"DELETE FROM links_evento WHERE evento_id IN ({','.join('?' * len(lote))})", lote)
+        registros = []
+        for links_por_id in (substituir, acrescentar):
+            for id_linha, links in links_por_id.items():
+                for identidade, (fonte, link) in zip(identidades_links({"Hash": ""}, links, ambiguos), links):
+                    registros.append((id_linha, fonte, link, identidade))
+        self.conexao.executemany(
+            "INSERT OR IGNORE INTO links_evento (evento_id, fonte, link, identidade) VALUES (?, ?, ?, ?)", registros)
+        depois = self._links_gravados(ids)
+        return [id_linha for id_linha in ids if antes.get(id_linha) != depois.get(id_linha)]
+
+    def _gravar_linhas(self, linhas: List[Dict], links: Optional[List[List[Tuple[str, str]]]] = None) -> ResultadoGravacao:
+        """
+        Upsert em lotes numa única transação. Cada lote é cruzado com o banco pela identidade,
+        depois (para quem não casou) pela identidade de alguma das suas publicações em
+        links_evento e por fim pelo hash: sem linha -> insere; campos iguais -> só last_seen;
+        campos diferentes -> atualiza tudo e updated_at. Um evento que casa só pelo hash com
+        linha de outra fonte é a mesma corrida vista em outro site: fica inalterado.
+        `links` traz as publicações de cada linha (padrão: só a própria)
+        """
+        if links is None:
+            links = [[(linha["Fonte"], linha["Link"])] for linha in linhas]
+        agora = datetime.now().isoformat(timespec="seconds")
+        # Ambíguo uma vez, ambíguo sempre: a identidade não depende de quantos cards vieram neste lote
+        repetidos = links_repetidos(linhas)
+        ambiguos = links_ambiguos_gravados(self.conexao) | repetidos
+        resultado = ResultadoGravacao()
+        vistas = set()
+        with self.conexao:
+            self.conexao.executemany("INSERT OR IGNORE INTO links_ambiguos (fonte, link) VALUES (?, ?)",
+                                     sorted(repetidos))
+            for lote in _lotes(list(zip(linhas, links))):
+                pendentes = []
+                for linha, links_linha in lote:
+                    identidade = identidade_evento(linha, ambiguos)
+                    if identidade in vistas or linha["Hash"] in vistas:
+                        resultado.inalteradas.append(linha)  # repetido dentro da própria gravação
+                        continue
+                    vistas.update((identidade, linha["Hash"]))
+                    pendentes.append((identidade, linha, links_linha))
+
+                por_identidade = self._existentes("identidade", [i for i, _, _ in pendentes])
+                # Evento fundido cujo canônico mudou: a linha gravada é achada por outra das publicações
+                outras = {i: [m for m in identidades_links(l, ls, ambiguos) if not m.startswith("hash|")]
+                          for i, l, ls in pendentes if i not in por_identidade}
+                por_link = self._por_link(sorted({m for membros in outras.values() for m in membros}))
+                id_por_link = {i: next((por_link[m] for m in membros if m in por_link), None)
+                               for i, membros in outras.items()}
+                por_id = self._existentes("id", sorted({id_linha for id_linha in id_por_link.values() if id_linha}))
+                por_hash = self._existentes("hash", [l["Hash"] for i, l, _ in pendentes
+                                                     if i not in por_identidade and not id_por_link.get(i)])
+
+                inserir, atualizar, tocar, reidentificar = [], [], [], []
+                substituir_links, acrescentar_links = {}, {}
+                for identidade, linha, links_linha in pendentes:
+                    via_link = por_id.get(id_por_link.get(identidade))
+                    existente = por_identidade.get(identidade) or via_link or por_hash.get(linha["Hash"])
+                    if existente is None:
+                        inserir.append((identidade, linha, links_linha))
+                        continue
+                    id_linha, campos = existente[0], dict(zip(CAMPOS_COMPARADOS, existente[1:]))
+                    outra_fonte = (identidade not in por_identidade and via_link is None
+                                   and campos["Fonte"] != linha["Fonte"])
+                    if outra_fonte:
+                        acrescentar_links[id_linha] = links_linha
+                    else:
+                        substituir_links[id_linha] = links_linha
+                    if outra_fonte or all(campos[c] == linha[c] for c in CAMPOS_COMPARADOS):
+                        if identidade not in por_identidade and not outra_fonte:
+                            reidentificar.append((identidade, id_linha))  # link passou a ser ambíguo
+                        tocar.append(id_linha)
+                        resultado.inalteradas.append(linha)
+                    else:
+                        atualizar.append((id_linha, identidade, linha))
+                        resultado.atualizadas.append(linha)
+
+                self.conexao.executemany(
+                    "INSERT INTO eventos (identidade, hash, titulo, data, data_iso, local, link, fonte, "
+                    "first_seen, last_seen, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(i, l["Hash"], l["Título"], l["Data"], data_iso(l["Data"]), l["Local"], l["Link"], l["Fonte"],
+                      agora, agora, agora) for i, l, _ in inserir])
+                self.conexao.executemany(
+                    "UPDATE eventos SET identidade = ?, hash = ?, titulo = ?, data = ?, data_iso = ?, local = ?, "
+                    "link = ?, fonte = ?, last_seen = ?, updated_at = ? WHERE id = ?",
+                    [(i, l["Hash"], l["Título"], l["Data"], data_iso(l["Data"]), l["Local"], l["Link"], l["Fonte"],
+                      agora, agora, id_linha) for id_linha, i, l in atualizar])
+                self.conexao.executemany("UPDATE eventos SET last_seen = ? WHERE id = ?",
+                                         [(agora, id_linha) for id_linha in tocar])
+                self.conexao.executemany("UPDATE eventos SET identidade = ? WHERE id = ?", reidentificar)
+                resultado.inseridas.extend(l for _, l, _ in inserir)
+                inseridos = self._existentes("identidade", [i for i, _, _ in inserir])
+                for identidade, _, links_linha in inserir:
+                    substituir_links[inseridos[identidade][0]] = links_linha
+                ids_inseridos = {registro[0] for registro in inseridos.values()}
+                resultado.ids_links_alterados.extend(
+                    id_linha for id_linha in self._gravar_links(substituir_links, acrescentar_links, ambiguos)
+                    if id_linha not in ids_inseridos)
+                resultado.ids_alterados.extend(registro[0] for registro in inseridos.values())
+                resultado.ids_alterados.extend(id_linha for id_linha, _, _ in atualizar)
+        return resultado
+
+    def gravar(self, eventos: List[Dict]) -> ResultadoGravacao:
+        """Faz o upsert dos eventos e mantém em dia o índice de busca e o CSV exportado"""
+        from busca import IndiceBusca
+
+        linhas = [linha_evento(evento) for evento in eventos]
+        links = [links_evento(evento) for evento in eventos]
+        resultado = self._gravar_linhas(linhas, links)
+        IndiceBusca(self.conexao).atualizar(resultado.ids_alterados)
+        if self.csv_exportado:
+            # Linha alterada, publicações novas num evento já gravado ou CSV sem a coluna Links: reescreve
+            if (resultado.atualizadas or resultado.ids_links_alterados
+                    or _cabecalho_csv(self.csv_exportado) != CABECALHO_EXPORTADO):
+                self.exportar_csv(self.csv_exportado)
+            else:
+                links_por_linha = {id(linha): links_linha for linha, links_linha in zip(linhas, links)}
+                _anexar_csv(self.csv_exportado, [dict(linha, Links=texto_links(links_por_linha[id(linha)]))
+                                                 for linha in resultado.inseridas], CABECALHO_EXPORTADO)
+        return resultado
+
+    def linhas(self) -> Iterator[Dict]:
+        """Todas as linhas na ordem de gravação, no formato do CSV"""
+        cursor = self.conexao.execute("SELECT titulo, data, local, link, fonte, hash FROM eventos ORDER BY id")
+        for registro in cursor:
+            yield dict(zip(HEADERS, registro))
+
+    def linhas_com_links(self) -> Iterator[Dict]:
+        """Como `linhas`, com "Links": as publicações [{"fonte", "link"}] de cada evento (várias se fundido)"""
+        links = {}
+        for id_linha, fonte, link in self.conexao.execute(
+                "SELECT evento_id, fonte, link FROM links_evento ORDER BY evento_id, fonte, link"):
+            links.setdefault(id_linha, []).append({"fonte": fonte, "link": link})
+        cursor = self.conexao.execute("SELECT id, titulo, data, local, link, fonte, hash FROM eventos ORDER BY id")
+        for id_linha, *registro in cursor:
+            linha = dict(zip(HEADERS, registro))
+            linha["Links"] = links.get(id_linha) or [{"fonte": linha["Fonte"], "link": linha["Link"]}]
+            yield linha
+
+    def contar(self) -> int:
+        return self.conexao.execute("SELECT COUNT(*) FROM eventos").fetchone()[0]
+
+    def exportar_csv(self, caminho: str = CSV_PATH) -> int:
+        """
+        Reescreve o CSV inteiro a partir do banco (arquivo temporário + rename), com a coluna Links;
+        retorna o total de linhas
+        """
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        temporario = caminho + ".tmp"
+        total = 0
+        with open(temporario, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CABECALHO_EXPORTADO)
+            writer.writeheader()
+            for linha in self.linhas_com_links():
+                linha["Links"] = texto_links([(item["fonte"], item["link"]) for item in linha["Links"]])
+                writer.writerow(linha)
+                total += 1
+        os.replace(temporario, caminho)
+        return total
+
+    def estatisticas(self) -> Dict:
+        """Mesmo formato de utils.estatisticas_csv, calculado pelos índices"""
+        hoje = datetime.now().strftime("%Y-%m-%d")
+        por_fonte = dict(self.conexao.execute("SELECT fonte, COUNT(*) FROM eventos GROUP BY fonte"))
+        futuros = self.conexao.execute("SELECT COUNT(*) FROM eventos WHERE data_iso >= ?", (hoje,)).fetchone()[0]
+        passados = self.conexao.execute("SELECT COUNT(*) FROM eventos WHERE data_iso < ?", (hoje,)).fetchone()[0]
+        return {
+            "total": self.contar(),
+            "por_fonte": por_fonte,
+            "arquivo_existe": True,
+            "eventos_futuros": futuros,
+            "eventos_passados": passados,
+        }
+
+    def limpar(self):
+        from busca import IndiceBusca
+
+        with self.conexao:
+            self.conexao.execute("DELETE FROM eventos")
+            self.conexao.execute("DELETE FROM links_evento")
+        IndiceBusca(self.conexao).reconstruir()
+        if self.csv_exportado:
+            limpar_csv(self.csv_exportado)
+
+    def fechar(self):
+        # Fechar a última conexão faz o checkpoint do WAL: o .db fica completo para o commit do workflow
+        self.conexao.close()
+
+ARMAZENAMENTOS = {
+    ArmazenamentoSQLite.nome: ArmazenamentoSQLite,
+    ArmazenamentoCSV.nome: ArmazenamentoCSV,
+}
+
+def tipo_armazenamento(tipo: Optional[str] = None) -> str:
+    """Armazenamento escolhido: argumento, KADENCE_ARMAZENAMENTO ou o padrão"""
+    return tipo or os.environ.get(VARIAVEL_ARMAZENAMENTO) or ARMAZENAMENTO_PADRAO
+
+def abrir_armazenamento(tipo: Optional[str] = None):
+    """Abre o armazenamento escolhido (argumento, KADENCE_ARMAZENAMENTO ou o padrão)"""
+    tipo = tipo_armazenamento(tipo)
+    if tipo not in ARMAZENAMENTOS:
+        raise ValueError(f"Armazenamento desconhecido: {tipo} (opções: {', '.join(ARMAZENAMENTOS)})")
+    return ARMAZENAMENTOS[tipo]()
+
+def _cabecalho_csv(caminho: str) -> Optional[List[str]]:
+    try:
+        with open(caminho, "r", newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), None)
+    except FileNotFoundError:
+        return None
+
+def _anexar_csv(caminho: str, linhas: List[Dict], cabecalho: List[str] = HEADERS):
+    if not linhas:
+        return
+    with open(caminho, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=cabecalho)
+        writer.writerows(linhas)
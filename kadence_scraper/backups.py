@@ -0,0 +1,359 @@
+import glob
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import re
+import sqlite3
+import tempfile
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils import CSV_PATH, BACKUP_DIR
+from armazenamento import DB_PATH
+
+# Configurações
+BLOCOS_DIR = os.path.join(BACKUP_DIR, "blocos")
+MANIFESTOS_DIR = os.path.join(BACKUP_DIR, "manifestos")
+ARQUIVOS_BACKUP = [CSV_PATH, DB_PATH]
+FORMATO_MOMENTO = "%Y%m%d_%H%M%S"  # o mesmo dos antigos corridas_backup_<momento>.csv
+# Blocos de linhas definidos pelo conteúdo: uma linha fecha o bloco quando o crc32 dela
+# cai na máscara (em média a cada 64 linhas), respeitando mínimo e máximo
+MASCARA_FIM_BLOCO = 0x3F
+MIN_LINHAS_BLOCO = 16
+MAX_LINHAS_BLOCO = 512
+TAMANHO_BLOCO_BINARIO = 16 * 1024  # arquivos não-texto: blocos fixos alinhados às páginas do SQLite
+# Cada bloco é gravado comprimido (em fluxo, direto no arquivo); blocos sem extensão são do formato antigo
+COMPRESSAO_PADRAO = "lzma"
+COMPRESSORES = {
+    "lzma": (".xz", lzma.open),
+    "gzip": (".gz", gzip.open),
+    "nenhuma": ("", open),
+}
+# Retenção por gerações: mantém o snapshot mais recente de cada uma das últimas N horas/dias/semanas/meses
+RETENCAO_PADRAO = {"horarios": 24, "diarios": 7, "semanais": 4, "mensais": 12}
+
+def _sha256(dados: bytes) -> str:
+    return hashlib.sha256(dados).hexdigest()
+
+def blocos_de_linhas(caminho: str) -> Iterator[bytes]:
+    """
+    Divide um arquivo de texto em blocos de linhas com fronteiras escolhidas pelo conteúdo:
+    inserir ou alterar linhas só muda os blocos em volta, os demais continuam iguais
+    """
+    bloco = []
+    with open(caminho, "rb") as f:
+        for linha in f:
+            bloco.append(linha)
+            if len(bloco) >= MAX_LINHAS_BLOCO or (
+                    len(bloco) >= MIN_LINHAS_BLOCO and zlib.crc32(linha) & MASCARA_FIM_BLOCO == 0):
+                yield b"".join(bloco)
+                bloco = []
+    if bloco:
+        yield b"".join(bloco)
+
+def blocos_fixos(caminho: str, tamanho: int = TAMANHO_BLOCO_BINARIO) -> Iterator[bytes]:
+    with open(caminho, "rb") as f:
+        while True:
+            bloco = f.read(tamanho)
+            if not bloco:
+                return
+            yield bloco
+
+def _caminho_bloco(chave: str, extensao: str = "") -> str:
+    return os.path.join(BLOCOS_DIR, chave[:2], chave + extensao)
+
+def _localizar_bloco(chave: str) -> Optional[Tuple[str, str]]:
+    """(caminho, compressão) do bloco já guardado, em qualquer formato, ou None"""
+    for compressao, (extensao, _) in COMPRESSORES.items():
+        caminho = _caminho_bloco(chave, extensao)
+        if os.path.exists(caminho):
+            return caminho, compressao
+    return None
+
+def _gravar_atomico(caminho: str, dados: bytes):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as f:
+        f.write(dados)
+    os.replace(temporario, caminho)
+
+def guardar_bloco(dados: bytes, compressao: str = COMPRESSAO_PADRAO) -> Tuple[str, int]:
+    """
+    Grava o bloco pelo sha256 do conteúdo (descomprimido) se ainda não existir.
+    Retorna (chave, bytes ocupados em disco; 0 se o bloco já existia)
+    """
+    chave = _sha256(dados)
+    if _localizar_bloco(chave):
+        return chave, 0
+    extensao, abrir = COMPRESSORES[compressao]
+    caminho = _caminho_bloco(chave, extensao)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = caminho + ".tmp"
+    with abrir(temporario, "wb") as f:
+        f.write(dados)
+    os.replace(temporario, caminho)
+    return chave, os.path.getsize(caminho)
+
+def ler_bloco(chave: str) -> bytes:
+    encontrado = _localizar_bloco(chave)
+    if encontrado is None:
+        raise FileNotFoundError(f"Bloco {chave[:12]} não encontrado")
+    caminho, compressao = encontrado
+    with COMPRESSORES[compressao][1](caminho, "rb") as f:
+        dados = f.read()
+    if _sha256(dados) != chave:
+        raise ValueError(f"Bloco {chave[:12]} corrompido")
+    return dados
+
+def _copia_consistente_sqlite(caminho: str) -> str:
+    """Cópia do banco feita pela API de backup do SQLite (inclui o que ainda está no WAL)"""
+    descritor, temporario = tempfile.mkstemp(suffix=".db")
+    os.close(descritor)
+    origem = sqlite3.connect(caminho)
+    destino = sqlite3.connect(temporario)
+    try:
+        origem.backup(destino)
+    finally:
+        destino.close()
+        origem.close()
+    return temporario
+
+def _registrar_arquivo(caminho: str, estatisticas: Dict, compressao: str) -> Dict:
+    """Quebra um arquivo em blocos, guarda os inéditos e devolve a entrada do manifesto"""
+    copia = _copia_consistente_sqlite(caminho) if caminho.endswith(".db") else None
+    origem = copia or caminho
+    try:
+        gerador = blocos_fixos(origem) if copia else blocos_de_linhas(origem)
+        total = hashlib.sha256()
+        chaves = []
+        tamanho = 0
+        for bloco in gerador:
+            chave, gravados = guardar_bloco(bloco, compressao)
+            chaves.append(chave)
+            total.update(bloco)
+            tamanho += len(bloco)
+            estatisticas["blocos"] += 1
+            if gravados:
+                estatisticas["blocos_novos"] += 1
+                estatisticas["bytes_novos"] += len(bloco)
+                estatisticas["bytes_gravados"] += gravados
+    finally:
+        if copia:
+            os.remove(copia)
+    return {"caminho": caminho, "tamanho": tamanho, "sha256": total.hexdigest(), "blocos": chaves}
+
+def criar_snapshot(arquivos: Optional[List[str]] = None, momento: Optional[datetime] = None,
+                   compressao: str = COMPRESSAO_PADRAO) -> Optional[str]:
+    """
+    Registra um snapshot dos arquivos de dados: cada bloco inédito é guardado uma vez
+    (comprimido) em data/backups/blocos e o manifesto lista os blocos de cada arquivo.
+    Retorna o caminho do manifesto (ou None se não havia o que guardar)
+    """
+    arquivos = [a for a in (arquivos or ARQUIVOS_BACKUP) if os.path.exists(a)]
+    if not arquivos:
+        print("📄 Nenhum arquivo de dados para fazer backup")
+        return None
+
+    momento = momento or datetime.now()
+    while os.path.exists(os.path.join(MANIFESTOS_DIR, f"snapshot_{momento.strftime(FORMATO_MOMENTO)}.json")):
+        momento += timedelta(seconds=1)  # dois snapshots no mesmo segundo
+    estatisticas = {"blocos": 0, "blocos_novos": 0, "bytes_novos": 0, "bytes_gravados": 0}
+    manifesto = {
+        "criado_em": momento.isoformat(timespec="seconds"),
+        "compressao": compressao,
+        "arquivos": [_registrar_arquivo(a, estatisticas, compressao) for a in arquivos],
+        "estatisticas": estatisticas,
+    }
+    caminho = os.path.join(MANIFESTOS_DIR, f"snapshot_{momento.strftime(FORMATO_MOMENTO)}.json")
+    _gravar_atomico(caminho, json.dumps(manifesto, ensure_ascii=False, indent=1).encode("utf-8"))
+    print(f"💾 Backup criado: {os.path.basename(caminho)} ({estatisticas['blocos_novos']}/"
+          f"{estatisticas['blocos']} blocos novos, {estatisticas['bytes_novos'] / 1024:.0f} KB -> "
+          f"{estatisticas['bytes_gravados'] / 1024:.0f} KB {compressao})")
+    return caminho
+
+def listar_snapshots() -> List[Tuple[datetime, str]]:
+    """(momento, caminho do manifesto) de todos os snapshots, do mais antigo ao mais recente"""
+    snapshots = []
+    for caminho in glob.glob(os.path.join(MANIFESTOS_DIR, "snapshot_*.json")):
+        encontrado = re.search(r"snapshot_(\d{8}_\d{6})\.json$", caminho)
+        if encontrado:
+            snapshots.append((datetime.strptime(encontrado.group(1), FORMATO_MOMENTO), caminho))
+    return sorted(snapshots)
+
+def ler_manifesto(caminho: str) -> Dict:
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def snapshot_em(momento: Optional[datetime] = None) -> Optional[Tuple[datetime, str]]:
+    """Último snapshot feito até `momento` (o mais recente se None)"""
+    candidatos = [s for s in listar_snapshots() if momento is None or s[0] <= momento]
+    return candidatos[-1] if candidatos else None
+
+def interpretar_momento(texto: str) -> datetime:
+    """Aceita '2025-08-07', '2025-08-07T14:43[:14]', '2025-08-07 14:43' ou '20250807_144314'"""
+    texto = texto.strip()
+    try:
+        return datetime.strptime(texto, FORMATO_MOMENTO)
+    except ValueError:
+        pass
+    momento = datetime.fromisoformat(texto)
+    if len(texto) == 10:
+        momento = momento.replace(hour=23, minute=59, second=59)  # só a data: vale o dia inteiro
+    return momento
+
+def restaurar(momento: Optional[datetime] = None, destino: Optional[str] = None) -> Optional[str]:
+    """
+    Remonta os arquivos do último snapshot até `momento` e confere o sha256 de cada um.
+    Sem `destino`, sobrescreve os arquivos de dados (antes guarda um snapshot do estado atual);
+    com `destino`, grava as cópias dentro desse diretório. Retorna o manifesto usado
+    """
+    escolhido = snapshot_em(momento)
+    if escolhido is None:
+        print(f"❌ Nenhum backup até {momento:%d/%m/%Y %H:%M:%S}" if momento else "❌ Nenhum backup encontrado")
+        return None
+    data_snapshot, caminho_manifesto = escolhido
+    manifesto = ler_manifesto(caminho_manifesto)
+
+    if destino is None:
+        criar_snapshot()
+        restaurados = {arquivo["caminho"] for arquivo in manifesto["arquivos"]}
+        if DB_PATH not in restaurados and os.path.exists(DB_PATH):
+            # Snapshot só do CSV (ex.: backups antigos importados): o banco é recriado a partir dele
+            print("⚠️ Backup sem o banco SQLite: ele será recriado a partir do CSV restaurado")
+            for arquivo in (DB_PATH, DB_PATH + "-wal", DB_PATH + "-shm"):
+                if os.path.exists(arquivo):
+                    os.remove(arquivo)
+
+    for arquivo in manifesto["arquivos"]:
+        alvo = os.path.join(destino, os.path.basename(arquivo["caminho"])) if destino else arquivo["caminho"]
+        temporario = alvo + ".restaurando"
+        os.makedirs(os.path.dirname(alvo) or ".", exist_ok=True)
+        total = hashlib.sha256()
+        with open(temporario, "wb") as f:
+            for chave in arquivo["blocos"]:
+                bloco = ler_bloco(chave)
+                total.update(bloco)
+                f.write(bloco)
+        if total.hexdigest() != arquivo["sha256"]:
+            os.remove(temporario)
+            raise ValueError(f"Restauração de {arquivo['caminho']} não confere com o manifesto")
+        if alvo.endswith(".db"):
+            for auxiliar in (alvo + "-wal", alvo + "-shm"):
+                if os.path.exists(auxiliar):
+                    os.remove(auxiliar)  # WAL do banco antigo não vale para o restaurado
+        os.replace(temporario, alvo)
+        print(f"♻️ {alvo} restaurado ({arquivo['tamanho'] / 1024:.0f} KB)")
+
+    print(f"✅ Backup de {data_snapshot:%d/%m/%Y %H:%M:%S} restaurado")
+    return caminho_manifesto
+
+def importar_backups_antigos(diretorio: str, remover: bool = False) -> int:
+    """
+    Registra cópias antigas corridas_backup_<momento>.csv como snapshots do CSV, com o
+    momento do nome do arquivo. Com `remover`, apaga cada cópia depois de registrada
+    """
+    importados = 0
+    ja_existentes = {m for m, _ in listar_snapshots()}
+    for caminho in sorted(glob.glob(os.path.join(diretorio, "corridas_backup_*.csv"))):
+        encontrado = re.search(r"corridas_backup_(\d{8}_\d{6})\.csv$", caminho)
+        if not encontrado:
+            continue
+        momento = datetime.strptime(encontrado.group(1), FORMATO_MOMENTO)
+        if momento not in ja_existentes:
+            manifesto = criar_snapshot([caminho], momento)
+            # O snapshot representa o CSV de dados, não a cópia
+            dados = ler_manifesto(manifesto)
+            dados["arquivos"][0]["caminho"] = CSV_PATH
+            _gravar_atomico(manifesto, json.dumps(dados, ensure_ascii=False, indent=1).encode("utf-8"))
+            importados += 1
+        if remover:
+            os.remove(caminho)
+    return importados
+
+def _chaves_de_periodo(momento: datetime) -> Dict[str, tuple]:
+    semana = momento.isocalendar()
+    return {
+        "horarios": (momento.year, momento.month, momento.day, momento.hour),
+        "diarios": (momento.year, momento.month, momento.day),
+        "semanais": (semana[0], semana[1]),
+        "mensais": (momento.year, momento.month),
+    }
+
+def snapshots_a_manter(snapshots: List[Tuple[datetime, str]], retencao: Dict[str, int]) -> set:
+    """
+    Avô-pai-filho: para cada geração, o snapshot mais recente de cada um dos
+    últimos N períodos que têm snapshot. O mais recente de todos sempre fica
+    """
+    manter = {snapshots[-1][1]} if snapshots else set()
+    for geracao, quantidade in retencao.items():
+        periodos = []
+        for momento, caminho in reversed(snapshots):
+            periodo = _chaves_de_periodo(momento)[geracao]
+            if periodo in periodos:
+                continue
+            if len(periodos) >= quantidade:
+                break
+            periodos.append(periodo)
+            manter.add(caminho)
+    return manter
+
+def coletar_blocos_orfaos() -> Tuple[int, int]:
+    """Apaga os blocos que nenhum manifesto usa mais; retorna (blocos, bytes) liberados"""
+    em_uso = set()
+    for _, caminho in listar_snapshots():
+        for arquivo in ler_manifesto(caminho)["arquivos"]:
+            em_uso.update(arquivo["blocos"])
+    removidos = liberados = 0
+    for caminho in glob.glob(os.path.join(BLOCOS_DIR, "*", "*")):
+        chave = os.path.basename(caminho).split(".")[0]
+        if chave not in em_uso:
+            liberados += os.path.getsize(caminho)
+            os.remove(caminho)
+            removidos += 1
+    return removidos, liberados
+
+def aplicar_retencao(retencao: Optional[Dict[str, int]] = None) -> int:
+    """Remove os snapshots fora da retenção por gerações e os blocos que ficaram sem uso"""
+    retencao = {**RETENCAO_PADRAO, **(retencao or {})}
+    snapshots = listar_snapshots()
+    manter = snapshots_a_manter(snapshots, retencao)
+    removidos = 0
+    for _, caminho in snapshots:
+        if caminho not in manter:
+            os.remove(caminho)
+            removidos += 1
+    if removidos:
+        blocos, liberados = coletar_blocos_orfaos()
+        print(f"🧹 {removidos} backups fora da retenção removidos "
+              f"({blocos} blocos, {liberados / 1024:.0f} KB liberados)")
+    return removidos
+
+def tamanho_armazenado() -> int:
+    """Bytes ocupados por blocos e manifestos"""
+    return sum(os.path.getsize(c) for c in glob.glob(os.path.join(BLOCOS_DIR, "*", "*")) +
+               glob.glob(os.path.join(MANIFESTOS_DIR, "*.json")))
+
+def listar_backups():
+    """Imprime os snapshots com tamanho original, quanto cada um acrescentou em disco e a razão de compressão"""
+    snapshots = listar_snapshots()
+    if not snapshots:
+        print("📄 Nenhum backup registrado")
+        return
+    print(f"{'Momento':<20} {'Original':>10} {'Novos':>10} {'Gravados':>10} {'Razão':>7}  Compressão")
+    total_original = 0
+    for momento, caminho in snapshots:
+        manifesto = ler_manifesto(caminho)
+        original = sum(a["tamanho"] for a in manifesto["arquivos"])
+        total_original += original
+        estatisticas = manifesto.get("estatisticas", {})
+        novos, gravados = estatisticas.get("bytes_novos"), estatisticas.get("bytes_gravados")
+        razao = f"{novos / gravados:.1f}x" if novos and gravados else "-"
+        print(f"{momento:%d/%m/%Y %H:%M:%S}  {original / 1024:>8.0f}KB "
+              f"{(novos or 0) / 1024:>8.0f}KB {(gravados or 0) / 1024:>8.0f}KB {razao:>7}  "
+              f"{manifesto.get('compressao', 'nenhuma')}")
+    em_disco = tamanho_armazenado()
+    print(f"\n📦 {len(snapshots)} backups: {total_original / 1024 / 1024:.1f} MB de dados em "
+          f"{em_disco / 1024 / 1024:.2f} MB no disco ({total_original / max(em_disco, 1):.1f}x)")
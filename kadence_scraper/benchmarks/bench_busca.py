@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Busca por palavras (busca.py) num banco temporário: plurais do português e do inglês têm de cair
+no mesmo termo do singular, então 'run' acha "Night Runs" e 'jardim' acha "Corrida dos Jardins".
+
+    python kadence_scraper/benchmarks/bench_busca.py
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import ArmazenamentoSQLite
+from busca import IndiceBusca, tokenizar
+from utils import gerar_hash_evento
+
+# Configurações
+EVENTOS = [
+    ("Night Runs Santos", "14/03/2026", "Santos - SP"),
+    ("Runners Club 10K", "21/03/2026", "São Paulo - SP"),
+    ("Corrida dos Jardins", "28/03/2026", "São Paulo - SP"),
+    ("Corrida dos Bons Amigos", "04/04/2026", "Garanhuns - PE"),
+    ("Rum Fest 5K", "11/04/2026", "Recife - PE"),
+]
+
+# texto -> radicais esperados
+TOKENS = {
+    "runs": ["run"],
+    "runners": ["runner"],
+    "jardins": ["jardim"],
+    "bons": ["bom"],
+    "comuns": ["comum"],
+    "edições": ["edicao"],
+}
+
+# busca -> título que tem de vir primeiro
+BUSCAS = {
+    "run": "Night Runs Santos",
+    "runs": "Night Runs Santos",
+    "night run": "Night Runs Santos",
+    "runner": "Runners Club 10K",
+    "rum": "Rum Fest 5K",
+    "jardim": "Corrida dos Jardins",
+    "bom": "Corrida dos Bons Amigos",
+}
+
+def _evento(titulo, data, local):
+    return {"titulo": titulo, "data": data, "local": local, "link": "", "fonte": "Teste",
+            "hash": gerar_hash_evento(titulo, data, local)}
+
+def conferir_tokens():
+    ok = True
+    for texto, esperado in TOKENS.items():
+        obtido = tokenizar(texto)
+        if obtido != esperado:
+            print(f"❌ tokenizar({texto!r}) = {obtido}, esperado {esperado}")
+            ok = False
+    return ok
+
+def conferir_buscas(indice, silencioso):
+    ok = True
+    for texto, esperado in BUSCAS.items():
+        resultados = indice.buscar(texto)
+        primeiro = resultados[0]["titulo"] if resultados else None
+        if primeiro != esperado:
+            print(f"❌ buscar({texto!r}) -> {primeiro!r}, esperado {esperado!r}")
+            ok = False
+        elif not silencioso:
+            print(f"   {texto!r}: {primeiro}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Confere plurais e buscas do índice de busca")
+    parser.add_argument("--silencioso", action="store_true", help="Mostra só as falhas")
+    args = parser.parse_args()
+
+    ok = conferir_tokens()
+    with tempfile.TemporaryDirectory() as diretorio:
+        with ArmazenamentoSQLite(os.path.join(diretorio, "busca.db"), csv_exportado=None) as banco:
+            banco.gravar([_evento(*evento) for evento in EVENTOS])
+            ok = conferir_buscas(IndiceBusca(banco.conexao), args.silencioso) and ok
+
+    print("✅ Busca OK" if ok else "❌ Busca com falhas")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
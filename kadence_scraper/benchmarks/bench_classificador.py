@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Precisão/revocação e vazão do classificador de corridas (scrapers/classificador.py) sobre o
+conjunto rotulado eval_classificador.tsv, comparado com as buscas por substring que cada
+scraper fazia antes.
+
+    python kadence_scraper/benchmarks/bench_classificador.py             # métricas + vazão
+    python kadence_scraper/benchmarks/bench_classificador.py --gerar-eval # regenera o conjunto
+
+O CSV não guarda a categoria do card, então as linhas vindas de data/corridas.csv levam a
+categoria típica da fonte (CATEGORIA_TIPICA); os rótulos revisados à mão e os casos difíceis
+ficam em REVISADOS e CASOS_EXTRAS. Como o CSV só tem o que o filtro antigo já aceitava, a linha
+"revisados à mão" (só REVISADOS e CASOS_EXTRAS) é a que mede precisão de verdade
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.classificador import classificador, limpar_cache
+
+# Configurações
+EVAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eval_classificador.tsv")
+CSV_ORIGEM = os.path.join("data", "corridas.csv")
+FONTES = ["Even3", "Doity", "TimeTicket", "YouMovin", "MinhasInscricoes"]
+TAMANHO_PAGINA = 40  # cards por página no teste em lote
+REPETICOES = 50
+
+# O que cada fonte mostra no campo de categoria (Even3 não tem; TimeTicket é a descrição)
+CATEGORIA_TIPICA = {"Doity": "Corrida", "YouMovin": "Corrida de Rua", "MinhasInscricoes": "Corrida de Rua"}
+
+# Linhas do CSV revisadas à mão: título -> (categoria, é corrida?)
+REVISADOS = {
+    "Teste": ("", 0),
+    "PRÉ-INSCRIÇÃO FKM - CAMPEONATO BRASILEIRO KARATÊ 2025": ("Artes Marciais", 0),
+    "6º Aniversário do Grupo Renegados Bike Club": ("Ciclismo", 0),
+    "Workshop de eletrotermofototerapia": ("", 0),
+    "Desconto TimeClub": ("", 0),
+    "Circuito Aguas Abertas 2025": ("Águas Abertas", 0),
+}
+
+# Casos que o CSV não tem: eventos que não são corrida e corridas com nome difícil
+CASOS_EXTRAS = [
+    # (fonte, título, categoria, url, é corrida?)
+    ("Doity", "Brunch dos Corredores", "Gastronomia", "", 0),
+    ("Doity", "Trunk Show Primavera", "Moda", "", 0),
+    ("Doity", "Passeio Ciclístico 30km", "Ciclismo", "", 0),
+    ("Doity", "Torneio de Beach Tennis", "Esporte", "", 0),
+    ("Doity", "Pedal Noturno Solidário", "", "", 0),
+    ("Doity", "Treinão Outubro Rosa 5K", "Corrida", "", 1),
+    ("Doity", "São Silvestre da Vila", "", "", 1),
+    ("Even3", "Workshop de Corrida para Iniciantes", "", "https://even3.com.br/workshop-corrida-iniciantes-512300", 0),
+    ("Even3", "Curso de Treinador de Corrida de Rua", "", "https://even3.com.br/curso-treinador-corrida-489001", 0),
+    ("Even3", "Seminário de Cooperativismo", "", "https://even3.com.br/seminario-cooperativismo-501122", 0),
+    ("Even3", "Festival de Food Trailers", "", "https://even3.com.br/food-trailers-2025-533001", 0),
+    ("Even3", "Congresso Brasileiro de Medicina do Esporte", "", "https://even3.com.br/cbme2025-499871", 0),
+    ("Even3", "Simpósio de Atletismo Escolar", "", "https://even3.com.br/simposio-atletismo-500002", 0),
+    ("Even3", "Corrida da Saúde UFPE 5km", "", "https://even3.com.br/corrida-da-saude-ufpe-521337", 1),
+    ("Even3", "1ª Rústica do Campus", "", "https://even3.com.br/rustica-campus-520001", 1),
+    ("Even3", "Caminhada e Corrida do Servidor", "", "https://even3.com.br/caminhada-servidor-519999", 1),
+    ("TimeTicket", "Travessia do Lago Azul 2km", "Travessia em águas abertas", "", 1),
+    ("TimeTicket", "Desafio MTB Serra Verde", "Mountain bike 60km", "", 1),
+    ("TimeTicket", "Backyard Ultra Cerrado", "", "", 1),
+    ("TimeTicket", "Campeonato de Kart Indoor", "Kart amador", "", 0),
+    ("YouMovin", "Cavalgada da Tradição", "", "", 0),
+    ("YouMovin", "Volta Internacional da Pampulha", "", "", 1),
+    ("YouMovin", "15K Noturna de Gramado", "", "", 1),
+    ("YouMovin", "Ultra Trail Serra Fina", "Aventura", "", 1),
+    ("MinhasInscricoes", "Motociclismo Regional - 3ª Etapa", "Motociclismo", "", 0),
+    ("MinhasInscricoes", "Curso de Arbitragem de Futebol", "Curso", "", 0),
+    ("MinhasInscricoes", "Night Race Santos", "", "", 1),
+    ("MinhasInscricoes", "Meia de Floripa 21,1 km", "", "", 1),
+    # Títulos mistos: o termo de corrida no título vence o outro esporte
+    ("Doity", "Pedal e Corrida Solidária", "", "", 1),
+    ("Doity", "Corrida Bike Fit", "", "", 1),
+    ("Even3", "Aquathlon Natação e Corrida UFRN", "", "https://even3.com.br/aquathlon-ufrn-534210", 1),
+    ("YouMovin", "Duathlon corrida e bike", "", "", 1),
+    ("MinhasInscricoes", "Corrida do Flamengo Futebol Clube", "", "", 1),
+    # Outros esportes e eventos sobre corrida que não são prova
+    ("Doity", "Passeio Ciclístico da Primavera 40km", "Ciclismo", "", 0),
+    ("Doity", "Jantar de Gala dos Corredores", "Gastronomia", "", 0),
+    ("Doity", "Campeonato de Xadrez Rápido", "Esporte", "", 0),
+    ("Even3", "Palestra: Corrida e Saúde do Coração", "", "https://even3.com.br/palestra-corrida-saude-530118", 0),
+    ("Even3", "Mentoria para Corredores de Rua", "", "https://even3.com.br/mentoria-corredores-528877", 0),
+    ("YouMovin", "Pedal Noturno 30km", "", "", 0),
+    ("YouMovin", "Volta Ciclística de Gramado", "", "", 0),
+    ("MinhasInscricoes", "Corrida de Kart Amador - 2ª Etapa", "Kart", "", 0),
+    ("MinhasInscricoes", "Torneio de Futebol Society", "Futebol", "", 0),
+    ("MinhasInscricoes", "Campeonato de Vôlei de Praia", "Vôlei", "", 0),
+    ("MinhasInscricoes", "Feira de Esportes e Corrida", "Feira", "", 0),
+    # Só termos fracos ('volta', 'ultra', 'corre', distância solta): não bastam sem um termo forte
+    ("Doity", "Volta às aulas 2025", "", "", 0),
+    ("Doity", "Ultra Show de Rock", "", "", 0),
+    ("Doity", "Retiro Espiritual 3K participantes", "", "", 0),
+    ("Even3", "Encontro Regional Volta Redonda 2025", "", "https://even3.com.br/encontro-regional-volta-redonda-2025-541120", 0),
+    ("Even3", "Jornada de Ultra-som Veterinário", "", "https://even3.com.br/jornada-ultrassom-veterinario-538004", 0),
+    ("Even3", "Semana Acadêmica: Corre Cotia", "", "https://even3.com.br/semana-academica-corre-cotia-536612", 0),
+    ("YouMovin", "R$ 10k em prêmios - Torneio de Poker", "", "", 0),
+    ("MinhasInscricoes", "Encontro Mini Cooper", "", "", 0),
+]
+
+# Buscas por substring que os scrapers usavam antes do classificador (a linha de base)
+PALAVRAS_LEGADO = ['corrida', 'maratona', 'run', 'running', 'atletismo', 'cooper', 'caminhada', 'trote',
+                   'meia maratona', '5k', '10k', '21k', '42k', 'km', 'trail', 'night run', 'day run',
+                   'street run', 'rustica']
+LEGADO = {
+    # fonte -> (palavras no título, termos na categoria, olha a url?, título e categoria juntos?)
+    "Even3": (PALAVRAS_LEGADO[:-1], [], True, False),
+    "Doity": (PALAVRAS_LEGADO, ['corrida', 'run'], False, False),
+    "TimeTicket": (PALAVRAS_LEGADO + ['travessia', 'mountain bike', 'mtb', 'bike'], [], False, True),
+    "YouMovin": (PALAVRAS_LEGADO, ['corrida de rua', 'aventura'], False, False),
+    "MinhasInscricoes": (PALAVRAS_LEGADO, ['corrida de rua', 'trail run', 'ultramaratona', 'meia maratona',
+                                           'evento de corrida', 'corridas de montanha'], False, False),
+}
+
+def legado(fonte, titulo, tag="", url=""):
+    if not titulo:
+        return False
+    palavras, termos_tag, com_url, juntos = LEGADO[fonte]
+    titulo = f"{titulo} {tag}".lower() if juntos else titulo.lower()
+    tag = (tag or "").lower()
+    if any(t in tag for t in termos_tag):
+        return True
+    textos = [titulo, (url or "").lower()] if com_url else [titulo]
+    return any(p in texto for texto in textos for p in palavras)
+
+def gerar_eval(origem=CSV_ORIGEM, destino=EVAL_PATH):
+    """Um exemplo por título distinto das fontes com classificador, mais os casos à parte"""
+    with open(origem, "r", encoding="utf-8") as f:
+        linhas = list(csv.DictReader(f))
+    vistos = set()
+    registros = []
+    for linha in linhas:
+        fonte, titulo = linha["Fonte"], linha["Título"]
+        if fonte not in FONTES or (fonte, titulo) in vistos:
+            continue
+        vistos.add((fonte, titulo))
+        categoria, rotulo = REVISADOS.get(titulo, (CATEGORIA_TIPICA.get(fonte, ""), 1))
+        url = linha["Link"] if fonte == "Even3" else ""
+        registros.append((fonte, titulo, categoria, url, rotulo))
+    registros.extend(CASOS_EXTRAS)
+    with open(destino, "w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f, delimiter="\t")
+        escritor.writerow(["fonte", "titulo", "tag", "url", "corrida"])
+        escritor.writerows(registros)
+    print(f"📝 {len(registros)} exemplos gravados em {destino}")
+
+def carregar_eval(caminho=EVAL_PATH):
+    with open(caminho, "r", encoding="utf-8", newline="") as f:
+        return [(l["fonte"], l["titulo"], l["tag"], l["url"], l["corrida"] == "1")
+                for l in csv.DictReader(f, delimiter="\t")]
+
+def _metricas(pares):
+    """(previsto, esperado) -> precisão, revocação, F1"""
+    vp = sum(1 for p, e in pares if p and e)
+    fp = sum(1 for p, e in pares if p and not e)
+    fn = sum(1 for p, e in pares if not p and e)
+    precisao = vp / (vp + fp) if vp + fp else 1.0
+    revocacao = vp / (vp + fn) if vp + fn else 1.0
+    f1 = 2 * precisao * revocacao / (precisao + revocacao) if precisao + revocacao else 0.0
+    return precisao, revocacao, f1
+
+def medir_qualidade(exemplos, detalhar=False):
+    previsoes = {"classificador": [], "legado": []}
+    # As demais linhas vêm de títulos que o filtro antigo já tinha aceitado: só estas medem o filtro de fato
+    revisados = {"classificador": [], "legado": []}
+    a_mao = {(fonte, titulo) for fonte, titulo, *_ in CASOS_EXTRAS}
+    por_fonte = {}
+    for fonte, titulo, tag, url, esperado in exemplos:
+        novo = classificador(fonte).eh_corrida(titulo, tag, url)
+        antigo = legado(fonte, titulo, tag, url)
+        previsoes["classificador"].append((novo, esperado))
+        previsoes["legado"].append((antigo, esperado))
+        if (fonte, titulo) in a_mao or titulo in REVISADOS:
+            revisados["classificador"].append((novo, esperado))
+            revisados["legado"].append((antigo, esperado))
+        por_fonte.setdefault(fonte, {"classificador": [], "legado": []})
+        por_fonte[fonte]["classificador"].append((novo, esperado))
+        por_fonte[fonte]["legado"].append((antigo, esperado))
+        if detalhar and novo != esperado:
+            print(f"   {'❌ FP' if novo else '⚠️ FN'} {fonte}: {titulo[:60]} [{tag}]")
+
+    positivos = sum(1 for *_, e in exemplos if e)
+    print(f"🎯 {len(exemplos)} exemplos ({positivos} corridas, {len(exemplos) - positivos} outros)")
+    print(f"   {'':<18} {'classificador (P/R/F1)':>24}   {'legado (P/R/F1)':>22}")
+    linhas = [("TOTAL", previsoes), ("revisados à mão", revisados)] + sorted(por_fonte.items())
+    for nome, grupos in linhas:
+        colunas = ["{:.2f} / {:.2f} / {:.2f}".format(*_metricas(grupos[k])) for k in ("classificador", "legado")]
+        print(f"   {nome:<18} {colunas[0]:>24}   {colunas[1]:>22}")
+    return _metricas(previsoes["classificador"])[2] >= _metricas(previsoes["legado"])[2]
+
+def medir_vazao(exemplos, repeticoes=REPETICOES):
+    paginas = {}
+    for fonte, titulo, tag, url, _ in exemplos:
+        paginas.setdefault(fonte, []).append((titulo, tag, url))
+    total = len(exemplos) * repeticoes
+
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for fonte, titulo, tag, url, _ in exemplos:
+            legado(fonte, titulo, tag, url)
+    t_legado = time.perf_counter() - inicio
+
+    # A frio: cache de normalização vazio a cada passada
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        limpar_cache()
+        for fonte, titulo, tag, url, _ in exemplos:
+            classificador(fonte).eh_corrida(titulo, tag, url)
+    t_frio = time.perf_counter() - inicio
+
+    # A quente: os mesmos cards de novo (páginas repetidas entre tentativas e execuções)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for fonte, titulo, tag, url, _ in exemplos:
+            classificador(fonte).eh_corrida(titulo, tag, url)
+    t_quente = time.perf_counter() - inicio
+
+    # Em lote e a frio: uma chamada por página de cards
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        limpar_cache()
+        for fonte, eventos in paginas.items():
+            c = classificador(fonte)
+            for i in range(0, len(eventos), TAMANHO_PAGINA):
+                c.classificar(eventos[i:i + TAMANHO_PAGINA])
+    t_lote = time.perf_counter() - inicio
+
+    print(f"⚡ Vazão ({len(exemplos)} eventos x {repeticoes}):")
+    print(f"   legado:   {total / t_legado:>12,.0f} eventos/s")
+    print(f"   a frio:   {total / t_frio:>12,.0f} eventos/s")
+    print(f"   a quente: {total / t_quente:>12,.0f} eventos/s")
+    print(f"   em lote:  {total / t_lote:>12,.0f} eventos/s (páginas de {TAMANHO_PAGINA})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do classificador de corridas")
+    parser.add_argument("--gerar-eval", action="store_true", help=f"Regenera o conjunto a partir de {CSV_ORIGEM}")
+    parser.add_argument("--detalhar", action="store_true", help="Lista os erros do classificador")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    args = parser.parse_args()
+    if args.gerar_eval:
+        gerar_eval()
+        return
+    exemplos = carregar_eval()
+    ok = medir_qualidade(exemplos, args.detalhar)
+    medir_vazao(exemplos, args.repeticoes)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
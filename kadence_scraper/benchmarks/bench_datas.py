@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Acerto e vazão do interpretador de datas (scrapers/datas.py) sobre o corpus corpus_datas.tsv.
+
+    python kadence_scraper/benchmarks/bench_datas.py                # acerto + vazão
+    python kadence_scraper/benchmarks/bench_datas.py --gerar-corpus # regenera o corpus a partir do CSV
+
+O CSV só guarda a data já normalizada, então o corpus pega as datas reais de data/corridas.csv
+e as escreve no formato bruto que cada fonte mostra nos cards (mais alguns casos à parte)
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.datas import interpretar_data, interpretar_datas, limpar_cache
+
+# Configurações
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus_datas.tsv")
+CSV_ORIGEM = os.path.join("data", "corridas.csv")
+REFERENCIA_CORPUS = date(2025, 9, 1)  # "hoje" dos formatos sem ano
+TAMANHO_PAGINA = 40  # cards por página no teste em lote
+REPETICOES = 20
+
+MESES_ABREV = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+MESES_NOME = ["janeiro", "fevereiro", "março", "abril", "maio", "junho", "julho", "agosto",
+              "setembro", "outubro", "novembro", "dezembro"]
+DIAS_SEMANA = ["segunda-feira", "terça-feira", "quarta-feira", "quinta-feira", "sexta-feira", "sábado", "domingo"]
+DIAS_ABREV = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+
+# Fonte -> (formato do card, precisa de ano?) ; False = formato sem ano (depende da referência)
+FORMATOS = {
+    "Sympla": (lambda d, t: f"{DIAS_SEMANA[d.weekday()].split('-')[0].capitalize()}, {d:%d} de "
+                            f"{MESES_ABREV[d.month - 1]} às 07:00", False),
+    "Doity": (lambda d, t: f"{d:%d} {MESES_ABREV[d.month - 1].upper()} {d.year}", True),
+    "Even3": (lambda d, t: f"{DIAS_SEMANA[d.weekday()]}, {d.day} de {MESES_NOME[d.month - 1]} de {d.year}", True),
+    "Atletis": (lambda d, t: f"{d:%d} {MESES_NOME[d.month - 1].capitalize()} {d.year}", True),
+    "CentralDaCorrida": (lambda d, t: f"{d:%d/%m/%Y} - 06:30", True),
+    "TimeTicket": (lambda d, t: f"{DIAS_ABREV[d.weekday()]} - {d:%d/%m/%Y}", True),
+    "LIVE! Run": (lambda d, t: f"{d:%d/%m} - {DIAS_SEMANA[d.weekday()].split('-')[0].capitalize()}", False),
+    "SportTimer": (lambda d, t: f"{d:%d/%m}", False),  # o scraper já separou a data do início do título
+    "Track&Field": (lambda d, t: f"{d.day} de {MESES_ABREV[d.month - 1].lower()}", False),
+    "Ativo": (lambda d, t: f"{d:%d} {MESES_ABREV[d.month - 1]}", False),
+    "Corridao": (lambda d, t: f"{d:%d} {MESES_ABREV[d.month - 1]}", False),
+    "VemCorrer": (lambda d, t: f"{d:%Y-%m-%d}/{d + timedelta(days=1):%Y-%m-%d}", True),
+    "YouMovin": (lambda d, t: f"{d:%d/%m/%Y} 14:30", True),
+    "MinhasInscricoes": (lambda d, t: f"{d:%d/%m/%Y}", True),
+    "BrasilCorrida": (lambda d, t: f"{d:%d/%m/%Y}", True),
+    "Cronoschip": (lambda d, t: f"  {d:%d/%m/%Y}  ", True),
+    "OxyScrono": (lambda d, t: f"{d:%d/%m/%Y}", True),
+}
+
+# Variações vistas nas páginas que o CSV não guarda: intervalos, virada de ano, ruído em volta
+CASOS_EXTRAS = [
+    ("Sympla", "Sáb, 13 de Set - Dom, 14 de Set", "13/09/2025"),
+    ("Sympla", "30 de Dez às 19:00", "30/12/2025"),
+    ("Sympla", "05 de Jan às 06:00", "05/01/2026"),
+    ("Even3", "13 a 14 de setembro de 2025", "13/09/2025"),
+    ("Even3", "sábado, 1 de novembro de 2025", "01/11/2025"),
+    ("Doity", "09 AGO 2026", "09/08/2026"),
+    ("Atletis", "07 Março 2026", "07/03/2026"),
+    ("Track&Field", "1 de mar", "01/03/2026"),
+    ("LIVE! Run", "01/09 - Segunda", "01/09/2025"),
+    ("TimeTicket", "Sab - 20/09/2025", "20/09/2025"),
+    ("VemCorrer", "2025-08-31/2025-09-01", "31/08/2025"),
+    ("VemCorrer", "2025-10-12T07:00:00-03:00", "12/10/2025"),
+    ("YouMovin", "20/09/25", "20/09/2025"),
+    ("Cronoschip", "\uf073 17/10/2025", "17/10/2025"),
+]
+
+def gerar_corpus(origem=CSV_ORIGEM, destino=CORPUS_PATH):
+    """Uma linha por evento real do CSV, no formato bruto da sua fonte (ou de uma fonte com o mesmo dia)"""
+    with open(origem, "r", encoding="utf-8") as f:
+        linhas = list(csv.DictReader(f))
+    limite_sem_ano = REFERENCIA_CORPUS + timedelta(days=364)
+    registros = []
+    for n, linha in enumerate(linhas):
+        try:
+            dia = datetime.strptime(linha["Data"], "%d/%m/%Y").date()
+        except ValueError:
+            continue
+        fonte = linha["Fonte"] if linha["Fonte"] in FORMATOS else list(FORMATOS)[n % len(FORMATOS)]
+        formatar, com_ano = FORMATOS[fonte]
+        if not com_ano and not (REFERENCIA_CORPUS <= dia <= limite_sem_ano):
+            continue
+        registros.append((fonte, formatar(dia, linha["Título"]), REFERENCIA_CORPUS.isoformat(), f"{dia:%d/%m/%Y}"))
+    registros.extend((fonte, bruto, REFERENCIA_CORPUS.isoformat(), esperado) for fonte, bruto, esperado in CASOS_EXTRAS)
+    with open(destino, "w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f, delimiter="\t")
+        escritor.writerow(["fonte", "bruto", "referencia", "esperado"])
+        escritor.writerows(registros)
+    print(f"📝 {len(registros)} textos gravados em {destino}")
+
+def carregar_corpus(caminho=CORPUS_PATH):
+    with open(caminho, "r", encoding="utf-8", newline="") as f:
+        return [(l["fonte"], l["bruto"], date.fromisoformat(l["referencia"]), l["esperado"])
+                for l in csv.DictReader(f, delimiter="\t")]
+
+def medir_acerto(corpus):
+    erros = {}
+    for fonte, bruto, referencia, esperado in corpus:
+        _, obtido = interpretar_data(bruto, referencia)
+        if obtido != esperado:
+            erros.setdefault(fonte, []).append((bruto, esperado, obtido))
+    acertos = len(corpus) - sum(len(e) for e in erros.values())
+    print(f"🎯 Acerto: {acertos}/{len(corpus)} ({acertos / len(corpus):.2%})")
+    for fonte, lista in sorted(erros.items()):
+        print(f"   ❌ {fonte}: {len(lista)} erros, ex.: {lista[0]}")
+    return not erros
+
+def medir_vazao(corpus, repeticoes=REPETICOES):
+    textos = [bruto for _, bruto, _, _ in corpus]
+    referencia = REFERENCIA_CORPUS
+
+    # A frio: cache vazio a cada passada (todo texto é interpretado de fato)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        limpar_cache()
+        for texto in textos:
+            interpretar_data(texto, referencia)
+    frio = len(textos) * repeticoes / (time.perf_counter() - inicio)
+
+    # A quente: os mesmos textos de novo (páginas repetidas, datas iguais entre fontes)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for texto in textos:
+            interpretar_data(texto, referencia)
+    quente = len(textos) * repeticoes / (time.perf_counter() - inicio)
+
+    # Em lote: uma chamada por página de cards
+    paginas = [textos[i:i + TAMANHO_PAGINA] for i in range(0, len(textos), TAMANHO_PAGINA)]
+    limpar_cache()
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for pagina in paginas:
+            interpretar_datas(pagina, referencia)
+    lote = len(textos) * repeticoes / (time.perf_counter() - inicio)
+
+    print(f"⚡ Vazão ({len(textos)} textos x {repeticoes}):")
+    print(f"   a frio:   {frio:>12,.0f} textos/s")
+    print(f"   a quente: {quente:>12,.0f} textos/s")
+    print(f"   em lote:  {lote:>12,.0f} textos/s (páginas de {TAMANHO_PAGINA})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do interpretador de datas")
+    parser.add_argument("--gerar-corpus", action="store_true", help=f"Regenera o corpus a partir de {CSV_ORIGEM}")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    args = parser.parse_args()
+    if args.gerar_corpus:
+        gerar_corpus()
+        return
+    corpus = carregar_corpus()
+    ok = medir_acerto(corpus)
+    medir_vazao(corpus, args.repeticoes)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
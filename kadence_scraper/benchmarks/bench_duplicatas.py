@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fusão de duplicatas entre fontes (duplicatas.py) ponta a ponta: agrupamento, gravação no SQLite,
+histórico e leitura de volta, conferindo que o evento canônico guarda o link de todas as fontes
+no banco e na coluna Links do CSV exportado.
+
+    python kadence_scraper/benchmarks/bench_duplicatas.py
+
+As duplicatas são sintéticas: cada evento de data/corridas.csv ganha uma cópia "publicada" em
+outra fonte, com link próprio e sem local. Na segunda execução quem vem sem local é o original,
+então o canônico de cada grupo troca de fonte: o banco não pode ganhar linhas nem o histórico
+registrar eventos novos ou sumidos
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import ArmazenamentoSQLite, ler_links, linha_evento, links_evento
+from duplicatas import resolver_duplicatas
+from historico import HistoricoEventos
+from utils import gerar_hash_evento
+
+# Configurações
+CSV_ORIGEM = os.path.join("data", "corridas.csv")
+FONTE_COPIA = "Espelho"
+MAX_EVENTOS = 1000
+
+def _evento(titulo, data, local, link, fonte):
+    return {"titulo": titulo, "data": data, "local": local, "link": link, "fonte": fonte,
+            "hash": gerar_hash_evento(titulo, data, local)}
+
+def _montar(base, original_sem_local):
+    eventos = []
+    for posicao, evento in enumerate(base):
+        eventos.append(_evento(evento["titulo"], evento["data"], "" if original_sem_local else evento["local"],
+                               evento["link"], evento["fonte"]))
+        eventos.append(_evento(evento["titulo"], evento["data"], evento["local"] if original_sem_local else "",
+                               f"https://espelho.example/evento/{posicao}", FONTE_COPIA))
+    return eventos
+
+def _pares_fundidos(base, eventos):
+    """Posições da base cujo original e cópia caíram no mesmo grupo"""
+    fundidos = set()
+    for evento in resolver_duplicatas(eventos):
+        links = {link for _, link in links_evento(evento)}
+        for link in links:
+            if link.startswith("https://espelho.example/evento/"):
+                posicao = int(link.rsplit("/", 1)[1])
+                if base[posicao]["link"] in links and len(links) == 2:
+                    fundidos.add(posicao)
+    return fundidos
+
+def gerar_execucoes(origem=CSV_ORIGEM, maximo=MAX_EVENTOS):
+    """
+    Eventos das duas execuções: na primeira a cópia vem sem local (o original é o canônico), na
+    segunda é o original que vem sem. Só entram eventos de base de título único no dia, que não se
+    fundem entre si e cujo par se funde sozinho nas duas execuções (o grupo não muda de forma)
+    """
+    with open(origem, "r", encoding="utf-8", newline="") as f:
+        base = [_evento(l["Título"], l["Data"], l["Local"], l["Link"], l["Fonte"]) for l in csv.DictReader(f)]
+    # Título e data repetidos (mesma corrida em cidades ou fontes diferentes) deixariam a cópia sem dono certo
+    contagem = Counter((e["titulo"].strip().lower(), e["data"]) for e in base)
+    base = [e for e in base if contagem[(e["titulo"].strip().lower(), e["data"])] == 1]
+    base = [e for e in resolver_duplicatas(base) if "links" not in e][:maximo]
+    estaveis = _pares_fundidos(base, _montar(base, False)) & _pares_fundidos(base, _montar(base, True))
+    base = [e for posicao, e in enumerate(base) if posicao in estaveis]
+    return _montar(base, False), _montar(base, True)
+
+def gravar_execucao(banco, historico, eventos, momento):
+    """resolver_duplicatas + gravação + histórico, como o main.py faz numa execução"""
+    inicio = time.perf_counter()
+    resolvidos = resolver_duplicatas(eventos)
+    t_fusao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    resultado = banco.gravar(resolvidos)
+    t_gravacao = time.perf_counter() - inicio
+
+    links = [links_evento(evento) for evento in resolvidos]
+    fontes = sorted({fonte for links_evento_ in links for fonte, _ in links_evento_})
+    execucao = historico.registrar([linha_evento(e) for e in resolvidos], momento, fontes=fontes, links=links)
+    print(f"   💾 {resultado.resumo()} | 📜 {execucao.resumo()}")
+    print(f"   ⚡ fusão {t_fusao * 1000:.0f} ms, gravação {t_gravacao * 1000:.0f} ms ({len(resolvidos)} eventos)")
+    return resolvidos, execucao
+
+def conferir_links(banco, resolvidos):
+    """Cada evento gravado volta do banco com exatamente as publicações do seu grupo"""
+    gravados = {(l["Hash"], l["Fonte"], l["Link"]): l["Links"] for l in banco.linhas_com_links()}
+    faltando = 0
+    for evento in resolvidos:
+        linha = linha_evento(evento)
+        esperado = sorted(links_evento(evento))
+        lido = sorted((item["fonte"], item["link"]) for item in gravados.get((linha["Hash"], linha["Fonte"], linha["Link"]), []))
+        if lido != esperado:
+            faltando += 1
+            if faltando <= 3:
+                print(f"   ❌ {linha['Título'][:50]}: esperado {esperado}, lido {lido}")
+    fundidos = sum(1 for evento in resolvidos if len(links_evento(evento)) > 1)
+    print(f"   🔗 {fundidos} eventos fundidos; {len(resolvidos) - faltando}/{len(resolvidos)} com todos os links")
+    return faltando == 0
+
+def conferir_csv(caminho, resolvidos):
+    """O CSV exportado traz, na coluna Links, as mesmas publicações de cada evento"""
+    with open(caminho, "r", encoding="utf-8", newline="") as f:
+        exportados = {(l["Hash"], l["Fonte"], l["Link"]): sorted(ler_links(l["Links"] or "")) for l in csv.DictReader(f)}
+    faltando = 0
+    for evento in resolvidos:
+        linha = linha_evento(evento)
+        if exportados.get((linha["Hash"], linha["Fonte"], linha["Link"])) != sorted(links_evento(evento)):
+            faltando += 1
+    print(f"   {'✅' if not faltando else '❌'} CSV exportado: {len(resolvidos) - faltando}/{len(resolvidos)} "
+          f"com todos os links, {len(exportados)} linhas")
+    return faltando == 0 and len(exportados) == len(resolvidos)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fusão de duplicatas: gravação, histórico e links")
+    parser.add_argument("--origem", default=CSV_ORIGEM, help="CSV com os eventos de base")
+    parser.add_argument("--maximo", type=int, default=MAX_EVENTOS, help="Eventos de base (cada um ganha uma cópia)")
+    args = parser.parse_args()
+
+    primeira, segunda = gerar_execucoes(args.origem, args.maximo)
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "corridas.db")
+        caminho_csv = os.path.join(diretorio, "corridas.csv")
+        with ArmazenamentoSQLite(caminho, csv_exportado=caminho_csv) as banco, HistoricoEventos(caminho) as historico:
+            print("1️⃣ Original completo, cópia sem local:")
+            resolvidos, _ = gravar_execucao(banco, historico, primeira, "2030-01-01T00:00:00")
+            ok = conferir_links(banco, resolvidos) and conferir_csv(caminho_csv, resolvidos)
+            linhas_antes = banco.contar()
+
+            print("2️⃣ Original sem local (o canônico muda de fonte):")
+            resolvidos, execucao = gravar_execucao(banco, historico, segunda, "2030-01-02T00:00:00")
+            ok = conferir_links(banco, resolvidos) and conferir_csv(caminho_csv, resolvidos) and ok
+            estavel = banco.contar() == linhas_antes and not execucao.inseridos and not execucao.removidos
+            print(f"   {'✅' if estavel else '❌'} {linhas_antes} -> {banco.contar()} linhas no banco, "
+                  f"{len(execucao.inseridos)} novos e {len(execucao.removidos)} sumidos no histórico")
+    sys.exit(0 if ok and estavel else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Desempenho de cada scraper contra o servidor local de fixtures (servidor_fixtures.py), sem rede.
+
+    python kadence_scraper/benchmarks/bench_scrapers.py                           # todas as fontes emuladas
+    python kadence_scraper/benchmarks/bench_scrapers.py --fontes Sympla Doity --latencia 0.4
+    python kadence_scraper/benchmarks/bench_scrapers.py --sem-http                # Atletis/YouMovin pelo navegador
+    python kadence_scraper/benchmarks/bench_scrapers.py --fontes Sympla --api-sympla /api/v3/listagem  # Sympla pelo DOM
+    python kadence_scraper/benchmarks/bench_scrapers.py --comparar benchmarks/resultados/scrapers_<data>.json
+
+Cada fonte roda em um processo próprio, com o espelho (KADENCE_ESPELHO) apontando para o servidor e um
+diretório de trabalho temporário (sem cache de detalhes nem dados da execução anterior). Mede tempo de parede,
+CPU e pico de RSS do Python e da árvore de processos (Chromium incluído), eventos por segundo e as fases da
+telemetria. O resultado vai para benchmarks/resultados/ e é comparado com a execução anterior
+"""
+
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servidor_fixtures import iniciar_servidor, LATENCIA_PADRAO, VARIACAO_PADRAO, EVENTOS_POR_SITE, API_SYMPLA_PADRAO
+
+# Configurações
+RESULTADOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+TIMEOUT_FONTE = 10 * 60  # segundos por fonte antes de matar o processo
+TENTATIVAS = 1  # uma tentativa: falha contra a fixture é regressão, não instabilidade do site
+TOLERANCIA_REGRESSAO = 0.20  # fração de piora no tempo de parede marcada na comparação
+
+# Fonte (nome do main.py) -> (módulo, função síncrona)
+FONTES = {
+    "Atletis": ("scrapers.atletis_scraper", "extrair_atletis"),
+    "YouMovin.com": ("scrapers.youmovin_scraper", "extrair_youmovin"),
+    "Sympla": ("scrapers.sympla_scraper", "extrair_sympla"),
+    "Doity": ("scrapers.doity_scraper", "extrair_doity"),
+    "Ativo.com": ("scrapers.ativo_scraper", "extrair_ativo"),
+    "Even3": ("scrapers.even3_scraper", "extrair_even3"),
+    "TicketSports": ("scrapers.ticket_sports_scraper", "extrair_ticket_sports"),
+    "Track&Field": ("scrapers.trackfield_scraper", "extrair_trackfield"),
+    "Corridão.com": ("scrapers.corridao_scraper", "extrair_corridao"),
+    "Central Corrida": ("scrapers.central_corrida_scraper", "extrair_central_corrida"),
+    "TimeTicket": ("scrapers.time_ticket_scraper", "extrair_timeticket"),
+    "SportTimer.com": ("scrapers.sporttimer_scraper", "extrair_sporttimer"),
+}
+
+def _rss_mb(ru_maxrss):
+    """ru_maxrss vem em KB no Linux e em bytes no macOS"""
+    return round(ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def executar_fonte(nome, saida, tentativas):
+    """Processo filho: roda o scraper e grava as medidas do próprio Python em `saida`"""
+    import importlib
+    from scrapers.telemetria import telemetria, em_fonte
+
+    modulo, funcao = FONTES[nome]
+    extrair = getattr(importlib.import_module(modulo), funcao)
+    erro = None
+    inicio, cpu_inicio = time.perf_counter(), time.process_time()
+    with em_fonte(nome):
+        try:
+            eventos = extrair(max_tentativas=tentativas) or []
+        except Exception as e:
+            eventos, erro = [], f"{type(e).__name__}: {str(e)[:120]}"
+    parede = time.perf_counter() - inicio
+    resultado = {
+        "parede": round(parede, 3),
+        "cpu_python": round(time.process_time() - cpu_inicio, 3),
+        "rss_python_mb": _rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss),
+        "eventos": len(eventos),
+        "erro": erro,
+        "fases": telemetria().fonte(nome).para_dict()["fases"],
+    }
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False)
+
+def medir_fonte(nome, base, sem_http, tentativas, timeout, verboso):
+    """Roda a fonte em um processo filho e junta as medidas dele às da árvore de processos (wait4)"""
+    with tempfile.TemporaryDirectory(prefix="bench_scrapers_") as trabalho:
+        saida = os.path.join(trabalho, "resultado.json")
+        ambiente = dict(os.environ, KADENCE_ESPELHO=base, PYTHONUNBUFFERED="1")
+        if sem_http:
+            ambiente["KADENCE_SEM_HTTP"] = "1"
+        inicio = time.perf_counter()
+        processo = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--executar-fonte", nome, "--saida", saida,
+             "--tentativas", str(tentativas)],
+            cwd=trabalho, env=ambiente,
+            stdout=None if verboso else subprocess.DEVNULL, stderr=None if verboso else subprocess.DEVNULL,
+        )
+        # Colhe o filho com wait4: o uso devolvido soma o dos descendentes que ele esperou (driver e Chromium)
+        limite = time.monotonic() + timeout
+        pid, status, uso = os.wait4(processo.pid, os.WNOHANG)
+        while not pid and time.monotonic() < limite:
+            time.sleep(0.1)
+            pid, status, uso = os.wait4(processo.pid, os.WNOHANG)
+        if not pid:
+            processo.kill()
+            pid, status, uso = os.wait4(processo.pid, 0)
+        processo.returncode = os.waitstatus_to_exitcode(status)
+        parede_processo = time.perf_counter() - inicio
+        medida = {"fonte": nome, "parede_processo": round(parede_processo, 3)}
+        try:
+            with open(saida, encoding="utf-8") as f:
+                medida.update(json.load(f))
+        except (OSError, ValueError):
+            medida.update({"parede": round(parede_processo, 3), "eventos": 0, "fases": {},
+                           "erro": f"processo terminou sem resultado (código {processo.returncode})"})
+        medida["cpu_arvore"] = round(uso.ru_utime + uso.ru_stime, 3)
+        medida["rss_arvore_mb"] = _rss_mb(uso.ru_maxrss)
+        medida["eventos_por_s"] = round(medida["eventos"] / medida["parede"], 2) if medida["parede"] else 0.0
+        return medida
+
+def _commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def gravar_resultado(execucao, diretorio=RESULTADOS_DIR):
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, f"scrapers_{datetime.now():%Y%m%d_%H%M%S}.json")
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(execucao, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+    return caminho
+
+def resultado_anterior(diretorio=RESULTADOS_DIR, excluir=None):
+    """Execução mais recente salva (ignorando `excluir`), ou None"""
+    arquivos = sorted(a for a in glob.glob(os.path.join(diretorio, "scrapers_*.json")) if a != excluir)
+    if not arquivos:
+        return None
+    with open(arquivos[-1], encoding="utf-8") as f:
+        return json.load(f)
+
+def imprimir_tabela(execucao, anterior=None, tolerancia=TOLERANCIA_REGRESSAO):
+    antes = {m["fonte"]: m for m in (anterior or {}).get("fontes", [])}
+    print(f"\n{'Fonte':<16} {'parede':>8} {'CPU py':>7} {'CPU tot':>8} {'RSS py':>7} {'RSS máx':>8} "
+          f"{'eventos':>8} {'ev/s':>7}  comparação")
+    for m in execucao["fontes"]:
+        comparacao = ""
+        ref = antes.get(m["fonte"])
+        if ref and ref.get("parede"):
+            variacao = (m["parede"] - ref["parede"]) / ref["parede"]
+            marca = "⚠️" if variacao > tolerancia else "🚀" if variacao < -tolerancia else "  "
+            comparacao = f"{marca} {variacao:+.0%} tempo"
+            if m["eventos"] != ref.get("eventos"):
+                comparacao += f", eventos {ref.get('eventos')} -> {m['eventos']}"
+        if m.get("erro"):
+            comparacao += f"  ❌ {m['erro'][:50]}"
+        print(f"{m['fonte']:<16} {m['parede']:>7.1f}s {m.get('cpu_python', 0):>6.1f}s {m['cpu_arvore']:>7.1f}s "
+              f"{m.get('rss_python_mb', 0):>5.0f}MB {m['rss_arvore_mb']:>6.0f}MB {m['eventos']:>8} "
+              f"{m['eventos_por_s']:>7.1f}  {comparacao}")
+        fases = sorted(m.get("fases", {}).items(), key=lambda item: -item[1]["segundos"])[:4]
+        if fases:
+            print("                 " + " | ".join(f"{fase} {v['segundos']:.1f}s ×{v['chamadas']}" for fase, v in fases))
+    total = sum(m["parede"] for m in execucao["fontes"])
+    print(f"\n⏱️ Soma das fontes: {total:.1f}s | {sum(m['eventos'] for m in execucao['fontes'])} eventos")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline dos scrapers contra as fixtures locais")
+    parser.add_argument("--fontes", nargs="+", choices=list(FONTES), default=list(FONTES), metavar="FONTE",
+                        help=f"fontes a medir (padrão: todas; opções: {', '.join(FONTES)})")
+    parser.add_argument("--latencia", type=float, default=LATENCIA_PADRAO, help="segundos antes de cada resposta")
+    parser.add_argument("--variacao", type=float, default=VARIACAO_PADRAO, help="± segundos em cima da latência")
+    parser.add_argument("--eventos", type=int, default=EVENTOS_POR_SITE, help="eventos sintéticos por site")
+    parser.add_argument("--gravadas", default=None, help="diretório de páginas gravadas (<host>/<caminho>)")
+    parser.add_argument("--sem-http", action="store_true", help="desliga o modo HTTP (KADENCE_SEM_HTTP=1)")
+    parser.add_argument("--api-sympla", default=API_SYMPLA_PADRAO, metavar="CAMINHO",
+                        help="caminho da busca do Sympla nas fixtures (outro força a leitura pelo DOM)")
+    parser.add_argument("--tentativas", type=int, default=TENTATIVAS)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_FONTE, help="segundos por fonte")
+    parser.add_argument("--comparar", help="resultado salvo para comparar (padrão: o mais recente)")
+    parser.add_argument("--nao-salvar", action="store_true", help="só imprime, sem gravar em resultados/")
+    parser.add_argument("--verboso", action="store_true", help="mostra a saída dos scrapers")
+    parser.add_argument("--executar-fonte", help=argparse.SUPPRESS)
+    parser.add_argument("--saida", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.executar_fonte:
+        executar_fonte(args.executar_fonte, args.saida, args.tentativas)
+        return
+
+    servidor = iniciar_servidor(latencia=args.latencia, variacao=args.variacao,
+                                eventos_por_site=args.eventos, gravadas=args.gravadas, api_sympla=args.api_sympla)
+    print(f"🧪 Fixtures em {servidor.base} | latência {args.latencia:.2f}s ± {args.variacao:.2f}s | "
+          f"{args.eventos} eventos por site | modo HTTP {'desligado' if args.sem_http else 'ligado'}")
+    medidas = []
+    try:
+        for nome in args.fontes:
+            print(f"▶️ {nome}...", flush=True)
+            medida = medir_fonte(nome, servidor.base, args.sem_http, args.tentativas, args.timeout, args.verboso)
+            medida["requisicoes"] = sum(servidor.zerar_contagem().values())
+            print(f"   {medida['parede']:.1f}s, {medida['eventos']} eventos, {medida['requisicoes']} requisições"
+                  + (f" ❌ {medida['erro'][:60]}" if medida.get("erro") else ""))
+            medidas.append(medida)
+    finally:
+        servidor.shutdown()
+
+    execucao = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "python": sys.version.split()[0],
+        "latencia": args.latencia,
+        "variacao": args.variacao,
+        "eventos_por_site": args.eventos,
+        "modo_http": not args.sem_http,
+        "fontes": medidas,
+    }
+    caminho = None if args.nao_salvar else gravar_resultado(execucao)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+    else:
+        anterior = resultado_anterior(excluir=caminho)
+    if anterior and (anterior.get("latencia"), anterior.get("eventos_por_site")) != (args.latencia, args.eventos):
+        print(f"⚠️ Comparando com uma execução de outra configuração "
+              f"(latência {anterior.get('latencia')}s, {anterior.get('eventos_por_site')} eventos por site)")
+    imprimir_tabela(execucao, anterior)
+    if anterior:
+        print(f"📊 Comparado com {anterior.get('data')} (commit {anterior.get('commit') or '?'})")
+    if caminho:
+        print(f"💾 Resultado: {caminho}")
+
+    falhas = [m["fonte"] for m in medidas if m.get("erro") or not m["eventos"]]
+    if falhas:
+        print(f"❌ Sem eventos ou com erro: {', '.join(falhas)}")
+    sys.exit(1 if falhas else 0)
+
+if __name__ == "__main__":
+    main()
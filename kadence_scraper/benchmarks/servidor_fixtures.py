@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor local de fixtures para medir os scrapers sem tocar nos sites reais (usado por bench_scrapers.py).
+
+    python kadence_scraper/benchmarks/servidor_fixtures.py                       # porta 8765, latência padrão
+    python kadence_scraper/benchmarks/servidor_fixtures.py --latencia 0.4 --variacao 0.1 --eventos 120
+
+Cada site é servido em /<host>/<caminho> e os scrapers chegam aqui pelo espelho
+(KADENCE_ESPELHO=http://127.0.0.1:8765, ver scrapers/espelho.py), com a página ainda na URL original.
+Os cards são sintéticos, no markup que cada scraper lê, e a carga imita a do site:
+    páginas numeradas ........ Atletis, YouMovin
+    botão "Próximo" (troca) .. Sympla (página 2+ pela API de busca), Doity
+    "Ver mais"/"Carregar mais" Ativo, Even3, TicketSports, Track&Field
+    rolagem infinita ......... Corridão, Central da Corrida e TimeTicket (dados pela API do Bubble)
+    páginas de detalhe ....... SportTimer
+Páginas gravadas em --gravadas DIR (DIR/<host>/<caminho>, index.html para diretórios) têm prioridade
+sobre as sintéticas. Toda resposta espera latência ± variação antes de sair
+"""
+
+import argparse
+import html
+import json
+import mimetypes
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Configurações
+PORTA_PADRAO = 8765
+LATENCIA_PADRAO = 0.15  # segundos antes de cada resposta (ida e volta até o site)
+VARIACAO_PADRAO = 0.05  # ± segundos sorteados em cima da latência
+EVENTOS_POR_SITE = 60
+SEMENTE = 42
+# Busca da listagem do Sympla; outro caminho (ex.: /api/v3/listagem) não casa com PADROES_API_SYMPLA e testa o DOM
+API_SYMPLA_PADRAO = "/api/v1/search"
+GRAVADAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+MESES_ABREV = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+MESES_NOME = ["janeiro", "fevereiro", "março", "abril", "maio", "junho", "julho", "agosto",
+              "setembro", "outubro", "novembro", "dezembro"]
+DIAS_SEMANA = ["segunda-feira", "terça-feira", "quarta-feira", "quinta-feira", "sexta-feira", "sábado", "domingo"]
+DIAS_ABREV = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+
+NOMES_CORRIDA = ["Corrida", "Meia Maratona", "Maratona", "Night Run", "Trail Run", "Corrida Noturna",
+                 "Circuito de Corrida", "Desafio de Corrida"]
+TEMAS = ["das Flores", "do Sol", "da Primavera", "Solidária", "da Independência", "das Águas",
+         "do Trabalhador", "Rosa", "de Verão", "da Serra"]
+OUTROS_EVENTOS = [("Passeio Ciclístico", "Ciclismo"), ("Aulão de Yoga", "Yoga"),
+                  ("Torneio de Beach Tennis", "Beach Tennis"), ("Encontro de Pedal", "Ciclismo"),
+                  ("Campeonato de Natação", "Natação")]
+CIDADES = [("São Paulo", "SP"), ("Rio de Janeiro", "RJ"), ("Belo Horizonte", "MG"), ("Aracaju", "SE"),
+           ("Campinas", "SP"), ("Niterói", "RJ"), ("Uberlândia", "MG"), ("Santos", "SP")]
+DISTANCIAS = ["3km", "5km", "10km", "15km", "21km", "42km"]
+MODALIDADES_TICKET = {"11": "3km", "12": "5km", "13": "15km", "14": "21km", "15": "42km"}  # ?modalidade= -> distância
+
+class EventoSintetico:
+    """Um evento da fixture; cada site monta o seu card a partir dele"""
+
+    def __init__(self, numero, titulo, data, cidade, uf, categoria, distancias):
+        self.numero = numero
+        self.titulo = titulo
+        self.data = data
+        self.cidade = cidade
+        self.uf = uf
+        self.categoria = categoria
+        self.distancias = distancias
+        self.slug = f"evento-{numero + 1}"
+
+    @property
+    def corrida(self):
+        return bool(self.distancias)
+
+def gerar_eventos(site, total, semente=SEMENTE):
+    """Eventos determinísticos do site, datas de 3 a ~320 dias à frente; 1 em 6 não é corrida (exercita os filtros)"""
+    sorteio = random.Random(f"{semente}:{site}")
+    hoje = date.today()
+    eventos = []
+    for n in range(total):
+        cidade, uf = sorteio.choice(CIDADES)
+        data = hoje + timedelta(days=3 + (n * 7 + sorteio.randint(0, 6)) % 320)
+        if n % 6 == 5:
+            nome, categoria = sorteio.choice(OUTROS_EVENTOS)
+            eventos.append(EventoSintetico(n, f"{nome} {cidade} {n + 1}", data, cidade, uf, categoria, []))
+            continue
+        titulo = f"{n + 1}ª {sorteio.choice(NOMES_CORRIDA)} {sorteio.choice(TEMAS)} {cidade}"
+        distancias = sorted(sorteio.sample(DISTANCIAS, sorteio.randint(1, 3)), key=lambda d: int(d[:-2]))
+        eventos.append(EventoSintetico(n, titulo, data, cidade, uf, "Corrida de Rua", distancias))
+    return eventos
+
+def documento(titulo, corpo, script=""):
+    """Página completa; os cards têm altura fixa para que a rolagem realmente role"""
+    return (f'<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"><title>{titulo}</title>'
+            '<style>body{margin:0;font-family:sans-serif}#lista>*{display:block;min-height:140px}</style>'
+            f'</head><body>{corpo}' + (f"<script>{script}</script>" if script else "") + "</body></html>")
+
+# Carrega a página seguinte da API da fixture ({"html", "fim", ...registros no formato do site})
+# e troca ou acrescenta os cards; `encerrar` some com o controle de paginação no fim
+SCRIPT_CARREGAR = """
+const API = %(api)s, MODO = %(modo)s;
+let pagina = %(pagina)d, carregando = false, acabou = %(acabou)s;
+function encerrar() { %(encerrar)s }
+async function carregar() {
+  if (carregando || acabou) return;
+  carregando = true;
+  try {
+    const resposta = await fetch(API + (API.includes("?") ? "&" : "?") + "pagina=" + (pagina + 1));
+    const dados = await resposta.json();
+    pagina += 1;
+    const lista = document.getElementById("lista");
+    if (MODO === "trocar") lista.innerHTML = dados.html; else lista.insertAdjacentHTML("beforeend", dados.html);
+    if (dados.fim) { acabou = true; encerrar(); }
+  } finally {
+    carregando = false;
+  }
+}
+if (acabou) encerrar();
+"""
+SCRIPT_BOTAO = 'document.querySelector(%s).addEventListener("click", (e) => { e.preventDefault(); carregar(); });'
+SCRIPT_ROLAGEM = ('window.addEventListener("scroll", () => {'
+                  ' if (innerHeight + scrollY >= document.body.scrollHeight - 300) carregar(); });')
+
+def script_carregar(api, modo, pagina, acabou, encerrar="", botao=None, rolagem=False, ao_abrir=False):
+    partes = [SCRIPT_CARREGAR % {"api": json.dumps(api), "modo": json.dumps(modo), "pagina": pagina,
+                                 "acabou": "true" if acabou else "false", "encerrar": encerrar}]
+    if botao:
+        partes.append(SCRIPT_BOTAO % json.dumps(botao))
+    if rolagem:
+        partes.append(SCRIPT_ROLAGEM)
+    if ao_abrir:
+        partes.append("carregar();")
+    return "\n".join(partes)
+
+class Site:
+    """Site emulado: eventos sintéticos, tamanho da página e as rotas que o scraper visita"""
+    fonte = ""
+    host = ""
+    mecanismo = ""
+    por_pagina = 20
+
+    def __init__(self, total=EVENTOS_POR_SITE):
+        self.eventos = gerar_eventos(self.fonte, total)
+
+    def visiveis(self, consulta):
+        """Eventos da listagem pedida (filtros de URL, ex.: modalidade do TicketSports)"""
+        return self.eventos
+
+    def pagina(self, eventos, numero):
+        """(eventos da página `numero`, True se é a última)"""
+        inicio = (numero - 1) * self.por_pagina
+        return eventos[inicio:inicio + self.por_pagina], inicio + self.por_pagina >= len(eventos)
+
+    def cards(self, eventos):
+        return "".join(self.card(evento) for evento in eventos)
+
+    def card(self, evento):
+        raise NotImplementedError
+
+    def registro(self, evento):
+        """Registro no formato da API do site (só nos sites cuja listagem chega em JSON)"""
+        return None
+
+    def api(self, eventos, numero):
+        """Resposta da API de paginação: cards renderizados, fim e os registros do site"""
+        eventos_pagina, ultima = self.pagina(eventos, numero)
+        return {"html": self.cards(eventos_pagina), "fim": ultima}
+
+    def responder(self, caminho, consulta):
+        """(status, content-type, corpo) ou None se a rota não existe"""
+        raise NotImplementedError
+
+def _e(texto):
+    return html.escape(str(texto), quote=True)
+
+def _json(dados):
+    return 200, "application/json; charset=utf-8", json.dumps(dados, ensure_ascii=False)
+
+def _html(corpo):
+    return 200, "text/html; charset=utf-8", corpo
+
+def _numero(consulta, nome="pagina", padrao=1):
+    try:
+        return max(1, int(consulta.get(nome, [padrao])[0]))
+    except ValueError:
+        return padrao
+
+class SiteAtletis(Site):
+    fonte, host, mecanismo, por_pagina = "Atletis", "www.atletis.com.br", "páginas numeradas", 12
+
+    def card(self, e):
+        data = f"{e.data:%d} {MESES_NOME[e.data.month - 1].capitalize()} {e.data.year}"
+        return (f'<div class="event-card"><div class="event-card-image"><a href="/evento/{e.slug}"></a></div>'
+                f'<div class="event-card-body"><h3 class="event-card-title">{_e(e.titulo)}</h3>'
+                f'<div class="event-card-info"><i class="fa fa-calendar"></i><span>{data}</span></div>'
+                f'<div class="event-card-info"><i class="fa fa-map-marker"></i>{_e(e.cidade)} - {e.uf}</div>'
+                '</div></div>')
+
+    def responder(self, caminho, consulta):
+        partes = caminho.strip("/").split("/")
+        if partes[0] != "eventos" or len(partes) > 2:
+            return None
+        numero = int(partes[1]) if len(partes) == 2 and partes[1].isdigit() else 1
+        eventos_pagina, _ = self.pagina(self.eventos, numero)
+        return _html(documento("Eventos | Atletis", f'<div id="lista">{self.cards(eventos_pagina)}</div>'))
+
+class SiteYouMovin(Site):
+    fonte, host, mecanismo, por_pagina = "YouMovin.com", "www.youmovin.com.br", "páginas numeradas", 10
+
+    def card(self, e):
+        infos = ["Data Hora", f"{e.data:%d/%m/%Y} 07:00", "Categoria",
+                 "Corrida de Rua" if e.corrida else e.categoria, "Modalidade",
+                 " e ".join(e.distancias) or "Livre", "Local", f"{e.cidade} - {e.uf}"]
+        return ('<div class="content"><div class="t_calendario">'
+                f'<span onclick="document.location.href=\'/evento/{e.slug}\'">{_e(e.titulo)}</span></div>'
+                '<div class="so_desktop"><ul class="calendario_tb">'
+                + "".join(f"<li>{_e(info)}</li>" for info in infos) + "</ul></div></div>")
+
+    def responder(self, caminho, consulta):
+        partes = caminho.strip("/").split("/")
+        if partes[0] != "calendario-de-eventos" or len(partes) > 2:
+            return None
+        numero = int(partes[1]) if len(partes) == 2 and partes[1].isdigit() else 1
+        eventos_pagina, ultima = self.pagina(self.eventos, numero)
+        proxima = "" if ultima else f'<a href="/calendario-de-eventos/{numero + 1}?filtro=S">Próxima</a>'
+        return _html(documento("Calendário | YouMovin", f'<div id="lista">{self.cards(eventos_pagina)}</div>{proxima}'))
+
+class SiteSympla(Site):
+    fonte, host, mecanismo, por_pagina = "Sympla", "www.sympla.com.br", "botão Próximo (API de busca)", 20
+    caminho_api = API_SYMPLA_PADRAO
+
+    def card(self, e):
+        data = f"{DIAS_ABREV[e.data.weekday()]}, {e.data:%d} de {MESES_ABREV[e.data.month - 1]} às 07:00"
+        return (f'<a class="sympla-card" href="https://www.sympla.com.br/evento/{e.slug}/{e.numero + 1000}">'
+                f'<h3>{_e(e.titulo)}</h3><div class="qtfy415">{data}</div>'
+                f'<p class="pn67h1c">Parque Central - {_e(e.cidade)}, {e.uf}</p></a>')
+
+    def registro(self, e):
+        return {"name": e.titulo, "start_date": f"{e.data.isoformat()}T07:00:00-03:00",
+                "location": {"name": "Parque Central", "city": e.cidade, "state": e.uf},
+                "url": f"https://www.sympla.com.br/evento/{e.slug}/{e.numero + 1000}"}
+
+    def api(self, eventos, numero):
+        eventos_pagina, ultima = self.pagina(eventos, numero)
+        return {"data": [self.registro(e) for e in eventos_pagina], "html": self.cards(eventos_pagina), "fim": ultima}
+
+    def responder(self, caminho, consulta):
+        if caminho.startswith(self.caminho_api):
+            return _json(self.api(self.eventos, _numero(consulta)))
+        if caminho.rstrip("/") != "/eventos/esportivo":
+            return None
+        eventos_pagina, ultima = self.pagina(self.eventos, 1)
+        corpo = (f'<div id="lista">{self.cards(eventos_pagina)}</div>'
+                 '<button class="_1p3nw00"><span class="swraze2">Próximo</span></button>')
+        script = script_carregar(f"{self.caminho_api}?ordem=month_trending_score", "trocar", 1, ultima,
+                                 'document.querySelector("button._1p3nw00").disabled = true;', botao="button._1p3nw00")
+        return _html(documento("Corrida e competições | Sympla", corpo, script))
+
+class SiteDoity(Site):
+    fonte, host, mecanismo, por_pagina = "Doity", "doity.com.br", "botão PRÓXIMO", 16
+
+    def card(self, e):
+        data = f"{e.data:%d} {MESES_ABREV[e.data.month - 1].upper()} {e.data.year}"
+        tag = "Corrida" if e.corrida else e.categoria
+        return (f'<a class="wrapper__event-card" href="/{e.slug}">'
+                f'<div class="wrapper__event-card__content__tag"><p>{_e(tag)}</p></div>'
+                f'<div class="wrapper__event-card__content__event">{_e(e.titulo)}</div>'
+                f'<div class="wrapper__event-card__content__date">{data}</div>'
+                f'<div class="wrapper__event-card__content__place">{_e(e.cidade)} - {e.uf}</div></a>')
+
+    def responder(self, caminho, consulta):
+        if caminho.startswith("/api/eventos"):
+            return _json(self.api(self.eventos, _numero(consulta)))
+        if caminho.rstrip("/") != "/eventos/esporte-lazer":
+            return None
+        eventos_pagina, ultima = self.pagina(self.eventos, 1)
+        corpo = (f'<div id="lista">{self.cards(eventos_pagina)}</div><div class="wrapper__pagination__navigation">'
+                 '<span class="wrapper__pagination__navigation__text next">PRÓXIMO</span></div>')
+        script = script_carregar("/api/eventos?categoria=esporte-lazer", "trocar", 1, ultima,
+                                 'document.querySelector(".wrapper__pagination__navigation").style.display = "none";',
+                                 botao=".wrapper__pagination__navigation")
+        return _html(documento("Esporte e lazer | Doity", corpo, script))
+
+class SiteAtivo(Site):
+    fonte, host, mecanismo, por_pagina = "Ativo.com", "www.ativo.com", "botão Ver mais", 12
+
+    def card(self, e):
+        return (f'<article class="card card-event"><a class="card-cover large" href="/evento/{e.slug}/">capa</a>'
+                f'<div class="date-square"><span class="date-square-day">{e.data:%d}</span>'
+                f'<span class="date-square-month">{MESES_ABREV[e.data.month - 1]}</span></div>'
+                f'<span class="tag">{_e(e.categoria)}</span><h3 class="title title-fixed-height">{_e(e.titulo)}</h3>'
+                f'<p class="subtitle-small place-input">{_e(e.cidade)} - {e.uf}</p>'
+                f'<p class="distances">{", ".join(e.distancias)}</p></article>')
+
+    def responder(self, caminho, consulta):
+        if caminho == "/wp-admin/admin-ajax.php":
+            return _json(self.api(self.eventos, _numero(consulta)))
+        if caminho.rstrip("/") != "/calendario":
+            return None
+        eventos_pagina, ultima = self.pagina(self.eventos, 1)
+        corpo = (f'<div id="lista">{self.cards(eventos_pagina)}</div>'
+                 f'<a class="button-primary" data-per_page="{self.por_pagina}" href="#">Ver mais</a>')
+        script = script_carregar("/wp-admin/admin-ajax.php?action=calendario", "acrescentar", 1, ultima,
+                                 'document.querySelector("a.button-primary").remove();', botao="a.button-primary")
+        return _html(documento("Calendário | Ativo", corpo, script))
+
+class SiteEven3(Site):
+    fonte, host, mecanismo, por_pagina = "Even3", "www.even3.com.br", "botão Ver mais", 12
+
+    def card(self, e):
+        data = f"{DIAS_SEMANA[e.data.weekday()]}, {e.data.day} de {MESES_NOME[e.data.month - 1]} de {e.data.year}"
+        return ('<div class="col-xl-3 col-lg-4 col-md-6 col-sm-12"><div class="card"><div class="card-body">'
+                f'<h5 class="card-title">{_e(e.titulo)}</h5><p class="card-text">'
+                f'<span><i class="fa fa-calendar-day"></i> {data}</span> '
+                f'<span><i class="fa fa-map-marker-alt"></i> {_e(e.cidade)} - {e.uf}</span></p>'
+                f'<a class="stretched-link" href="/{e.slug}/"></a></div></div></div>')
+
+    def responder(self, caminho, consulta):
+        if caminho == "/api/eventos":
+            return _json(self.api(self.eventos, _numero(consulta)))
+        if caminho.rstrip("/") != "/eventos-online/saude-e-bem-estar":
+            return None
+        eventos_pagina, ultima = self.pagina(self.eventos, 1)
+        corpo = (f'<h2>Todos os eventos</h2><div id="lista" class="row">{self.cards(eventos_pagina)}</div>'
+                 '<button class="btn btn-primary btn-block" ng-click="carregarMaisEventos()">Ver mais</button>')
+        script = script_carregar("/api/eventos?categoria=saude-e-bem-estar", "acrescentar", 1, ultima,
+                                 'document.querySelector("button.btn-primary").remove();', botao="button.btn-primary")
+        return _html(documento("Saúde e bem-estar | Even3", corpo, script))
+
+class SiteTicketSports(Site):
+    fonte, host, mecanismo, por_pagina = "TicketSports", "www.ticketsports.com.br", "botão Carregar mais", 12
+
+    def visiveis(self, consulta):
+        distancia = MODALIDADES_TICKET.get(consulta.get("modalidade", [""])[0])
+        corridas = [e for e in self.eventos if e.corrida]
+        return [e for e in corridas if distancia in e.distancias] if distancia else corridas
+
+    def card(self, e):
+        return (f'<div class="card-evento"><a href="/e/{e.slug}-{e.numero + 1000}">'
+                f'<div class="titulo-card-evento">{_e(e.titulo)}</div>'
+                f'<div class="data-card-evento">{e.data:%d/%m/%Y}<br>{DIAS_ABREV[e.data.weekday()]}</div>'
+                f'<div class="local-card-evento">{_e(e.cidade)} - {e.uf}</div></a></div>')
+
+    def responder(self, caminho, consulta):
+        if caminho == "/Calendario/CarregarMais":
+            return _json(self.api(self.visiveis(consulta), _numero(consulta)))
+        if not caminho.startswith("/Calendario/"):
+            return None
+        eventos = self.visiveis(consulta)
+        eventos_pagina, ultima = self.pagina(eventos, 1)
+        modalidade = consulta.get("modalidade", [""])[0]
+        corpo = (f'<div id="lista">{self.cards(eventos_pagina)}</div>'
+                 '<button class="carregar-mais">Carregar mais</button>')
+        script = script_carregar(f"/Calendario/CarregarMais?modalidade={modalidade}", "acrescentar", 1, ultima,
+                                 'document.querySelector(".carregar-mais").remove();', botao=".carregar-mais")
+        return _html(documento("Calendário | Ticket Sports", corpo, script))
+
+class SiteTrackField(Site):
+    fonte, host, mecanismo, por_pagina = "Track&Field", "www.tfsports.com.br", "botão carregar mais provas", 9
+
+    def card(self, e):
+        return (f'<div class="run-series-card"><h2><a href="/run-series/{e.slug}/">{_e(e.titulo)}</a></h2>'
+                f'<strong>{e.data.day} de {MESES_ABREV[e.data.month - 1].lower()}</strong>'
+                f'<a href="https://maps.example/{e.slug}">📍 Shopping {_e(e.cidade)} - {e.uf}</a></div>')
+
+    def responder(self, caminho, consulta):
+        if caminho == "/api/run-series":
+            return _json(self.api(self.eventos, _numero(consulta)))
+        if caminho.rstrip("/") != "/run-series":
+            return None
+        eventos_pagina, ultima = self.pagina(self.eventos, 1)
+        corpo = f'<div id="lista">{self.cards(eventos_pagina)}</div><button class="mais">carregar mais provas</button>'
+        script = script_carregar("/api/run-series", "acrescentar", 1, ultima,
+                                 'document.querySelector("button.mais").setAttribute("disabled", "");', botao="button.mais")
+        return _html(documento("Run Series | Track&Field", corpo, script))
+
+class SiteCorridao(Site):
+    fonte, host, mecanismo, por_pagina = "Corridão.com", "www.corridao.com.br", "rolagem infinita", 15
+
+    def card(self, e):
+        return (f'<a class="borda-banner" href="/evento/{e.slug}"><div class="infodia">{e.data:%d}</div>'
+                f'<div class="infomes">{MESES_ABREV[e.data.month - 1]}</div>'
+                f'<div class="infotitulo">{_e(e.titulo)}</div>'
+                f'<div class="infolocalcity">{_e(e.cidade)} - {e.uf}</div></a>')
+
+    def responder(self, caminho, consulta):
+        if caminho == "/api/eventos":
+            return _json(self.api(self.eventos, _numero(consulta)))
+        if caminho != "/":
+            return None
+        eventos_pagina, ultima = self.pagina(self.eventos, 1)
+        script = script_carregar("/api/eventos", "acrescentar", 1, ultima, rolagem=True)
+        return _html(documento("Corridão", f'<div id="lista">{self.cards(eventos_pagina)}</div>', script))
+
+class SiteBubble(Site):
+    """Apps Bubble.io: página vazia que busca os dados na Data API ao abrir e a cada rolagem"""
+    mecanismo, por_pagina = "rolagem infinita (API do Bubble)", 12
+    separador_local = " - "
+
+    def textos(self, e):
+        return [e.titulo, f"{e.data:%d/%m/%Y} - 06:30", f"{e.cidade}{self.separador_local}{e.uf}"]
+
+    def card(self, e):
+        textos = "".join(f'<div class="bubble-element Text">{_e(t)}</div>' for t in self.textos(e))
+        return f'<div class="clickable-element bubble-element Group">{textos}</div>'
+
+    def registro(self, e):
+        epoch_ms = int(datetime(e.data.year, e.data.month, e.data.day, 9).timestamp() * 1000)
+        return {"_id": f"{e.numero + 1}x{SEMENTE}", "nome_text": e.titulo, "data_date": epoch_ms,
+                "cidade_text": e.cidade, "estado_text": e.uf,
+                "descricao_text": self.descricao(e)}
+
+    def descricao(self, e):
+        if e.corrida:
+            return f"Corrida de rua com percursos de {' e '.join(e.distancias)}"
+        return f"Evento de {e.categoria.lower()} aberto ao público"
+
+    def api(self, eventos, numero):
+        eventos_pagina, ultima = self.pagina(eventos, numero)
+        inicio = (numero - 1) * self.por_pagina
+        return {"response": {"cursor": inicio, "results": [self.registro(e) for e in eventos_pagina],
+                             "count": len(eventos_pagina), "remaining": max(0, len(eventos) - inicio - self.por_pagina)},
+                "html": self.cards(eventos_pagina), "fim": ultima}
+
+    def responder(self, caminho, consulta):
+        if caminho.startswith("/api/1.1/obj/"):
+            return _json(self.api(self.eventos, _numero(consulta)))
+        if caminho != "/":
+            return None
+        script = script_carregar("/api/1.1/obj/evento", "acrescentar", 0, False, rolagem=True, ao_abrir=True)
+        return _html(documento(self.fonte, '<div id="lista"></div>', script))
+
+class SiteCentralCorrida(SiteBubble):
+    fonte, host = "Central Corrida", "centraldacorrida.com.br"
+
+class SiteTimeTicket(SiteBubble):
+    fonte, host = "TimeTicket", "timeticket.com.br"
+    separador_local = " | "
+
+    def textos(self, e):
+        return [e.titulo, self.descricao(e), f"{DIAS_ABREV[e.data.weekday()]} - {e.data:%d/%m/%Y}",
+                f"{e.cidade}{self.separador_local}{e.uf}"]
+
+    def card(self, e):
+        textos = "".join(f'<div class="bubble-element Text">{_e(t)}</div>' for t in self.textos(e))
+        return f'<div class="bubble-element group-item"><div class="clickable-element">{textos}</div></div>'
+
+class SiteSportTimer(Site):
+    fonte, host, mecanismo = "SportTimer.com", "www.sporttimer.com.br", "páginas de detalhe"
+
+    def card(self, e):
+        return (f'<div class="col-sm-4 col-lg-3"><a href="/evento/{e.slug}"><div class="thumb-info-inner">'
+                f'<h2>{e.data:%d/%m} – {_e(e.titulo)}</h2></div>'
+                f'<span class="thumb-info-type">{_e(e.categoria)}</span></a></div>')
+
+    def detalhe(self, e):
+        itens = [f"Data: {e.data:%d/%m/%Y}", f"Cidade: {e.cidade} {e.uf}", "Largada: 07h00",
+                 f"Percursos: {', '.join(e.distancias) or 'livre'}"]
+        corpo = (f"<h1>{_e(e.titulo)}</h1><ul>"
+                 + "".join(f'<li><i class="fas fa-check"></i>{_e(item)}</li>' for item in itens) + "</ul>")
+        return _html(documento(e.titulo, corpo))
+
+    def responder(self, caminho, consulta):
+        if caminho.startswith("/evento/"):
+            slug = caminho.strip("/").split("/")[-1]
+            evento = next((e for e in self.eventos if e.slug == slug), None)
+            return self.detalhe(evento) if evento else None
+        if caminho != "/":
+            return None
+        return _html(documento("SportTimer", f'<div id="lista" class="row">{self.cards(self.eventos)}</div>'))
+
+CLASSES_SITES = [SiteAtletis, SiteYouMovin, SiteSympla, SiteDoity, SiteAtivo, SiteEven3, SiteTicketSports,
+                 SiteTrackField, SiteCorridao, SiteCentralCorrida, SiteTimeTicket, SiteSportTimer]
+
+def criar_sites(eventos_por_site=EVENTOS_POR_SITE):
+    """host -> Site"""
+    return {classe.host: classe(eventos_por_site) for classe in CLASSES_SITES}
+
+class ServidorFixtures(ThreadingHTTPServer):
+    """HTTP local com os sites emulados, latência injetada e contagem de requisições por host"""
+    daemon_threads = True
+
+    def __init__(self, endereco, sites, latencia=LATENCIA_PADRAO, variacao=VARIACAO_PADRAO, gravadas=GRAVADAS_DIR):
+        super().__init__(endereco, ManipuladorFixtures)
+        self.sites = sites
+        self.latencia = latencia
+        self.variacao = variacao
+        self.gravadas = gravadas
+        self.requisicoes = {}  # host -> quantidade
+        self._sorteio = random.Random(SEMENTE)
+        self._trava = threading.Lock()
+
+    @property
+    def base(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def atraso(self):
+        with self._trava:
+            return max(0.0, self.latencia + self._sorteio.uniform(-self.variacao, self.variacao))
+
+    def contar(self, host):
+        with self._trava:
+            self.requisicoes[host] = self.requisicoes.get(host, 0) + 1
+
+    def zerar_contagem(self):
+        with self._trava:
+            contagem, self.requisicoes = self.requisicoes, {}
+        return contagem
+
+    def arquivo_gravado(self, host, caminho):
+        """Caminho da página gravada para host+caminho, se existir"""
+        if not self.gravadas:
+            return None
+        arquivo = os.path.normpath(os.path.join(self.gravadas, host, caminho.lstrip("/")))
+        if not arquivo.startswith(os.path.normpath(self.gravadas) + os.sep):
+            return None
+        if os.path.isdir(arquivo):
+            arquivo = os.path.join(arquivo, "index.html")
+        return arquivo if os.path.isfile(arquivo) else None
+
+class ManipuladorFixtures(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como os sites reais
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        host, _, resto = partes.path.lstrip("/").partition("/")
+        caminho = "/" + resto
+        self.server.contar(host)
+        time.sleep(self.server.atraso())
+
+        gravado = self.server.arquivo_gravado(host, caminho)
+        if gravado:
+            with open(gravado, "rb") as f:
+                corpo = f.read()
+            tipo = mimetypes.guess_type(gravado)[0] or "text/html"
+            self._enviar(200, f"{tipo}; charset=utf-8" if tipo.startswith("text/") else tipo, corpo)
+            return
+
+        site = self.server.sites.get(host)
+        resposta = site.responder(caminho, parse_qs(partes.query)) if site else None
+        if resposta is None:
+            self._enviar(404, "text/plain; charset=utf-8", b"nao encontrado")
+            return
+        status, tipo, corpo = resposta
+        self._enviar(status, tipo, corpo.encode("utf-8"))
+
+    def _enviar(self, status, tipo, corpo):
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass  # uma linha por requisição atrapalharia a saída do benchmark
+
+def iniciar_servidor(porta=0, latencia=LATENCIA_PADRAO, variacao=VARIACAO_PADRAO,
+                     eventos_por_site=EVENTOS_POR_SITE, gravadas=GRAVADAS_DIR, api_sympla=API_SYMPLA_PADRAO):
+    """Sobe o servidor em uma thread (porta 0 = livre) e o devolve; encerre com .shutdown()"""
+    sites = criar_sites(eventos_por_site)
+    sites[SiteSympla.host].caminho_api = api_sympla
+    servidor = ServidorFixtures(("127.0.0.1", porta), sites, latencia, variacao, gravadas)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local de fixtures dos sites de corrida")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--latencia", type=float, default=LATENCIA_PADRAO, help="segundos antes de cada resposta")
+    parser.add_argument("--variacao", type=float, default=VARIACAO_PADRAO, help="± segundos em cima da latência")
+    parser.add_argument("--eventos", type=int, default=EVENTOS_POR_SITE, help="eventos sintéticos por site")
+    parser.add_argument("--gravadas", default=GRAVADAS_DIR, help="diretório de páginas gravadas (<host>/<caminho>)")
+    parser.add_argument("--api-sympla", default=API_SYMPLA_PADRAO, metavar="CAMINHO",
+                        help="caminho da busca do Sympla (outro que não casa com a captura força a leitura pelo DOM)")
+    args = parser.parse_args()
+
+    servidor = iniciar_servidor(args.porta, args.latencia, args.variacao, args.eventos, args.gravadas, args.api_sympla)
+    print(f"🧪 Fixtures em {servidor.base} (latência {args.latencia:.2f}s ± {args.variacao:.2f}s, "
+          f"{args.eventos} eventos por site)")
+    for site in servidor.sites.values():
+        print(f"   {site.fonte:<16} {site.mecanismo:<34} {servidor.base}/{site.host}/")
+    print(f"   Exporte KADENCE_ESPELHO={servidor.base} para apontar os scrapers para cá (Ctrl+C encerra)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.shutdown()
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import math
+import re
+import sqlite3
+from typing import Dict, Iterable, List
+
+from consulta import normalizar
+
+# Configurações
+VERSAO_TOKENIZADOR = "2"  # mude ao alterar tokenizar(): o índice é remontado sozinho
+PESOS_CAMPOS = {"titulo": 2.0, "local": 1.0}
+FATOR_PREFIXO = 0.7  # termo que só começa com a palavra buscada vale menos que o termo exato
+MIN_PREFIXO = 2  # palavras menores só casam exatamente
+BM25_K1 = 1.2
+BM25_B = 0.75
+LIMITE_PADRAO = 20
+TAMANHO_LOTE_BUSCA = 500
+
+STOPWORDS = frozenset("""
+a o as os um uma uns umas de da do das dos e em na no nas nos ao aos para pra por pelo pela
+com sem que se the of and
+""".split())
+
+_RE_DISTANCIA = re.compile(r"(\d+(?:[.,]\d+)?)\s*(?:km|k)\b")
+_RE_TOKEN = re.compile(r"\d+(?:\.\d+)?k|[a-z0-9]+")
+
+ESQUEMA_BUSCA = """
+CREATE TABLE IF NOT EXISTS busca_meta (chave TEXT PRIMARY KEY, valor TEXT) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS busca_documentos (
+    doc INTEGER PRIMARY KEY,
+    comprimento REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS busca_postagens (
+    termo TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    peso REAL NOT NULL,
+    PRIMARY KEY (termo, doc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_busca_postagens_doc ON busca_postagens(doc);
+"""
+
+def _radical(token: str) -> str:
+    """
+    Plural simples do português: 'corridas' -> 'corrida', 'edicoes' -> 'edicao', 'jardins' -> 'jardim'.
+    O '-ns' -> '-m' fica nas terminações do português ('runs' -> 'run', não 'rum')
+    """
+    if len(token) <= 3 or token[0].isdigit():
+        return token
+    if token.endswith(("oes", "aes")):
+        return token[:-3] + "ao"
+    if token.endswith(("ens", "ins", "ons")) or (token.endswith("uns") and len(token) > 4):
+        return token[:-2] + "m"
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+def tokenizar(texto: str) -> List[str]:
+    """
+    Sem acentos e em minúsculas, distâncias unificadas ('5 km', '5KM', '5K' -> '5k'),
+    sem stopwords e com o plural reduzido
+    """
+    texto = _RE_DISTANCIA.sub(lambda m: m.group(1).replace(",", ".") + "k", normalizar(texto))
+    return [_radical(token) for token in _RE_TOKEN.findall(texto) if token not in STOPWORDS]
+
+def termos_documento(titulo: str, local: str) -> Dict[str, float]:
+    """Termo -> frequência ponderada pelo campo (título vale mais que local)"""
+    termos = {}
+    for campo, texto in (("titulo", titulo), ("local", local)):
+        for token in tokenizar(texto):
+            termos[token] = termos.get(token, 0.0) + PESOS_CAMPOS[campo]
+    return termos
+
+def _fim_prefixo(prefixo: str) -> str:
+    """Menor string maior que todas as que começam com o prefixo (limite do intervalo no índice)"""
+    return prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
+
+class IndiceBusca:
+    """
+    Índice invertido de título e local dos eventos, em tabelas do próprio banco SQLite:
+    termo -> (documento, peso), com o id da linha em `eventos` como documento.
+    Prefixos viram intervalos na chave primária (termo, doc); o ranking é BM25
+    """
+
+    def __init__(self, conexao: sqlite3.Connection):
+        self.conexao = conexao
+        self.conexao.executescript(ESQUEMA_BUSCA)
+        versao = self._meta("versao_tokenizador")
+        if versao != VERSAO_TOKENIZADOR:
+            with self.conexao:
+                self.conexao.execute("DELETE FROM busca_postagens")
+                self.conexao.execute("DELETE FROM busca_documentos")
+                self.conexao.execute("DELETE FROM busca_meta")
+            self._definir_meta("versao_tokenizador", VERSAO_TOKENIZADOR)
+
+    def _meta(self, chave: str):
+        registro = self.conexao.execute("SELECT valor FROM busca_meta WHERE chave = ?", (chave,)).fetchone()
+        return registro[0] if registro else None
+
+    def _definir_meta(self, chave: str, valor: str):
+        with self.conexao:
+            self.conexao.execute("INSERT OR REPLACE INTO busca_meta (chave, valor) VALUES (?, ?)", (chave, valor))
+
+    def _indexar(self, registros: Iterable[tuple]):
+        """(id, título, local) -> substitui as postagens de cada documento"""
+        for lote in _lotes(list(registros)):
+            ids = [(id_linha,) for id_linha, _, _ in lote]
+            self.conexao.executemany("DELETE FROM busca_postagens WHERE doc = ?", ids)
+            postagens, documentos = [], []
+            for id_linha, titulo, local in lote:
+                termos = termos_documento(titulo or "", local or "")
+                postagens.extend((termo, id_linha, peso) for termo, peso in termos.items())
+                documentos.append((id_linha, sum(termos.values())))
+            self.conexao.executemany("INSERT INTO busca_postagens (termo, doc, peso) VALUES (?, ?, ?)", postagens)
+            self.conexao.executemany(
+                "INSERT OR REPLACE INTO busca_documentos (doc, comprimento) VALUES (?, ?)", documentos)
+
+    def reconstruir(self) -> int:
+        """Indexa todos os eventos do zero (primeira vez ou tokenizador novo)"""
+        with self.conexao:
+            self.conexao.execute("DELETE FROM busca_postagens")
+            self.conexao.execute("DELETE FROM busca_documentos")
+            self._indexar(self.conexao.execute("SELECT id, titulo, local FROM eventos"))
+            self.conexao.execute("INSERT OR REPLACE INTO busca_meta (chave, valor) VALUES ('construido', '1')")
+        return self.conexao.execute("SELECT COUNT(*) FROM busca_documentos").fetchone()[0]
+
+    def atualizar(self, ids: List[int]):
+        """Reindexa só os eventos inseridos/alterados; monta tudo se o índice ainda não existe"""
+        if self._meta("construido") != "1":
+            self.reconstruir()
+            return
+        if not ids:
+            return
+        with self.conexao:
+            registros = []
+            for lote in _lotes(list(ids)):
+                marcadores = ",".join("?" * len(lote))
+                registros.extend(self.conexao.execute(
+                    f"SELECT id, titulo, local FROM eventos WHERE id IN ({marcadores})", lote))
+            self._indexar(registros)
+
+    def _postagens(self, token: str) -> Dict[int, List[tuple]]:
+        """doc -> [(termo, peso, exato)] dos termos iguais ao token ou que começam com ele"""
+        if len(token) >= MIN_PREFIXO:
+            cursor = self.conexao.execute(
+                "SELECT termo, doc, peso FROM busca_postagens WHERE termo >= ? AND termo < ?",
+                (token, _fim_prefixo(token)))
+        else:
+            cursor = self.conexao.execute("SELECT termo, doc, peso FROM busca_postagens WHERE termo = ?", (token,))
+        por_doc = {}
+        for termo, doc, peso in cursor:
+            por_doc.setdefault(doc, []).append((termo, peso, termo == token))
+        return por_doc
+
+    def buscar(self, texto: str, limite: int = LIMITE_PADRAO) -> List[Dict]:
+        """
+        Eventos que casam com todas as palavras (ou, se nenhum, com alguma), do mais ao menos
+        relevante. Cada palavra casa também como prefixo ('mara' acha 'maratona')
+        """
+        if self._meta("construido") != "1":
+            self.reconstruir()
+        tokens = list(dict.fromkeys(tokenizar(texto)))
+        if not tokens:
+            return []
+        total_docs, media = self.conexao.execute(
+            "SELECT COUNT(*), AVG(comprimento) FROM busca_documentos").fetchone()
+        if not total_docs:
+            return []
+
+        pontuacoes = []  # por token: doc -> pontos
+        comprimentos = {}
+        for token in tokens:
+            por_doc = self._postagens(token)
+            # Termo exato usa a própria frequência; os completados pelo prefixo contam como um
+            # termo só (senão completamentos raros, com idf alto, passariam na frente dos comuns)
+            frequencia = {}
+            for postagens in por_doc.values():
+                for termo, _, exato in postagens:
+                    if exato:
+                        frequencia[termo] = frequencia.get(termo, 0) + 1
+            df_prefixo = len(por_doc)
+            faltam = [doc for doc in por_doc if doc not in comprimentos]
+            for lote in _lotes(faltam):
+                marcadores = ",".join("?" * len(lote))
+                comprimentos.update(self.conexao.execute(
+                    f"SELECT doc, comprimento FROM busca_documentos WHERE doc IN ({marcadores})", lote))
+            pontos = {}
+            for doc, postagens in por_doc.items():
+                normalizacao = BM25_K1 * (1 - BM25_B + BM25_B * comprimentos.get(doc, media) / media)
+                melhor = 0.0
+                for termo, peso, exato in postagens:
+                    df = frequencia[termo] if exato else df_prefixo
+                    idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                    valor = idf * peso * (BM25_K1 + 1) / (peso + normalizacao)
+                    melhor = max(melhor, valor if exato else valor * FATOR_PREFIXO)
+                pontos[doc] = melhor
+            pontuacoes.append(pontos)
+
+        todos = set.intersection(*(set(p) for p in pontuacoes))
+        if not todos:
+            todos = set.union(*(set(p) for p in pontuacoes))
+        ranking = sorted(((sum(p.get(doc, 0.0) for p in pontuacoes), doc) for doc in todos), reverse=True)[:limite]
+        if not ranking:
+            return []
+
+        marcadores = ",".join("?" * len(ranking))
+        eventos = {registro[0]: registro[1:] for registro in self.conexao.execute(
+            f"SELECT id, titulo, data, local, link, fonte FROM eventos WHERE id IN ({marcadores})",
+            [doc for _, doc in ranking])}
+        resultados = []
+        for pontos, doc in ranking:
+            if doc in eventos:
+                titulo, data, local, link, fonte = eventos[doc]
+                resultados.append({"pontos": round(pontos, 3), "titulo": titulo, "data": data,
+                                   "local": local, "link": link, "fonte": fonte})
+        return resultados
+
+def _lotes(itens: List, tamanho: int = TAMANHO_LOTE_BUSCA):
+    for inicio in range(0, len(itens), tamanho):
+        yield itens[inicio:inicio + tamanho]
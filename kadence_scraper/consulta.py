@@ -0,0 +1,190 @@
+import os
+import pickle
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from armazenamento import DB_PATH, abrir_armazenamento, data_iso, tipo_armazenamento
+from utils import CSV_PATH
+
+# Configurações
+CACHE_CONSULTA = os.path.join("data", "cache", "consulta.pickle")
+VERSAO_INDICE = 1
+POR_PAGINA_PADRAO = 20
+
+UFS = {
+    "AC": "Acre", "AL": "Alagoas", "AP": "Amapá", "AM": "Amazonas", "BA": "Bahia", "CE": "Ceará",
+    "DF": "Distrito Federal", "ES": "Espírito Santo", "GO": "Goiás", "MA": "Maranhão",
+    "MT": "Mato Grosso", "MS": "Mato Grosso do Sul", "MG": "Minas Gerais", "PA": "Pará",
+    "PB": "Paraíba", "PR": "Paraná", "PE": "Pernambuco", "PI": "Piauí", "RJ": "Rio de Janeiro",
+    "RN": "Rio Grande do Norte", "RS": "Rio Grande do Sul", "RO": "Rondônia", "RR": "Roraima",
+    "SC": "Santa Catarina", "SP": "São Paulo", "SE": "Sergipe", "TO": "Tocantins",
+}
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sem acentos e com espaços simples (chave dos índices invertidos)"""
+    sem_acento = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\s+", " ", sem_acento).strip().casefold()
+
+_NOMES_UF = {normalizar(nome): uf for uf, nome in UFS.items()}
+_RE_UF_FINAL = re.compile(r"^(.*?)[\s/,\-]+([A-Za-z]{2})\s*$")
+
+def cidade_e_uf(local: str) -> Tuple[str, Optional[str]]:
+    """
+    'Parque - Praça JK - Belo Horizonte  MG' -> ('Belo Horizonte', 'MG');
+    'Bombinhas/SC' -> ('Bombinhas', 'SC'); 'Goiânia Goiás' -> ('Goiânia', 'GO'); 'SALVADOR' -> ('SALVADOR', None)
+    """
+    local = (local or "").strip()
+    uf = None
+    encontrado = _RE_UF_FINAL.match(local)
+    if encontrado and encontrado.group(2).upper() in UFS:
+        local, uf = encontrado.group(1), encontrado.group(2).upper()
+    else:
+        normalizado = normalizar(local)
+        for nome, sigla in sorted(_NOMES_UF.items(), key=lambda x: -len(x[0])):
+            if normalizado.endswith(" " + nome) or normalizado == nome:
+                uf = sigla
+                local = local[:len(local) - len(nome)] if normalizado != nome else ""
+                break
+    cidade = re.split(r"\s+-\s+", local.strip(" -/,"))[-1].strip()
+    return cidade, uf
+
+def interpretar_data(texto: str) -> str:
+    """'dd/mm/aaaa' ou 'aaaa-mm-dd' -> 'aaaa-mm-dd'"""
+    return data_iso(texto) or datetime.strptime(texto.strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+
+class ResultadoConsulta:
+    """Uma página de resultados"""
+
+    def __init__(self, eventos: List[Dict], total: int, pagina: int, por_pagina: int):
+        self.eventos = eventos
+        self.total = total
+        self.pagina = pagina
+        self.por_pagina = por_pagina
+
+    @property
+    def paginas(self) -> int:
+        return max(1, -(-self.total // self.por_pagina))
+
+class IndiceConsulta:
+    """
+    Eventos ordenados por data (busca de intervalo com bisect) e índices invertidos
+    por UF, cidade e fonte com as posições na ordem de data
+    """
+
+    def __init__(self, linhas: List[Dict], assinatura=None):
+        self.assinatura = assinatura
+        chave = lambda linha: (data_iso(linha["Data"]) or "9999-99-99", linha["Título"])
+        self.eventos = sorted(linhas, key=chave)
+        self.datas = []  # só o trecho com data válida (as sem data ficam no fim de self.eventos)
+        self.por_uf, self.por_cidade, self.por_fonte = {}, {}, {}
+        for posicao, linha in enumerate(self.eventos):
+            iso = data_iso(linha["Data"])
+            if iso:
+                self.datas.append(iso)
+            cidade, uf = cidade_e_uf(linha["Local"])
+            if uf:
+                self.por_uf.setdefault(normalizar(uf), []).append(posicao)
+            if cidade:
+                self.por_cidade.setdefault(normalizar(cidade), []).append(posicao)
+            self.por_fonte.setdefault(normalizar(linha["Fonte"]), []).append(posicao)
+
+    def _postagens(self, indice: Dict[str, List[int]], valor: str, prefixo: bool = False) -> List[int]:
+        chave = normalizar(valor)
+        if not prefixo:
+            return indice.get(chave, [])
+        # Fonte 'TicketSports' casa 'TicketSports-Geral', 'TicketSports-Até 4K'...
+        listas = [posicoes for nome, posicoes in indice.items() if nome == chave or nome.startswith(chave)]
+        return sorted(p for posicoes in listas for p in posicoes) if len(listas) > 1 else (listas or [[]])[0]
+
+    def consultar(self, uf: Optional[str] = None, cidade: Optional[str] = None, fonte: Optional[str] = None,
+                  de: Optional[str] = None, ate: Optional[str] = None,
+                  pagina: int = 1, por_pagina: int = POR_PAGINA_PADRAO) -> ResultadoConsulta:
+        """Filtros combinados (E); datas 'aaaa-mm-dd' inclusivas. Resultado em ordem de data, paginado"""
+        inicio, fim = 0, len(self.eventos)
+        if de or ate:
+            inicio = bisect_left(self.datas, de) if de else 0
+            fim = bisect_right(self.datas, ate) if ate else len(self.datas)
+
+        filtros = []
+        if uf:
+            filtros.append(self._postagens(self.por_uf, uf.upper()) if uf.upper() in UFS else [])
+        if cidade:
+            filtros.append(self._postagens(self.por_cidade, cidade))
+        if fonte:
+            filtros.append(self._postagens(self.por_fonte, fonte, prefixo=True))
+
+        if filtros:
+            # Recorta cada lista ao intervalo de datas (bisect) e cruza a partir da menor
+            recortes = sorted((p[bisect_left(p, inicio):bisect_left(p, fim)] for p in filtros), key=len)
+            posicoes = recortes[0]
+            for outra in recortes[1:]:
+                conjunto = set(outra)
+                posicoes = [p for p in posicoes if p in conjunto]
+        else:
+            posicoes = range(inicio, fim)
+
+        pagina = max(1, pagina)
+        trecho = posicoes[(pagina - 1) * por_pagina:pagina * por_pagina]
+        return ResultadoConsulta([self.eventos[p] for p in trecho], len(posicoes), pagina, por_pagina)
+
+def _assinatura(tipo: str) -> tuple:
+    """Identifica a versão dos dados: tamanho e mtime do banco (e do WAL) ou do CSV"""
+    arquivos = [DB_PATH, DB_PATH + "-wal"] if tipo == "sqlite" else [CSV_PATH]
+    assinatura = [VERSAO_INDICE, tipo]
+    for arquivo in arquivos:
+        try:
+            estado = os.stat(arquivo)
+            assinatura.append((estado.st_size, estado.st_mtime_ns))
+        except FileNotFoundError:
+            assinatura.append(None)
+    return tuple(assinatura)
+
+_indice_em_memoria = None
+
+def carregar_indice(armazenamento: Optional[str] = None, cache: str = CACHE_CONSULTA) -> IndiceConsulta:
+    """
+    Índice pronto para consultas: o da memória ou o do cache em disco, se os dados não mudaram
+    desde que foi montado; senão monta a partir do armazenamento e regrava o cache
+    """
+    global _indice_em_memoria
+    tipo = tipo_armazenamento(armazenamento)
+    assinatura = _assinatura(tipo)
+    if _indice_em_memoria is not None and _indice_em_memoria.assinatura == assinatura:
+        return _indice_em_memoria
+    try:
+        with open(cache, "rb") as f:
+            indice = pickle.load(f)
+        if isinstance(indice, IndiceConsulta) and indice.assinatura == assinatura:
+            _indice_em_memoria = indice
+            return indice
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    with abrir_armazenamento(tipo) as banco:
+        linhas = list(banco.linhas())
+    indice = IndiceConsulta(linhas, _assinatura(tipo))  # abrir o banco pode ter mexido no arquivo
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        temporario = cache + ".tmp"
+        with open(temporario, "wb") as f:
+            pickle.dump(indice, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, cache)
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar o cache de consulta: {str(e)[:50]}")
+    _indice_em_memoria = indice
+    return indice
+
+def consultar(uf: Optional[str] = None, cidade: Optional[str] = None, fonte: Optional[str] = None,
+              de: Optional[str] = None, ate: Optional[str] = None, dias: Optional[int] = None,
+              pagina: int = 1, por_pagina: int = POR_PAGINA_PADRAO,
+              armazenamento: Optional[str] = None) -> ResultadoConsulta:
+    """Consulta os eventos salvos; `dias` = de hoje (ou de `de`) até N dias depois"""
+    de = interpretar_data(de) if de else None
+    ate = interpretar_data(ate) if ate else None
+    if dias is not None:
+        de = de or datetime.now().strftime("%Y-%m-%d")
+        ate = (datetime.strptime(de, "%Y-%m-%d") + timedelta(days=dias)).strftime("%Y-%m-%d")
+    return carregar_indice(armazenamento).consultar(uf, cidade, fonte, de, ate, pagina, por_pagina)
@@ -0,0 +1,167 @@
+import re
+from typing import Dict, List, Optional, Set
+
+from armazenamento import data_iso
+from busca import tokenizar
+from consulta import cidade_e_uf, normalizar
+
+# Configurações
+LIMIAR_MESMA_CIDADE = 0.5  # similaridade mínima de título quando as cidades batem
+LIMIAR_SEM_LOCAL = 0.75  # ... quando um dos lados não informa o local
+LIMIAR_CIDADE = 0.5  # abaixo disso as cidades são consideradas diferentes
+MAX_POR_TOKEN = 50  # palavra presente em mais eventos do mesmo dia não gera candidatos
+TERMOS_GENERICOS = frozenset("""
+corrida corre caminhada run running rustica edicao ed etapa circuito desafio treino treinao
+kid kids infantil noturna night trail
+""".split())
+LOCAIS_VAGOS = frozenset(["", "brasil", "local nao informado", "a definir", "online", "virtual"])
+
+_RE_TOKEN_GENERICO = re.compile(r"^(\d+(\.\d+)?k?|\d+[ao])$")  # números, anos, distâncias e ordinais (1a, 2o)
+
+def fonte_base(fonte: str) -> str:
+    """'TicketSports-Geral' e 'TicketSports-Até 4K' são a mesma fonte"""
+    return normalizar((fonte or "").split("-")[0])
+
+def _shingles(texto: str, n: int = 3) -> Set[str]:
+    texto = f" {texto} "
+    return {texto[i:i + n] for i in range(max(1, len(texto) - n + 1))}
+
+def _dice(a: Set, b: Set) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+class _Assinatura:
+    """O que é comparado de cada evento, calculado uma vez só"""
+
+    def __init__(self, posicao: int, evento: Dict):
+        self.posicao = posicao
+        cidade, uf = cidade_e_uf(evento.get("local") or "")
+        cidade = normalizar(cidade)
+        self.cidade = None if cidade in LOCAIS_VAGOS else cidade
+        # A cidade no título ('LIVE! Run São Paulo' x 'SporTV Run São Paulo') não diz que é o mesmo evento
+        ignorar = TERMOS_GENERICOS | set(tokenizar(self.cidade or ""))
+        titulo = (evento.get("titulo") or "").replace("...", " ").replace("…", " ")
+        tokens = tokenizar(titulo)
+        significativos = [t for t in tokens if t not in ignorar and not _RE_TOKEN_GENERICO.match(t)]
+        self.tokens = set(significativos or tokens)
+        self.shingles = _shingles(" ".join(significativos or tokens))
+        self.cidade_shingles = _shingles(self.cidade) if self.cidade else set()
+        self.uf = uf
+        self.fonte = fonte_base(evento.get("fonte"))
+
+def similaridade_titulo(a: _Assinatura, b: _Assinatura) -> float:
+    """
+    Trigramas de caracteres (erros de digitação, acentos, abreviações) ou, se maior, a fração
+    das palavras do título mais curto presentes no outro (títulos cortados com '...')
+    """
+    similaridade = _dice(a.shingles, b.shingles)
+    menor = min(len(a.tokens), len(b.tokens))
+    comuns = len(a.tokens & b.tokens)
+    if menor >= 2 and comuns >= 2:
+        similaridade = max(similaridade, 0.95 * comuns / menor)
+    return similaridade
+
+def pontuar(a: _Assinatura, b: _Assinatura) -> Optional[float]:
+    """Similaridade do par, ou None se não é o mesmo evento"""
+    if a.fonte == b.fonte or (a.uf and b.uf and a.uf != b.uf):
+        return None
+    titulo = similaridade_titulo(a, b)
+    if a.cidade and b.cidade:
+        cidade = 1.0 if a.cidade == b.cidade else _dice(a.cidade_shingles, b.cidade_shingles)
+        if cidade < LIMIAR_CIDADE or titulo < LIMIAR_MESMA_CIDADE:
+            return None
+        return 0.7 * titulo + 0.3 * cidade
+    return titulo if titulo >= LIMIAR_SEM_LOCAL else None
+
+def pares_candidatos(assinaturas: List[_Assinatura]) -> Set[tuple]:
+    """
+    Dentro de um bloco (mesmo dia), só pares que dividem alguma palavra do título;
+    palavras comuns demais no dia são ignoradas para o custo não virar quadrático
+    """
+    por_token = {}
+    for assinatura in assinaturas:
+        for token in assinatura.tokens:
+            por_token.setdefault(token, []).append(assinatura)
+    pares = set()
+    for membros in por_token.values():
+        if len(membros) < 2 or len(membros) > MAX_POR_TOKEN:
+            continue
+        for i, a in enumerate(membros):
+            for b in membros[i + 1:]:
+                pares.add((a.posicao, b.posicao) if a.posicao < b.posicao else (b.posicao, a.posicao))
+    return pares
+
+def _qualidade(evento: Dict) -> tuple:
+    """Critério para escolher o evento canônico do grupo: local informado, título completo, fonte"""
+    local = normalizar(evento.get("local"))
+    titulo = evento.get("titulo") or ""
+    return (local not in LOCAIS_VAGOS, not titulo.endswith(("...", "…")), len(local), len(titulo),
+            [-ord(c) for c in evento.get("fonte") or ""])
+
+def agrupar_duplicatas(eventos: List[Dict]) -> List[List[int]]:
+    """
+    Grupos (posições em `eventos`) do mesmo evento publicado em fontes diferentes.
+    Blocos por data (e UF, quando conhecida), pares pontuados e unidos do mais ao menos
+    parecido (union-find), sem juntar dois eventos da mesma fonte num grupo
+    """
+    blocos = {}
+    for posicao, evento in enumerate(eventos):
+        iso = data_iso(evento.get("data") or "")
+        if iso:
+            blocos.setdefault(iso, []).append(_Assinatura(posicao, evento))
+
+    pares = []
+    for assinaturas in blocos.values():
+        if len(assinaturas) < 2:
+            continue
+        por_posicao = {a.posicao: a for a in assinaturas}
+        for i, j in pares_candidatos(assinaturas):
+            pontos = pontuar(por_posicao[i], por_posicao[j])
+            if pontos is not None:
+                pares.append((pontos, i, j))
+
+    pai = list(range(len(eventos)))
+    fontes = {}
+
+    def raiz(i):
+        while pai[i] != i:
+            pai[i] = pai[pai[i]]
+            i = pai[i]
+        return i
+
+    for _, i, j in sorted(pares, reverse=True):
+        ri, rj = raiz(i), raiz(j)
+        if ri == rj:
+            continue
+        fontes_i = fontes.get(ri) or {fonte_base(eventos[ri].get("fonte"))}
+        fontes_j = fontes.get(rj) or {fonte_base(eventos[rj].get("fonte"))}
+        if fontes_i & fontes_j:
+            continue
+        pai[rj] = ri
+        fontes[ri] = fontes_i | fontes_j
+        fontes.pop(rj, None)
+
+    grupos = {}
+    for posicao in range(len(eventos)):
+        grupos.setdefault(raiz(posicao), []).append(posicao)
+    return [membros for membros in grupos.values() if len(membros) > 1]
+
+def evento_canonico(membros: List[Dict]) -> Dict:
+    """O membro mais completo, com `links` (fonte e link de todos) e `fontes`"""
+    canonico = dict(max(membros, key=_qualidade))
+    links = sorted({(m.get("fonte") or "", m.get("link") or "") for m in membros})
+    canonico["links"] = [{"fonte": fonte, "link": link} for fonte, link in links]
+    canonico["fontes"] = sorted({fonte for fonte, _ in links})
+    return canonico
+
+def resolver_duplicatas(eventos: List[Dict]) -> List[Dict]:
+    """Troca cada grupo de duplicatas entre fontes pelo seu evento canônico (na posição do primeiro)"""
+    grupos = agrupar_duplicatas(eventos)
+    if not grupos:
+        return eventos
+    substituir, descartar = {}, set()
+    for membros in grupos:
+        substituir[membros[0]] = evento_canonico([eventos[p] for p in membros])
+        descartar.update(membros[1:])
+    resolvidos = [substituir.get(p, evento) for p, evento in enumerate(eventos) if p not in descartar]
+    print(f"🔗 Duplicatas entre fontes: {len(grupos)} grupos, {len(descartar)} eventos fundidos")
+    return resolvidos
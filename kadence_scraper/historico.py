@@ -0,0 +1,276 @@
+import csv
+import glob
+import io
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from utils import HEADERS, gerar_hash_evento
+from armazenamento import (DB_PATH, CAMPOS_COMPARADOS, identidade_evento, identidades_links, linha_evento,
+                           links_ambiguos_gravados, links_evento, links_repetidos)
+
+# Configurações
+TIPOS_PRESENTES = ("inserido", "atualizado")  # o evento existe no catálogo depois dessa entrada
+ORIGEM_SCRAPING = "scraping"
+
+# Log só de acréscimo: uma entrada por evento inserido, alterado ou desaparecido em cada execução.
+# historico_atual aponta a última entrada de cada evento (não apaga nada do log)
+ESQUEMA_HISTORICO = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY,
+    momento TEXT NOT NULL,
+    origem TEXT NOT NULL,
+    fontes TEXT NOT NULL,
+    inseridos INTEGER NOT NULL,
+    atualizados INTEGER NOT NULL,
+    removidos INTEGER NOT NULL,
+    inalterados INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_execucoes_momento ON execucoes(momento);
+CREATE TABLE IF NOT EXISTS historico (
+    id INTEGER PRIMARY KEY,
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+    momento TEXT NOT NULL,
+    identidade TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    titulo TEXT, data TEXT, local TEXT, link TEXT, fonte TEXT, hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_historico_evento ON historico(identidade, momento, id);
+CREATE INDEX IF NOT EXISTS idx_historico_execucao ON historico(execucao_id);
+CREATE TABLE IF NOT EXISTS historico_atual (
+    identidade TEXT PRIMARY KEY,
+    historico_id INTEGER NOT NULL,
+    momento TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+COLUNAS_LINHA = "titulo, data, local, link, fonte, hash"  # mesma ordem de HEADERS
+
+def _linha_csv(registro: Dict) -> Dict:
+    """Linha de um CSV antigo no formato de HEADERS (hash recalculado se faltar)"""
+    linha = {cabecalho: (registro.get(cabecalho) or "").strip() for cabecalho in HEADERS}
+    if not linha["Hash"]:
+        linha["Hash"] = gerar_hash_evento(linha["Título"], linha["Data"], linha["Local"])
+    return linha
+
+class ResultadoExecucao:
+    """Uma execução registrada no histórico: id e as linhas de cada tipo de mudança"""
+
+    def __init__(self, execucao_id: int, momento: str):
+        self.execucao_id = execucao_id
+        self.momento = momento
+        self.inseridos = []
+        self.atualizados = []
+        self.removidos = []
+        self.inalterados = 0
+        self.entradas = []  # (id no histórico, tipo, identidade, linha, linha anterior ou None)
+
+    def resumo(self) -> str:
+        return (f"{len(self.inseridos)} novos, {len(self.atualizados)} alterados, "
+                f"{len(self.removidos)} sumiram, {self.inalterados} sem mudança")
+
+class HistoricoEventos:
+    """Histórico de mudanças do catálogo, nas tabelas execucoes/historico do banco SQLite"""
+
+    def __init__(self, caminho: str = DB_PATH):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.executescript(ESQUEMA_HISTORICO)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+    def fechar(self):
+        self.conexao.close()
+
+    def _linhas(self, consulta: str, parametros=()) -> Dict[str, Dict]:
+        """identidade -> linha (HEADERS) para consultas que retornam identidade + COLUNAS_LINHA"""
+        return {identidade: dict(zip(HEADERS, campos))
+                for identidade, *campos in self.conexao.execute(consulta, parametros)}
+
+    def estado_atual(self, fontes: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Eventos presentes no catálogo segundo a última entrada de cada um"""
+        consulta = (f"SELECT h.identidade, {', '.join('h.' + c for c in COLUNAS_LINHA.split(', '))} "
+                    f"FROM historico_atual a JOIN historico h ON h.id = a.historico_id "
+                    f"WHERE h.tipo IN ({','.join('?' * len(TIPOS_PRESENTES))})")
+        parametros = list(TIPOS_PRESENTES)
+        if fontes is not None:
+            consulta += f" AND h.fonte IN ({','.join('?' * len(fontes))})"
+            parametros += list(fontes)
+        return self._linhas(consulta, parametros)
+
+    def estado_em(self, momento: str) -> Dict[str, Dict]:
+        """Eventos presentes no catálogo no instante `momento` (ISO): última entrada de cada um até lá"""
+        return self._linhas(
+            f"SELECT identidade, {COLUNAS_LINHA} FROM ("
+            f"  SELECT *, ROW_NUMBER() OVER (PARTITION BY identidade ORDER BY momento DESC, id DESC) AS ordem"
+            f"  FROM historico WHERE momento <= ?"
+            f") WHERE ordem = 1 AND tipo IN ({','.join('?' * len(TIPOS_PRESENTES))})",
+            [momento, *TIPOS_PRESENTES])
+
+    def ultimo_momento(self) -> Optional[str]:
+        return self.conexao.execute("SELECT MAX(momento) FROM historico_atual").fetchone()[0]
+
+    def registrar(self, linhas: List[Dict], momento: str, origem: str = ORIGEM_SCRAPING,
+                  fontes: Optional[List[str]] = None, links: Optional[List[List[tuple]]] = None) -> ResultadoExecucao:
+        """
+        Compara as linhas vistas numa execução com o estado anterior do catálogo (junção por
+        identidade, em dicionário) e acrescenta uma entrada por evento novo, alterado ou sumido.
+        Só somem eventos das `fontes` informadas (None: todas, ex.: um snapshot completo).
+        `links` traz as publicações (fonte, link) de cada linha: um evento fundido cujo canônico
+        mudou continua com a identidade anterior de uma delas
+        """
+        ambiguos = links_ambiguos_gravados(self.conexao) | links_repetidos(linhas)
+
+        ultimo = self.ultimo_momento()
+        if ultimo is None or momento >= ultimo:
+            anteriores = self.estado_atual(fontes)
+        else:
+            # Execução anterior à última registrada (ex.: backup antigo importado depois)
+            anteriores = self.estado_em(momento)
+            if fontes is not None:
+                anteriores = {i: l for i, l in anteriores.items() if l["Fonte"] in fontes}
+
+        proprias = [identidade_evento(linha, ambiguos) for linha in linhas]
+        ocupadas = set(proprias)
+        atuais = {}
+        for posicao, (identidade, linha) in enumerate(zip(proprias, linhas)):
+            if links is not None and identidade not in anteriores:
+                identidade = next((m for m in identidades_links(linha, links[posicao], ambiguos)
+                                   if m in anteriores and m not in ocupadas), identidade)
+                ocupadas.add(identidade)
+            atuais.setdefault(identidade, linha)
+
+        with self.conexao:
+            cursor = self.conexao.execute(
+                "INSERT INTO execucoes (momento, origem, fontes, inseridos, atualizados, removidos, inalterados) "
+                "VALUES (?, ?, ?, 0, 0, 0, 0)",
+                (momento, origem, json.dumps(sorted(fontes) if fontes is not None else None, ensure_ascii=False)))
+            resultado = ResultadoExecucao(cursor.lastrowid, momento)
+
+            entradas = []
+            for identidade, linha in atuais.items():
+                anterior = anteriores.get(identidade)
+                if anterior is None:
+                    entradas.append((identidade, "inserido", linha, None))
+                    resultado.inseridos.append((identidade, linha))
+                elif any(anterior[c] != linha[c] for c in CAMPOS_COMPARADOS):
+                    entradas.append((identidade, "atualizado", linha, anterior))
+                    resultado.atualizados.append((identidade, linha, anterior))
+                else:
+                    resultado.inalterados += 1
+            for identidade, anterior in anteriores.items():
+                if identidade not in atuais:
+                    entradas.append((identidade, "removido", anterior, None))
+                    resultado.removidos.append((identidade, anterior))
+
+            for identidade, tipo, linha, anterior in entradas:
+                cursor = self.conexao.execute(
+                    f"INSERT INTO historico (execucao_id, momento, identidade, tipo, {COLUNAS_LINHA}) "
+                    f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (resultado.execucao_id, momento, identidade, tipo, *(linha[c] for c in HEADERS)))
+                self.conexao.execute(
+                    "INSERT INTO historico_atual (identidade, historico_id, momento) VALUES (?, ?, ?) "
+                    "ON CONFLICT(identidade) DO UPDATE SET historico_id = excluded.historico_id, "
+                    "momento = excluded.momento WHERE excluded.momento >= historico_atual.momento",
+                    (identidade, cursor.lastrowid, momento))
+                resultado.entradas.append((cursor.lastrowid, tipo, identidade, linha, anterior))
+            self.conexao.execute(
+                "UPDATE execucoes SET inseridos = ?, atualizados = ?, removidos = ?, inalterados = ? WHERE id = ?",
+                (len(resultado.inseridos), len(resultado.atualizados), len(resultado.removidos),
+                 resultado.inalterados, resultado.execucao_id))
+        return resultado
+
+    def historico_evento(self, identidade: str) -> List[Dict]:
+        """Entradas de um evento em ordem cronológica"""
+        cursor = self.conexao.execute(
+            f"SELECT h.momento, h.tipo, e.origem, {COLUNAS_LINHA} FROM historico h "
+            f"JOIN execucoes e ON e.id = h.execucao_id WHERE h.identidade = ? ORDER BY h.momento, h.id",
+            (identidade,))
+        return [{"momento": momento, "tipo": tipo, "origem": origem, **dict(zip(HEADERS, campos))}
+                for momento, tipo, origem, *campos in cursor]
+
+    def encontrar(self, texto: str, limite: int = 20) -> List[str]:
+        """Identidades cujo título, link ou identidade contém o texto (entrada mais recente de cada)"""
+        padrao = f"%{texto}%"
+        cursor = self.conexao.execute(
+            "SELECT a.identidade FROM historico_atual a JOIN historico h ON h.id = a.historico_id "
+            "WHERE h.titulo LIKE ? OR h.link LIKE ? OR a.identidade LIKE ? ORDER BY a.momento DESC LIMIT ?",
+            (padrao, padrao, padrao, limite))
+        return [identidade for (identidade,) in cursor]
+
+    def execucoes(self) -> List[Dict]:
+        colunas = ("id", "momento", "origem", "fontes", "inseridos", "atualizados", "removidos", "inalterados")
+        cursor = self.conexao.execute(f"SELECT {', '.join(colunas)} FROM execucoes ORDER BY momento, id")
+        return [dict(zip(colunas, registro)) for registro in cursor]
+
+    def _ja_importado(self, origem: str) -> bool:
+        return self.conexao.execute("SELECT 1 FROM execucoes WHERE origem = ? LIMIT 1", (origem,)).fetchone() is not None
+
+    def importar_backups_csv(self, diretorio: str) -> int:
+        """
+        Semeia o histórico com cópias antigas corridas_backup_<momento>.csv, em ordem cronológica,
+        cada uma como uma execução completa naquele momento. Cópias já importadas são puladas
+        """
+        importados = 0
+        for caminho in sorted(glob.glob(os.path.join(diretorio, "corridas_backup_*.csv"))):
+            encontrado = re.search(r"corridas_backup_(\d{8}_\d{6})\.csv$", caminho)
+            origem = f"backup:{os.path.basename(caminho)}"
+            if not encontrado or self._ja_importado(origem):
+                continue
+            momento = datetime.strptime(encontrado.group(1), "%Y%m%d_%H%M%S").isoformat()
+            with open(caminho, "r", newline="", encoding="utf-8") as f:
+                linhas = [_linha_csv(registro) for registro in csv.DictReader(f)]
+            resultado = self.registrar(linhas, momento, origem)
+            print(f"   📜 {os.path.basename(caminho)}: {resultado.resumo()}")
+            importados += 1
+        return importados
+
+    def importar_snapshots(self) -> int:
+        """Semeia o histórico com o CSV de cada snapshot do armazenamento de backups (backups.py)"""
+        from backups import listar_snapshots, ler_manifesto, ler_bloco
+
+        importados = 0
+        for momento, caminho in listar_snapshots():
+            origem = f"snapshot:{os.path.basename(caminho)}"
+            if self._ja_importado(origem):
+                continue
+            arquivos = [a for a in ler_manifesto(caminho)["arquivos"] if a["caminho"].endswith(".csv")]
+            if not arquivos:
+                continue
+            conteudo = b"".join(ler_bloco(chave) for chave in arquivos[0]["blocos"]).decode("utf-8")
+            linhas = [_linha_csv(registro) for registro in csv.DictReader(io.StringIO(conteudo, newline=""))]
+            resultado = self.registrar(linhas, momento.isoformat(), origem)
+            print(f"   📜 {os.path.basename(caminho)}: {resultado.resumo()}")
+            importados += 1
+        return importados
+
+def registrar_execucao(eventos: List[Dict], caminho: str = DB_PATH) -> Optional[ResultadoExecucao]:
+    """
+    Registra no histórico a saída de consolidar_eventos_globais: eventos que sumiram só contam
+    para as fontes que trouxeram algum evento nesta execução
+    """
+    if not eventos:
+        return None
+    linhas = [linha_evento(evento) for evento in eventos]
+    links = [links_evento(evento) for evento in eventos]
+    fontes = sorted({fonte for links_linha in links for fonte, _ in links_linha})
+    momento = datetime.now().isoformat(timespec="seconds")
+    try:
+        with HistoricoEventos(caminho) as historico:
+            resultado = historico.registrar(linhas, momento, ORIGEM_SCRAPING, fontes, links)
+    except sqlite3.Error as e:
+        print(f"⚠️ Erro ao registrar histórico: {e}")
+        return None
+    print(f"📜 Histórico: {resultado.resumo()}")
+    return resultado
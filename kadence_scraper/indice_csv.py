@@ -0,0 +1,159 @@
+import mmap
+import os
+import struct
+from typing import Iterable, List
+
+from utils import carregar_eventos_existentes
+
+# Configurações
+SUFIXO_INDICE = ".idx"
+MAGICO = b"KDXHASH1"
+# mágico, largura da chave, reservado, tamanho do CSV, mtime do CSV (ns), chaves ordenadas, chaves na cauda
+CABECALHO = struct.Struct("<8sHHQqQQ")
+LARGURA_MINIMA = 8  # hashes de gerar_hash_evento têm 8 caracteres
+MAX_CAUDA = 4096  # chaves acrescentadas fora de ordem antes de regravar tudo ordenado
+
+class IndiceHashes:
+    """
+    Índice dos hashes do CSV em um arquivo ao lado dele (corridas.csv.idx): cabeçalho com
+    tamanho e mtime do CSV, chaves de largura fixa ordenadas (busca binária sobre mmap) e uma
+    cauda curta de chaves recém-acrescentadas. Abrir custa só o mmap; se o CSV mudou por fora,
+    o índice é reconstruído
+    """
+
+    def __init__(self, caminho_csv: str):
+        self.caminho_csv = caminho_csv
+        self.caminho = caminho_csv + SUFIXO_INDICE
+        self._arquivo = None
+        self._mapa = None
+        self.largura = LARGURA_MINIMA
+        self.ordenadas = 0
+        self.cauda = set()
+        self.reconstruido = False
+
+    @classmethod
+    def abrir(cls, caminho_csv: str) -> "IndiceHashes":
+        indice = cls(caminho_csv)
+        if not indice._carregar():
+            indice.reconstruir()
+        return indice
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+    def _estado_csv(self):
+        try:
+            estado = os.stat(self.caminho_csv)
+        except FileNotFoundError:
+            return 0, 0
+        return estado.st_size, estado.st_mtime_ns
+
+    def _carregar(self) -> bool:
+        """Mapeia o índice; False se não existe, está corrompido ou não bate com o CSV"""
+        try:
+            arquivo = open(self.caminho, "rb")
+        except FileNotFoundError:
+            return False
+        try:
+            bruto = arquivo.read(CABECALHO.size)
+            if len(bruto) < CABECALHO.size:
+                return False
+            magico, largura, _, tamanho, mtime, ordenadas, cauda = CABECALHO.unpack(bruto)
+            esperado = CABECALHO.size + (ordenadas + cauda) * largura
+            if (magico != MAGICO or (tamanho, mtime) != self._estado_csv()
+                    or os.fstat(arquivo.fileno()).st_size != esperado):
+                return False
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            if self._mapa is None:
+                arquivo.close()
+        self._arquivo = arquivo
+        self.largura, self.ordenadas = largura, ordenadas
+        inicio_cauda = CABECALHO.size + ordenadas * largura
+        self.cauda = {self._mapa[inicio_cauda + i * largura:inicio_cauda + (i + 1) * largura]
+                      for i in range(cauda)}
+        return True
+
+    def _chave(self, hash_evento: str) -> bytes:
+        return hash_evento.encode("utf-8").ljust(self.largura, b" ")
+
+    def _chave_ordenada(self, i: int) -> bytes:
+        inicio = CABECALHO.size + i * self.largura
+        return self._mapa[inicio:inicio + self.largura]
+
+    def __contains__(self, hash_evento: str) -> bool:
+        chave = self._chave(hash_evento)
+        if len(chave) != self.largura:
+            return False  # mais larga que qualquer chave gravada
+        if chave in self.cauda:
+            return True
+        baixo, alto = 0, self.ordenadas
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self._chave_ordenada(meio) < chave:
+                baixo = meio + 1
+            else:
+                alto = meio
+        return baixo < self.ordenadas and self._chave_ordenada(baixo) == chave
+
+    def __len__(self) -> int:
+        return self.ordenadas + len(self.cauda)
+
+    def _todas(self) -> List[bytes]:
+        return [self._chave_ordenada(i) for i in range(self.ordenadas)] + list(self.cauda)
+
+    def _gravar(self, chaves: Iterable[bytes], largura: int):
+        """Regrava o índice inteiro ordenado (temporário + rename) e o mapeia de novo"""
+        chaves = sorted({c.rstrip(b" ").ljust(largura, b" ") for c in chaves})
+        self.fechar()
+        tamanho, mtime = self._estado_csv()
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "wb") as f:
+            f.write(CABECALHO.pack(MAGICO, largura, 0, tamanho, mtime, len(chaves), 0))
+            f.write(b"".join(chaves))
+        os.replace(temporario, self.caminho)
+        if not self._carregar():
+            raise OSError(f"Índice {self.caminho} inválido logo após ser gravado")
+
+    def reconstruir(self):
+        """Lê o CSV inteiro uma vez (com o fallback de hash de carregar_eventos_existentes)"""
+        hashes = carregar_eventos_existentes(self.caminho_csv)
+        chaves = [h.encode("utf-8") for h in hashes]
+        largura = max([LARGURA_MINIMA] + [len(c) for c in chaves])
+        self._gravar(chaves, largura)
+        self.reconstruido = True
+
+    def registrar(self, hashes: List[str]):
+        """
+        Registra os hashes que acabaram de ser acrescentados ao CSV: vão para a cauda e o
+        cabeçalho passa a apontar o novo tamanho/mtime. Cauda grande ou chave mais larga
+        que o índice -> regrava tudo ordenado
+        """
+        novas = sorted({h.encode("utf-8") for h in hashes if h not in self})
+        largura = max([self.largura] + [len(c) for c in novas])
+        if largura != self.largura or len(self.cauda) + len(novas) > MAX_CAUDA:
+            self._gravar(self._todas() + novas, largura)
+            return
+        novas = [c.ljust(self.largura, b" ") for c in novas]
+        tamanho, mtime = self._estado_csv()
+        cauda = len(self.cauda) + len(novas)
+        self.fechar()
+        with open(self.caminho, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            f.write(b"".join(novas))
+            f.seek(0)
+            f.write(CABECALHO.pack(MAGICO, self.largura, 0, tamanho, mtime, self.ordenadas, cauda))
+        if not self._carregar():
+            self.reconstruir()
+
+    def fechar(self):
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
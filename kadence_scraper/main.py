@@ -2,28 +2,46 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import json
 import os
 import sys
+import time
 from datetime import datetime
-from utils import salvar_eventos, limpar_csv, criar_backup
-from scrapers.time_ticket_scraper import extrair_timeticket
-from scrapers.ticket_sports_scraper import extrair_ticket_sports
-from scrapers.sympla_scraper import extrair_sympla
-from scrapers.even3_scraper import extrair_even3
-from scrapers.doity_scraper import extrair_doity
-from scrapers.atletis_scraper import extrair_atletis
-from scrapers.central_corrida_scraper import extrair_central_corrida
-from scrapers.minhas_inscricoes_scraper import extrair_minhas_inscricoes
-from scrapers.ativo_scraper import extrair_ativo
-from scrapers.corridao_scraper import extrair_corridao
-from scrapers.youmovin_scraper import extrair_youmovin
-from scrapers.cronoschip_scraper import extrair_cronoschip
-from scrapers.brasilcorrida_scraper import extrair_brasilcorrida
-from scrapers.vemcorrer_scraper import extrair_vemcorrer
-from scrapers.sporttimer_scraper import extrair_sporttimer
-from scrapers.oxyscrono_scraper import extrair_oxyscrono
-from scrapers.liverun_scraper import extrair_liverun
-from scrapers.trackfield_scraper import extrair_trackfield
+from utils import salvar_eventos, limpar_eventos, criar_backup, CSV_PATH
+from armazenamento import ARMAZENAMENTOS, abrir_armazenamento, tipo_armazenamento
+from backups import (restaurar, importar_backups_antigos, interpretar_momento, listar_backups,
+                     aplicar_retencao, RETENCAO_PADRAO)
+from historico import HistoricoEventos, registrar_execucao
+from mudancas import gravar_mudancas, ler_mudancas, LeitorMudancas, CursorPodado
+from consulta import consultar, POR_PAGINA_PADRAO
+from busca import IndiceBusca, LIMITE_PADRAO
+from duplicatas import agrupar_duplicatas, resolver_duplicatas
+from paralelo import executar_fontes_em_paralelo, TIMEOUT_FONTE_PADRAO
+from motor import executar_fontes
+from relatorio import montar_relatorio, gravar_relatorios, imprimir_detalhamento, PROMETHEUS_PATH
+from scrapers.navegador import LIMITE_POR_HOST_PADRAO
+from scrapers.http_rapido import VARIAVEL_DESLIGAR
+from scrapers.detalhes import VARIAVEL_ATUALIZAR
+from scrapers.har import VARIAVEL_GRAVAR_HAR, VARIAVEL_REPRODUZIR_HAR
+from scrapers.telemetria import em_fonte, medir, FONTE_GERAL
+from scrapers.time_ticket_scraper import extrair_timeticket, extrair_timeticket_async
+from scrapers.ticket_sports_scraper import extrair_ticket_sports, extrair_ticket_sports_async
+from scrapers.sympla_scraper import extrair_sympla, extrair_sympla_async
+from scrapers.even3_scraper import extrair_even3, extrair_even3_async
+from scrapers.doity_scraper import extrair_doity, extrair_doity_async
+from scrapers.atletis_scraper import extrair_atletis, extrair_atletis_async
+from scrapers.central_corrida_scraper import extrair_central_corrida, extrair_central_corrida_async
+from scrapers.minhas_inscricoes_scraper import extrair_minhas_inscricoes, extrair_minhas_inscricoes_async
+from scrapers.ativo_scraper import extrair_ativo, extrair_ativo_async
+from scrapers.corridao_scraper import extrair_corridao, extrair_corridao_async
+from scrapers.youmovin_scraper import extrair_youmovin, extrair_youmovin_async
+from scrapers.cronoschip_scraper import extrair_cronoschip, extrair_cronoschip_async
+from scrapers.brasilcorrida_scraper import extrair_brasilcorrida, extrair_brasilcorrida_async
+from scrapers.vemcorrer_scraper import extrair_vemcorrer, extrair_vemcorrer_async
+from scrapers.sporttimer_scraper import extrair_sporttimer, extrair_sporttimer_async
+from scrapers.oxyscrono_scraper import extrair_oxyscrono, extrair_oxyscrono_async
+from scrapers.liverun_scraper import extrair_liverun, extrair_liverun_async
+from scrapers.trackfield_scraper import extrair_trackfield, extrair_trackfield_async
 
 def validar_ambiente():
     """Verifica ambiente e cria diretórios necessários"""
@@ -35,8 +53,11 @@ def validar_ambiente():
         print("❌ Playwright não encontrado. Execute: pip install playwright")
         sys.exit(1)
 
-def consolidar_eventos_globais(*args_eventos):
-    """Consolida eventos de todas as fontes removendo duplicatas"""
+def consolidar_eventos_globais(*args_eventos, fundir_duplicatas=True):
+    """
+    Consolida eventos de todas as fontes removendo duplicatas: as idênticas (mesmo hash) e,
+    com `fundir_duplicatas`, o mesmo evento publicado em várias fontes (ver duplicatas.py)
+    """
     todos_eventos = []
     for eventos in args_eventos:
         if eventos:
@@ -50,6 +71,8 @@ def consolidar_eventos_globais(*args_eventos):
             eventos_unicos[hash_evento] = evento
     
     eventos_finais = list(eventos_unicos.values())
+    if fundir_duplicatas:
+        eventos_finais = resolver_duplicatas(eventos_finais)
     
     # Ordena por data
     def ordenar_por_data(evento):
@@ -67,7 +90,9 @@ def consolidar_eventos_globais(*args_eventos):
 def executar_fonte(nome, funcao_extrair):
     """Executa uma fonte de scraping"""
     try:
-        eventos = funcao_extrair()
+        with em_fonte(nome) as estatisticas:
+            eventos = funcao_extrair()
+        estatisticas.eventos = len(eventos or [])
         if eventos:
             print(f"✅ {nome}: {len(eventos)} eventos")
             return eventos
@@ -76,46 +101,64 @@ def executar_fonte(nome, funcao_extrair):
             return []
     except Exception as e:
         print(f"❌ {nome}: Falhou")
+        estatisticas.erro = f"{type(e).__name__}: {str(e)[:80]}"
         return []
 
-def executar_scraping_completo():
-    """Executa scraping de todas as fontes"""
-    print("🚀 Iniciando coleta de 19 fontes...")
-    
+def executar_scraping_completo(workers=1, motor="async", limite_por_host=LIMITE_POR_HOST_PADRAO,
+                               timeout_fonte=TIMEOUT_FONTE_PADRAO):
+    """Executa scraping de todas as fontes (motor assíncrono ou processos isolados)"""
     fontes = [
-        ("TimeTicket", extrair_timeticket),
-        ("TicketSports", extrair_ticket_sports),
-        ("Sympla", extrair_sympla),
-        ("Even3", extrair_even3),
-        ("Doity", extrair_doity),
-        ("Atletis", extrair_atletis),
-        ("Central Corrida", extrair_central_corrida),
-        ("Minhas Inscrições", extrair_minhas_inscricoes),
-        ("Ativo.com", extrair_ativo),
-        ("Corridão.com", extrair_corridao),
-        ("YouMovin.com", extrair_youmovin),
-        ("Cronoschip.com", extrair_cronoschip),
-        ("BrasilCorrida.com", extrair_brasilcorrida),
-        ("VemCorrer.com", extrair_vemcorrer),
-        ("SportTimer.com", extrair_sporttimer),
-        ("OxyScrono.com", extrair_oxyscrono),
-        ("LIVE! Run", extrair_liverun),
-        ("Track&Field", extrair_trackfield)
+        ("TimeTicket", extrair_timeticket, extrair_timeticket_async),
+        ("TicketSports", extrair_ticket_sports, extrair_ticket_sports_async),
+        ("Sympla", extrair_sympla, extrair_sympla_async),
+        ("Even3", extrair_even3, extrair_even3_async),
+        ("Doity", extrair_doity, extrair_doity_async),
+        ("Atletis", extrair_atletis, extrair_atletis_async),
+        ("Central Corrida", extrair_central_corrida, extrair_central_corrida_async),
+        ("Minhas Inscrições", extrair_minhas_inscricoes, extrair_minhas_inscricoes_async),
+        ("Ativo.com", extrair_ativo, extrair_ativo_async),
+        ("Corridão.com", extrair_corridao, extrair_corridao_async),
+        ("YouMovin.com", extrair_youmovin, extrair_youmovin_async),
+        ("Cronoschip.com", extrair_cronoschip, extrair_cronoschip_async),
+        ("BrasilCorrida.com", extrair_brasilcorrida, extrair_brasilcorrida_async),
+        ("VemCorrer.com", extrair_vemcorrer, extrair_vemcorrer_async),
+        ("SportTimer.com", extrair_sporttimer, extrair_sporttimer_async),
+        ("OxyScrono.com", extrair_oxyscrono, extrair_oxyscrono_async),
+        ("LIVE! Run", extrair_liverun, extrair_liverun_async),
+        ("Track&Field", extrair_trackfield, extrair_trackfield_async)
     ]
     
     todos_eventos = []
     sucessos = 0
     
-    for nome, funcao in fontes:
-        eventos = executar_fonte(nome, funcao)
-        if eventos:
+    if motor == "processos":
+        print(f"🚀 Iniciando coleta de {len(fontes)} fontes em {workers} processos...")
+        resultados = executar_fontes_em_paralelo(
+            [(nome, funcao) for nome, funcao, _ in fontes],
+            workers=workers, timeout_fonte=timeout_fonte
+        )
+    else:
+        print(f"🚀 Iniciando coleta de {len(fontes)} fontes (concorrência {workers})...")
+        # Um único loop e um único Chromium, com um contexto isolado por fonte
+        resultados = executar_fontes(
+            [(nome, funcao_async) for nome, _, funcao_async in fontes],
+            concorrencia=workers, limite_por_host=limite_por_host, timeout_fonte=timeout_fonte
+        )
+    
+    for nome, eventos, erro in resultados:
+        if erro:
+            print(f"❌ {nome}: Falhou ({erro})")
+        elif eventos:
+            print(f"✅ {nome}: {len(eventos)} eventos")
             todos_eventos.extend(eventos)
             sucessos += 1
+        else:
+            print(f"⚠️ {nome}: 0 eventos")
     
     return todos_eventos, sucessos, len(fontes)
 
-def exibir_relatorio_final(eventos, sucessos, total_fontes, tempo):
-    """Exibe relatório final consolidado"""
+def exibir_relatorio_final(eventos, sucessos, total_fontes, tempo, relatorio=None):
+    """Exibe relatório final consolidado (com `relatorio`, também o tempo por fonte e por fase)"""
     print(f"\n📊 RELATÓRIO FINAL:")
     
     # Por fonte
@@ -127,14 +170,150 @@ def exibir_relatorio_final(eventos, sucessos, total_fontes, tempo):
     for fonte, count in sorted(fontes_count.items()):
         print(f"   {fonte}: {count}")
     
+    if relatorio:
+        imprimir_detalhamento(relatorio)
+    
     print(f"\n🏆 Total: {len(eventos)} eventos únicos")
     print(f"⏱️ Tempo: {tempo:.1f}s | Taxa: {sucessos}/{total_fontes}")
 
+def executar_historico(args):
+    """Subcomando historico: importação, catálogo em um momento, histórico de eventos ou execuções"""
+    with HistoricoEventos() as historico:
+        if args.importar:
+            print(f"📥 {historico.importar_backups_csv(args.importar)} cópias antigas importadas")
+        if args.importar_snapshots:
+            print(f"📥 {historico.importar_snapshots()} snapshots importados")
+        if args.momento:
+            estado = historico.estado_em(args.momento.isoformat(timespec="seconds"))
+            por_fonte = {}
+            for linha in estado.values():
+                por_fonte[linha["Fonte"]] = por_fonte.get(linha["Fonte"], 0) + 1
+            print(f"🗂️ Catálogo em {args.momento:%d/%m/%Y %H:%M:%S}: {len(estado)} eventos")
+            for fonte, total in sorted(por_fonte.items(), key=lambda x: -x[1]):
+                print(f"   {fonte}: {total}")
+        if args.evento:
+            identidades = historico.encontrar(args.evento)
+            if not identidades:
+                print(f"🔍 Nenhum evento com '{args.evento}' no histórico")
+            for identidade in identidades:
+                print(f"\n📌 {identidade}")
+                for entrada in historico.historico_evento(identidade):
+                    print(f"   {entrada['momento']}  {entrada['tipo']:<10} {entrada['Título'][:50]} | "
+                          f"{entrada['Data']} | {entrada['Local']}  ({entrada['origem']})")
+        if not (args.importar or args.importar_snapshots or args.momento or args.evento):
+            for execucao in historico.execucoes()[-20:]:
+                print(f"   {execucao['momento']}  {execucao['origem']:<40} +{execucao['inseridos']} "
+                      f"~{execucao['atualizados']} -{execucao['removidos']} ={execucao['inalterados']}")
+
+def executar_consulta(args):
+    """Subcomando consultar: uma página de resultados e o tempo da consulta"""
+    inicio = time.perf_counter()
+    resultado = consultar(uf=args.uf, cidade=args.cidade, fonte=args.fonte, de=args.de, ate=args.ate,
+                          dias=args.dias, pagina=args.pagina, por_pagina=args.por_pagina,
+                          armazenamento=args.armazenamento)
+    decorrido = (time.perf_counter() - inicio) * 1000
+    for evento in resultado.eventos:
+        print(f"   {evento['Data']}  {evento['Título'][:55]:<55} {evento['Local'][:30]:<30} {evento['Fonte']}")
+    print(f"\n🔎 {resultado.total} eventos | página {resultado.pagina} de {resultado.paginas} | {decorrido:.1f} ms")
+
+def executar_duplicatas(args):
+    """Subcomando duplicatas: grupos do mesmo evento entre fontes nos eventos salvos"""
+    with abrir_armazenamento(args.armazenamento) as banco:
+        eventos = [{"titulo": l["Título"], "data": l["Data"], "local": l["Local"], "link": l["Link"],
+                    "fonte": l["Fonte"], "hash": l["Hash"]} for l in banco.linhas()]
+    inicio = time.perf_counter()
+    grupos = agrupar_duplicatas(eventos)
+    decorrido = (time.perf_counter() - inicio) * 1000
+    for membros in grupos[:args.limite]:
+        print()
+        for posicao in membros:
+            evento = eventos[posicao]
+            print(f"   {evento['data']}  {evento['titulo'][:50]:<50} {evento['local'][:28]:<28} {evento['fonte']}")
+    print(f"\n🔗 {len(grupos)} grupos de duplicatas em {len(eventos)} eventos ({decorrido:.0f} ms)")
+
 def main():
     parser = argparse.ArgumentParser(description="Scraper multi-plataforma de eventos de corrida")
     
-    parser.add_argument("--limpar", action="store_true", help="Limpa CSV antes")
+    parser.add_argument("--limpar", action="store_true", help="Limpa os eventos salvos antes")
     parser.add_argument("--backup", action="store_true", help="Cria backup antes")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Número de fontes executadas ao mesmo tempo")
+    parser.add_argument("--motor", choices=["async", "processos"], default="async",
+                        help="async: corrotinas em um único Chromium | processos: um processo isolado por fonte")
+    parser.add_argument("--limite-por-host", type=int, default=LIMITE_POR_HOST_PADRAO,
+                        help="Navegações simultâneas por host no motor async")
+    parser.add_argument("--timeout-fonte", type=float, default=TIMEOUT_FONTE_PADRAO,
+                        help="Tempo máximo em segundos por fonte")
+    parser.add_argument("--sem-http", action="store_true",
+                        help="Desliga o modo HTTP (sem navegador) e usa o Playwright em todas as fontes")
+    parser.add_argument("--refresh-details", action="store_true",
+                        help="Ignora o cache de páginas de detalhe e busca todas de novo")
+    har = parser.add_mutually_exclusive_group()
+    har.add_argument("--record-har", metavar="DIR",
+                     help="Grava o tráfego do navegador de cada fonte em DIR/<fonte>/*.har (desliga o modo HTTP)")
+    har.add_argument("--replay-har", metavar="DIR",
+                     help="Serve as requisições a partir dos HAR gravados em DIR, sem acessar a rede "
+                          "(não grava nada em data/)")
+    parser.add_argument("--armazenamento", choices=list(ARMAZENAMENTOS), default=None,
+                        help="Onde gravar os eventos (padrão: sqlite, com o CSV mantido como exportação)")
+    parser.add_argument("--manter-duplicatas", action="store_true",
+                        help="Não funde o mesmo evento publicado em fontes diferentes "
+                             "(com --armazenamento csv nunca funde)")
+    parser.add_argument("--prometheus", default=PROMETHEUS_PATH, metavar="CAMINHO",
+                        help="Textfile do Prometheus com o tempo por fonte e por fase ('' para não gravar)")
+    parser.add_argument("--exportar-csv", nargs="?", const=CSV_PATH, metavar="CAMINHO",
+                        help="Reescreve o CSV a partir do banco SQLite e sai")
+    
+    # Comandos de manutenção (sem scraping)
+    comandos = parser.add_subparsers(dest="comando")
+    restore = comandos.add_parser("restore", help="Restaura os dados de um backup")
+    restore.add_argument("--at", dest="momento", type=interpretar_momento, default=None,
+                         help="Último backup até este momento (ex.: 2025-08-07T14:43); padrão: o mais recente")
+    restore.add_argument("--destino", default=None,
+                         help="Grava os arquivos restaurados neste diretório em vez de sobrescrever os dados")
+    lista_backups = comandos.add_parser("backups", help="Lista os backups com tamanhos e razão de compressão")
+    lista_backups.add_argument("--podar", action="store_true",
+                               help="Antes de listar, remove os backups fora da retenção por gerações")
+    for geracao, quantidade in RETENCAO_PADRAO.items():
+        lista_backups.add_argument(f"--{geracao}", type=int, default=quantidade,
+                                   help=f"Backups {geracao} mantidos ao podar (padrão: {quantidade})")
+    importar = comandos.add_parser("importar-backups",
+                                   help="Registra cópias antigas corridas_backup_*.csv no armazenamento de backups")
+    importar.add_argument("diretorio", help="Diretório com as cópias antigas")
+    importar.add_argument("--remover", action="store_true", help="Apaga cada cópia depois de registrada")
+    
+    historico = comandos.add_parser("historico", help="Histórico de mudanças do catálogo")
+    historico.add_argument("--evento", metavar="TEXTO",
+                           help="Mostra o histórico dos eventos cujo título ou link contém o texto")
+    historico.add_argument("--em", dest="momento", type=interpretar_momento, default=None,
+                           help="Mostra o catálogo como estava neste momento (total por fonte)")
+    historico.add_argument("--importar", metavar="DIR",
+                           help="Semeia o histórico com as cópias antigas corridas_backup_*.csv do diretório")
+    historico.add_argument("--importar-snapshots", action="store_true",
+                           help="Semeia o histórico com os snapshots do armazenamento de backups")
+    
+    mudancas = comandos.add_parser("mudancas", help="Imprime (JSON por linha) as mudanças entre execuções")
+    mudancas.add_argument("--desde", type=int, default=0, help="Só mudanças com seq maior que este")
+    mudancas.add_argument("--cursor", metavar="ARQUIVO",
+                          help="Lê as mudanças desde o cursor salvo neste arquivo e o avança")
+    
+    consulta = comandos.add_parser("consultar", help="Consulta os eventos salvos por UF, cidade, fonte e datas")
+    consulta.add_argument("--uf", help="Sigla do estado (ex.: MG)")
+    consulta.add_argument("--cidade")
+    consulta.add_argument("--fonte", help="Nome da fonte (prefixo: TicketSports casa TicketSports-Geral)")
+    consulta.add_argument("--de", help="Data inicial (dd/mm/aaaa ou aaaa-mm-dd)")
+    consulta.add_argument("--ate", help="Data final, inclusiva")
+    consulta.add_argument("--dias", type=int, help="Próximos N dias (a partir de hoje ou de --de)")
+    consulta.add_argument("--pagina", type=int, default=1)
+    consulta.add_argument("--por-pagina", type=int, default=POR_PAGINA_PADRAO)
+    
+    busca = comandos.add_parser("buscar", help="Busca textual por título e local (ex.: meia maratona)")
+    busca.add_argument("texto", nargs="+")
+    busca.add_argument("--limite", type=int, default=LIMITE_PADRAO)
+    busca.add_argument("--reconstruir", action="store_true", help="Remonta o índice de busca do zero")
+    
+    duplicatas = comandos.add_parser("duplicatas", help="Lista o mesmo evento publicado em fontes diferentes")
+    duplicatas.add_argument("--limite", type=int, default=50, help="Grupos exibidos")
     
     # Fontes individuais
     parser.add_argument("--timeticket-only", action="store_true")
@@ -158,14 +337,87 @@ def main():
     
     args = parser.parse_args()
     
+    if args.comando == "restore":
+        restaurar(args.momento, args.destino)
+        return
+    if args.comando == "backups":
+        if args.podar:
+            aplicar_retencao({geracao: getattr(args, geracao) for geracao in RETENCAO_PADRAO})
+        listar_backups()
+        return
+    if args.comando == "historico":
+        executar_historico(args)
+        return
+    if args.comando == "mudancas":
+        leitor = LeitorMudancas(args.cursor) if args.cursor else None
+        ultimo = None
+        try:
+            for registro in (leitor.pendentes() if leitor else ler_mudancas(args.desde)):
+                print(json.dumps(registro, ensure_ascii=False))
+                ultimo = registro["seq"]
+        except CursorPodado as e:
+            print(f"⚠️ {e}", file=sys.stderr)
+            sys.exit(1)
+        if leitor and ultimo is not None:
+            leitor.confirmar(ultimo)
+        return
+    if args.comando == "consultar":
+        executar_consulta(args)
+        return
+    if args.comando == "buscar":
+        with abrir_armazenamento("sqlite") as banco:
+            indice = IndiceBusca(banco.conexao)
+            if args.reconstruir:
+                print(f"🔤 Índice de busca remontado: {indice.reconstruir()} eventos")
+            inicio = time.perf_counter()
+            resultados = indice.buscar(" ".join(args.texto), args.limite)
+            decorrido = (time.perf_counter() - inicio) * 1000
+        for r in resultados:
+            print(f"   {r['pontos']:>6.2f}  {r['data']}  {r['titulo'][:55]:<55} {r['local'][:28]:<28} {r['fonte']}")
+        print(f"\n🔎 {len(resultados)} resultados em {decorrido:.1f} ms")
+        return
+    if args.comando == "duplicatas":
+        executar_duplicatas(args)
+        return
+    if args.comando == "importar-backups":
+        importados = importar_backups_antigos(args.diretorio, args.remover)
+        print(f"📥 {importados} backups antigos registrados")
+        return
+    
+    if args.exportar_csv:
+        with abrir_armazenamento("sqlite") as banco:
+            total = banco.exportar_csv(args.exportar_csv)
+        print(f"📤 {total} eventos exportados para {args.exportar_csv}")
+        return
+    
     validar_ambiente()
     
-    if args.backup:
+    if args.sem_http:
+        # Variável de ambiente para valer também nos processos filhos (--motor processos)
+        os.environ[VARIAVEL_DESLIGAR] = "1"
+    if args.refresh_details:
+        os.environ[VARIAVEL_ATUALIZAR] = "1"
+    if args.record_har or args.replay_har:
+        # O cache de detalhes fica de fora para que gravação e reprodução passem pelas mesmas páginas
+        os.environ[VARIAVEL_ATUALIZAR] = "1"
+        if args.record_har:
+            os.environ[VARIAVEL_GRAVAR_HAR] = os.path.abspath(args.record_har)
+            print(f"📼 Gravando o tráfego das fontes em {args.record_har}")
+        else:
+            os.environ[VARIAVEL_REPRODUZIR_HAR] = os.path.abspath(args.replay_har)
+            print(f"📼 Reproduzindo as fontes a partir de {args.replay_har} (sem rede)")
+    
+    # A reprodução serve HAR antigos: nada do que ela coleta pode ir para os dados de produção em data/
+    reproducao = bool(args.replay_har)
+    if reproducao and (args.backup or args.limpar):
+        print("📼 Reprodução de HAR: --backup e --limpar ignorados")
+    
+    if args.backup and not reproducao:
         criar_backup()
     
-    if args.limpar:
-        limpar_csv()
-        print("🧹 CSV limpo")
+    if args.limpar and not reproducao:
+        limpar_eventos(args.armazenamento)
+        print("🧹 Eventos limpos")
     
     start_time = datetime.now()
     
@@ -207,18 +459,35 @@ def main():
         total_fontes = 1
     else:
         # Execução completa
-        todos_eventos, sucessos, total_fontes = executar_scraping_completo()
-        eventos_consolidados = consolidar_eventos_globais(*[todos_eventos])
+        todos_eventos, sucessos, total_fontes = executar_scraping_completo(
+            workers=args.workers, motor=args.motor,
+            limite_por_host=args.limite_por_host, timeout_fonte=args.timeout_fonte
+        )
+        # O CSV só de acréscimo não guarda os links das outras fontes: lá cada publicação continua uma linha
+        fundir = not args.manter_duplicatas and tipo_armazenamento(args.armazenamento) == "sqlite"
+        with medir("consolidacao", fonte=FONTE_GERAL):
+            eventos_consolidados = consolidar_eventos_globais(*[todos_eventos], fundir_duplicatas=fundir)
+    
+    if eventos_consolidados and not reproducao:
+        with medir("persistencia", fonte=FONTE_GERAL):
+            eventos_salvos = salvar_eventos(eventos_consolidados, args.armazenamento)
+            if tipo_armazenamento(args.armazenamento) == "sqlite":
+                gravar_mudancas(registrar_execucao(eventos_consolidados))
+    tempo_total = (datetime.now() - start_time).total_seconds()
+    relatorio = montar_relatorio(start_time, tempo_total, eventos_consolidados, sucessos, total_fontes)
     
     if eventos_consolidados:
-        eventos_salvos = salvar_eventos(eventos_consolidados)
-        tempo_total = (datetime.now() - start_time).total_seconds()
-        
-        exibir_relatorio_final(eventos_consolidados, sucessos, total_fontes, tempo_total)
-        print(f"💾 {eventos_salvos} novos eventos salvos")
-        print(f"📁 {os.path.abspath('data/corridas.csv')}")
+        exibir_relatorio_final(eventos_consolidados, sucessos, total_fontes, tempo_total, relatorio)
+        if reproducao:
+            print("📼 Reprodução de HAR: eventos, histórico e mudanças não gravados")
+        else:
+            print(f"💾 {eventos_salvos} novos eventos salvos")
+            print(f"📁 {os.path.abspath('data/corridas.csv')}")
     else:
+        imprimir_detalhamento(relatorio)
         print("💀 Nenhum evento coletado")
+    if not reproducao:
+        gravar_relatorios(relatorio, args.prometheus or None)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,60 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+from scrapers.navegador import navegador_compartilhado, LIMITE_POR_HOST_PADRAO
+from scrapers.telemetria import em_fonte
+from paralelo import TIMEOUT_FONTE_PADRAO  # mesmo limite nos dois motores
+
+# Configurações
+CONCORRENCIA_PADRAO = 4
+
+FonteAsync = Tuple[str, Callable[[], Awaitable[list]]]
+Resultado = Tuple[str, list, Optional[str]]
+
+async def _executar_fonte(nome: str, funcao: Callable[[], Awaitable[list]], semaforo: asyncio.Semaphore,
+                          timeout_fonte: float) -> Resultado:
+    """Roda uma fonte sob o limite global, isolando falhas e timeouts (fases medidas na telemetria)"""
+    async with semaforo:
+        inicio = time.monotonic()
+        print(f"▶️ {nome}: iniciado")
+        with em_fonte(nome) as estatisticas:
+            try:
+                eventos = await asyncio.wait_for(funcao(), timeout=timeout_fonte)
+                resultado = (nome, eventos or [], None)
+            except asyncio.TimeoutError:
+                resultado = (nome, [], f"timeout após {timeout_fonte:.0f}s")
+            except Exception as e:
+                resultado = (nome, [], f"{type(e).__name__}: {str(e)[:80]}")
+            finally:
+                print(f"⏹️ {nome}: {time.monotonic() - inicio:.1f}s")
+        estatisticas.eventos, estatisticas.erro = len(resultado[1]), resultado[2]
+        return resultado
+
+async def executar_fontes_async(fontes: List[FonteAsync], concorrencia: int = CONCORRENCIA_PADRAO,
+                                limite_por_host: int = LIMITE_POR_HOST_PADRAO,
+                                timeout_fonte: float = TIMEOUT_FONTE_PADRAO) -> List[Resultado]:
+    """
+    Executa as fontes como corrotinas em um único loop e um único Chromium.
+    `concorrencia` limita as fontes simultâneas e `limite_por_host` as navegações por host.
+    Retorna [(nome, eventos, erro)] na mesma ordem de `fontes`
+    """
+    semaforo = asyncio.Semaphore(max(1, concorrencia))
+    async with navegador_compartilhado(limite_por_host=limite_por_host) as gerenciador:
+        resultados = await asyncio.gather(*(
+            _executar_fonte(nome, funcao, semaforo, timeout_fonte) for nome, funcao in fontes
+        ))
+        imprimir_relatorio_bloqueio(gerenciador.estatisticas_bloqueio)
+        return resultados
+
+def imprimir_relatorio_bloqueio(estatisticas_por_fonte):
+    """Resumo do bloqueio de recursos por fonte, da maior economia para a menor"""
+    if not estatisticas_por_fonte:
+        return
+    print("\n🛡️ Bloqueio de recursos por fonte:")
+    ordenadas = sorted(estatisticas_por_fonte.values(), key=lambda e: -e.bytes_economizados_estimados)
+    for estatisticas in ordenadas:
+        print(f"   {estatisticas.resumo()}")
+
+def executar_fontes(fontes: List[FonteAsync], **opcoes) -> List[Resultado]:
+    """Entrada síncrona do motor assíncrono"""
+    return asyncio.run(executar_fontes_async(fontes, **opcoes))
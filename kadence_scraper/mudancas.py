@@ -0,0 +1,151 @@
+import glob
+import json
+import os
+import re
+from typing import Dict, Iterator, List, Optional
+
+from utils import HEADERS
+
+# Configurações
+MUDANCAS_DIR = os.path.join("data", "mudancas")
+# Arquivos de mudanças mantidos (um por execução com mudanças); o histórico no SQLite guarda tudo,
+# então um consumidor parado há mais execuções que isso se ressincroniza por HistoricoEventos.estado_atual()
+MAX_ARQUIVOS_MUDANCAS = 200
+# Último seq já apagado pela poda ({"seq": N}), para quem lê os JSONL direto do repositório
+MARCA_PODA = "podado.json"
+# Tipo no histórico -> tipo no arquivo de mudanças
+TIPOS_MUDANCA = {"inserido": "novo", "atualizado": "alterado", "removido": "removido"}
+CAMPOS_EVENTO = {"Título": "titulo", "Data": "data", "Local": "local", "Link": "link", "Fonte": "fonte", "Hash": "hash"}
+
+class CursorPodado(LookupError):
+    """O cursor é anterior às mudanças apagadas pela poda: o consumidor precisa se ressincronizar"""
+
+    def __init__(self, desde: int, podado_ate: int):
+        super().__init__(f"mudanças até o seq {podado_ate} já foram podadas (cursor em {desde}); "
+                         "ressincronize pelo histórico")
+        self.desde = desde
+        self.podado_ate = podado_ate
+
+def _evento(linha: Optional[Dict]) -> Optional[Dict]:
+    return {CAMPOS_EVENTO[c]: linha[c] for c in HEADERS} if linha else None
+
+def _primeiro_seq(caminho: str) -> int:
+    return int(re.search(r"mudancas_(\d+)\.jsonl$", caminho).group(1))
+
+def arquivos_mudancas(diretorio: str = MUDANCAS_DIR) -> List[str]:
+    """Arquivos de mudanças em ordem de seq (o nome carrega o seq da primeira linha)"""
+    return sorted(glob.glob(os.path.join(diretorio, "mudancas_*.jsonl")), key=_primeiro_seq)
+
+def gravar_mudancas(resultado, diretorio: str = MUDANCAS_DIR) -> Optional[str]:
+    """
+    Grava as mudanças de uma execução do histórico (historico.ResultadoExecucao) em
+    mudancas_<seq>.jsonl: uma linha por evento novo, alterado ou removido, com seq crescente
+    (o id da entrada no histórico). Execução sem mudanças não gera arquivo
+    """
+    if not resultado or not resultado.entradas:
+        return None
+    entradas = sorted(resultado.entradas)
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, f"mudancas_{entradas[0][0]:010d}.jsonl")
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        for seq, tipo, identidade, linha, anterior in entradas:
+            registro = {
+                "seq": seq,
+                "execucao": resultado.execucao_id,
+                "momento": resultado.momento,
+                "tipo": TIPOS_MUDANCA[tipo],
+                "identidade": identidade,
+                "evento": _evento(linha),
+            }
+            if anterior:
+                registro["anterior"] = _evento(anterior)
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    os.replace(temporario, caminho)
+    podar_mudancas(diretorio)
+    contagem = {}
+    for _, tipo, *_ in entradas:
+        contagem[TIPOS_MUDANCA[tipo]] = contagem.get(TIPOS_MUDANCA[tipo], 0) + 1
+    print(f"📰 Mudanças: {os.path.basename(caminho)} "
+          f"({', '.join(f'{n} {tipo}' for tipo, n in contagem.items())})")
+    return caminho
+
+def _ultimo_seq(caminho: str) -> int:
+    with open(caminho, "r", encoding="utf-8") as f:
+        linhas = [linha for linha in f if linha.strip()]
+    return json.loads(linhas[-1])["seq"] if linhas else _primeiro_seq(caminho)
+
+def podado_ate(diretorio: str = MUDANCAS_DIR) -> int:
+    """Último seq apagado pela poda (0 se nada foi apagado)"""
+    try:
+        with open(os.path.join(diretorio, MARCA_PODA), "r", encoding="utf-8") as f:
+            return int(json.load(f).get("seq", 0))
+    except FileNotFoundError:
+        return 0
+
+def podar_mudancas(diretorio: str = MUDANCAS_DIR, manter: int = MAX_ARQUIVOS_MUDANCAS) -> int:
+    """
+    Apaga os arquivos de mudanças além dos `manter` mais recentes, registra em MARCA_PODA o
+    último seq apagado e devolve quantos arquivos saíram
+    """
+    arquivos = arquivos_mudancas(diretorio)
+    antigos = arquivos[:max(len(arquivos) - manter, 0)]
+    if not antigos:
+        return 0
+    ultimo = max(podado_ate(diretorio), _ultimo_seq(antigos[-1]))
+    marca = os.path.join(diretorio, MARCA_PODA)
+    with open(marca + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"seq": ultimo}, f)
+    os.replace(marca + ".tmp", marca)  # a marca vai antes: uma poda interrompida nunca esconde a perda
+    for caminho in antigos:
+        os.remove(caminho)
+    return len(antigos)
+
+def ler_mudancas(desde: int = 0, diretorio: str = MUDANCAS_DIR) -> Iterator[Dict]:
+    """
+    Mudanças com seq maior que `desde`, em ordem. Arquivos inteiramente anteriores
+    ao cursor nem são abertos (o seq inicial de cada um está no nome).
+    Levanta CursorPodado se parte do que vem depois de `desde` já foi apagada pela poda
+    """
+    ultimo_podado = podado_ate(diretorio)
+    if 0 < desde < ultimo_podado:
+        raise CursorPodado(desde, ultimo_podado)
+    arquivos = arquivos_mudancas(diretorio)
+    for i, caminho in enumerate(arquivos):
+        if i + 1 < len(arquivos) and _primeiro_seq(arquivos[i + 1]) <= desde + 1:
+            continue
+        with open(caminho, "r", encoding="utf-8") as f:
+            for linha in f:
+                registro = json.loads(linha)
+                if registro["seq"] > desde:
+                    yield registro
+
+class LeitorMudancas:
+    """
+    Consumidor com cursor salvo em arquivo: `pendentes()` traz só o que chegou desde a
+    última `confirmar()`, então o custo é proporcional ao número de mudanças novas
+    """
+
+    def __init__(self, caminho_cursor: str, diretorio: str = MUDANCAS_DIR):
+        self.caminho_cursor = caminho_cursor
+        self.diretorio = diretorio
+        self.cursor = self._carregar()
+
+    def _carregar(self) -> int:
+        try:
+            with open(self.caminho_cursor, "r", encoding="utf-8") as f:
+                return int(json.load(f).get("seq", 0))
+        except FileNotFoundError:
+            return 0
+
+    def pendentes(self) -> Iterator[Dict]:
+        return ler_mudancas(self.cursor, self.diretorio)
+
+    def confirmar(self, seq: int):
+        """Grava o cursor depois que o consumidor processou até `seq` (arquivo temporário + rename)"""
+        self.cursor = max(self.cursor, seq)
+        os.makedirs(os.path.dirname(self.caminho_cursor) or ".", exist_ok=True)
+        temporario = self.caminho_cursor + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"seq": self.cursor}, f)
+        os.replace(temporario, self.caminho_cursor)
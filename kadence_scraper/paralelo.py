@@ -0,0 +1,105 @@
+import multiprocessing
+import time
+from multiprocessing.connection import wait
+from typing import Callable, List, Optional, Tuple
+
+from scrapers.telemetria import telemetria, em_fonte
+
+# Configurações
+TIMEOUT_FONTE_PADRAO = 20 * 60  # segundos por fonte antes de matar o processo
+INTERVALO_VERIFICACAO = 1.0
+
+Fonte = Tuple[str, Callable[[], list]]
+Resultado = Tuple[str, list, Optional[str]]
+
+def _executar_fonte_no_processo(nome: str, funcao: Callable[[], list], conexao):
+    """Roda uma fonte dentro de um processo filho e devolve (eventos, erro, telemetria) pelo pipe"""
+    try:
+        with em_fonte(nome) as estatisticas:
+            eventos = funcao() or []
+        conexao.send((eventos, None, estatisticas.para_dict()))
+    except BaseException as e:
+        try:
+            conexao.send(([], f"{type(e).__name__}: {str(e)[:80]}", telemetria().fonte(nome).para_dict()))
+        except Exception:
+            pass
+    finally:
+        conexao.close()
+
+def _iniciar_processo(contexto, nome: str, funcao: Callable[[], list]):
+    """Inicia o processo de uma fonte e retorna (processo, conexão de leitura)"""
+    leitura, escrita = contexto.Pipe(duplex=False)
+    processo = contexto.Process(
+        target=_executar_fonte_no_processo,
+        args=(nome, funcao, escrita),
+        name=f"fonte-{nome}",
+        daemon=True
+    )
+    processo.start()
+    escrita.close()  # O pai só lê
+    return processo, leitura
+
+def _registrar_telemetria(nome: str, duracao: float, eventos: list, erro: Optional[str], dados: dict):
+    """Leva para a telemetria do pai as fases medidas no processo da fonte"""
+    estatisticas = telemetria().fonte(nome)
+    estatisticas.absorver(dados)
+    estatisticas.duracao += duracao
+    estatisticas.eventos, estatisticas.erro = len(eventos), erro
+
+def _encerrar_processo(processo):
+    """Encerra um processo travado, escalando para kill se necessário"""
+    processo.terminate()
+    processo.join(5)
+    if processo.is_alive():
+        processo.kill()
+        processo.join(5)
+
+def executar_fontes_em_paralelo(fontes: List[Fonte], workers: int = 4,
+                                timeout_fonte: float = TIMEOUT_FONTE_PADRAO) -> List[Resultado]:
+    """
+    Executa cada fonte em um processo isolado, com no máximo `workers` simultâneos.
+    Uma fonte que quebra ou estoura o timeout não afeta as demais.
+    Retorna [(nome, eventos, erro)] na mesma ordem de `fontes`
+    """
+    contexto = multiprocessing.get_context()
+    workers = max(1, workers)
+
+    pendentes = list(enumerate(fontes))
+    ativos = {}  # conexão -> (índice, nome, processo, início)
+    resultados: List[Optional[Resultado]] = [None] * len(fontes)
+
+    while pendentes or ativos:
+        # Preenche os slots livres
+        while pendentes and len(ativos) < workers:
+            indice, (nome, funcao) = pendentes.pop(0)
+            processo, leitura = _iniciar_processo(contexto, nome, funcao)
+            ativos[leitura] = (indice, nome, processo, time.monotonic())
+            print(f"▶️ {nome}: iniciado (pid {processo.pid})")
+
+        # Aguarda algum resultado, acordando periodicamente para checar timeouts
+        prontos = wait(list(ativos.keys()), timeout=INTERVALO_VERIFICACAO)
+
+        for leitura in prontos:
+            indice, nome, processo, inicio = ativos.pop(leitura)
+            try:
+                eventos, erro, dados_telemetria = leitura.recv()
+            except EOFError:
+                eventos, erro, dados_telemetria = [], "processo encerrou sem resultado", {}
+            leitura.close()
+            processo.join(5)
+            if processo.is_alive():
+                _encerrar_processo(processo)
+            resultados[indice] = (nome, eventos, erro)
+            _registrar_telemetria(nome, time.monotonic() - inicio, eventos, erro, dados_telemetria)
+
+        # Mata fontes que passaram do tempo limite
+        agora = time.monotonic()
+        for leitura, (indice, nome, processo, inicio) in list(ativos.items()):
+            if agora - inicio > timeout_fonte:
+                _encerrar_processo(processo)
+                leitura.close()
+                del ativos[leitura]
+                resultados[indice] = (nome, [], f"timeout após {timeout_fonte:.0f}s")
+                _registrar_telemetria(nome, agora - inicio, [], resultados[indice][2], {})
+
+    return [r for r in resultados if r is not None]
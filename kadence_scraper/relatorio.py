@@ -0,0 +1,139 @@
+import glob
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from scrapers.telemetria import telemetria, FONTE_GERAL
+
+# Configurações
+RELATORIOS_DIR = os.path.join("data", "relatorios")
+MAX_RELATORIOS = 30  # relatórios JSON mantidos; a cada gravação os mais antigos são apagados
+PROMETHEUS_PATH = os.path.join("data", "metricas", "kadence_scraper.prom")  # diretório do textfile collector
+PREFIXO_METRICAS = "kadence_scraper"
+FASES_POR_FONTE = 4  # fases mostradas por fonte no detalhamento
+
+def montar_relatorio(inicio: datetime, duracao: float, eventos: List[Dict], sucessos: int,
+                     total_fontes: int) -> Dict:
+    """Relatório da execução: totais e, por fonte, duração, eventos, tentativas e tempo por fase"""
+    por_fonte = telemetria().para_dict()
+    geral = por_fonte.pop(FONTE_GERAL, None)
+    fases = {}
+    for dados in por_fonte.values():
+        for fase, valores in dados["fases"].items():
+            fases[fase] = round(fases.get(fase, 0.0) + valores["segundos"], 4)
+    return {
+        "inicio": inicio.isoformat(timespec="seconds"),
+        "duracao": round(duracao, 4),
+        "eventos": len(eventos),
+        "fontes_ok": sucessos,
+        "fontes_total": total_fontes,
+        "retentativas": sum(d["retentativas"] for d in por_fonte.values()),
+        "fases": dict(sorted(fases.items(), key=lambda item: -item[1])),
+        "fontes": dict(sorted(por_fonte.items(), key=lambda item: -item[1]["duracao"])),
+        "geral": geral["fases"] if geral else {},
+    }
+
+def gravar_relatorio_json(relatorio: Dict, diretorio: str = RELATORIOS_DIR) -> str:
+    """Grava execucao_<início>.json e devolve o caminho"""
+    os.makedirs(diretorio, exist_ok=True)
+    momento = datetime.fromisoformat(relatorio["inicio"]).strftime("%Y%m%d_%H%M%S")
+    caminho = os.path.join(diretorio, f"execucao_{momento}.json")
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+    podar_relatorios(diretorio)
+    return caminho
+
+def podar_relatorios(diretorio: str = RELATORIOS_DIR, manter: int = MAX_RELATORIOS) -> int:
+    """Apaga os execucao_*.json além dos `manter` mais recentes e devolve quantos saíram"""
+    arquivos = sorted(glob.glob(os.path.join(diretorio, "execucao_*.json")))  # o nome tem o início da execução
+    antigos = arquivos[:max(len(arquivos) - manter, 0)]
+    for caminho in antigos:
+        os.remove(caminho)
+    return len(antigos)
+
+def _rotulos(**rotulos: str) -> str:
+    pares = []
+    for nome, valor in rotulos.items():
+        valor = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+        pares.append(f'{nome}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+def formatar_prometheus(relatorio: Dict) -> str:
+    """Métricas no formato de texto do Prometheus (uma família por bloco HELP/TYPE)"""
+    p = PREFIXO_METRICAS
+    familias = [
+        (f"{p}_execucao_duracao_segundos", "gauge", "Duração total da última execução",
+         [("", relatorio["duracao"])]),
+        (f"{p}_execucao_eventos", "gauge", "Eventos únicos da última execução", [("", relatorio["eventos"])]),
+        (f"{p}_execucao_fim_timestamp_segundos", "gauge", "Fim da última execução (epoch)",
+         [("", round(datetime.fromisoformat(relatorio["inicio"]).timestamp() + relatorio["duracao"], 3))]),
+        (f"{p}_fonte_duracao_segundos", "gauge", "Duração de cada fonte",
+         [(_rotulos(fonte=f), d["duracao"]) for f, d in relatorio["fontes"].items()]),
+        (f"{p}_fonte_eventos", "gauge", "Eventos coletados por fonte",
+         [(_rotulos(fonte=f), d["eventos"]) for f, d in relatorio["fontes"].items()]),
+        (f"{p}_fonte_tentativas", "gauge", "Tentativas (sessões de navegador) por fonte",
+         [(_rotulos(fonte=f), d["tentativas"]) for f, d in relatorio["fontes"].items()]),
+        (f"{p}_fonte_sucesso", "gauge", "1 se a fonte terminou sem erro",
+         [(_rotulos(fonte=f), 0 if d["erro"] else 1) for f, d in relatorio["fontes"].items()]),
+        (f"{p}_fase_segundos", "gauge", "Tempo próprio de cada fase por fonte (sem as fases internas)",
+         [(_rotulos(fonte=f, fase=fase), v["segundos"])
+          for f, d in relatorio["fontes"].items() for fase, v in d["fases"].items()]
+         + [(_rotulos(fonte=FONTE_GERAL, fase=fase), v["segundos"]) for fase, v in relatorio["geral"].items()]),
+        (f"{p}_fase_chamadas", "gauge", "Chamadas de cada fase por fonte",
+         [(_rotulos(fonte=f, fase=fase), v["chamadas"])
+          for f, d in relatorio["fontes"].items() for fase, v in d["fases"].items()]
+         + [(_rotulos(fonte=FONTE_GERAL, fase=fase), v["chamadas"]) for fase, v in relatorio["geral"].items()]),
+    ]
+    linhas = []
+    for nome, tipo, ajuda, amostras in familias:
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+        linhas.extend(f"{nome}{rotulos} {valor}" for rotulos, valor in amostras)
+    return "\n".join(linhas) + "\n"
+
+def gravar_prometheus(relatorio: Dict, caminho: str = PROMETHEUS_PATH) -> str:
+    """Grava o textfile de uma vez (o collector nunca lê um arquivo pela metade)"""
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(formatar_prometheus(relatorio))
+    os.replace(temporario, caminho)
+    return caminho
+
+def imprimir_detalhamento(relatorio: Dict, fases_por_fonte: int = FASES_POR_FONTE):
+    """Fontes da mais lenta para a mais rápida, com as fases que mais pesaram em cada uma"""
+    if not relatorio["fontes"]:
+        return
+    print("\n⏱️ Tempo por fonte (fases: tempo próprio, chamadas):")
+    for nome, dados in relatorio["fontes"].items():
+        extras = []
+        if dados["retentativas"]:
+            extras.append(f"🔁 {dados['retentativas']} retentativas")
+        if dados["erro"]:
+            extras.append(f"❌ {dados['erro'][:40]}")
+        print(f"   {nome:<20} {dados['duracao']:>7.1f}s  {dados['eventos']:>5} eventos  {'  '.join(extras)}")
+        fases = sorted(dados["fases"].items(), key=lambda item: -item[1]["segundos"])
+        partes = [f"{fase} {v['segundos']:.1f}s ×{v['chamadas']}" for fase, v in fases[:fases_por_fonte]]
+        if dados["nao_medido"] >= 0.05:
+            partes.append(f"sem fase {dados['nao_medido']:.1f}s")
+        if partes:
+            print(f"      {' | '.join(partes)}")
+    if relatorio["fases"]:
+        total = sum(relatorio["fases"].values()) or 1.0
+        print("\n🔥 Fases somadas em todas as fontes:")
+        for fase, segundos in relatorio["fases"].items():
+            print(f"   {fase:<12} {segundos:>8.1f}s  {segundos / total:>6.1%}")
+    if relatorio["geral"]:
+        print(f"   {FONTE_GERAL}: " + " | ".join(f"{fase} {v['segundos']:.2f}s" for fase, v in relatorio["geral"].items()))
+
+def gravar_relatorios(relatorio: Dict, prometheus: Optional[str] = PROMETHEUS_PATH):
+    """JSON da execução e textfile do Prometheus; falha ao gravar só avisa"""
+    try:
+        print(f"🧾 Relatório: {gravar_relatorio_json(relatorio)}")
+        if prometheus:
+            print(f"📈 Métricas: {gravar_prometheus(relatorio, prometheus)}")
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar o relatório: {str(e)[:80]}")
@@ -1,8 +1,12 @@
-import time
 import hashlib
 import re
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import contar_elementos, aguardar_rede_ociosa, aguardar_carregamento, aguardar_mudanca_contagem
+from .datas import interpretar_datas
+from .telemetria import cronometrar
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,43 +21,8 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para não quebrar CSV
     return texto
 
-def processar_data_ativo(dia_str, mes_str):
-    """Processa data do formato Ativo: dia='17', mês='Ago' -> '17/08/2025'"""
-    if not dia_str or not mes_str:
-        return None, None
-    
-    # Mapeia meses em português (abreviado)
-    meses = {
-        'jan': '01', 'fev': '02', 'mar': '03', 'abr': '04',
-        'mai': '05', 'jun': '06', 'jul': '07', 'ago': '08',
-        'set': '09', 'out': '10', 'nov': '11', 'dez': '12'
-    }
-    
-    try:
-        dia = dia_str.strip().zfill(2)
-        mes_texto = mes_str.strip().lower()
-        mes_num = meses.get(mes_texto, '01')
-        
-        # Assume ano atual ou próximo
-        ano_atual = datetime.now().year
-        data_str_formatada = f"{dia}/{mes_num}/{ano_atual}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            # Se a data já passou, assume ano seguinte
-            if data_obj < datetime.now():
-                data_obj = datetime.strptime(f"{dia}/{mes_num}/{ano_atual + 1}", '%d/%m/%Y')
-                data_str_formatada = f"{dia}/{mes_num}/{ano_atual + 1}"
-            
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
-    except:
-        pass
-    
-    return None, f"{dia_str}/{mes_str}"
-
-def carregar_todos_eventos_ativo(page, max_cliques=10):
+@cronometrar("paginacao")
+async def carregar_todos_eventos_ativo(page, max_cliques=10):
     """Carrega todos os eventos clicando em 'Ver mais'"""
     print("🔄 Carregando todos os eventos...")
     
@@ -64,7 +33,7 @@ def carregar_todos_eventos_ativo(page, max_cliques=10):
     while cliques_realizados < max_cliques and cliques_sem_efeito < max_cliques_sem_efeito:
         try:
             # Conta eventos antes do clique
-            cards_antes = len(page.query_selector_all("article.card.card-event"))
+            cards_antes = await contar_elementos(page, "article.card.card-event")
             
             # Procura pelo botão "Ver mais"
             seletores_ver_mais = [
@@ -76,8 +45,8 @@ def carregar_todos_eventos_ativo(page, max_cliques=10):
             botao_ver_mais = None
             for seletor in seletores_ver_mais:
                 try:
-                    botao_ver_mais = page.query_selector(seletor)
-                    if botao_ver_mais and botao_ver_mais.is_visible():
+                    botao_ver_mais = await page.query_selector(seletor)
+                    if botao_ver_mais and await botao_ver_mais.is_visible():
                         break
                 except:
                     continue
@@ -88,14 +57,13 @@ def carregar_todos_eventos_ativo(page, max_cliques=10):
             
             # Scroll para o botão e clica
             try:
-                botao_ver_mais.scroll_into_view_if_needed()
-                time.sleep(1)
-                botao_ver_mais.click()
+                await botao_ver_mais.scroll_into_view_if_needed()
+                await botao_ver_mais.click()
                 cliques_realizados += 1
                 print(f"   👉 Clique {cliques_realizados} - Aguardando novos eventos...")
                 
-                # Aguarda carregar novos eventos (AJAX)
-                time.sleep(4)
+                # Aguarda os novos cards do AJAX (no máximo 8s)
+                cards_depois = await aguardar_mudanca_contagem(page, "article.card.card-event", cards_antes, timeout=8)
                 
             except Exception as e:
                 print(f"   ⚠️ Erro ao clicar 'Ver mais': {str(e)[:50]}...")
@@ -103,7 +71,6 @@ def carregar_todos_eventos_ativo(page, max_cliques=10):
                 continue
             
             # Verifica se novos eventos foram adicionados
-            cards_depois = len(page.query_selector_all("article.card.card-event"))
             
             if cards_depois > cards_antes:
                 cliques_sem_efeito = 0
@@ -115,41 +82,50 @@ def carregar_todos_eventos_ativo(page, max_cliques=10):
         except Exception as e:
             print(f"   ⚠️ Erro ao carregar mais eventos: {str(e)[:50]}...")
             cliques_sem_efeito += 1
-            time.sleep(2)
+            await aguardar_rede_ociosa(page, timeout=2)
     
-    total_final = len(page.query_selector_all("article.card.card-event"))
+    total_final = await contar_elementos(page, "article.card.card-event")
     print(f"🏁 Carregamento finalizado: {total_final} eventos | {cliques_realizados} cliques realizados")
     return total_final
 
-def coletar_eventos_ativo(page):
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_ATIVO = "article.card.card-event"
+CAMPOS_CARD_ATIVO = {
+    "titulo": campo("h3.title.title-fixed-height"),
+    "dia": campo(".date-square-day"),
+    "mes": campo(".date-square-month"),
+    "local": campo(".subtitle-small.place-input"),
+    "href": campo("a.card-cover.large", atributo="href"),
+    "distancias": campo(".distances"),
+    "tag": campo(".tag"),
+}
+
+@cronometrar("parse")
+async def coletar_eventos_ativo(page):
     """Coleta eventos de corrida do Ativo.com"""
     eventos = []
     
     try:
-        # Seleciona todos os cards de evento
-        cards = page.query_selector_all("article.card.card-event")
+        # Extrai todos os cards de evento de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_ATIVO, CAMPOS_CARD_ATIVO)
         print(f"   📦 {len(cards)} cards encontrados para processamento")
         
+        # Todas as datas da página de uma vez, contra a mesma data de referência
+        datas = interpretar_datas([f"{card['dia']} {card['mes']}" if card["dia"] and card["mes"] else None
+                                   for card in cards])
         for i, card in enumerate(cards):
             try:
                 # Título
-                titulo_el = card.query_selector("h3.title.title-fixed-height")
-                titulo = limpar_texto(titulo_el.inner_text()) if titulo_el else ""
+                titulo = limpar_texto(card["titulo"])
                 
                 if not titulo:
                     continue
                 
                 # Data (dia e mês separados)
-                dia_el = card.query_selector(".date-square-day")
-                mes_el = card.query_selector(".date-square-month")
-                
-                if not dia_el or not mes_el:
+                if card["dia"] is None or card["mes"] is None:
                     continue
                 
-                dia_str = dia_el.inner_text().strip() if dia_el else ""
-                mes_str = mes_el.inner_text().strip() if mes_el else ""
-                
-                data_obj, data_formatada = processar_data_ativo(dia_str, mes_str)
+                data_obj, data_formatada = datas[i]
                 if not data_obj:
                     continue
                 
@@ -158,24 +134,19 @@ def coletar_eventos_ativo(page):
                     continue
                 
                 # Local
-                local_el = card.query_selector(".subtitle-small.place-input")
-                local = limpar_texto(local_el.inner_text()) if local_el else "Local não informado"
+                local = limpar_texto(card["local"]) if card["local"] is not None else "Local não informado"
                 
                 # Link
-                link_el = card.query_selector("a.card-cover.large")
                 link = ""
-                if link_el:
-                    href = link_el.get_attribute("href")
-                    if href:
-                        link = href if href.startswith("http") else f"https://www.ativo.com{href}"
+                href = card["href"]
+                if href:
+                    link = href if href.startswith("http") else f"https://www.ativo.com{href}"
                 
                 # Distâncias (opcional)
-                distancias_el = card.query_selector(".distances")
-                distancias = limpar_texto(distancias_el.inner_text()) if distancias_el else ""
+                distancias = limpar_texto(card["distancias"])
                 
                 # Categoria/Tag
-                tag_el = card.query_selector(".tag")
-                categoria = limpar_texto(tag_el.inner_text()) if tag_el else "Corrida de Rua"
+                categoria = limpar_texto(card["tag"]) if card["tag"] is not None else "Corrida de Rua"
                 
                 # Validações básicas
                 if len(titulo.strip()) < 3:
@@ -210,7 +181,7 @@ def coletar_eventos_ativo(page):
     
     return eventos
 
-def extrair_ativo(max_tentativas=3):
+async def extrair_ativo_async(max_tentativas=3):
     """Extrai eventos de corrida do Ativo.com"""
     eventos = []
     
@@ -218,36 +189,27 @@ def extrair_ativo(max_tentativas=3):
         try:
             print(f"🔎 Ativo.com - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("Ativo.com") as sessao:
+                page = await sessao.nova_pagina()
                 
                 # URL do calendário do Ativo
                 url = "https://www.ativo.com/calendario/"
                 
                 try:
                     print("📄 Carregando Ativo.com...")
-                    page.goto(url, timeout=60000)
-                    
-                    # Aguarda a página carregar completamente
-                    time.sleep(5)
+                    await navegar(page, url, timeout=60000)
                     
-                    # Aguarda os cards aparecerem
-                    try:
-                        page.wait_for_selector("article.card.card-event", timeout=20000)
-                    except TimeoutError:
+                    # Aguarda os cards aparecerem e a rede sossegar
+                    if not await aguardar_carregamento(page, "article.card.card-event", timeout=20):
                         print("   ⚠️ Cards não carregaram no tempo esperado")
-                        browser.close()
                         continue
                     
                     # Carrega todos os eventos clicando em "Ver mais"
-                    total_cards = carregar_todos_eventos_ativo(page, max_cliques=10)
+                    total_cards = await carregar_todos_eventos_ativo(page, max_cliques=10)
                     
                     # Agora coleta todos os eventos de uma vez
                     print(f"🔄 Processando {total_cards} eventos...")
-                    eventos = coletar_eventos_ativo(page)
-                    
-                    browser.close()
+                    eventos = await coletar_eventos_ativo(page)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -272,7 +234,6 @@ def extrair_ativo(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -281,4 +242,8 @@ def extrair_ativo(max_tentativas=3):
                 print("💀 Ativo.com falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_ativo(max_tentativas=3):
+    """Extrai eventos de corrida do Ativo.com (entrada síncrona)"""
+    return executar_sync(extrair_ativo_async(max_tentativas))
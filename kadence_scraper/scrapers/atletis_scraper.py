@@ -1,8 +1,13 @@
-import time
+import asyncio
 import hashlib
 import re
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards, extrair_cards_html
+from .http_rapido import ClienteHTTP, percorrer_paginas_http, http_rapido_habilitado
+from .datas import interpretar_datas
+from .telemetria import cronometrar, medir
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,228 +22,208 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para não quebrar CSV
     return texto
 
-def processar_data_atletis(data_str):
-    """Processa diferentes formatos de data do Atletis"""
-    if not data_str:
-        return None, None
-    
-    # Remove texto extra e normaliza
-    data_limpa = data_str.strip()
-    
-    # Mapeia meses em português
-    meses = {
-        'janeiro': '01', 'fevereiro': '02', 'março': '03', 'abril': '04',
-        'maio': '05', 'junho': '06', 'julho': '07', 'agosto': '08',
-        'setembro': '09', 'outubro': '10', 'novembro': '11', 'dezembro': '12'
-    }
+def url_pagina_atletis(numero):
+    """URL da página `numero` da listagem do Atletis"""
+    if numero == 1:
+        return "https://www.atletis.com.br/eventos"
+    return f"https://www.atletis.com.br/eventos/{numero}"
+
+async def preparar_pagina_atletis(page):
+    """Ajusta cabeçalhos de uma página do Atletis (imagens, fontes, CSS e rastreadores já são bloqueados pela sessão)"""
+    # Configurações de performance
+    await page.set_extra_http_headers({
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+        "Cache-Control": "no-cache"
+    })
+
+async def carregar_pagina_atletis(page, numero):
+    """Carrega uma página da listagem; retorna a lista de eventos ou None se acabou/falhou"""
+    try:
+        await navegar(page, url_pagina_atletis(numero), timeout=30000)
+        
+        # Aguarda apenas o essencial - DOM estar pronto
+        try:
+            with medir("espera"):
+                await page.wait_for_selector(".event-card", timeout=8000)
+        except TimeoutError:
+            print(f"   ❌ Página {numero}: Sem eventos")
+            return None
+        
+        eventos_pagina = await coletar_eventos_pagina_atletis(page)
+        if not eventos_pagina:
+            print(f"   ⚠️ Página {numero}: Vazia - finalizando")
+            return None
+        
+        print(f"   ✅ Página {numero}: {len(eventos_pagina)} eventos")
+        return eventos_pagina
     
-    # Padrão: "07 Junho 2026"
-    padrao = r'(\d{1,2})\s+([a-záéíóúç]+)\s+(\d{4})'
-    match = re.search(padrao, data_limpa.lower())
+    except Exception as e:
+        print(f"   ❌ Erro página {numero}: {str(e)[:30]}...")
+        return []
+
+async def navegar_paginas_atletis(sessao, max_paginas=96, paralelas=3):
+    """
+    Navega pelas páginas do Atletis usando paginação numérica - OTIMIZADO
+    Busca `paralelas` páginas ao mesmo tempo (janela) e para na primeira página sem eventos
+    """
+    todos_eventos = []
+    paginas = []
+    for _ in range(max(1, paralelas)):
+        page = await sessao.nova_pagina()
+        await preparar_pagina_atletis(page)
+        paginas.append(page)
     
-    if match:
-        dia = match.group(1).zfill(2)
-        mes_texto = match.group(2)
-        ano = match.group(3)
+    for inicio in range(1, max_paginas + 1, len(paginas)):
+        numeros = list(range(inicio, min(inicio + len(paginas), max_paginas + 1)))
+        print(f"   📄 Páginas {numeros[0]}-{numeros[-1]}")
         
-        mes_num = meses.get(mes_texto, '01')
-        data_str_formatada = f"{dia}/{mes_num}/{ano}"
+        resultados = await asyncio.gather(*(
+            carregar_pagina_atletis(page, numero) for page, numero in zip(paginas, numeros)
+        ))
         
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
+        # Mantém a ordem das páginas e descarta o que vier depois da primeira vazia
+        for eventos_pagina in resultados:
+            if eventos_pagina is None:
+                return todos_eventos
+            todos_eventos.extend(eventos_pagina)
     
-    return None, data_str
+    return todos_eventos
 
-def navegar_paginas_atletis(page, max_paginas=96):
-    """Navega pelas páginas do Atletis usando paginação numérica - OTIMIZADO"""
-    todos_eventos = []
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_ATLETIS = ".event-card"
+CAMPOS_CARD_ATLETIS = {
+    "titulo": campo(".event-card-title"),
+    "href": campo(["a[href*='evento']", ".event-card-image a", ".event-card-body a"], atributo="href"),
+    # Primeira info traz a data (no span), segunda o local
+    "data": campo(".event-card-info span"),
+    "infos": campo(".event-card-info", todos=True),
+}
+
+@cronometrar("parse")
+def processar_cards_atletis(cards):
+    """Converte os cards extraídos (do navegador ou do HTML) em eventos"""
+    eventos = []
     
-    for pagina_atual in range(1, max_paginas + 1):
+    # Todas as datas da página de uma vez, contra a mesma data de referência
+    datas = interpretar_datas([card["data"] for card in cards])
+    for i, card in enumerate(cards):
         try:
-            print(f"   📄 Página {pagina_atual}")
+            # Título
+            titulo = limpar_texto(card["titulo"])
             
-            # URL da página específica
-            if pagina_atual == 1:
-                url_pagina = "https://www.atletis.com.br/eventos"
-            else:
-                url_pagina = f"https://www.atletis.com.br/eventos/{pagina_atual}"
+            if not titulo or len(titulo) < 3:
+                continue
             
-            page.goto(url_pagina, timeout=30000)
+            # Link
+            link = ""
+            href = card["href"]
+            if href:
+                link = href if href.startswith("http") else f"https://www.atletis.com.br{href}"
             
-            # Aguarda apenas o essencial - DOM estar pronto
-            try:
-                page.wait_for_selector(".event-card", timeout=8000)
-            except TimeoutError:
-                print(f"   ❌ Página {pagina_atual}: Sem eventos")
-                break  # Se não tem cards, chegou ao fim
+            # Informações pela posição dos event-card-info
+            infos = card["infos"]
+            local = limpar_texto(infos[1]) if len(infos) > 1 else "Local não informado"
             
-            # Coleta eventos da página atual
-            eventos_pagina = coletar_eventos_pagina_atletis(page)
+            # Processa a data
+            data_obj, data_formatada = datas[i]
+            if not data_obj:
+                continue
             
-            if eventos_pagina:
-                todos_eventos.extend(eventos_pagina)
-                print(f"   ✅ Página {pagina_atual}: {len(eventos_pagina)} eventos")
-            else:
-                print(f"   ⚠️ Página {pagina_atual}: Vazia - finalizando")
-                break  # Se não tem eventos, provavelmente chegou ao fim
+            # Só eventos futuros
+            if data_obj < datetime.now():
+                continue
+            
+            # Hash para deduplicação
+            evento_hash = gerar_hash_evento(titulo, data_formatada, local)
+            
+            eventos.append({
+                "titulo": titulo,
+                "data": data_formatada,
+                "local": local,
+                "link": link,
+                "hash": evento_hash,
+                "fonte": "Atletis",
+                "data_obj": data_obj
+            })
             
-            # Pausa mínima entre páginas
-            time.sleep(0.5)
-                
         except Exception as e:
-            print(f"   ❌ Erro página {pagina_atual}: {str(e)[:30]}...")
             continue
     
-    return todos_eventos
+    return eventos
 
-def coletar_eventos_pagina_atletis(page):
+async def coletar_eventos_pagina_atletis(page):
     """Coleta eventos de uma página do Atletis - OTIMIZADO"""
-    eventos = []
-    
     try:
-        # Pega os cards - seletor direto
-        cards = page.query_selector_all(".event-card")
-        
-        if not cards:
-            return eventos
-        
-        for i, card in enumerate(cards):
-            try:
-                # Título
-                titulo_el = card.query_selector(".event-card-title")
-                titulo = limpar_texto(titulo_el.inner_text()) if titulo_el else ""
-                
-                if not titulo or len(titulo) < 3:
-                    continue
-                
-                # Link
-                link_el = card.query_selector("a[href*='evento']")
-                if not link_el:
-                    link_el = card.query_selector(".event-card-image a")
-                if not link_el:
-                    link_el = card.query_selector(".event-card-body a")
-                
-                link = ""
-                if link_el:
-                    href = link_el.get_attribute("href")
-                    if href:
-                        link = href if href.startswith("http") else f"https://www.atletis.com.br{href}"
-                
-                # Busca informações nos event-card-info
-                info_elements = card.query_selector_all(".event-card-info")
-                
-                data_raw = ""
-                local = "Local não informado"
-                
-                # Estratégia pela posição dos elementos
-                for j, info_el in enumerate(info_elements):
-                    try:
-                        # Primeira info é a data
-                        if j == 0:
-                            span_el = info_el.query_selector("span")
-                            if span_el:
-                                data_raw = span_el.inner_text().strip()
-                        
-                        # Segunda info é o local
-                        elif j == 1:
-                            local = limpar_texto(info_el.inner_text())
-                            
-                    except Exception:
-                        continue
-                
-                # Processa a data
-                data_obj, data_formatada = processar_data_atletis(data_raw)
-                if not data_obj:
-                    continue
-                
-                # Só eventos futuros
-                if data_obj < datetime.now():
-                    continue
-                
-                # Hash para deduplicação
-                evento_hash = gerar_hash_evento(titulo, data_formatada, local)
-                
-                eventos.append({
-                    "titulo": titulo,
-                    "data": data_formatada,
-                    "local": local,
-                    "link": link,
-                    "hash": evento_hash,
-                    "fonte": "Atletis",
-                    "data_obj": data_obj
-                })
-                
-            except Exception as e:
-                continue
-    
+        # Extrai os cards em uma única chamada
+        cards = await extrair_cards(page, SELETOR_CARD_ATLETIS, CAMPOS_CARD_ATLETIS)
+        return processar_cards_atletis(cards)
     except Exception as e:
         print(f"   ⚠️ Erro ao coletar página: {str(e)[:30]}...")
+        return []
+
+def processar_html_atletis(html, numero):
+    """Eventos de uma página baixada sem navegador; None se a página não tem eventos (fim)"""
+    eventos_pagina = processar_cards_atletis(extrair_cards_html(html, SELETOR_CARD_ATLETIS, CAMPOS_CARD_ATLETIS))
+    if eventos_pagina:
+        print(f"   ✅ Página {numero}: {len(eventos_pagina)} eventos")
+    return eventos_pagina or None
+
+async def coletar_atletis_http(max_paginas=96):
+    """Percorre a listagem só com HTTP; None se o HTML não trouxer os eventos"""
+    async with ClienteHTTP(cabecalhos={"Cache-Control": "no-cache"}) as cliente:
+        return await percorrer_paginas_http(cliente, url_pagina_atletis, processar_html_atletis, max_paginas)
+
+def remover_duplicatas_atletis(eventos):
+    """Remove duplicatas internas e ordena por data"""
+    eventos_unicos = {}
+    for evento in eventos:
+        hash_evento = evento['hash']
+        if hash_evento not in eventos_unicos:
+            eventos_unicos[hash_evento] = evento
     
-    return eventos
+    eventos_finais = list(eventos_unicos.values())
+    eventos_finais.sort(key=lambda x: x['data_obj'])
+    
+    duplicatas = len(eventos) - len(eventos_finais)
+    
+    print(f"✅ Atletis: {len(eventos_finais)} eventos únicos coletados")
+    if duplicatas > 0:
+        print(f"🔄 {duplicatas} duplicatas internas removidas")
+    
+    return eventos_finais
 
-def extrair_atletis(max_tentativas=3):
+async def extrair_atletis_async(max_tentativas=3):
     """Extrai eventos do Atletis - VERSÃO OTIMIZADA"""
     eventos = []
     
+    # Listagem renderizada no servidor: tenta primeiro sem navegador
+    if http_rapido_habilitado():
+        print("⚡ Atletis - modo HTTP")
+        eventos = await coletar_atletis_http(max_paginas=96)
+        if eventos:
+            return remover_duplicatas_atletis(eventos)
+        print("↩️ Atletis: modo HTTP sem eventos - usando o navegador")
+        eventos = []
+    
     for tentativa in range(max_tentativas):
         try:
             print(f"🔎 Atletis (OTIMIZADO) - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                
-                # 🚀 OTIMIZAÇÕES DE PERFORMANCE
-                # Bloqueia recursos pesados desnecessários
-                page.route("**/*.{png,jpg,jpeg,gif,svg,webp,woff,woff2,ttf,eot}", lambda route: route.abort())
-                page.route("**/*.{css}", lambda route: route.abort())  # CSS não é necessário para dados
-                page.route("**/analytics**", lambda route: route.abort())
-                page.route("**/gtag**", lambda route: route.abort())
-                page.route("**/google-analytics**", lambda route: route.abort())
-                page.route("**/facebook.net**", lambda route: route.abort())
-                
-                # Configurações de performance
-                page.set_extra_http_headers({
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
-                    "Cache-Control": "no-cache"
-                })
-                
+            async with sessao_navegador("Atletis") as sessao:
                 try:
                     print("📄 Carregando Atletis (modo otimizado)...")
                     
                     # Navega por todas as páginas
-                    eventos = navegar_paginas_atletis(page, max_paginas=96)
-                    
-                    browser.close()
+                    eventos = await navegar_paginas_atletis(sessao, max_paginas=96)
                     
                     if eventos:
-                        # Remove duplicatas internas
-                        eventos_unicos = {}
-                        for evento in eventos:
-                            hash_evento = evento['hash']
-                            if hash_evento not in eventos_unicos:
-                                eventos_unicos[hash_evento] = evento
-                        
-                        eventos_finais = list(eventos_unicos.values())
-                        eventos_finais.sort(key=lambda x: x['data_obj'])
-                        
-                        duplicatas = len(eventos) - len(eventos_finais)
-                        
-                        print(f"✅ Atletis: {len(eventos_finais)} eventos únicos coletados")
-                        if duplicatas > 0:
-                            print(f"🔄 {duplicatas} duplicatas internas removidas")
-                        
-                        return eventos_finais
+                        return remover_duplicatas_atletis(eventos)
                     else:
                         print("⚠️ Nenhum evento encontrado")
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -247,4 +232,8 @@ def extrair_atletis(max_tentativas=3):
                 print("💀 Atletis falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_atletis(max_tentativas=3):
+    """Extrai eventos do Atletis - VERSÃO OTIMIZADA (entrada síncrona)"""
+    return executar_sync(extrair_atletis_async(max_tentativas))
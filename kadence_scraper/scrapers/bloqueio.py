@@ -0,0 +1,124 @@
+from urllib.parse import urlsplit
+
+# Configurações
+TIPOS_BLOQUEADOS_PADRAO = frozenset({"image", "media", "font"})
+DOMINIOS_BLOQUEADOS_PADRAO = (
+    "google-analytics.com", "googletagmanager.com", "googleadservices.com", "googlesyndication.com",
+    "doubleclick.net", "facebook.net", "facebook.com", "connect.facebook.net",
+    "hotjar.com", "hotjar.io", "clarity.ms", "bat.bing.com", "analytics.tiktok.com",
+    "nr-data.net", "newrelic.com", "segment.io", "segment.com", "mixpanel.com",
+    "amplitude.com", "fullstory.com", "criteo.com", "criteo.net", "taboola.com", "outbrain.com",
+    "rdstation.com.br", "onesignal.com", "zopim.com", "zdassets.com",
+    "intercom.io", "intercomcdn.com", "tawk.to", "jivosite.com", "yandex.ru",
+)
+
+# Tamanho médio por tipo de recurso, para estimar o que deixou de ser baixado
+TAMANHO_MEDIO_POR_TIPO = {
+    "image": 60 * 1024,
+    "media": 500 * 1024,
+    "font": 40 * 1024,
+    "stylesheet": 30 * 1024,
+    "script": 50 * 1024,
+}
+TAMANHO_MEDIO_OUTROS = 10 * 1024
+
+# Ajustes por fonte (nome da sessão): tipos extras a bloquear, tipos liberados
+# e domínios que nunca entram na lista de bloqueio por domínio
+POLITICA_BUBBLE = {
+    # O runtime do Bubble.io espera as fontes antes de renderizar e carrega scripts do próprio CDN
+    "permitir_tipos": {"font"},
+    "permitir_dominios": ("bubble.io", "bubbleapps.io"),
+}
+POLITICAS_POR_FONTE = {
+    # Listagem server-side: CSS não é necessário para os dados
+    "Atletis": {"bloquear_tipos": {"stylesheet"}},
+    "Central Corrida": POLITICA_BUBBLE,
+    "TimeTicket": POLITICA_BUBBLE,
+}
+
+def _casa_dominio(host, dominios):
+    """True se o host é um dos domínios ou subdomínio deles"""
+    return any(host == d or host.endswith("." + d) for d in dominios)
+
+class PoliticaBloqueio:
+    """Decide quais requisições abortar: por tipo de recurso e por lista de domínios"""
+
+    def __init__(self, bloquear_tipos=TIPOS_BLOQUEADOS_PADRAO, bloquear_dominios=DOMINIOS_BLOQUEADOS_PADRAO,
+                 permitir_tipos=(), permitir_dominios=()):
+        self.bloquear_tipos = frozenset(bloquear_tipos) - frozenset(permitir_tipos)
+        self.bloquear_dominios = tuple(bloquear_dominios)
+        self.permitir_dominios = tuple(permitir_dominios)
+
+    def motivo(self, url, tipo):
+        """Motivo do bloqueio ('tipo:<tipo>' ou 'dominio') ou None se a requisição deve seguir"""
+        host = (urlsplit(url).hostname or "").lower()
+        if _casa_dominio(host, self.bloquear_dominios) and not _casa_dominio(host, self.permitir_dominios):
+            return "dominio"
+        if tipo in self.bloquear_tipos:
+            return f"tipo:{tipo}"
+        return None
+
+def politica_para_fonte(nome):
+    """Política padrão combinada com os ajustes da fonte"""
+    ajustes = POLITICAS_POR_FONTE.get(nome, {})
+    return PoliticaBloqueio(
+        bloquear_tipos=TIPOS_BLOQUEADOS_PADRAO | frozenset(ajustes.get("bloquear_tipos", ())),
+        bloquear_dominios=DOMINIOS_BLOQUEADOS_PADRAO + tuple(ajustes.get("bloquear_dominios", ())),
+        permitir_tipos=ajustes.get("permitir_tipos", ()),
+        permitir_dominios=ajustes.get("permitir_dominios", ()),
+    )
+
+class EstatisticasBloqueio:
+    """Contadores de uma fonte: o que foi bloqueado e o que foi baixado"""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.bloqueadas = 0
+        self.bytes_economizados_estimados = 0
+        self.bloqueadas_por_motivo = {}
+        self.permitidas = 0
+        self.bytes_baixados = 0  # soma dos Content-Length informados
+
+    def registrar_bloqueio(self, motivo, tipo):
+        self.bloqueadas += 1
+        self.bloqueadas_por_motivo[motivo] = self.bloqueadas_por_motivo.get(motivo, 0) + 1
+        self.bytes_economizados_estimados += TAMANHO_MEDIO_POR_TIPO.get(tipo, TAMANHO_MEDIO_OUTROS)
+
+    def registrar_resposta(self, resposta):
+        self.permitidas += 1
+        try:
+            self.bytes_baixados += int(resposta.headers.get("content-length", 0))
+        except (TypeError, ValueError):
+            pass
+
+    def somar(self, outras):
+        """Acumula os contadores de outra sessão da mesma fonte"""
+        self.bloqueadas += outras.bloqueadas
+        self.bytes_economizados_estimados += outras.bytes_economizados_estimados
+        for motivo, n in outras.bloqueadas_por_motivo.items():
+            self.bloqueadas_por_motivo[motivo] = self.bloqueadas_por_motivo.get(motivo, 0) + n
+        self.permitidas += outras.permitidas
+        self.bytes_baixados += outras.bytes_baixados
+
+    def resumo(self):
+        """Linha de resumo para o log"""
+        motivos = ", ".join(f"{m} {n}" for m, n in sorted(self.bloqueadas_por_motivo.items(), key=lambda x: -x[1]))
+        detalhe = f" [{motivos}]" if motivos else ""
+        return (f"🛡️ {self.nome}: {self.bloqueadas} requisições bloqueadas "
+                f"(~{self.bytes_economizados_estimados / 1024 / 1024:.1f} MB economizados, estimativa){detalhe} | "
+                f"{self.permitidas} respostas, {self.bytes_baixados / 1024 / 1024:.1f} MB baixados")
+
+async def aplicar_bloqueio(contexto, politica, estatisticas):
+    """Instala a política em um BrowserContext (vale para todas as páginas dele)"""
+
+    async def _rotear(route):
+        requisicao = route.request
+        motivo = politica.motivo(requisicao.url, requisicao.resource_type)
+        if motivo:
+            estatisticas.registrar_bloqueio(motivo, requisicao.resource_type)
+            await route.abort("blockedbyclient")
+        else:
+            await route.fallback()  # segue para a próxima rota (ex.: espelho) ou para a rede
+
+    await contexto.route("**/*", _rotear)
+    contexto.on("response", estatisticas.registrar_resposta)
@@ -1,8 +1,13 @@
-import time
 import hashlib
 import re
-from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from datetime import date, datetime
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import contar_elementos, aguardar_carregamento, aguardar_mudanca_contagem
+from .interceptacao import capturar_json, encontrar_registros, valor, converter_data_api
+from .datas import interpretar_data
+from .telemetria import cronometrar, medir
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,50 +22,25 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para não quebrar CSV
     return texto
 
-def processar_data_brasilcorrida(data_str, hora_str=""):
-    """Processa data do formato BrasilCorrida: '09/08/2025' + '08:00'"""
-    if not data_str:
-        return None, None
-    
-    # Remove espaços e caracteres extras
-    data_limpa = data_str.strip()
-    
-    # Padrão: "09/08/2025"
-    padrao = r'(\d{2})/(\d{2})/(\d{4})'
-    match = re.search(padrao, data_limpa)
-    
-    if match:
-        dia, mes, ano = match.groups()
-        data_str_formatada = f"{dia}/{mes}/{ano}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
-    
-    return None, data_str
-
-def aguardar_carregamento_angularjs(page, max_tentativas=30):
+@cronometrar("espera")
+async def aguardar_carregamento_angularjs(page, max_tentativas=30):
     """Aguarda AngularJS carregar completamente e todos os eventos aparecerem"""
     print("🔄 Aguardando carregamento completo do AngularJS...")
     
     tentativa = 0
     ultimo_total = 0
     tentativas_sem_mudanca = 0
-    max_tentativas_sem_mudanca = 5
+    max_tentativas_sem_mudanca = 2
     
-    # Aguarda primeiro carregamento
-    time.sleep(8)  # AngularJS precisa de tempo inicial
+    # Aguarda primeiro carregamento (AngularJS renderiza os cards e a rede sossega)
+    await aguardar_carregamento(page, ".col-md-3 .card", timeout=15)
+    ultimo_total = await contar_elementos(page, ".col-md-3 .card")
     
     while tentativa < max_tentativas and tentativas_sem_mudanca < max_tentativas_sem_mudanca:
         try:
-            # Scroll para o final da página para garantir que tudo carregue
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(3)  # Aguarda AJAX/lazy loading
-            
-            # Conta cards atuais
-            cards_atuais = len(page.query_selector_all(".col-md-3 .card"))
+            # Scroll para o final da página e espera novos cards do AJAX/lazy loading (no máximo 5s)
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            cards_atuais = await aguardar_mudanca_contagem(page, ".col-md-3 .card", ultimo_total, timeout=5)
             
             if cards_atuais > ultimo_total:
                 ultimo_total = cards_atuais
@@ -71,43 +51,99 @@ def aguardar_carregamento_angularjs(page, max_tentativas=30):
                 print(f"   ⏳ Tentativa {tentativa + 1}: Sem novos eventos ({tentativas_sem_mudanca}/{max_tentativas_sem_mudanca})")
             
             tentativa += 1
-            time.sleep(2)  # Aguarda mais processamento AngularJS
             
         except Exception as e:
             print(f"   ⚠️ Erro na tentativa {tentativa + 1}: {str(e)[:50]}...")
             break
     
-    total_final = len(page.query_selector_all(".col-md-3 .card"))
+    total_final = await contar_elementos(page, ".col-md-3 .card")
     print(f"🏁 Carregamento AngularJS finalizado: {total_final} eventos | {tentativa} tentativas realizadas")
     return total_final
 
-def coletar_eventos_brasilcorrida(page):
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_BRASILCORRIDA = ".col-md-3 .card"
+CAMPOS_CARD_BRASILCORRIDA = {
+    "titulo": campo(".card-body h6.text-secondary"),  # h6 dentro do card-body
+    "data": campo(".col-sm-6 h6"),  # Data: 09/08/2025
+    "hora": campo(".col-sm-4 h6"),  # Hora: 08:00
+    "local": campo("div.row:has(i.fa-map-marker) .col-sm-11 h6"),  # coluna ao lado do ícone de localização
+    "modalidades": campo(".badge.badge-secondary", todos=True),
+    "href": campo(".card-body a[href*='#/evento/']", atributo="href"),
+}
+
+# Endpoints JSON que alimentam o calendário AngularJS (templates .html não são JSON e ficam de fora)
+PADROES_API_BRASILCORRIDA = [
+    r"brasilcorrida\.com\.br/(api|ws|rest)/",
+    r"brasilcorrida\.com\.br/.*(eventos?|calendario)[^/]*$",
+]
+
+def mapear_api_brasilcorrida(dados):
+    """Converte o JSON do calendário do BrasilCorrida em eventos"""
+    eventos = []
+    chaves_data = ("dataEvento", "data_evento", "dataInicio", "data_inicio", "dtEvento")
+    for registro in encontrar_registros(dados, chaves_data):
+        titulo = limpar_texto(str(valor(registro, "nome", "titulo", "nomeEvento", "title") or ""))
+        if len(titulo) < 3:
+            continue
+        
+        data_bruta = valor(registro, *chaves_data)
+        data_obj, data_formatada = interpretar_data(str(data_bruta))
+        if not data_obj:
+            data_obj, data_formatada = converter_data_api(data_bruta)
+        if not data_obj or data_obj < datetime.now():
+            continue
+        
+        cidade = valor(registro, "cidade.nome", "cidade", "local") or ""
+        uf = valor(registro, "estado.sigla", "uf", "estado") or ""
+        local = limpar_texto(" - ".join(str(p) for p in (cidade, uf) if p)) or "Local não informado"
+        
+        modalidades = valor(registro, "modalidades", "modalidade") or []
+        if not isinstance(modalidades, list):
+            modalidades = [modalidades]
+        nomes = [limpar_texto(str(m.get("nome", "") if isinstance(m, dict) else m)) for m in modalidades]
+        modalidade = ", ".join(n for n in nomes if n) or "Corrida de Rua"
+        
+        slug = valor(registro, "slug", "url", "id")
+        link = f"https://brasilcorrida.com.br/#/evento/{slug}" if slug else ""
+        
+        eventos.append({
+            "titulo": titulo,
+            "data": data_formatada,
+            "local": local,
+            "link": link,
+            "hash": gerar_hash_evento(titulo, data_formatada, local),
+            "fonte": "BrasilCorrida",
+            "data_obj": data_obj,
+            "modalidade": modalidade,
+            "hora": limpar_texto(str(valor(registro, "hora", "horario") or ""))
+        })
+    return eventos
+
+@cronometrar("parse")
+async def coletar_eventos_brasilcorrida(page):
     """Coleta eventos de corrida do BrasilCorrida"""
     eventos = []
     
     try:
-        # Seleciona todos os cards de evento
-        cards = page.query_selector_all(".col-md-3 .card")
+        # Extrai todos os cards de evento de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_BRASILCORRIDA, CAMPOS_CARD_BRASILCORRIDA)
         print(f"   📦 {len(cards)} cards encontrados para processamento")
         
+        referencia = date.today()  # a mesma para a página inteira
         for i, card in enumerate(cards):
             try:
-                # Título - no h6 dentro do card-body
-                titulo_el = card.query_selector(".card-body h6.text-secondary")
-                titulo = limpar_texto(titulo_el.inner_text()) if titulo_el else ""
+                # Título
+                titulo = limpar_texto(card["titulo"])
                 
                 if not titulo:
                     continue
                 
                 # Data e hora - estão em divs separadas
-                data_el = card.query_selector(".col-sm-6 h6")  # Data: 09/08/2025
-                hora_el = card.query_selector(".col-sm-4 h6")  # Hora: 08:00
-                
-                data_raw = limpar_texto(data_el.inner_text()) if data_el else ""
-                hora_raw = limpar_texto(hora_el.inner_text()) if hora_el else ""
+                data_raw = limpar_texto(card["data"])
+                hora_raw = limpar_texto(card["hora"])
                 
                 # Processa a data
-                data_obj, data_formatada = processar_data_brasilcorrida(data_raw, hora_raw)
+                data_obj, data_formatada = interpretar_data(data_raw, referencia)
                 if not data_obj:
                     continue
                 
@@ -115,38 +151,24 @@ def coletar_eventos_brasilcorrida(page):
                 if data_obj < datetime.now():
                     continue
                 
-                # Local - CORREÇÃO: pega o campo correto do ícone de localização
+                # Local - campo ao lado do ícone de localização
                 local = "Local não informado"
-                
-                # Busca a div que contém o ícone fa-map-marker
-                local_row = card.query_selector("div.row:has(i.fa-map-marker)")
-                if local_row:
-                    # Pega o texto da coluna ao lado do ícone
-                    local_el = local_row.query_selector(".col-sm-11 h6")
-                    if local_el:
-                        local_raw = limpar_texto(local_el.inner_text())
-                        if local_raw and len(local_raw) > 2:
-                            local = local_raw
+                local_raw = limpar_texto(card["local"])
+                if local_raw and len(local_raw) > 2:
+                    local = local_raw
                 
                 # Modalidade - badge badge-secondary
-                modalidade_els = card.query_selector_all(".badge.badge-secondary")
-                modalidades = []
-                for mod_el in modalidade_els:
-                    mod_text = limpar_texto(mod_el.inner_text())
-                    if mod_text:
-                        modalidades.append(mod_text)
+                modalidades = [limpar_texto(m) for m in card["modalidades"] if limpar_texto(m)]
                 
                 modalidade = ", ".join(modalidades) if modalidades else "Corrida de Rua"
                 
                 # Link - extrai do href do título
-                link_el = card.query_selector(".card-body a[href*='#/evento/']")
                 link = ""
-                if link_el:
-                    href = link_el.get_attribute("href")
-                    if href:
-                        # Converte de hash route para URL completa
-                        slug = href.replace("#/evento/", "")
-                        link = f"https://brasilcorrida.com.br/#/evento/{slug}"
+                href = card["href"]
+                if href:
+                    # Converte de hash route para URL completa
+                    slug = href.replace("#/evento/", "")
+                    link = f"https://brasilcorrida.com.br/#/evento/{slug}"
                 
                 # Validações básicas
                 if len(titulo.strip()) < 3:
@@ -181,7 +203,7 @@ def coletar_eventos_brasilcorrida(page):
     
     return eventos
 
-def extrair_brasilcorrida(max_tentativas=3):
+async def extrair_brasilcorrida_async(max_tentativas=3):
     """Extrai eventos de corrida do BrasilCorrida"""
     eventos = []
     
@@ -189,33 +211,38 @@ def extrair_brasilcorrida(max_tentativas=3):
         try:
             print(f"🔎 BrasilCorrida - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("BrasilCorrida.com") as sessao:
+                page = await sessao.nova_pagina()
                 
                 # URL do calendário do BrasilCorrida
                 url = "https://brasilcorrida.com.br/#/calendario"
                 
                 try:
                     print("📄 Carregando BrasilCorrida...")
-                    page.goto(url, timeout=60000)
-                    
-                    # Aguarda AngularJS carregar completamente
-                    try:
-                        page.wait_for_selector(".col-md-3 .card", timeout=20000)
-                    except TimeoutError:
-                        print("   ⚠️ Cards não carregaram no tempo esperado")
-                        browser.close()
-                        continue
-                    
-                    # Aguarda carregamento completo do AngularJS e lazy loading
-                    total_cards = aguardar_carregamento_angularjs(page, max_tentativas=30)
-                    
-                    # Agora coleta todos os eventos de uma vez
-                    print(f"🔄 Processando {total_cards} eventos...")
-                    eventos = coletar_eventos_brasilcorrida(page)
+                    async with capturar_json(page, PADROES_API_BRASILCORRIDA, mapear_api_brasilcorrida) as captura:
+                        await navegar(page, url, timeout=60000)
+                        
+                        # O calendário chega inteiro no JSON: sem espera de renderização nem scroll
+                        if await captura.aguardar(timeout=20, quietude=1.0):
+                            eventos = await captura.eventos()
+                            if eventos:
+                                print(f"   📡 {len(eventos)} eventos lidos de {len(captura.payloads)} respostas da API")
                     
-                    browser.close()
+                    if not eventos:
+                        # Fallback: aguarda AngularJS carregar completamente
+                        try:
+                            with medir("espera"):
+                                await page.wait_for_selector(".col-md-3 .card", timeout=20000)
+                        except TimeoutError:
+                            print("   ⚠️ Cards não carregaram no tempo esperado")
+                            continue
+                        
+                        # Aguarda carregamento completo do AngularJS e lazy loading
+                        total_cards = await aguardar_carregamento_angularjs(page, max_tentativas=30)
+                        
+                        # Agora coleta todos os eventos de uma vez
+                        print(f"🔄 Processando {total_cards} eventos...")
+                        eventos = await coletar_eventos_brasilcorrida(page)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -240,7 +267,6 @@ def extrair_brasilcorrida(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -249,4 +275,8 @@ def extrair_brasilcorrida(max_tentativas=3):
                 print("💀 BrasilCorrida falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_brasilcorrida(max_tentativas=3):
+    """Extrai eventos de corrida do BrasilCorrida (entrada síncrona)"""
+    return executar_sync(extrair_brasilcorrida_async(max_tentativas))
@@ -1,8 +1,13 @@
-import time
 import hashlib
 import re
-from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from datetime import date, datetime
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import contar_elementos, aguardar_carregamento, aguardar_mudanca_contagem
+from .interceptacao import capturar_json, converter_data_api, registros_bubble, campo_bubble, PADROES_API_BUBBLE
+from .datas import interpretar_data
+from .telemetria import cronometrar
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,43 +22,31 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para não quebrar CSV
     return texto
 
-def processar_data_central(data_str):
-    """Processa diferentes formatos de data da Central da Corrida"""
-    if not data_str:
-        return None, None
-    
-    # Remove texto extra e normaliza - formato: "10/08/2025 - 06:30"
-    data_limpa = data_str.split(' - ')[0].strip()  # Pega só a parte da data
-    
-    # Padrão: "10/08/2025"
-    try:
-        data_obj = datetime.strptime(data_limpa, '%d/%m/%Y')
-        return data_obj, data_limpa
-    except ValueError:
-        pass
-    
-    return None, data_str
-
-def fazer_scroll_infinito(page, max_scrolls=50):
-    """Faz scroll até carregar todos os eventos disponíveis"""
+@cronometrar("paginacao")
+async def fazer_scroll_infinito(page, max_scrolls=50, captura=None):
+    """
+    Faz scroll até carregar todos os eventos disponíveis.
+    Com `captura`, cada rolagem espera só a resposta de dados do Bubble, não a renderização
+    """
     print("🔄 Fazendo scroll para carregar todos os eventos...")
     
     scroll_realizados = 0
     eventos_anteriores = 0
     tentativas_sem_novos = 0
-    max_tentativas_sem_novos = 5
+    max_tentativas_sem_novos = 2
     
     while scroll_realizados < max_scrolls and tentativas_sem_novos < max_tentativas_sem_novos:
         try:
             # Conta eventos atuais
-            cards_atuais = len(page.query_selector_all(".clickable-element.bubble-element.Group"))
-            
-            # Scroll para baixo
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(3)  # Aguarda carregar novos eventos
+            cards_atuais = await contar_elementos(page, ".clickable-element.bubble-element.Group")
             
-            # Conta eventos após scroll
-            cards_novos = len(page.query_selector_all(".clickable-element.bubble-element.Group"))
+            # Scroll para baixo e aguarda novos dados (no máximo 5s)
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            if captura:
+                chegou = await captura.aguardar(timeout=5, quietude=0.3)
+                cards_novos = len(await captura.eventos()) if chegou else eventos_anteriores
+            else:
+                cards_novos = await aguardar_mudanca_contagem(page, ".clickable-element.bubble-element.Group", cards_atuais, timeout=5)
             
             if cards_novos > eventos_anteriores:
                 eventos_anteriores = cards_novos
@@ -69,23 +62,58 @@ def fazer_scroll_infinito(page, max_scrolls=50):
             print(f"   ⚠️ Erro no scroll {scroll_realizados + 1}: {str(e)[:50]}...")
             break
     
-    total_final = len(page.query_selector_all(".clickable-element.bubble-element.Group"))
+    total_final = await contar_elementos(page, ".clickable-element.bubble-element.Group")
     print(f"🏁 Scroll finalizado: {total_final} eventos carregados | {scroll_realizados} scrolls realizados")
     return total_final
 
-def coletar_eventos_central(page):
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_CENTRAL = ".clickable-element.bubble-element.Group"
+CAMPOS_CARD_CENTRAL = {
+    "textos": campo(".bubble-element.Text", todos=True),
+}
+
+def mapear_api_central(dados):
+    """Converte as respostas de dados do Bubble da Central da Corrida em eventos"""
+    eventos = []
+    for registro in registros_bubble(dados):
+        titulo = limpar_texto(campo_bubble(registro, ("nome", "titulo", "title", "name")) or "")
+        if len(titulo) < 3:
+            continue
+        
+        data_obj, data_formatada = converter_data_api(campo_bubble(registro, ("data", "date", "inicio"), ("_date",)))
+        if not data_obj or data_obj < datetime.now():
+            continue
+        
+        cidade = campo_bubble(registro, ("cidade", "city", "local")) or ""
+        uf = campo_bubble(registro, ("estado", "uf")) or ""
+        local = limpar_texto(" - ".join(p for p in (cidade, uf) if p)) or "Local não informado"
+        
+        eventos.append({
+            "titulo": titulo,
+            "data": data_formatada,
+            "local": local,
+            "link": "https://centraldacorrida.com.br/",
+            "hash": gerar_hash_evento(titulo, data_formatada, local),
+            "fonte": "CentralDaCorrida",
+            "data_obj": data_obj
+        })
+    return eventos
+
+@cronometrar("parse")
+async def coletar_eventos_central(page):
     """Coleta eventos da Central da Corrida"""
     eventos = []
     
     try:
-        # Seleciona todos os cards de evento
-        cards = page.query_selector_all(".clickable-element.bubble-element.Group")
+        # Extrai os textos de todos os cards de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_CENTRAL, CAMPOS_CARD_CENTRAL)
         print(f"   📦 {len(cards)} cards encontrados para processamento")
         
+        referencia = date.today()  # a mesma para a página inteira
         for i, card in enumerate(cards):
             try:
-                # Busca todos os elementos de texto do card
-                text_elements = card.query_selector_all(".bubble-element.Text")
+                # Todos os elementos de texto do card
+                text_elements = card["textos"]
                 
                 if len(text_elements) < 3:  # Precisa ter pelo menos título, data e local
                     continue
@@ -97,7 +125,7 @@ def coletar_eventos_central(page):
                 
                 for j, text_el in enumerate(text_elements):
                     try:
-                        texto = limpar_texto(text_el.inner_text())
+                        texto = limpar_texto(text_el)
                         
                         if not texto:
                             continue
@@ -124,10 +152,10 @@ def coletar_eventos_central(page):
                 
                 # Se não conseguiu identificar título, pega o primeiro texto
                 if not titulo and text_elements:
-                    titulo = limpar_texto(text_elements[0].inner_text())
+                    titulo = limpar_texto(text_elements[0])
                 
                 # Processa a data
-                data_obj, data_formatada = processar_data_central(data_raw)
+                data_obj, data_formatada = interpretar_data(data_raw, referencia)
                 if not data_obj:
                     continue
                 
@@ -169,7 +197,7 @@ def coletar_eventos_central(page):
     
     return eventos
 
-def extrair_central_corrida(max_tentativas=3):
+async def extrair_central_corrida_async(max_tentativas=3):
     """Extrai eventos da Central da Corrida"""
     eventos = []
     
@@ -177,36 +205,31 @@ def extrair_central_corrida(max_tentativas=3):
         try:
             print(f"🔎 Central da Corrida - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                
-                # Aguarda carregar
-                page.route("**/*.{png,jpg,jpeg,gif,svg,webp}", lambda route: route.abort())
+            async with sessao_navegador("Central Corrida") as sessao:
+                page = await sessao.nova_pagina()
                 
                 try:
                     print("📄 Carregando Central da Corrida...")
-                    page.goto("https://centraldacorrida.com.br/", timeout=60000)
-                    
-                    # Aguarda a página carregar (é uma SPA com Bubble.io)
-                    time.sleep(8)  # Bubble.io precisa de mais tempo para carregar
-                    
-                    # Aguarda os cards aparecerem
-                    try:
-                        page.wait_for_selector(".clickable-element.bubble-element.Group", timeout=20000)
-                    except TimeoutError:
-                        print("   ⚠️ Cards não carregaram no tempo esperado")
-                        browser.close()
-                        continue
-                    
-                    # Faz scroll infinito para carregar todos os eventos
-                    total_cards = fazer_scroll_infinito(page, max_scrolls=50)
-                    
-                    # Coleta todos os eventos
-                    print(f"🔄 Processando {total_cards} cards em busca de eventos válidos...")
-                    eventos = coletar_eventos_central(page)
-                    
-                    browser.close()
+                    async with capturar_json(page, PADROES_API_BUBBLE, mapear_api_central) as captura:
+                        await navegar(page, "https://centraldacorrida.com.br/", timeout=60000)
+                        
+                        # Com os dados chegando pela API, não é preciso esperar a renderização dos cards
+                        if await captura.aguardar(timeout=20, quietude=1.0) and await captura.eventos():
+                            await fazer_scroll_infinito(page, max_scrolls=50, captura=captura)
+                            eventos = await captura.eventos()
+                            print(f"   📡 {len(eventos)} eventos lidos de {len(captura.payloads)} respostas da API")
+                        else:
+                            # Fallback: aguarda os cards e o Bubble.io terminar as requisições de dados
+                            if not await aguardar_carregamento(page, ".clickable-element.bubble-element.Group", timeout=20, quietude=1.0):
+                                print("   ⚠️ Cards não carregaram no tempo esperado")
+                                continue
+                            
+                            # Faz scroll infinito para carregar todos os eventos
+                            total_cards = await fazer_scroll_infinito(page, max_scrolls=50)
+                            
+                            # Coleta todos os eventos
+                            print(f"🔄 Processando {total_cards} cards em busca de eventos válidos...")
+                            eventos = await coletar_eventos_central(page)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -231,7 +254,6 @@ def extrair_central_corrida(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -240,4 +262,8 @@ def extrair_central_corrida(max_tentativas=3):
                 print("💀 Central da Corrida falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_central_corrida(max_tentativas=3):
+    """Extrai eventos da Central da Corrida (entrada síncrona)"""
+    return executar_sync(extrair_central_corrida_async(max_tentativas))
@@ -0,0 +1,218 @@
+import re
+from functools import lru_cache
+
+# Configurações
+LIMIAR_CORRIDA = 0.5  # pontuação mínima para o evento contar como corrida
+TAMANHO_CACHE = 4096  # textos normalizados guardados (categorias e títulos se repetem entre páginas)
+
+# Termo -> peso. Casamento por palavra inteira, sem acento e sem caixa ('run' não casa 'brunch')
+TERMOS_CORRIDA = {
+    "corrida": 1.0, "corridas": 1.0, "corrida de rua": 1.5, "maratona": 1.0, "meia maratona": 1.5,
+    "ultramaratona": 1.0, "maratonas": 1.0, "marathon": 1.0, "half marathon": 1.5,
+    "run": 1.0, "running": 1.0, "runners": 1.0, "night run": 1.5, "day run": 1.5, "street run": 1.5,
+    "trail": 1.0, "trail run": 1.5, "trail running": 1.5, "corridas de montanha": 1.5,
+    "atletismo": 1.0, "cooper": 1.0, "trote": 1.0, "rustica": 1.0, "caminhada": 1.0,
+    "treinao": 0.8, "evento de corrida": 1.5, "corridinha": 1.0, "corridao": 1.0, "runner": 1.0,
+    "race": 1.0, "night race": 1.5, "backyard": 1.0, "ultra": 0.8, "cross urbano": 1.0,
+    "corre": 0.8, "correndo": 0.8, "corredores": 0.5, "volta": 0.5, "sao silvestre": 1.0,
+}
+# Termos e padrões abaixo deste peso são fracos ('volta', 'ultra', 'corre', '10k'): só contam quando o evento
+# também tem um termo forte (sozinhos, 'Volta às aulas' e 'R$ 10k em prêmios' passariam do limiar)
+PESO_TERMO_FORTE = 1.0
+# Padrões além dos termos fixos -> peso
+PADROES_CORRIDA = {
+    "distancia": (r"\d+(?:[.,]\d+)?\s?km?", 0.8),  # '5k', '10 km', '21,1km' (um 'km' solto não conta)
+    "colado": (r"[a-z]{3,}(?:run(?:ners?)?|trail)", 1.0),  # 'GardenRun', 'HALLORUN', 'ANAJATRAIL'
+}
+
+# Sempre descontam, mesmo com 'corrida' no título
+TERMOS_EXCLUSAO = {
+    # Outro tipo de evento que só fala de corrida
+    "workshop": 1.5, "curso": 1.5, "palestra": 1.5, "congresso": 1.5, "seminario": 1.5, "simposio": 1.5,
+    "webinar": 1.5, "mentoria": 1.5, "brunch": 1.5, "jantar": 1.0, "feira": 1.0,
+    # Esporte a motor: aí 'corrida' é a prova de carro/moto
+    "kart": 1.5, "motociclismo": 1.5, "automobilismo": 1.5, "mini cooper": 1.5,
+}
+# Outros esportes e clubes: só descontam quando o título não traz um termo forte de corrida
+# ('Pedal e Corrida Solidária', 'Corrida do Flamengo Futebol Clube' continuam corrida)
+TERMOS_OUTROS_ESPORTES = {
+    "ciclismo": 1.0, "ciclistico": 1.0, "ciclistica": 1.0, "pedal": 1.0, "bike": 1.0, "mtb": 1.0,
+    "mountain bike": 1.0, "natacao": 1.0, "futebol": 1.0, "volei": 1.0, "beach tennis": 1.0, "xadrez": 1.0,
+    "cavalgada": 1.0,
+}
+
+# Peso de cada campo do card na pontuação
+PESOS_CAMPOS = {"titulo": 1.0, "tag": 1.0, "url": 0.8}
+
+# Por fonte: pesos dos campos (o que cada site põe em 'tag' varia) e termos próprios
+PERFIS = {
+    "Even3": {"pesos": {"titulo": 1.0, "url": 0.8}},
+    "Doity": {"pesos": {"titulo": 1.0, "tag": 2.0}},  # a tag de categoria é a informação mais confiável
+    "TimeTicket": {
+        "pesos": {"titulo": 1.0, "tag": 0.7},  # tag = descrição do evento
+        # O TimeTicket também vende travessias e provas de bike, que o catálogo quer manter
+        "incluir": {"travessia": 1.0, "mountain bike": 1.0, "mtb": 1.0, "bike": 1.0},
+    },
+    "YouMovin": {"pesos": {"titulo": 1.0, "tag": 2.0}, "incluir_tag": {"aventura": 1.0}},
+    "MinhasInscricoes": {"pesos": {"titulo": 1.0, "tag": 2.0}},
+}
+
+# Acentos do português (o resto que não é letra/número vira espaço)
+_SEM_ACENTO = str.maketrans("áàâãäéèêëíìîïóòôõöúùûüçñªº", "aaaaaeeeeiiiiooooouuuucnao")
+_RE_LETRA_NUMERO = re.compile(r"([a-z])(\d)")
+_RE_SEPARADORES = re.compile(r"[^a-z0-9.,]+")
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def normalizar(texto):
+    """Minúsculas, sem acento e só letras/números separados por espaço (URLs viram palavras)"""
+    texto = (texto or "").lower().translate(_SEM_ACENTO)
+    texto = _RE_LETRA_NUMERO.sub(r"\1 \2", texto)  # 'corrida153' -> 'corrida 153', 'igt23k' -> 'igt 23k'
+    return _RE_SEPARADORES.sub(" ", texto).strip()
+
+def _alternativa(termos):
+    """
+    Alternância em forma de árvore de prefixos ('corrida|corridao|corre' -> 'corr(?:e|ida(?:o)?)'):
+    o regex decide por prefixo comum em vez de testar termo a termo
+    """
+    arvore = {}
+    for termo in termos:
+        no = arvore
+        for letra in termo:
+            no = no.setdefault(letra, {})
+        no[""] = {}  # fim de termo
+
+    def montar(no):
+        fim = "" in no
+        ramos = [re.escape(letra) + montar(filho) for letra, filho in sorted(no.items()) if letra]
+        if not ramos:
+            return ""
+        corpo = ramos[0] if len(ramos) == 1 else "(?:" + "|".join(ramos) + ")"
+        if fim:
+            return ("(?:" + corpo + ")?") if len(ramos) == 1 else corpo + "?"
+        return corpo
+
+    return montar(arvore)
+
+def _compilar(termos, padroes=None):
+    """
+    Um único regex com todos os termos e padrões, em limites de palavra. Cada alternativa é um
+    grupo nomeado: 'termo' ou o nome do padrão
+    """
+    alternativas = ["(?P<termo>" + _alternativa(termos) + ")"]
+    for nome, (padrao, _) in (padroes or {}).items():
+        alternativas.append(f"(?P<{nome}>{padrao})")
+    return re.compile(r"(?<![a-z0-9])(?:" + "|".join(alternativas) + r")(?![a-z0-9])")
+
+def _tipo_inclusao(peso):
+    """0 para termo forte, 1 para fraco (índices do resultado de _pontuar_campo)"""
+    return 0 if peso >= PESO_TERMO_FORTE else 1
+
+class ClassificadorCorrida:
+    """
+    Decide se um evento é de corrida pela soma ponderada dos termos de inclusão menos os de
+    exclusão encontrados no título, na tag/categoria e na URL. Termos fracos só somam quando
+    algum campo tem um termo forte, e os de outros esportes só descontam quando o título não
+    tem um. Todos os termos viram um regex só por campo, compilado uma vez por perfil
+    """
+
+    def __init__(self, incluir=None, excluir=None, pesos=None, incluir_tag=None, limiar=LIMIAR_CORRIDA):
+        self.incluir = dict(TERMOS_CORRIDA, **(incluir or {}))
+        # Um termo que a fonte inclui explicitamente deixa de excluir
+        self.excluir = {t: p for t, p in dict(TERMOS_EXCLUSAO, **(excluir or {})).items() if t not in self.incluir}
+        self.outros_esportes = {t: p for t, p in TERMOS_OUTROS_ESPORTES.items()
+                                if t not in self.incluir and t not in self.excluir}
+        self.incluir_tag = dict(self.incluir, **(incluir_tag or {}))
+        self.pesos = pesos or PESOS_CAMPOS
+        self.limiar = limiar
+        # Termo -> (índice no resultado do campo, peso): 0 inclusão forte, 1 inclusão fraca, 2 exclusão,
+        # 3 outro esporte; um conjunto para título/url e outro para a tag
+        exclusoes = {t: (2, p) for t, p in self.excluir.items()}
+        exclusoes.update((t, (3, p)) for t, p in self.outros_esportes.items())
+        self._termos = dict({t: (_tipo_inclusao(p), p) for t, p in self.incluir.items()}, **exclusoes)
+        self._termos_tag = dict({t: (_tipo_inclusao(p), p) for t, p in self.incluir_tag.items()}, **exclusoes)
+        self._re = _compilar(self._termos, PADROES_CORRIDA)
+        self._re_tag = _compilar(self._termos_tag, PADROES_CORRIDA)
+        # (peso, regex, termos) de título, tag e url, na ordem dos argumentos
+        self._campos = [(self.pesos.get(campo, 0.0), regex, termos) for campo, regex, termos in (
+            ("titulo", self._re, self._termos), ("tag", self._re_tag, self._termos_tag), ("url", self._re, self._termos))]
+        self._cache = {}  # (campo, texto) -> resultado de _pontuar_campo
+
+    def _pontuar_campo(self, texto, regex, termos):
+        """
+        (inclusão forte, inclusão fraca, exclusão, outros esportes) do texto (cada termo conta uma
+        vez por campo; os padrões são fortes ou fracos pelo peso, como os termos)
+        """
+        encontrados = {}
+        for m in regex.finditer(normalizar(texto)):
+            grupo = m.lastgroup
+            if grupo == "termo":
+                encontrados[m.group()] = termos[m.group()]
+            else:
+                peso = PADROES_CORRIDA[grupo][1]
+                encontrados[m.group()] = (_tipo_inclusao(peso), peso)
+        somas = [0.0, 0.0, 0.0, 0.0]
+        for tipo, peso in encontrados.values():
+            somas[tipo] += peso
+        return tuple(somas)
+
+    def _campo(self, indice, texto):
+        """Resultado do campo guardado por texto (títulos e categorias se repetem entre páginas e execuções)"""
+        chave = (indice, texto)
+        resultado = self._cache.get(chave)
+        if resultado is None:
+            if len(self._cache) >= TAMANHO_CACHE:
+                self._cache.clear()
+            _, regex, termos = self._campos[indice]
+            resultado = self._cache[chave] = self._pontuar_campo(texto, regex, termos)
+        return resultado
+
+    def pontuar(self, titulo, tag="", url=""):
+        """Pontuação do evento (>= limiar é corrida)"""
+        pontos = fracos = esportes = 0.0
+        forte = titulo_forte = False
+        for indice, texto in enumerate((titulo, tag, url)):
+            peso = self._campos[indice][0]
+            if not (peso and texto):
+                continue
+            inclusao, fraca, exclusao, esporte = self._campo(indice, texto)
+            pontos += peso * (inclusao - exclusao)
+            fracos += peso * fraca
+            esportes += peso * esporte
+            forte = forte or inclusao > 0
+            titulo_forte = titulo_forte or (indice == 0 and inclusao > 0)
+        if forte:
+            pontos += fracos
+        return pontos if titulo_forte else pontos - esportes
+
+    def eh_corrida(self, titulo, tag="", url=""):
+        return bool(titulo) and self.pontuar(titulo, tag, url) >= self.limiar
+
+    def classificar(self, eventos):
+        """
+        Lote: [(titulo, tag, url)] ou [{'titulo', 'tag', 'url'}] -> [bool]. A pontuação de cada
+        texto vem do cache do classificador (a mesma categoria se repete em quase todos os cards)
+        """
+        resultados = []
+        for evento in eventos:
+            if isinstance(evento, dict):
+                evento = (evento.get("titulo"), evento.get("tag", ""), evento.get("url", ""))
+            resultados.append(self.eh_corrida(*evento))
+        return resultados
+
+_classificadores = {}
+
+def classificador(fonte=None):
+    """Classificador da fonte (perfil em PERFIS; padrão para as demais), compilado uma vez só"""
+    if fonte not in _classificadores:
+        _classificadores[fonte] = ClassificadorCorrida(**PERFIS.get(fonte, {}))
+    return _classificadores[fonte]
+
+def limpar_cache():
+    """Esvazia o cache de textos normalizados e os resultados por campo (benchmarks)"""
+    normalizar.cache_clear()
+    for c in _classificadores.values():
+        c._cache.clear()
+
+def eh_evento_de_corrida(titulo, tag="", url="", fonte=None):
+    """Atalho para um evento avulso"""
+    return classificador(fonte).eh_corrida(titulo, tag, url)
@@ -1,8 +1,12 @@
-import time
 import hashlib
 import re
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import contar_elementos, aguardar_carregamento, aguardar_mudanca_contagem
+from .datas import interpretar_datas
+from .telemetria import cronometrar
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,62 +21,24 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para não quebrar CSV
     return texto
 
-def processar_data_corridao(dia_str, mes_str):
-    """Processa data do formato Corridão: dia='09', mês='Ago' -> '09/08/2025'"""
-    if not dia_str or not mes_str:
-        return None, None
-    
-    # Mapeia meses em português (abreviado)
-    meses = {
-        'jan': '01', 'fev': '02', 'mar': '03', 'abr': '04',
-        'mai': '05', 'jun': '06', 'jul': '07', 'ago': '08',
-        'set': '09', 'out': '10', 'nov': '11', 'dez': '12'
-    }
-    
-    try:
-        dia = dia_str.strip().zfill(2)
-        mes_texto = mes_str.strip().lower()
-        mes_num = meses.get(mes_texto, '01')
-        
-        # Assume ano atual ou próximo
-        ano_atual = datetime.now().year
-        data_str_formatada = f"{dia}/{mes_num}/{ano_atual}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            # Se a data já passou, assume ano seguinte
-            if data_obj < datetime.now():
-                data_obj = datetime.strptime(f"{dia}/{mes_num}/{ano_atual + 1}", '%d/%m/%Y')
-                data_str_formatada = f"{dia}/{mes_num}/{ano_atual + 1}"
-            
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
-    except:
-        pass
-    
-    return None, f"{dia_str}/{mes_str}"
-
-def fazer_scroll_completo(page, max_scrolls=50):
+@cronometrar("paginacao")
+async def fazer_scroll_completo(page, max_scrolls=50):
     """Faz scroll até o final da página para carregar todos os eventos"""
     print("🔄 Fazendo scroll para carregar todos os eventos...")
     
     scroll_realizados = 0
     eventos_anteriores = 0
     tentativas_sem_novos = 0
-    max_tentativas_sem_novos = 5
+    max_tentativas_sem_novos = 2
     
     while scroll_realizados < max_scrolls and tentativas_sem_novos < max_tentativas_sem_novos:
         try:
             # Conta eventos atuais
-            cards_atuais = len(page.query_selector_all("a.borda-banner"))
-            
-            # Scroll para baixo
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(2)  # Aguarda carregar novos eventos
+            cards_atuais = await contar_elementos(page, "a.borda-banner")
             
-            # Conta eventos após scroll
-            cards_novos = len(page.query_selector_all("a.borda-banner"))
+            # Scroll para baixo e aguarda novos cards (no máximo 5s)
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            cards_novos = await aguardar_mudanca_contagem(page, "a.borda-banner", cards_atuais, timeout=5)
             
             if cards_novos > eventos_anteriores:
                 eventos_anteriores = cards_novos
@@ -88,39 +54,46 @@ def fazer_scroll_completo(page, max_scrolls=50):
             print(f"   ⚠️ Erro no scroll {scroll_realizados + 1}: {str(e)[:50]}...")
             break
     
-    total_final = len(page.query_selector_all("a.borda-banner"))
+    total_final = await contar_elementos(page, "a.borda-banner")
     print(f"🏁 Scroll finalizado: {total_final} eventos carregados | {scroll_realizados} scrolls realizados")
     return total_final
 
-def coletar_eventos_corridao(page):
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_CORRIDAO = "a.borda-banner"
+CAMPOS_CARD_CORRIDAO = {
+    "titulo": campo(".infotitulo"),
+    "dia": campo(".infodia"),
+    "mes": campo(".infomes"),
+    "local": campo(".infolocalcity"),
+    "href": campo(atributo="href"),  # o próprio card é o link
+}
+
+@cronometrar("parse")
+async def coletar_eventos_corridao(page):
     """Coleta eventos de corrida do Corridão.com"""
     eventos = []
     
     try:
-        # Seleciona todos os cards de evento
-        cards = page.query_selector_all("a.borda-banner")
+        # Extrai todos os cards de evento de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_CORRIDAO, CAMPOS_CARD_CORRIDAO)
         print(f"   📦 {len(cards)} cards encontrados para processamento")
         
+        # Todas as datas da página de uma vez, contra a mesma data de referência
+        datas = interpretar_datas([f"{card['dia']} {card['mes']}" if card["dia"] and card["mes"] else None
+                                   for card in cards])
         for i, card in enumerate(cards):
             try:
                 # Título
-                titulo_el = card.query_selector(".infotitulo")
-                titulo = limpar_texto(titulo_el.inner_text()) if titulo_el else ""
+                titulo = limpar_texto(card["titulo"])
                 
                 if not titulo:
                     continue
                 
                 # Data (dia e mês separados)
-                dia_el = card.query_selector(".infodia")
-                mes_el = card.query_selector(".infomes")
-                
-                if not dia_el or not mes_el:
+                if card["dia"] is None or card["mes"] is None:
                     continue
                 
-                dia_str = dia_el.inner_text().strip() if dia_el else ""
-                mes_str = mes_el.inner_text().strip() if mes_el else ""
-                
-                data_obj, data_formatada = processar_data_corridao(dia_str, mes_str)
+                data_obj, data_formatada = datas[i]
                 if not data_obj:
                     continue
                 
@@ -129,11 +102,10 @@ def coletar_eventos_corridao(page):
                     continue
                 
                 # Local
-                local_el = card.query_selector(".infolocalcity")
-                local = limpar_texto(local_el.inner_text()) if local_el else "Local não informado"
+                local = limpar_texto(card["local"]) if card["local"] is not None else "Local não informado"
                 
                 # Link
-                href = card.get_attribute("href")
+                href = card["href"]
                 link = ""
                 if href:
                     link = href if href.startswith("http") else f"https://www.corridao.com.br{href}"
@@ -169,7 +141,7 @@ def coletar_eventos_corridao(page):
     
     return eventos
 
-def extrair_corridao(max_tentativas=3):
+async def extrair_corridao_async(max_tentativas=3):
     """Extrai eventos de corrida do Corridão.com"""
     eventos = []
     
@@ -177,36 +149,27 @@ def extrair_corridao(max_tentativas=3):
         try:
             print(f"🔎 Corridão.com - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("Corridão.com") as sessao:
+                page = await sessao.nova_pagina()
                 
                 # URL do Corridão
                 url = "https://www.corridao.com.br/"
                 
                 try:
                     print("📄 Carregando Corridão.com...")
-                    page.goto(url, timeout=60000)
-                    
-                    # Aguarda a página carregar completamente
-                    time.sleep(5)
+                    await navegar(page, url, timeout=60000)
                     
-                    # Aguarda os cards aparecerem
-                    try:
-                        page.wait_for_selector("a.borda-banner", timeout=20000)
-                    except TimeoutError:
+                    # Aguarda os cards aparecerem e a rede sossegar
+                    if not await aguardar_carregamento(page, "a.borda-banner", timeout=20):
                         print("   ⚠️ Cards não carregaram no tempo esperado")
-                        browser.close()
                         continue
                     
                     # Faz scroll completo para carregar todos os eventos
-                    total_cards = fazer_scroll_completo(page, max_scrolls=50)
+                    total_cards = await fazer_scroll_completo(page, max_scrolls=50)
                     
                     # Agora coleta todos os eventos de uma vez
                     print(f"🔄 Processando {total_cards} eventos...")
-                    eventos = coletar_eventos_corridao(page)
-                    
-                    browser.close()
+                    eventos = await coletar_eventos_corridao(page)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -231,7 +194,6 @@ def extrair_corridao(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -240,4 +202,8 @@ def extrair_corridao(max_tentativas=3):
                 print("💀 Corridão.com falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_corridao(max_tentativas=3):
+    """Extrai eventos de corrida do Corridão.com (entrada síncrona)"""
+    return executar_sync(extrair_corridao_async(max_tentativas))
@@ -1,8 +1,13 @@
-import time
 import hashlib
 import re
-from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from datetime import date, datetime
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import contar_elementos, aguardar_carregamento, aguardar_mudanca_contagem
+from .interceptacao import capturar_json, encontrar_registros, valor, converter_data_api
+from .datas import interpretar_data
+from .telemetria import cronometrar
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,30 +22,6 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para não quebrar CSV
     return texto
 
-def processar_data_cronoschip(data_str):
-    """Processa data do formato Cronoschip: '17/08/2025'"""
-    if not data_str:
-        return None, None
-    
-    # Remove ícones e texto extra, mantém só a data
-    data_limpa = re.sub(r'^.*?(\d{2}/\d{2}/\d{4}).*$', r'\1', data_str.strip())
-    
-    # Padrão: "17/08/2025"
-    padrao = r'(\d{2})/(\d{2})/(\d{4})'
-    match = re.search(padrao, data_limpa)
-    
-    if match:
-        dia, mes, ano = match.groups()
-        data_str_formatada = f"{dia}/{mes}/{ano}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
-    
-    return None, data_str
-
 def processar_local_cronoschip(local_str):
     """Processa local removendo ícone de mapa"""
     if not local_str:
@@ -50,23 +31,21 @@ def processar_local_cronoschip(local_str):
     local_limpo = re.sub(r'^.*?([A-ZÁÊÇ].+)$', r'\1', local_str.strip())
     return limpar_texto(local_limpo)
 
-def aguardar_carregamento_ajax(page, max_tentativas=30):
+@cronometrar("espera")
+async def aguardar_carregamento_ajax(page, max_tentativas=30):
     """Aguarda todos os eventos carregarem via AJAX"""
     print("🔄 Aguardando carregamento completo via AJAX...")
     
     tentativa = 0
     ultimo_total = 0
     tentativas_sem_mudanca = 0
-    max_tentativas_sem_mudanca = 5
+    max_tentativas_sem_mudanca = 2
     
     while tentativa < max_tentativas and tentativas_sem_mudanca < max_tentativas_sem_mudanca:
         try:
-            # Scroll para o final da página para garantir que tudo carregue
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(2)
-            
-            # Conta cards atuais
-            cards_atuais = len(page.query_selector_all(".item-app"))
+            # Scroll para o final da página e espera novos cards via AJAX (no máximo 5s)
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            cards_atuais = await aguardar_mudanca_contagem(page, ".item-app", ultimo_total, timeout=5)
             
             if cards_atuais > ultimo_total:
                 ultimo_total = cards_atuais
@@ -77,37 +56,86 @@ def aguardar_carregamento_ajax(page, max_tentativas=30):
                 print(f"   ⏳ Tentativa {tentativa + 1}: Sem novos eventos ({tentativas_sem_mudanca}/{max_tentativas_sem_mudanca})")
             
             tentativa += 1
-            time.sleep(3)  # Aguarda mais AJAX
             
         except Exception as e:
             print(f"   ⚠️ Erro na tentativa {tentativa + 1}: {str(e)[:50]}...")
             break
     
-    total_final = len(page.query_selector_all(".item-app"))
+    total_final = await contar_elementos(page, ".item-app")
     print(f"🏁 Carregamento AJAX finalizado: {total_final} eventos | {tentativa} tentativas realizadas")
     return total_final
 
-def coletar_eventos_cronoschip(page):
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_CRONOSCHIP = ".item-app"
+CAMPOS_CARD_CRONOSCHIP = {
+    "titulo": campo(".item-app-header h5"),
+    "conteudo": campo(".item-app-content"),  # data e local estão juntos
+    "conteudo_html": campo(".item-app-content", html=True),
+    "href": campo("a.theme-button", atributo="href"),
+}
+
+# Chamadas AJAX que preenchem a lista de provas (respostas em HTML são ignoradas pela captura)
+PADROES_API_CRONOSCHIP = [
+    r"cronoschip\.com\.br/(api|ajax)/",
+    r"cronoschip\.com\.br/provas/(listar|lista|carregar|buscar)",
+]
+
+def mapear_api_cronoschip(dados):
+    """Converte o JSON da lista de provas do Cronoschip em eventos"""
+    eventos = []
+    chaves_data = ("data_prova", "dataProva", "data_evento", "dataEvento", "data_inicio")
+    for registro in encontrar_registros(dados, chaves_data):
+        titulo = limpar_texto(str(valor(registro, "nome", "titulo", "nome_prova", "title") or ""))
+        if len(titulo) < 3:
+            continue
+        
+        data_bruta = valor(registro, *chaves_data)
+        data_obj, data_formatada = interpretar_data(str(data_bruta))
+        if not data_obj:
+            data_obj, data_formatada = converter_data_api(data_bruta)
+        if not data_obj or data_obj < datetime.now():
+            continue
+        
+        cidade = valor(registro, "cidade", "local") or ""
+        uf = valor(registro, "uf", "estado") or ""
+        local = processar_local_cronoschip(" - ".join(str(p) for p in (cidade, uf) if p))
+        
+        href = str(valor(registro, "url", "link", "slug") or "")
+        link = href if href.startswith("http") else f"https://cronoschip.com.br/{href.lstrip('/')}" if href else ""
+        
+        eventos.append({
+            "titulo": titulo,
+            "data": data_formatada,
+            "local": local,
+            "link": link,
+            "hash": gerar_hash_evento(titulo, data_formatada, local),
+            "fonte": "Cronoschip",
+            "data_obj": data_obj
+        })
+    return eventos
+
+@cronometrar("parse")
+async def coletar_eventos_cronoschip(page):
     """Coleta eventos de corrida do Cronoschip"""
     eventos = []
     
     try:
-        # Seleciona todos os cards de evento
-        cards = page.query_selector_all(".item-app")
+        # Extrai todos os cards de evento de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_CRONOSCHIP, CAMPOS_CARD_CRONOSCHIP)
         print(f"   📦 {len(cards)} cards encontrados para processamento")
         
+        referencia = date.today()  # a mesma para a página inteira
         for i, card in enumerate(cards):
             try:
                 # Título
-                titulo_el = card.query_selector(".item-app-header h5")
-                titulo = limpar_texto(titulo_el.inner_text()) if titulo_el else ""
+                titulo = limpar_texto(card["titulo"])
                 
                 if not titulo:
                     continue
                 
                 # Conteúdo do card (data e local estão juntos)
-                content_el = card.query_selector(".item-app-content")
-                content_text = content_el.inner_text() if content_el else ""
+                content_text = card["conteudo"] or ""
+                content_html = card["conteudo_html"] or ""
                 
                 if not content_text:
                     continue
@@ -119,15 +147,15 @@ def coletar_eventos_cronoschip(page):
                 
                 for linha in linhas:
                     linha = linha.strip()
-                    if "fa-calendar" in content_el.get_attribute('innerHTML') and "/" in linha:
+                    if "fa-calendar" in content_html and "/" in linha:
                         # Linha com data
                         data_raw = linha
-                    elif "fa-map-marker" in content_el.get_attribute('innerHTML') and " - " in linha:
+                    elif "fa-map-marker" in content_html and " - " in linha:
                         # Linha com local
                         local_raw = linha
                 
                 # Processa a data
-                data_obj, data_formatada = processar_data_cronoschip(data_raw)
+                data_obj, data_formatada = interpretar_data(data_raw, referencia)
                 if not data_obj:
                     continue
                 
@@ -139,12 +167,10 @@ def coletar_eventos_cronoschip(page):
                 local = processar_local_cronoschip(local_raw)
                 
                 # Link
-                link_el = card.query_selector("a.theme-button")
                 link = ""
-                if link_el:
-                    href = link_el.get_attribute("href")
-                    if href:
-                        link = href if href.startswith("http") else f"https://cronoschip.com.br/{href}"
+                href = card["href"]
+                if href:
+                    link = href if href.startswith("http") else f"https://cronoschip.com.br/{href}"
                 
                 # Validações básicas
                 if len(titulo.strip()) < 3:
@@ -177,7 +203,7 @@ def coletar_eventos_cronoschip(page):
     
     return eventos
 
-def extrair_cronoschip(max_tentativas=3):
+async def extrair_cronoschip_async(max_tentativas=3):
     """Extrai eventos de corrida do Cronoschip"""
     eventos = []
     
@@ -185,36 +211,35 @@ def extrair_cronoschip(max_tentativas=3):
         try:
             print(f"🔎 Cronoschip - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("Cronoschip.com") as sessao:
+                page = await sessao.nova_pagina()
                 
                 # URL do calendário do Cronoschip
                 url = "https://cronoschip.com.br/provas"
                 
                 try:
                     print("📄 Carregando Cronoschip...")
-                    page.goto(url, timeout=60000)
-                    
-                    # Aguarda a página carregar completamente
-                    time.sleep(5)
-                    
-                    # Aguarda o JavaScript carregar os eventos
-                    try:
-                        page.wait_for_selector(".item-app", timeout=20000)
-                    except TimeoutError:
-                        print("   ⚠️ Cards não carregaram no tempo esperado")
-                        browser.close()
-                        continue
-                    
-                    # Aguarda carregamento completo via AJAX
-                    total_cards = aguardar_carregamento_ajax(page, max_tentativas=30)
-                    
-                    # Agora coleta todos os eventos de uma vez
-                    print(f"🔄 Processando {total_cards} eventos...")
-                    eventos = coletar_eventos_cronoschip(page)
+                    async with capturar_json(page, PADROES_API_CRONOSCHIP, mapear_api_cronoschip) as captura:
+                        await navegar(page, url, timeout=60000)
+                        
+                        # Se a lista vier em JSON, dispensa a espera dos cards e o scroll
+                        if await captura.aguardar(timeout=20, quietude=1.0):
+                            eventos = await captura.eventos()
+                            if eventos:
+                                print(f"   📡 {len(eventos)} eventos lidos de {len(captura.payloads)} respostas da API")
                     
-                    browser.close()
+                    if not eventos:
+                        # Fallback: aguarda o JavaScript carregar os eventos e a rede sossegar
+                        if not await aguardar_carregamento(page, ".item-app", timeout=20):
+                            print("   ⚠️ Cards não carregaram no tempo esperado")
+                            continue
+                        
+                        # Aguarda carregamento completo via AJAX
+                        total_cards = await aguardar_carregamento_ajax(page, max_tentativas=30)
+                        
+                        # Agora coleta todos os eventos de uma vez
+                        print(f"🔄 Processando {total_cards} eventos...")
+                        eventos = await coletar_eventos_cronoschip(page)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -239,7 +264,6 @@ def extrair_cronoschip(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -248,4 +272,8 @@ def extrair_cronoschip(max_tentativas=3):
                 print("💀 Cronoschip falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_cronoschip(max_tentativas=3):
+    """Extrai eventos de corrida do Cronoschip (entrada síncrona)"""
+    return executar_sync(extrair_cronoschip_async(max_tentativas))
@@ -0,0 +1,141 @@
+import re
+import unicodedata
+from datetime import date, datetime
+from functools import lru_cache
+
+# Configurações
+TAMANHO_CACHE = 8192  # textos brutos distintos lembrados (por data de referência)
+
+MESES = {
+    "jan": 1, "janeiro": 1, "fev": 2, "fevereiro": 2, "mar": 3, "marco": 3, "abr": 4, "abril": 4,
+    "mai": 5, "maio": 5, "jun": 6, "junho": 6, "jul": 7, "julho": 7, "ago": 8, "agosto": 8,
+    "set": 9, "setembro": 9, "out": 10, "outubro": 10, "nov": 11, "novembro": 11, "dez": 12, "dezembro": 12,
+}
+
+# Cada padrão acha uma data (ou um intervalo "13 a 14 de set") em qualquer ponto do texto;
+# dia da semana, horário e ícones em volta são simplesmente ignorados
+_RE_ISO = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+_RE_NUMERICA = re.compile(r"(?<!\d)(\d{1,2})/(\d{1,2})(?:/(\d{4}|\d{2}))?(?![\d/])")
+_RE_POR_EXTENSO = re.compile(
+    r"(?<!\d)(\d{1,2})(?:\s*(?:ao?|e|-|–)\s*(\d{1,2}))?\s*(?:de\s+)?([a-z]{3,9})\b\.?"
+    r"(?:,?\s*(?:de\s+)?(\d{4})\b)?"
+)
+
+def _normalizar(texto):
+    """Minúsculas e sem acentos: 'Março' -> 'marco', 'SÁB' -> 'sab'"""
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii").lower()
+
+def _ano(bruto):
+    if not bruto:
+        return None
+    ano = int(bruto)
+    return ano + 2000 if ano < 100 else ano
+
+def _completar_ano(dia, mes, ano, referencia):
+    """Sem ano explícito vale a próxima ocorrência a partir da referência (hoje ainda é este ano)"""
+    if ano:
+        return date(ano, mes, dia)
+    try:
+        candidata = date(referencia.year, mes, dia)
+        if candidata >= referencia:
+            return candidata
+    except ValueError:  # 29/02 fora de ano bissexto
+        pass
+    return date(referencia.year + 1, mes, dia)
+
+def _datas_no_texto(texto, referencia):
+    """(posição, date) de todas as datas reconhecidas, em ordem de aparição"""
+    encontradas = []
+    ocupado = []
+
+    def livre(inicio, fim):
+        return all(fim <= a or inicio >= b for a, b in ocupado)
+
+    for m in _RE_ISO.finditer(texto):
+        try:
+            encontradas.append((m.start(), date(int(m.group(1)), int(m.group(2)), int(m.group(3)))))
+            ocupado.append(m.span())
+        except ValueError:
+            pass
+
+    for m in _RE_NUMERICA.finditer(texto):
+        if not livre(*m.span()):
+            continue
+        try:
+            encontradas.append((m.start(), _completar_ano(int(m.group(1)), int(m.group(2)),
+                                                          _ano(m.group(3)), referencia)))
+            ocupado.append(m.span())
+        except ValueError:
+            pass
+
+    for m in _RE_POR_EXTENSO.finditer(texto):
+        mes = MESES.get(m.group(3))
+        if not mes or not livre(*m.span()):
+            continue
+        ano = _ano(m.group(4))
+        try:
+            inicio = _completar_ano(int(m.group(1)), mes, ano, referencia)
+            encontradas.append((m.start(), inicio))
+            if m.group(2):
+                fim = date(inicio.year, mes, int(m.group(2)))
+                encontradas.append((m.start() + 1, fim))
+            ocupado.append(m.span())
+        except ValueError:
+            pass
+
+    encontradas.sort(key=lambda x: x[0])
+    return encontradas
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _interpretar(texto, referencia):
+    """
+    Tupla de (data_obj, 'dd/mm/aaaa') do texto bruto, do início ao fim do intervalo.
+    O cache é por (texto, referência): a mesma string vista em outra página ou fonte sai pronta
+    """
+    datas = [d for _, d in _datas_no_texto(_normalizar(texto), referencia)]
+    # Intervalo sem ano na segunda ponta que vira o ano: "30/12 a 02/01"
+    for i in range(1, len(datas)):
+        if datas[i] < datas[i - 1]:
+            try:
+                datas[i] = datas[i].replace(year=datas[i - 1].year + (datas[i].year <= datas[i - 1].year))
+            except ValueError:
+                pass
+    return tuple((datetime(d.year, d.month, d.day), f"{d.day:02d}/{d.month:02d}/{d.year}") for d in datas)
+
+def _referencia(referencia=None):
+    if referencia is None:
+        return date.today()
+    return referencia.date() if isinstance(referencia, datetime) else referencia
+
+def interpretar_data(texto, referencia=None):
+    """
+    Primeira data do texto bruto em (data_obj, 'dd/mm/aaaa'), ou (None, None).
+    Reconhece '05 de Out', '09 AGO 2025', 'domingo, 7 de setembro de 2025', '07 Junho 2026',
+    '14/09 - Domingo', 'Sab - 20/09/2025', '10/08/2025 - 06:30', '2025-08-16' e intervalos
+    ('13 a 14 de set', '2025-08-16/2025-08-17'). Sem ano, vale a próxima ocorrência a partir
+    de `referencia` (padrão: hoje)
+    """
+    if not texto:
+        return None, None
+    datas = _interpretar(str(texto), _referencia(referencia))
+    return datas[0] if datas else (None, None)
+
+def interpretar_datas(textos, referencia=None):
+    """Lote (uma página de cards): todos os textos contra a mesma data de referência"""
+    referencia = _referencia(referencia)
+    resultados = []
+    for texto in textos:
+        datas = _interpretar(str(texto), referencia) if texto else ()
+        resultados.append(datas[0] if datas else (None, None))
+    return resultados
+
+def interpretar_periodo(texto, referencia=None):
+    """(início, fim) como data_obj; evento de um dia só tem início == fim. (None, None) se não achar"""
+    datas = _interpretar(str(texto), _referencia(referencia)) if texto else ()
+    if not datas:
+        return None, None
+    return datas[0][0], datas[-1][0]
+
+def limpar_cache():
+    """Esquece os textos já interpretados (benchmarks a frio)"""
+    _interpretar.cache_clear()
@@ -0,0 +1,200 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+from .har import diretorio_reproducao
+from .telemetria import cronometrar, medir
+
+# Configurações
+PAGINAS_DETALHE_PADRAO = 4  # páginas abertas ao mesmo tempo para páginas de detalhe
+INTERVALO_POR_HOST_PADRAO = 0.25  # segundos mínimos entre inícios de requisição ao mesmo host
+CACHE_DIR = os.path.join("data", "cache")
+TTL_CACHE_PADRAO = 7 * 24 * 3600  # segundos até um detalhe ser buscado de novo
+MAX_ENTRADAS_CACHE = 5000  # acima disso os menos usados recentemente são descartados
+# Exporte KADENCE_ATUALIZAR_DETALHES=1 (ou use --refresh-details) para ignorar o cache nesta execução
+VARIAVEL_ATUALIZAR = "KADENCE_ATUALIZAR_DETALHES"
+
+class LimitadorTaxa:
+    """Espaça o início das requisições a cada host em pelo menos `intervalo` segundos"""
+
+    def __init__(self, intervalo=INTERVALO_POR_HOST_PADRAO):
+        self.intervalo = intervalo
+        self._proximo = {}  # host -> instante liberado para a próxima requisição
+        self._trava = asyncio.Lock()
+
+    async def aguardar(self, url):
+        host = urlsplit(url).hostname or ""
+        async with self._trava:
+            agora = time.monotonic()
+            liberado = max(agora, self._proximo.get(host, 0.0))
+            self._proximo[host] = liberado + self.intervalo
+        if liberado > agora:
+            with medir("pausa"):
+                await asyncio.sleep(liberado - agora)
+
+def impressao_digital(campos):
+    """Hash estável dos campos extraídos (mostra se o conteúdo mudou entre duas buscas)"""
+    serializado = json.dumps(campos, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(serializado.encode()).hexdigest()[:16]
+
+class CacheDetalhes:
+    """
+    Cache em disco dos detalhes extraídos, por URL: campos, data da busca e impressão digital.
+    Entradas vencem após `ttl` segundos; acima de `max_entradas` sai a usada há mais tempo
+    """
+
+    def __init__(self, nome, ttl=TTL_CACHE_PADRAO, max_entradas=MAX_ENTRADAS_CACHE,
+                 diretorio=CACHE_DIR, ignorar_existentes=None):
+        self.caminho = os.path.join(diretorio, f"detalhes_{nome}.json")
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        if ignorar_existentes is None:
+            ignorar_existentes = os.environ.get(VARIAVEL_ATUALIZAR) == "1"
+        self.ignorar_existentes = ignorar_existentes
+        self.entradas = self._carregar()
+        self.acertos = 0
+        self.buscados = 0
+        self.alterados = 0
+        self.descartados = 0
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            return dados if isinstance(dados, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️ Cache de detalhes ilegível ({self.caminho}): {str(e)[:50]} - recomeçando vazio")
+            return {}
+
+    def obter(self, url):
+        """Campos em cache ainda válidos para a URL, ou None"""
+        if self.ignorar_existentes:
+            return None
+        entrada = self.entradas.get(url)
+        if not entrada or time.time() - entrada["buscado_em"] > self.ttl:
+            return None
+        entrada["usado_em"] = time.time()
+        self.acertos += 1
+        return entrada["campos"]
+
+    def guardar(self, url, campos):
+        agora = time.time()
+        impressao = impressao_digital(campos)
+        anterior = self.entradas.get(url)
+        if anterior and anterior.get("impressao") != impressao:
+            self.alterados += 1
+        self.buscados += 1
+        self.entradas[url] = {"campos": campos, "buscado_em": agora, "usado_em": agora, "impressao": impressao}
+
+    def _descartar_excedentes(self):
+        """Remove as vencidas há mais de um TTL e, se ainda passar do limite, as menos usadas"""
+        agora = time.time()
+        for url in [u for u, e in self.entradas.items() if agora - e["buscado_em"] > 2 * self.ttl]:
+            del self.entradas[url]
+            self.descartados += 1
+        excedente = len(self.entradas) - self.max_entradas
+        if excedente > 0:
+            for url in sorted(self.entradas, key=lambda u: self.entradas[u]["usado_em"])[:excedente]:
+                del self.entradas[url]
+                self.descartados += 1
+
+    def salvar(self):
+        """Grava o cache de forma atômica (arquivo temporário + rename)"""
+        if diretorio_reproducao():
+            return  # detalhes vindos de HAR antigos não substituem os do cache
+        self._descartar_excedentes()
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.entradas, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temporario, self.caminho)
+
+    def resumo(self):
+        """Linha de resumo para o log"""
+        atualizado = " (cache ignorado: --refresh-details)" if self.ignorar_existentes else ""
+        return (f"💾 Cache de detalhes{atualizado}: {self.acertos} do cache, {self.buscados} buscados "
+                f"({self.alterados} alterados), {self.descartados} descartados, {len(self.entradas)} entradas")
+
+class PoolPaginas:
+    """Até `tamanho` páginas da sessão, reaproveitadas entre as tarefas (abertas sob demanda)"""
+
+    def __init__(self, sessao, tamanho=PAGINAS_DETALHE_PADRAO):
+        self.sessao = sessao
+        self.tamanho = max(1, tamanho)
+        self._livres = asyncio.Queue()
+        self._abertas = []
+        self._semaforo = asyncio.Semaphore(self.tamanho)
+
+    @asynccontextmanager
+    async def pagina(self):
+        async with self._semaforo:
+            if self._livres.empty():
+                page = await self.sessao.nova_pagina()
+                self._abertas.append(page)
+            else:
+                page = self._livres.get_nowait()
+            try:
+                yield page
+            except Exception:
+                # Página em estado desconhecido: descarta e deixa a próxima tarefa abrir outra
+                self._abertas.remove(page)
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+                raise
+            else:
+                self._livres.put_nowait(page)
+
+    async def fechar(self):
+        for page in self._abertas:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self._abertas = []
+
+@cronometrar("detalhes")
+async def buscar_detalhes(sessao, urls, extrair, paralelas=PAGINAS_DETALHE_PADRAO,
+                          intervalo_por_host=INTERVALO_POR_HOST_PADRAO, padrao=None, cache=None):
+    """
+    Roda `extrair(page, url)` para cada URL com um pool limitado de páginas e
+    limite de taxa por host. Retorna os resultados na mesma ordem de `urls`
+    (`padrao` no lugar de quem levantou exceção).
+    Com `cache`, URLs com detalhe válido nem abrem página e os novos resultados são gravados
+    (falhas não entram no cache)
+    """
+    pool = PoolPaginas(sessao, paralelas)
+    limitador = LimitadorTaxa(intervalo_por_host)
+
+    async def _uma(url):
+        if cache is not None:
+            em_cache = cache.obter(url)
+            if em_cache is not None:
+                return em_cache
+        try:
+            async with pool.pagina() as page:
+                await limitador.aguardar(url)
+                resultado = await extrair(page, url)
+        except Exception as e:
+            print(f"     ⚠️ Detalhe falhou ({url[:60]}): {str(e)[:50]}...")
+            return padrao
+        if cache is not None:
+            cache.guardar(url, resultado)
+        return resultado
+
+    try:
+        return await asyncio.gather(*(_uma(url) for url in urls))
+    finally:
+        await pool.fechar()
+        if cache is not None:
+            try:
+                cache.salvar()
+            except OSError as e:
+                print(f"   ⚠️ Não foi possível gravar o cache de detalhes: {str(e)[:50]}")
+            print(f"   {cache.resumo()}")
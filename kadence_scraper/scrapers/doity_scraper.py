@@ -1,8 +1,13 @@
-import time
 import hashlib
 import re
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import aguardar_rede_ociosa, aguardar_troca_pagina
+from .datas import interpretar_datas
+from .classificador import classificador
+from .telemetria import cronometrar, medir
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,69 +22,7 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')
     return texto
 
-def eh_evento_de_corrida_doity(titulo, tag=""):
-    """Verifica se o evento é relacionado a corrida no Doity"""
-    if not titulo:
-        return False
-    
-    titulo_lower = titulo.lower()
-    tag_lower = tag.lower() if tag else ""
-    
-    # Palavras-chave específicas do Doity
-    palavras_corrida = [
-        'corrida', 'maratona', 'run', 'running', 'atletismo', 
-        'cooper', 'caminhada', 'trote', 'meia maratona',
-        '5k', '10k', '21k', '42k', 'km', 'trail',
-        'night run', 'day run', 'street run', 'rustica'
-    ]
-    
-    # Verifica na tag primeiro (mais confiável)
-    if 'corrida' in tag_lower or 'run' in tag_lower:
-        return True
-    
-    # Verifica no título
-    for palavra in palavras_corrida:
-        if palavra in titulo_lower:
-            return True
-    
-    return False
-
-def processar_data_doity(data_str):
-    """Processa datas do formato Doity: '09 AGO 2025'"""
-    if not data_str:
-        return None, None
-    
-    # Mapeia meses em português (abreviado)
-    meses = {
-        'jan': '01', 'fev': '02', 'mar': '03', 'abr': '04',
-        'mai': '05', 'jun': '06', 'jul': '07', 'ago': '08',
-        'set': '09', 'out': '10', 'nov': '11', 'dez': '12'
-    }
-    
-    # Remove espaços extras e converte para minúsculo
-    data_limpa = re.sub(r'\s+', ' ', data_str.strip().lower())
-    
-    # Padrão: "09 ago 2025"
-    padrao = r'(\d{1,2})\s+([a-z]{3})\s+(\d{4})'
-    match = re.search(padrao, data_limpa)
-    
-    if match:
-        dia = match.group(1).zfill(2)
-        mes_texto = match.group(2)
-        ano = match.group(3)
-        
-        mes_num = meses.get(mes_texto, '01')
-        data_str_formatada = f"{dia}/{mes_num}/{ano}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
-    
-    return None, data_str
-
-def navegar_paginas_doity(page, max_paginas=20):
+async def navegar_paginas_doity(page, max_paginas=20):
     """Navega pelas páginas do Doity usando botão 'PRÓXIMO'"""
     todos_eventos = []
     pagina_atual = 1
@@ -89,10 +32,11 @@ def navegar_paginas_doity(page, max_paginas=20):
             print(f"   📄 Processando página {pagina_atual}")
             
             # Aguarda os cards carregarem
-            page.wait_for_selector(".wrapper__event-card", timeout=15000)
+            with medir("espera"):
+                await page.wait_for_selector(".wrapper__event-card", timeout=15000)
             
             # Coleta eventos da página atual
-            eventos_pagina = coletar_eventos_pagina_doity(page)
+            eventos_pagina = await coletar_eventos_pagina_doity(page)
             
             if eventos_pagina:
                 todos_eventos.extend(eventos_pagina)
@@ -112,16 +56,18 @@ def navegar_paginas_doity(page, max_paginas=20):
                 botao_proximo = None
                 for seletor in seletores_proximo:
                     try:
-                        botao_proximo = page.query_selector(seletor)
-                        if botao_proximo and botao_proximo.is_visible():
+                        botao_proximo = await page.query_selector(seletor)
+                        if botao_proximo and await botao_proximo.is_visible():
                             break
                     except:
                         continue
                 
                 if botao_proximo:
                     print(f"   👉 Indo para página {pagina_atual + 1}")
-                    botao_proximo.click()
-                    time.sleep(3)  # Aguarda carregar
+                    # Aguarda os cards da página atual serem substituídos
+                    if not await aguardar_troca_pagina(page, ".wrapper__event-card", botao_proximo.click):
+                        print(f"   🏁 Página não mudou após o clique - fim da paginação")
+                        break
                     pagina_atual += 1
                 else:
                     print(f"   🏁 Não há mais páginas")
@@ -137,33 +83,42 @@ def navegar_paginas_doity(page, max_paginas=20):
     
     return todos_eventos
 
-def coletar_eventos_pagina_doity(page):
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_DOITY = ".wrapper__event-card"
+CAMPOS_CARD_DOITY = {
+    "titulo": campo(".wrapper__event-card__content__event"),
+    "tag": campo(".wrapper__event-card__content__tag p"),
+    "data": campo(".wrapper__event-card__content__date"),
+    "local": campo(".wrapper__event-card__content__place"),
+    "href": campo(atributo="href"),  # o próprio card é o link
+}
+
+@cronometrar("parse")
+async def coletar_eventos_pagina_doity(page):
     """Coleta eventos de corrida de uma página do Doity"""
     eventos = []
     
     try:
-        # Seleciona todos os cards de evento
-        cards = page.query_selector_all(".wrapper__event-card")
+        # Extrai todos os cards da página de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_DOITY, CAMPOS_CARD_DOITY)
         
+        # Todas as datas da página de uma vez, contra a mesma data de referência
+        datas = interpretar_datas([card["data"] for card in cards])
+        corridas = classificador("Doity").classificar([(card["titulo"], card["tag"], "") for card in cards])
         for i, card in enumerate(cards):
             try:
                 # Título
-                titulo_el = card.query_selector(".wrapper__event-card__content__event")
-                titulo = limpar_texto(titulo_el.inner_text()) if titulo_el else ""
+                titulo = limpar_texto(card["titulo"])
                 
                 # Tag/Categoria (para filtrar corridas)
-                tag_el = card.query_selector(".wrapper__event-card__content__tag p")
-                tag = limpar_texto(tag_el.inner_text()) if tag_el else ""
+                tag = limpar_texto(card["tag"])
                 
                 # Filtra só eventos de corrida
-                if not eh_evento_de_corrida_doity(titulo, tag):
+                if not corridas[i]:
                     continue
                 
                 # Data
-                data_el = card.query_selector(".wrapper__event-card__content__date")
-                data_raw = data_el.inner_text().strip() if data_el else ""
-                
-                data_obj, data_formatada = processar_data_doity(data_raw)
+                data_obj, data_formatada = datas[i]
                 if not data_obj:
                     continue
                 
@@ -172,11 +127,10 @@ def coletar_eventos_pagina_doity(page):
                     continue
                 
                 # Local
-                local_el = card.query_selector(".wrapper__event-card__content__place")
-                local = limpar_texto(local_el.inner_text()) if local_el else "Local não informado"
+                local = limpar_texto(card["local"]) if card["local"] is not None else "Local não informado"
                 
                 # Link
-                href = card.get_attribute("href")
+                href = card["href"]
                 link = href if href and href.startswith("http") else f"https://doity.com.br{href}" if href else ""
                 
                 # Validações básicas
@@ -209,7 +163,7 @@ def coletar_eventos_pagina_doity(page):
     
     return eventos
 
-def extrair_doity(max_tentativas=3):
+async def extrair_doity_async(max_tentativas=3):
     """Extrai eventos de corrida do Doity"""
     eventos = []
     
@@ -217,27 +171,23 @@ def extrair_doity(max_tentativas=3):
         try:
             print(f"🔎 Doity - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("Doity") as sessao:
+                page = await sessao.nova_pagina()
                 
                 # URL do Doity para eventos de esporte e lazer
                 url = "https://doity.com.br/eventos/esporte-lazer"
                 
                 try:
                     print("📄 Carregando Doity...")
-                    page.goto(url, timeout=60000)
-                    
-                    # Aguarda a página carregar completamente (Vue.js)
-                    time.sleep(5)
+                    await navegar(page, url, timeout=60000)
                     
-                    # Aguarda os cards aparecerem
-                    page.wait_for_selector(".wrapper__event-card", timeout=20000)
+                    # Aguarda os cards do Vue.js aparecerem e a rede sossegar
+                    with medir("espera"):
+                        await page.wait_for_selector(".wrapper__event-card", timeout=20000)
+                    await aguardar_rede_ociosa(page)
                     
                     # Navega por todas as páginas
-                    eventos = navegar_paginas_doity(page, max_paginas=20)
-                    
-                    browser.close()
+                    eventos = await navegar_paginas_doity(page, max_paginas=20)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -262,7 +212,6 @@ def extrair_doity(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -272,3 +221,7 @@ def extrair_doity(max_tentativas=3):
             continue
     
     return eventos
+
+def extrair_doity(max_tentativas=3):
+    """Extrai eventos de corrida do Doity (entrada síncrona)"""
+    return executar_sync(extrair_doity_async(max_tentativas))
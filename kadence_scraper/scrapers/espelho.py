@@ -0,0 +1,44 @@
+import os
+from urllib.parse import urlsplit
+
+# Configurações
+# Exporte KADENCE_ESPELHO=http://127.0.0.1:8765 para que navegador e cliente HTTP busquem tudo
+# nesse servidor (ex.: benchmarks/servidor_fixtures.py) em vez dos sites reais
+VARIAVEL_ESPELHO = "KADENCE_ESPELHO"
+
+def espelho_ativo():
+    """URL base do espelho (sem barra final) ou None quando as fontes vão aos sites reais"""
+    base = os.environ.get(VARIAVEL_ESPELHO, "").strip().rstrip("/")
+    return base or None
+
+def url_no_espelho(url, base=None):
+    """
+    'https://www.site.com.br/eventos?p=2' -> '<base>/www.site.com.br/eventos?p=2'.
+    Sem espelho (ou URL sem host, ex.: data:) devolve a própria URL
+    """
+    base = base or espelho_ativo()
+    partes = urlsplit(url)
+    if not base or not partes.hostname:
+        return url
+    destino = f"{base}/{partes.hostname}{partes.path or '/'}"
+    if partes.query:
+        destino += "?" + partes.query
+    return destino
+
+async def aplicar_espelho(contexto, base=None):
+    """
+    Busca todas as requisições do contexto no espelho e entrega a resposta como se viesse do site:
+    a página continua na URL original (mesma origem para fetch/XHR, cookies e capturas de JSON).
+    Deve ser registrado antes do bloqueio, que repassa as requisições permitidas com route.fallback()
+    """
+    base = base or espelho_ativo()
+
+    async def _rotear(route):
+        try:
+            resposta = await route.fetch(url=url_no_espelho(route.request.url, base))
+        except Exception:
+            await route.abort("connectionrefused")
+            return
+        await route.fulfill(response=resposta)
+
+    await contexto.route("**/*", _rotear)
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from playwright.async_api import TimeoutError
+from .telemetria import cronometrar
+
+# Configurações
+TIMEOUT_ESPERA = 10  # segundos - teto de qualquer espera
+QUIETUDE_REDE = 0.5  # segundos sem requisições para considerar a rede ociosa
+INTERVALO_VERIFICACAO = 0.05
+
+async def contar_elementos(page, seletor):
+    """Quantidade de elementos que casam com o seletor"""
+    try:
+        return await page.locator(seletor).count()
+    except Exception:
+        return 0
+
+@cronometrar("espera")
+async def aguardar_elementos(page, seletor, timeout=TIMEOUT_ESPERA):
+    """Aguarda o seletor aparecer no DOM; retorna False se estourar o tempo"""
+    try:
+        await page.wait_for_selector(seletor, state="attached", timeout=timeout * 1000)
+        return True
+    except TimeoutError:
+        return False
+
+@cronometrar("espera")
+async def aguardar_rede_ociosa(page, quietude=QUIETUDE_REDE, timeout=TIMEOUT_ESPERA):
+    """
+    Aguarda a página ficar `quietude` segundos sem requisições pendentes.
+    Diferente do networkidle do Playwright, a janela é curta e a espera é limitada por `timeout`
+    Retorna False se a rede não sossegou dentro do limite
+    """
+    pendentes = set()
+    ultima_atividade = time.monotonic()
+
+    def _inicio(requisicao):
+        nonlocal ultima_atividade
+        pendentes.add(requisicao)
+        ultima_atividade = time.monotonic()
+
+    def _fim(requisicao):
+        nonlocal ultima_atividade
+        pendentes.discard(requisicao)
+        ultima_atividade = time.monotonic()
+
+    page.on("request", _inicio)
+    page.on("requestfinished", _fim)
+    page.on("requestfailed", _fim)
+    try:
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite:
+            if not pendentes and time.monotonic() - ultima_atividade >= quietude:
+                return True
+            await asyncio.sleep(INTERVALO_VERIFICACAO)
+        return False
+    finally:
+        page.remove_listener("request", _inicio)
+        page.remove_listener("requestfinished", _fim)
+        page.remove_listener("requestfailed", _fim)
+
+@cronometrar("espera")
+async def aguardar_carregamento(page, seletor=None, timeout=TIMEOUT_ESPERA, quietude=QUIETUDE_REDE):
+    """
+    Espera pós-navegação: o seletor dos cards (se informado) e em seguida uma janela curta de rede ociosa.
+    Substitui os sleeps fixos logo após page.goto
+    """
+    inicio = time.monotonic()
+    encontrou = True
+    if seletor:
+        encontrou = await aguardar_elementos(page, seletor, timeout)
+    restante = max(0.0, timeout - (time.monotonic() - inicio))
+    await aguardar_rede_ociosa(page, quietude, restante)
+    return encontrou
+
+@cronometrar("espera")
+async def aguardar_mudanca_contagem(page, seletor, anterior=None, timeout=TIMEOUT_ESPERA):
+    """
+    Aguarda a quantidade de elementos do seletor mudar em relação a `anterior`
+    (usado após "Ver mais", scroll infinito e paginação AJAX).
+    Retorna a nova contagem, ou a contagem atual se nada mudou dentro do limite
+    """
+    if anterior is None:
+        anterior = await contar_elementos(page, seletor)
+    try:
+        await page.wait_for_function(
+            "([seletor, anterior]) => document.querySelectorAll(seletor).length !== anterior",
+            arg=[seletor, anterior],
+            timeout=timeout * 1000
+        )
+    except TimeoutError:
+        pass
+    return await contar_elementos(page, seletor)
+
+@cronometrar("paginacao")
+async def rolar_ate_estabilizar(page, seletor, max_rolagens=5, timeout=3, sem_mudanca_max=2):
+    """
+    Rola até o fim da página enquanto novos elementos do seletor aparecerem.
+    Para após `sem_mudanca_max` rolagens sem efeito; cada rolagem espera no máximo `timeout` segundos
+    """
+    total = await contar_elementos(page, seletor)
+    sem_mudanca = 0
+    for _ in range(max_rolagens):
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        novo_total = await aguardar_mudanca_contagem(page, seletor, total, timeout)
+        if novo_total > total:
+            total = novo_total
+            sem_mudanca = 0
+        else:
+            sem_mudanca += 1
+            if sem_mudanca >= sem_mudanca_max:
+                break
+    return total
+
+@cronometrar("espera")
+async def aguardar_troca_pagina(page, seletor, acao, timeout=TIMEOUT_ESPERA, confirmar=None):
+    """
+    Executa `acao` (ex.: clique em "Próximo") e aguarda o primeiro elemento do seletor
+    ser desanexado ou re-renderizado e o seletor voltar a existir no DOM.
+    `confirmar` (corrotina opcional) roda logo após a ação: se devolver True a troca já está
+    confirmada (ex.: o JSON da página chegou) e o DOM não é esperado.
+    Retorna False se a página não trocou dentro do limite
+    """
+    primeiro = await page.query_selector(seletor)
+    if primeiro is None:
+        await acao()
+        if confirmar and await confirmar():
+            return True
+        return await aguardar_elementos(page, seletor, timeout)
+
+    try:
+        texto_antes = await primeiro.inner_text()
+        await acao()
+        if confirmar and await confirmar():
+            return True
+        inicio = time.monotonic()
+        try:
+            await page.wait_for_function(
+                "([el, texto]) => !el.isConnected || el.innerText !== texto",
+                arg=[primeiro, texto_antes],
+                timeout=timeout * 1000
+            )
+        except TimeoutError:
+            return False
+    finally:
+        # Libera o handle (uma troca por página em paginações longas)
+        try:
+            await primeiro.dispose()
+        except Exception:
+            pass
+    restante = max(0.1, timeout - (time.monotonic() - inicio))
+    return await aguardar_elementos(page, seletor, restante)
@@ -1,8 +1,13 @@
-import time
 import hashlib
 import re
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import contar_elementos, aguardar_rede_ociosa, aguardar_carregamento, aguardar_mudanca_contagem
+from .datas import interpretar_datas
+from .classificador import classificador
+from .telemetria import cronometrar
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,70 +22,19 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')
     return texto
 
-def eh_evento_de_corrida(titulo, href=""):
-    """Verifica se o evento é relacionado a corrida"""
-    if not titulo:
-        return False
-    
-    titulo_lower = titulo.lower()
-    href_lower = href.lower() if href else ""
-    
-    # Palavras-chave que indicam corrida
-    palavras_corrida = [
-        'corrida', 'maratona', 'run', 'running', 'atletismo', 
-        'cooper', 'caminhada', 'trote', 'meia maratona',
-        '5k', '10k', '21k', '42k', 'km', 'trail',
-        'night run', 'day run', 'street run'
-    ]
-    
-    # Verifica no título
-    for palavra in palavras_corrida:
-        if palavra in titulo_lower:
-            return True
-    
-    # Verifica na URL
-    for palavra in palavras_corrida:
-        if palavra in href_lower:
-            return True
-    
-    return False
-
-def processar_data_even3(data_str):
-    """Processa datas no formato do Even3"""
-    if not data_str:
-        return None, None
-    
-    # Remove texto extra e normaliza
-    data_limpa = re.sub(r'^[a-zA-Zç-]+,\s*', '', data_str.strip())  # Remove "domingo, "
-    
-    # Mapeia meses em português
-    meses = {
-        'janeiro': '01', 'fevereiro': '02', 'março': '03', 'abril': '04',
-        'maio': '05', 'junho': '06', 'julho': '07', 'agosto': '08',
-        'setembro': '09', 'outubro': '10', 'novembro': '11', 'dezembro': '12'
-    }
-    
-    # Padrão: "7 de setembro de 2025"
-    padrao = r'(\d{1,2})\s+de\s+([a-záéíóúç]+)\s+de\s+(\d{4})'
-    match = re.search(padrao, data_limpa.lower())
-    
-    if match:
-        dia = match.group(1).zfill(2)
-        mes_texto = match.group(2)
-        ano = match.group(3)
-        
-        mes_num = meses.get(mes_texto, '01')
-        data_str_formatada = f"{dia}/{mes_num}/{ano}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
-    
-    return None, data_str
+# Campos de cada card da seção "Todos os eventos" (extraídos em uma única chamada)
+SELETOR_CARD_EVEN3 = ".col-xl-3.col-lg-4.col-md-6.col-sm-12 .card"
+CAMPOS_CARD_EVEN3 = {
+    "titulo": campo("h5.card-title"),
+    "href": campo("a.stretched-link", atributo="href"),
+    # Data - elemento com ícone de calendário, senão o primeiro span do texto
+    "data": campo(["span:has(i.fa-calendar-day)", ".card-text span"]),
+    # Local - elemento com ícone de localização
+    "local": campo("span:has(i.fa-map-marker-alt)"),
+}
 
-def coletar_eventos_pagina(page):
+@cronometrar("parse")
+async def coletar_eventos_pagina(page):
     """Coleta eventos de corrida da seção 'Todos os eventos'"""
     eventos = []
     
@@ -88,33 +42,28 @@ def coletar_eventos_pagina(page):
         # Foca na seção "Todos os eventos" - os cards estão em divs específicas
         print("🔍 Procurando eventos na seção 'Todos os eventos'...")
         
-        # Seletor mais específico baseado no HTML real
-        cards = page.query_selector_all(".col-xl-3.col-lg-4.col-md-6.col-sm-12 .card")
+        # Extrai todos os cards de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_EVEN3, CAMPOS_CARD_EVEN3)
         
         print(f"📦 Encontrados {len(cards)} cards para análise")
         
+        # Todas as datas da página de uma vez, contra a mesma data de referência
+        datas = interpretar_datas([card["data"] for card in cards])
+        corridas = classificador("Even3").classificar([(card["titulo"], "", card["href"]) for card in cards])
         for i, card in enumerate(cards):
             try:
                 # Título
-                titulo_el = card.query_selector("h5.card-title")
-                titulo = limpar_texto(titulo_el.inner_text()) if titulo_el else ""
+                titulo = limpar_texto(card["titulo"])
                 
                 # Link para verificar se é corrida
-                link_el = card.query_selector("a.stretched-link")
-                href = link_el.get_attribute("href") if link_el else ""
+                href = card["href"] or ""
                 
                 # Filtra só eventos de corrida
-                if not eh_evento_de_corrida(titulo, href):
+                if not corridas[i]:
                     continue
                 
-                # Data - busca por elementos com ícone de calendário
-                data_el = card.query_selector("span:has(i.fa-calendar-day)")
-                if not data_el:
-                    data_el = card.query_selector(".card-text span")
-                
-                data_raw = data_el.inner_text().strip() if data_el else ""
-                
-                data_obj, data_formatada = processar_data_even3(data_raw)
+                # Data
+                data_obj, data_formatada = datas[i]
                 if not data_obj:
                     continue
                 
@@ -122,10 +71,9 @@ def coletar_eventos_pagina(page):
                 if data_obj < datetime.now():
                     continue
                 
-                # Local - busca por elementos com ícone de localização
-                local_el = card.query_selector("span:has(i.fa-map-marker-alt)")
-                if local_el:
-                    local_text = local_el.inner_text().strip()
+                # Local
+                if card["local"] is not None:
+                    local_text = card["local"].strip()
                     # Remove o ícone do texto e limpa
                     local = re.sub(r'^\s*[^\w\s]*\s*', '', local_text).strip()
                     local = limpar_texto(local)
@@ -166,7 +114,8 @@ def coletar_eventos_pagina(page):
     
     return eventos
 
-def carregar_todos_eventos_even3(page, max_cliques=30):
+@cronometrar("paginacao")
+async def carregar_todos_eventos_even3(page, max_cliques=30):
     """Carrega todos os eventos clicando em 'Ver mais' na seção 'Todos os eventos'"""
     print("🔄 Carregando todos os eventos da seção 'Todos os eventos'...")
     
@@ -177,15 +126,14 @@ def carregar_todos_eventos_even3(page, max_cliques=30):
         try:
             # Scroll para a seção "Todos os eventos" (no final da página)
             try:
-                secao_todos = page.query_selector("h2:has-text('Todos os eventos')")
+                secao_todos = await page.query_selector("h2:has-text('Todos os eventos')")
                 if secao_todos:
-                    secao_todos.scroll_into_view_if_needed()
-                    time.sleep(1)
+                    await secao_todos.scroll_into_view_if_needed()
             except:
                 pass
             
             # Conta eventos antes do clique
-            cards_antes = len(page.query_selector_all(".card"))
+            cards_antes = await contar_elementos(page, ".card")
             
             # Procura pelo botão "Ver mais" - seletores baseados no HTML real
             seletores_ver_mais = [
@@ -199,8 +147,8 @@ def carregar_todos_eventos_even3(page, max_cliques=30):
             botao_ver_mais = None
             for seletor in seletores_ver_mais:
                 try:
-                    botao_ver_mais = page.query_selector(seletor)
-                    if botao_ver_mais and botao_ver_mais.is_visible() and not botao_ver_mais.is_disabled():
+                    botao_ver_mais = await page.query_selector(seletor)
+                    if botao_ver_mais and await botao_ver_mais.is_visible() and not await botao_ver_mais.is_disabled():
                         break
                 except:
                     continue
@@ -211,14 +159,13 @@ def carregar_todos_eventos_even3(page, max_cliques=30):
             
             # Clica no botão
             print(f"   👉 Clique {cliques_realizados + 1} - Aguardando novos eventos...")
-            botao_ver_mais.click()
+            await botao_ver_mais.click()
             cliques_realizados += 1
             
-            # Aguarda AngularJS carregar novos eventos
-            time.sleep(4)
+            # Aguarda AngularJS renderizar os novos cards (no máximo 8s)
+            cards_depois = await aguardar_mudanca_contagem(page, ".card", cards_antes, timeout=8)
             
             # Verifica se novos eventos foram adicionados
-            cards_depois = len(page.query_selector_all(".card"))
             
             if cards_depois > cards_antes:
                 cliques_sem_efeito = 0
@@ -230,13 +177,13 @@ def carregar_todos_eventos_even3(page, max_cliques=30):
         except Exception as e:
             print(f"   ⚠️ Erro ao clicar 'Ver mais': {str(e)[:50]}...")
             cliques_sem_efeito += 1
-            time.sleep(2)
+            await aguardar_rede_ociosa(page, timeout=2)
     
-    total_final = len(page.query_selector_all(".card"))
+    total_final = await contar_elementos(page, ".card")
     print(f"🏁 Carregamento finalizado: {total_final} eventos | {cliques_realizados} cliques realizados")
     return total_final
 
-def extrair_even3(max_tentativas=3):
+async def extrair_even3_async(max_tentativas=3):
     """Extrai eventos de corrida do Even3"""
     eventos = []
     
@@ -244,27 +191,24 @@ def extrair_even3(max_tentativas=3):
         try:
             print(f"🔎 Even3 - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("Even3") as sessao:
+                page = await sessao.nova_pagina()
                 
                 url = "https://www.even3.com.br/eventos-online/saude-e-bem-estar/"
                 
                 try:
                     print("📄 Carregando Even3...")
-                    page.goto(url, timeout=60000)
+                    await navegar(page, url, timeout=60000)
                     
-                    # Aguarda a página carregar completamente
-                    time.sleep(5)
+                    # Aguarda os cards aparecerem e a rede sossegar
+                    await aguardar_carregamento(page, ".card", timeout=15)
                     
                     # Carrega todos os eventos clicando em "Ver mais"
-                    total_cards = carregar_todos_eventos_even3(page, max_cliques=30)
+                    total_cards = await carregar_todos_eventos_even3(page, max_cliques=30)
                     
                     # Agora coleta todas as corridas de uma vez
                     print(f"🔄 Processando {total_cards} eventos em busca de corridas...")
-                    eventos = coletar_eventos_pagina(page)
-                    
-                    browser.close()
+                    eventos = await coletar_eventos_pagina(page)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -289,7 +233,6 @@ def extrair_even3(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -299,3 +242,7 @@ def extrair_even3(max_tentativas=3):
             continue
     
     return eventos
+
+def extrair_even3(max_tentativas=3):
+    """Extrai eventos de corrida do Even3 (entrada síncrona)"""
+    return executar_sync(extrair_even3_async(max_tentativas))
@@ -0,0 +1,83 @@
+from .html_estatico import analisar_html
+from .telemetria import cronometrar
+
+def campo(seletor=None, atributo=None, todos=False, html=False):
+    """
+    Declara um campo do card para `extrair_cards`.
+    seletor: CSS relativo ao card (lista = o primeiro que casar; None = o próprio card)
+    atributo: lê o atributo em vez do texto; html=True lê o innerHTML
+    todos: retorna a lista de valores de todos os elementos que casarem
+    """
+    if seletor is None or isinstance(seletor, str):
+        seletores = [seletor]
+    else:
+        seletores = list(seletor)
+    return {"seletores": seletores, "atributo": atributo, "todos": todos, "html": html}
+
+# Roda dentro da página: percorre os cards e devolve apenas dados (nenhum ElementHandle sobrevive)
+_SCRIPT_EXTRACAO = """
+({seletor, campos}) => {
+    const ler = (el, c) => c.atributo ? el.getAttribute(c.atributo) : (c.html ? el.innerHTML : el.innerText);
+    const buscar = (card, c) => {
+        for (const s of c.seletores) {
+            if (s === null) return [card];
+            let elementos;
+            try { elementos = card.querySelectorAll(s); } catch (e) { continue; }
+            if (elementos.length) return Array.from(elementos);
+        }
+        return [];
+    };
+    return Array.from(document.querySelectorAll(seletor), card => {
+        const item = {};
+        for (const [nome, c] of Object.entries(campos)) {
+            const elementos = buscar(card, c);
+            item[nome] = c.todos ? elementos.map(el => ler(el, c)) : (elementos.length ? ler(elementos[0], c) : null);
+        }
+        return item;
+    });
+}
+"""
+
+@cronometrar("extracao")
+async def extrair_cards(page, seletor_card, campos):
+    """
+    Extrai todos os cards do seletor em um único page.evaluate.
+    Retorna uma lista de dicts {nome_do_campo: texto/atributo/lista ou None}
+    """
+    return await page.evaluate(_SCRIPT_EXTRACAO, {"seletor": seletor_card, "campos": campos})
+
+def _buscar_html(card, c):
+    for seletor in c["seletores"]:
+        if seletor is None:
+            return [card]
+        try:
+            elementos = card.selecionar(seletor)
+        except ValueError:
+            continue
+        if elementos:
+            return elementos
+    return []
+
+def _ler_html(elemento, c):
+    if c["atributo"]:
+        return elemento.atributos.get(c["atributo"])
+    return elemento.html_interno() if c["html"] else elemento.texto()
+
+@cronometrar("extracao")
+def extrair_cards_html(html, seletor_card, campos):
+    """
+    Mesma extração de `extrair_cards`, sobre o HTML baixado sem navegador
+    (`html` pode ser o texto da página ou a árvore já analisada)
+    """
+    documento = analisar_html(html) if isinstance(html, str) else html
+    cards = []
+    for card in documento.selecionar(seletor_card):
+        item = {}
+        for nome, c in campos.items():
+            elementos = _buscar_html(card, c)
+            if c["todos"]:
+                item[nome] = [_ler_html(el, c) for el in elementos]
+            else:
+                item[nome] = _ler_html(elementos[0], c) if elementos else None
+        cards.append(item)
+    return cards
@@ -0,0 +1,88 @@
+import glob
+import os
+import re
+import shutil
+
+# Configurações
+# Exporte KADENCE_GRAVAR_HAR=DIR (ou use --record-har DIR) para gravar o tráfego do navegador de cada fonte
+VARIAVEL_GRAVAR_HAR = "KADENCE_GRAVAR_HAR"
+# Exporte KADENCE_REPRODUZIR_HAR=DIR (ou use --replay-har DIR) para servir as requisições a partir dos HAR, sem rede
+VARIAVEL_REPRODUZIR_HAR = "KADENCE_REPRODUZIR_HAR"
+MOTIVO_FORA_DO_HAR = "internetdisconnected"
+
+_arquivos_gravados = {}  # fonte -> HARs gravados nesta execução (numeração dos contextos)
+
+def diretorio_gravacao():
+    return os.environ.get(VARIAVEL_GRAVAR_HAR) or None
+
+def diretorio_reproducao():
+    return os.environ.get(VARIAVEL_REPRODUZIR_HAR) or None
+
+def har_ativo():
+    """True quando o tráfego do navegador está sendo gravado ou reproduzido"""
+    return bool(diretorio_gravacao() or diretorio_reproducao())
+
+def pasta_fonte(diretorio, nome):
+    """DIR/<fonte> com o nome da sessão reduzido a caracteres seguros ('Track&Field' -> 'Track_Field')"""
+    return os.path.join(diretorio, re.sub(r"[^\w.-]+", "_", nome).strip("_") or "fonte")
+
+def _proximo_arquivo(diretorio, nome):
+    """
+    Um HAR por contexto (tentativas e reciclagens de contexto geram arquivos novos).
+    A primeira gravação da fonte nesta execução substitui a pasta da gravação anterior
+    """
+    pasta = pasta_fonte(diretorio, nome)
+    if nome not in _arquivos_gravados:
+        shutil.rmtree(pasta, ignore_errors=True)
+        os.makedirs(pasta, exist_ok=True)
+        _arquivos_gravados[nome] = 0
+    _arquivos_gravados[nome] += 1
+    return os.path.join(pasta, f"{_arquivos_gravados[nome]:03d}.har")
+
+def opcoes_har(nome):
+    """Opções extras do BrowserContext da fonte: gravação do HAR e service workers fora do caminho"""
+    gravacao = diretorio_gravacao()
+    if gravacao:
+        return {"record_har_path": _proximo_arquivo(gravacao, nome), "record_har_content": "embed",
+                "record_har_mode": "full", "service_workers": "block"}
+    if diretorio_reproducao():
+        return {"service_workers": "block"}  # requisições de service worker não passam pelo roteamento
+    return {}
+
+class ReproducaoHAR:
+    """Contagem do que a reprodução não achou nos arquivos da fonte (abortado, nunca vai para a rede)"""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.arquivos = []
+        self.contextos = 0
+        self.fora_do_har = 0
+        self.exemplos = []
+
+    def resumo(self):
+        exemplos = f" (ex.: {', '.join(u[:70] for u in self.exemplos)})" if self.exemplos else ""
+        return f"📼 {self.nome}: {len(self.arquivos)} HAR, {self.fora_do_har} requisições fora do arquivo{exemplos}"
+
+async def reproduzir_har(contexto, reproducao, diretorio=None):
+    """
+    Serve o contexto a partir dos HAR da fonte. O Playwright consulta as rotas da última para a primeira:
+    o arquivo mais recente responde primeiro, o que não casar cai nos anteriores e, por fim,
+    na rota de base que aborta (nenhuma requisição sai para a rede)
+    """
+    pasta = pasta_fonte(diretorio or diretorio_reproducao(), reproducao.nome)
+    arquivos = sorted(glob.glob(os.path.join(pasta, "*.har")))
+    if not arquivos and not reproducao.contextos:
+        print(f"⚠️ {reproducao.nome}: nenhum HAR gravado em {pasta}")
+    reproducao.arquivos = arquivos
+    reproducao.contextos += 1
+
+    async def _fora_do_har(route):
+        reproducao.fora_do_har += 1
+        if len(reproducao.exemplos) < 3:
+            reproducao.exemplos.append(route.request.url)
+        await route.abort(MOTIVO_FORA_DO_HAR)
+
+    await contexto.route("**/*", _fora_do_har)
+    for arquivo in arquivos:
+        await contexto.route_from_har(arquivo, not_found="fallback")
+    return reproducao
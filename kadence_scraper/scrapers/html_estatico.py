@@ -0,0 +1,393 @@
+from html import escape
+from html.parser import HTMLParser
+
+# Elementos sem fechamento e elementos que quebram linha no innerText
+ELEMENTOS_VAZIOS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+})
+ELEMENTOS_BLOCO = frozenset({
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset", "figcaption", "figure",
+    "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p",
+    "pre", "section", "table", "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+})
+ELEMENTOS_SEM_TEXTO = frozenset({"head", "noscript", "script", "style", "template", "title"})
+# Abrir um destes fecha um <p> aberto (como o parser do navegador faz)
+FECHAM_PARAGRAFO = ELEMENTOS_BLOCO - {"dd", "dt", "li", "td", "th", "tbody", "tfoot", "thead", "tr"}
+# Abrir a chave fecha o irmão aberto da mesma família, até o limite
+FECHAMENTO_IMPLICITO = {
+    "li": ({"li"}, {"ul", "ol"}),
+    "dt": ({"dt", "dd"}, {"dl"}),
+    "dd": ({"dt", "dd"}, {"dl"}),
+    "tr": ({"tr", "td", "th"}, {"table", "tbody", "thead", "tfoot"}),
+    "td": ({"td", "th"}, {"tr", "table"}),
+    "th": ({"td", "th"}, {"tr", "table"}),
+    "option": ({"option"}, {"select", "datalist"}),
+}
+
+class No:
+    """Elemento do HTML estático: tag, atributos e filhos (outros Nos ou textos)"""
+
+    __slots__ = ("tag", "atributos", "filhos", "pai")
+
+    def __init__(self, tag, atributos=None, pai=None):
+        self.tag = tag
+        self.atributos = atributos or {}
+        self.filhos = []
+        self.pai = pai
+
+    @property
+    def classes(self):
+        return (self.atributos.get("class") or "").split()
+
+    def elementos(self):
+        """Filhos que são elementos (sem os textos)"""
+        return [f for f in self.filhos if isinstance(f, No)]
+
+    def descendentes(self):
+        """Todos os elementos abaixo deste, em ordem de documento"""
+        pilha = list(reversed(self.elementos()))
+        while pilha:
+            no = pilha.pop()
+            yield no
+            pilha.extend(reversed(no.elementos()))
+
+    def ancestrais(self):
+        no = self.pai
+        while no is not None:
+            yield no
+            no = no.pai
+
+    def selecionar(self, seletor):
+        """Equivalente ao querySelectorAll: descendentes que casam com o seletor"""
+        lista = compilar_seletor(seletor)
+        return [no for no in self.descendentes() if any(_casa_complexo(no, partes) for partes in lista)]
+
+    def selecionar_um(self, seletor):
+        encontrados = self.selecionar(seletor)
+        return encontrados[0] if encontrados else None
+
+    def casa(self, seletor):
+        """Equivalente ao Element.matches"""
+        return any(_casa_complexo(self, partes) for partes in compilar_seletor(seletor))
+
+    def texto(self):
+        """Aproximação do innerText: blocos e <br> viram quebras de linha, espaços colapsados"""
+        pedacos = []
+        _coletar_texto(self, pedacos)
+        linhas = (" ".join(linha.split()) for linha in "".join(pedacos).split("\n"))
+        return "\n".join(linha for linha in linhas if linha)
+
+    def html_interno(self):
+        """Equivalente ao innerHTML"""
+        pedacos = []
+        for filho in self.filhos:
+            _serializar(filho, pedacos)
+        return "".join(pedacos)
+
+def _coletar_texto(no, pedacos):
+    for filho in no.filhos:
+        if isinstance(filho, str):
+            pedacos.append(filho.replace("\n", " "))
+        elif filho.tag == "br":
+            pedacos.append("\n")
+        elif filho.tag not in ELEMENTOS_SEM_TEXTO:
+            bloco = filho.tag in ELEMENTOS_BLOCO
+            if bloco:
+                pedacos.append("\n")
+            _coletar_texto(filho, pedacos)
+            if bloco:
+                pedacos.append("\n")
+
+def _serializar(no, pedacos):
+    if isinstance(no, str):
+        pedacos.append(escape(no, quote=False))
+        return
+    atributos = "".join(
+        f' {nome}="{escape(valor)}"' if valor is not None else f" {nome}"
+        for nome, valor in no.atributos.items()
+    )
+    pedacos.append(f"<{no.tag}{atributos}>")
+    if no.tag in ELEMENTOS_VAZIOS:
+        return
+    for filho in no.filhos:
+        _serializar(filho, pedacos)
+    pedacos.append(f"</{no.tag}>")
+
+class _Construtor(HTMLParser):
+    """Monta a árvore de Nos tolerando HTML mal formado (tags não fechadas, fechamentos órfãos)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.raiz = No("#documento")
+        self.pilha = [self.raiz]
+
+    def _fechar_ate(self, indice):
+        del self.pilha[indice:]
+
+    def handle_starttag(self, tag, attrs):
+        if tag in FECHAM_PARAGRAFO and self.pilha[-1].tag == "p":
+            self.pilha.pop()
+        if tag in FECHAMENTO_IMPLICITO:
+            irmaos, limites = FECHAMENTO_IMPLICITO[tag]
+            for i in range(len(self.pilha) - 1, 0, -1):
+                if self.pilha[i].tag in limites:
+                    break
+                if self.pilha[i].tag in irmaos:
+                    self._fechar_ate(i)
+                    break
+        no = No(tag, dict(attrs), self.pilha[-1])
+        self.pilha[-1].filhos.append(no)
+        if tag not in ELEMENTOS_VAZIOS:
+            self.pilha.append(no)
+
+    def handle_startendtag(self, tag, attrs):
+        no = No(tag, dict(attrs), self.pilha[-1])
+        self.pilha[-1].filhos.append(no)
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.pilha) - 1, 0, -1):
+            if self.pilha[i].tag == tag:
+                self._fechar_ate(i)
+                return
+        # Fechamento sem abertura correspondente: ignorado, como no navegador
+
+    def handle_data(self, dados):
+        self.pilha[-1].filhos.append(dados)
+
+def analisar_html(html):
+    """Converte o HTML em uma árvore de Nos; retorna o nó raiz do documento"""
+    construtor = _Construtor()
+    construtor.feed(html)
+    construtor.close()
+    return construtor.raiz
+
+# ---- Seletores CSS (subconjunto usado pelos campos das fontes) ----
+# Tag, *, .classe, #id, [attr], [attr=v], [attr*=v], [attr^=v], [attr$=v], [attr~=v],
+# :has(...), :not(...), :first-child, :last-child, :nth-of-type(n), combinadores " " e ">", listas com ","
+
+_cache_seletores = {}
+
+class _Leitor:
+    def __init__(self, texto):
+        self.texto = texto
+        self.pos = 0
+
+    def fim(self):
+        return self.pos >= len(self.texto)
+
+    def atual(self):
+        return self.texto[self.pos] if not self.fim() else ""
+
+    def pular_espacos(self):
+        inicio = self.pos
+        while not self.fim() and self.texto[self.pos].isspace():
+            self.pos += 1
+        return self.pos > inicio
+
+    def identificador(self):
+        inicio = self.pos
+        while not self.fim() and (self.texto[self.pos].isalnum() or self.texto[self.pos] in "-_"):
+            self.pos += 1
+        if inicio == self.pos:
+            raise ValueError(f"Seletor inválido perto de {self.texto[inicio:]!r}")
+        return self.texto[inicio:self.pos]
+
+    def ate_parentese(self):
+        """Conteúdo até o ')' que fecha o '(' já consumido"""
+        profundidade, inicio = 1, self.pos
+        while not self.fim():
+            c = self.texto[self.pos]
+            if c == "(":
+                profundidade += 1
+            elif c == ")":
+                profundidade -= 1
+                if profundidade == 0:
+                    conteudo = self.texto[inicio:self.pos]
+                    self.pos += 1
+                    return conteudo
+            self.pos += 1
+        raise ValueError(f"Parêntese não fechado em {self.texto!r}")
+
+def _ler_atributo(leitor):
+    leitor.pular_espacos()
+    nome = leitor.identificador().lower()
+    leitor.pular_espacos()
+    if leitor.atual() == "]":
+        leitor.pos += 1
+        return (nome, None, None)
+    operador = ""
+    while leitor.atual() and leitor.atual() in "*^$~|=":
+        operador += leitor.atual()
+        leitor.pos += 1
+    leitor.pular_espacos()
+    aspas = leitor.atual()
+    if aspas and aspas in "'\"":
+        fim = leitor.texto.index(aspas, leitor.pos + 1)
+        valor = leitor.texto[leitor.pos + 1:fim]
+        leitor.pos = fim + 1
+    else:
+        valor = leitor.identificador()
+    leitor.pular_espacos()
+    if leitor.atual() != "]":
+        raise ValueError(f"Atributo mal formado em {leitor.texto!r}")
+    leitor.pos += 1
+    return (nome, operador, valor)
+
+def _ler_composto(leitor):
+    composto = {"tag": None, "id": None, "classes": [], "atributos": [], "has": [], "not": [], "posicao": []}
+    if leitor.atual() == "*":
+        leitor.pos += 1
+    elif leitor.atual().isalpha():
+        composto["tag"] = leitor.identificador().lower()
+    while not leitor.fim():
+        c = leitor.atual()
+        if c == ".":
+            leitor.pos += 1
+            composto["classes"].append(leitor.identificador())
+        elif c == "#":
+            leitor.pos += 1
+            composto["id"] = leitor.identificador()
+        elif c == "[":
+            leitor.pos += 1
+            composto["atributos"].append(_ler_atributo(leitor))
+        elif c == ":":
+            leitor.pos += 1
+            nome = leitor.identificador().lower()
+            argumento = None
+            if leitor.atual() == "(":
+                leitor.pos += 1
+                argumento = leitor.ate_parentese().strip()
+            if nome == "has":
+                composto["has"].append(_compilar_lista(argumento, relativo=True))
+            elif nome == "not":
+                composto["not"].append(_compilar_lista(argumento))
+            elif nome in ("first-child", "last-child"):
+                composto["posicao"].append((nome, None))
+            elif nome == "nth-of-type":
+                composto["posicao"].append((nome, int(argumento)))
+            else:
+                raise ValueError(f"Pseudo-classe não suportada: :{nome}")
+        else:
+            break
+    return composto
+
+def _compilar_complexo(texto, relativo=False):
+    """Lista de (combinador, composto); o combinador da primeira parte é None (ou '>'/' ' em :has)"""
+    leitor = _Leitor(texto.strip())
+    partes = []
+    combinador = " " if relativo else None
+    if relativo and leitor.atual() == ">":
+        leitor.pos += 1
+        leitor.pular_espacos()
+        combinador = ">"
+    while not leitor.fim():
+        partes.append((combinador, _ler_composto(leitor)))
+        teve_espaco = leitor.pular_espacos()
+        if leitor.atual() == ">":
+            leitor.pos += 1
+            leitor.pular_espacos()
+            combinador = ">"
+        elif leitor.atual() and leitor.atual() in "+~":
+            raise ValueError(f"Combinador não suportado: {leitor.atual()!r}")
+        elif teve_espaco:
+            combinador = " "
+        elif not leitor.fim():
+            raise ValueError(f"Seletor inválido perto de {leitor.texto[leitor.pos:]!r}")
+    if not partes:
+        raise ValueError("Seletor vazio")
+    return partes
+
+def _dividir_lista(texto):
+    """Separa por vírgulas de nível superior (fora de parênteses e colchetes)"""
+    partes, profundidade, inicio = [], 0, 0
+    for i, c in enumerate(texto):
+        if c in "([":
+            profundidade += 1
+        elif c in ")]":
+            profundidade -= 1
+        elif c == "," and profundidade == 0:
+            partes.append(texto[inicio:i])
+            inicio = i + 1
+    partes.append(texto[inicio:])
+    return partes
+
+def _compilar_lista(texto, relativo=False):
+    return [_compilar_complexo(parte, relativo) for parte in _dividir_lista(texto)]
+
+def compilar_seletor(seletor):
+    """Compila (com cache) um seletor CSS do subconjunto suportado"""
+    if seletor not in _cache_seletores:
+        _cache_seletores[seletor] = _compilar_lista(seletor)
+    return _cache_seletores[seletor]
+
+def _casa_atributo(no, nome, operador, esperado):
+    if nome not in no.atributos:
+        return False
+    if operador is None:
+        return True
+    valor = no.atributos[nome] or ""
+    if operador == "=":
+        return valor == esperado
+    if operador == "*=":
+        return esperado in valor
+    if operador == "^=":
+        return valor.startswith(esperado)
+    if operador == "$=":
+        return valor.endswith(esperado)
+    if operador == "~=":
+        return esperado in valor.split()
+    if operador == "|=":
+        return valor == esperado or valor.startswith(esperado + "-")
+    raise ValueError(f"Operador de atributo não suportado: {operador}")
+
+def _casa_posicao(no, nome, argumento):
+    irmaos = no.pai.elementos() if no.pai is not None else [no]
+    if nome == "first-child":
+        return irmaos[0] is no
+    if nome == "last-child":
+        return irmaos[-1] is no
+    mesmos = [irmao for irmao in irmaos if irmao.tag == no.tag]
+    return mesmos.index(no) + 1 == argumento
+
+def _casa_composto(no, composto):
+    if composto["tag"] and no.tag != composto["tag"]:
+        return False
+    if composto["id"] and no.atributos.get("id") != composto["id"]:
+        return False
+    if composto["classes"]:
+        classes = no.classes
+        if any(c not in classes for c in composto["classes"]):
+            return False
+    if any(not _casa_atributo(no, *a) for a in composto["atributos"]):
+        return False
+    if any(not _casa_posicao(no, *p) for p in composto["posicao"]):
+        return False
+    for lista in composto["not"]:
+        if any(_casa_complexo(no, partes) for partes in lista):
+            return False
+    for lista in composto["has"]:
+        if not any(_casa_complexo(d, partes, escopo=no) for partes in lista for d in no.descendentes()):
+            return False
+    return True
+
+def _casa_complexo(no, partes, indice=None, escopo=None):
+    """Casa da direita para a esquerda; com `escopo` (:has) os ancestrais ficam limitados a ele"""
+    if indice is None:
+        indice = len(partes) - 1
+    combinador, composto = partes[indice]
+    if not _casa_composto(no, composto):
+        return False
+    if indice == 0:
+        if escopo is None:
+            return True
+        return no.pai is escopo if combinador == ">" else True
+    anterior = partes[indice][0]
+    if anterior == ">":
+        pai = no.pai
+        return pai is not None and pai is not escopo and _casa_complexo(pai, partes, indice - 1, escopo)
+    for ancestral in no.ancestrais():
+        if ancestral is escopo:
+            return False
+        if _casa_complexo(ancestral, partes, indice - 1, escopo):
+            return True
+    return False
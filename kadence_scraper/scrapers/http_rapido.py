@@ -0,0 +1,277 @@
+import asyncio
+import gzip
+import http.client
+import os
+import re
+import threading
+import time
+import zlib
+from urllib.parse import urljoin, urlsplit
+from .navegador import LimitadorHosts
+from .espelho import url_no_espelho
+from .har import har_ativo
+from .telemetria import medir
+
+# Configurações
+PAGINAS_SIMULTANEAS = 8  # páginas buscadas ao mesmo tempo por fonte
+LIMITE_POR_HOST_HTTP = 6  # conexões simultâneas por host (cada uma fica viva entre requisições)
+TIMEOUT_HTTP = 20  # segundos por requisição
+MAX_REDIRECIONAMENTOS = 5
+PAUSA_RETENTATIVA_HTTP = 1.0  # segundos antes de buscar de novo uma página da listagem que falhou
+STATUS_FIM_LISTAGEM = (404, 410)  # página além da última: fim da listagem, não falha
+CABECALHOS_PADRAO = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+# Exporte KADENCE_SEM_HTTP=1 para forçar o Playwright em todas as fontes
+VARIAVEL_DESLIGAR = "KADENCE_SEM_HTTP"
+
+# Erros de uma conexão keep-alive que o servidor fechou enquanto estava ociosa
+_ERROS_CONEXAO_VELHA = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                        BrokenPipeError, ConnectionResetError, ConnectionAbortedError)
+
+def http_rapido_habilitado():
+    """
+    False quando o modo HTTP foi desligado (ex.: --sem-http no main.py) ou quando o tráfego
+    está sendo gravado/reproduzido em HAR, que só cobre o que passa pelo navegador
+    """
+    return os.environ.get(VARIAVEL_DESLIGAR) != "1" and not har_ativo()
+
+class RespostaHTTP:
+    """Resposta já lida e descomprimida"""
+
+    def __init__(self, url, status, cabecalhos, corpo):
+        self.url = url
+        self.status = status
+        self.cabecalhos = cabecalhos
+        self.corpo = corpo
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def texto(self):
+        """Corpo decodificado pelo charset do Content-Type (ou da <meta>), UTF-8 por padrão"""
+        encontrado = re.search(r"charset=([\w-]+)", self.cabecalhos.get("content-type", ""), re.I)
+        if encontrado:
+            charset = encontrado.group(1)
+        else:
+            meta = re.search(rb"<meta[^>]+charset=[\"']?([\w-]+)", self.corpo[:2048], re.I)
+            charset = meta.group(1).decode("ascii") if meta else "utf-8"
+        try:
+            return self.corpo.decode(charset, errors="replace")
+        except LookupError:
+            return self.corpo.decode("utf-8", errors="replace")
+
+def _descomprimir(corpo, codificacao):
+    codificacao = (codificacao or "").lower()
+    if codificacao == "gzip":
+        return gzip.decompress(corpo)
+    if codificacao == "deflate":
+        try:
+            return zlib.decompress(corpo)
+        except zlib.error:
+            return zlib.decompress(corpo, -zlib.MAX_WBITS)  # deflate "cru", sem cabeçalho zlib
+    return corpo
+
+class ClienteHTTP:
+    """
+    Cliente HTTP sem navegador: conexões keep-alive reaproveitadas por host, gzip,
+    cookies simples por host e limite de requisições simultâneas por host
+    """
+
+    def __init__(self, limite_por_host=LIMITE_POR_HOST_HTTP, timeout=TIMEOUT_HTTP, cabecalhos=None):
+        self.timeout = timeout
+        self.cabecalhos = {**CABECALHOS_PADRAO, **(cabecalhos or {})}
+        self.limitador = LimitadorHosts(limite_por_host)
+        self._ociosas = {}  # (esquema, host, porta) -> [conexões livres]
+        self._cookies = {}  # host -> {nome: valor}
+        self._trava = threading.Lock()
+        self.requisicoes = 0
+        self.conexoes_abertas = 0
+        self.bytes_recebidos = 0  # no fio (comprimido)
+        self.bytes_descomprimidos = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.fechar()
+        return False
+
+    def fechar(self):
+        """Fecha as conexões ociosas do pool"""
+        with self._trava:
+            conexoes = [c for livres in self._ociosas.values() for c in livres]
+            self._ociosas = {}
+        for conexao in conexoes:
+            conexao.close()
+
+    def _obter_conexao(self, chave):
+        with self._trava:
+            livres = self._ociosas.get(chave)
+            if livres:
+                return livres.pop(), True
+            self.conexoes_abertas += 1
+        esquema, host, porta = chave
+        classe = http.client.HTTPSConnection if esquema == "https" else http.client.HTTPConnection
+        return classe(host, porta, timeout=self.timeout), False
+
+    def _devolver_conexao(self, chave, conexao):
+        with self._trava:
+            self._ociosas.setdefault(chave, []).append(conexao)
+
+    def _cabecalho_cookie(self, host):
+        with self._trava:
+            cookies = self._cookies.get(host, {})
+            return "; ".join(f"{nome}={valor}" for nome, valor in cookies.items())
+
+    def _guardar_cookies(self, host, resposta):
+        for linha in resposta.msg.get_all("Set-Cookie") or []:
+            nome, _, valor = linha.split(";", 1)[0].partition("=")
+            if nome.strip():
+                with self._trava:
+                    self._cookies.setdefault(host, {})[nome.strip()] = valor.strip()
+
+    def _requisitar_uma(self, url):
+        """Uma requisição GET (sem seguir redirecionamento), reaproveitando conexão do pool"""
+        partes = urlsplit(url)
+        # Com espelho ativo a conexão vai para ele; cookies e a URL da resposta continuam os do site
+        destino = urlsplit(url_no_espelho(url))
+        esquema = destino.scheme or "https"
+        porta = destino.port or (443 if esquema == "https" else 80)
+        chave = (esquema, destino.hostname, porta)
+        caminho = destino.path or "/"
+        if destino.query:
+            caminho += "?" + destino.query
+
+        cabecalhos = dict(self.cabecalhos)
+        cookie = self._cabecalho_cookie(partes.hostname)
+        if cookie:
+            cabecalhos["Cookie"] = cookie
+
+        for tentativa in range(2):
+            conexao, reaproveitada = self._obter_conexao(chave)
+            try:
+                conexao.request("GET", caminho, headers=cabecalhos)
+                resposta = conexao.getresponse()
+                corpo = resposta.read()
+            except _ERROS_CONEXAO_VELHA:
+                conexao.close()
+                if reaproveitada and tentativa == 0:
+                    continue  # o servidor fechou a conexão ociosa: tenta de novo com uma nova
+                raise
+            except Exception:
+                conexao.close()
+                raise
+
+            if resposta.will_close:
+                conexao.close()
+            else:
+                self._devolver_conexao(chave, conexao)
+            self._guardar_cookies(partes.hostname, resposta)
+
+            conteudo = _descomprimir(corpo, resposta.getheader("Content-Encoding"))
+            with self._trava:
+                self.requisicoes += 1
+                self.bytes_recebidos += len(corpo)
+                self.bytes_descomprimidos += len(conteudo)
+            cabecalhos_resposta = {nome.lower(): valor for nome, valor in resposta.getheaders()}
+            return RespostaHTTP(url, resposta.status, cabecalhos_resposta, conteudo)
+
+    def _requisitar(self, url):
+        """GET seguindo redirecionamentos (bloqueante; roda em thread)"""
+        for _ in range(MAX_REDIRECIONAMENTOS + 1):
+            resposta = self._requisitar_uma(url)
+            destino = resposta.cabecalhos.get("location")
+            if resposta.status in (301, 302, 303, 307, 308) and destino:
+                url = urljoin(url, destino)
+                continue
+            return resposta
+        raise http.client.HTTPException(f"Redirecionamentos demais a partir de {url}")
+
+    async def buscar(self, url):
+        """GET assíncrono: a E/S roda em thread, respeitando o limite do host"""
+        semaforo = self.limitador.semaforo(url)
+        with medir("fila_host"):
+            await semaforo.acquire()
+        try:
+            with medir("http"):
+                return await asyncio.to_thread(self._requisitar, url)
+        finally:
+            semaforo.release()
+
+    def resumo(self):
+        """Linha de resumo para o log"""
+        return (f"{self.requisicoes} requisições em {self.conexoes_abertas} conexões, "
+                f"{self.bytes_recebidos / 1024:.0f} KB recebidos "
+                f"({self.bytes_descomprimidos / 1024:.0f} KB descomprimidos)")
+
+def _falha_http(resposta):
+    """Motivo da falha (exceção ou status fora de 2xx que não marca o fim da listagem), ou None"""
+    if isinstance(resposta, Exception):
+        return type(resposta).__name__
+    if not resposta.ok and resposta.status not in STATUS_FIM_LISTAGEM:
+        return f"status {resposta.status}"
+    return None
+
+async def percorrer_paginas_http(cliente, url_pagina, processar, max_paginas, paralelas=PAGINAS_SIMULTANEAS):
+    """
+    Busca as páginas 1..max_paginas sem navegador e passa o HTML de cada uma para
+    `processar(html, numero)`, que retorna a lista de eventos ou None quando a página não tem cards.
+    A página 1 vai sozinha (cookies/sessão); as demais em janelas de `paralelas`.
+    Retorna os eventos na ordem das páginas, parando na primeira sem cards (ou 404/410),
+    ou None se a página 1 falhar ou vier sem cards, ou se uma página do meio falhar também
+    na segunda tentativa: a listagem estaria incompleta e a fonte deve cair para o Playwright
+    """
+    inicio = time.monotonic()
+    try:
+        resposta = await cliente.buscar(url_pagina(1))
+    except Exception as e:
+        print(f"   ⚠️ HTTP: página 1 falhou ({type(e).__name__}: {str(e)[:50]})")
+        return None
+    if not resposta.ok:
+        print(f"   ⚠️ HTTP: página 1 respondeu {resposta.status}")
+        return None
+    eventos_pagina = processar(resposta.texto(), 1)
+    if eventos_pagina is None:
+        print("   ⚠️ HTTP: página 1 sem cards no HTML (conteúdo depende de JavaScript?)")
+        return None
+
+    todos_eventos = list(eventos_pagina)
+    paginas_lidas = 1
+    numero = 2
+    while numero <= max_paginas:
+        numeros = list(range(numero, min(numero + max(1, paralelas), max_paginas + 1)))
+        respostas = await asyncio.gather(*(cliente.buscar(url_pagina(n)) for n in numeros), return_exceptions=True)
+
+        # Mantém a ordem das páginas e descarta o que vier depois da primeira sem cards
+        for n, resposta in zip(numeros, respostas):
+            motivo = _falha_http(resposta)
+            if motivo:
+                # Falha passageira (503, conexão caída) não pode virar fim da listagem: tenta mais uma vez
+                print(f"   ⚠️ HTTP: página {n} falhou ({motivo}) - tentando de novo")
+                await asyncio.sleep(PAUSA_RETENTATIVA_HTTP)
+                try:
+                    resposta = await cliente.buscar(url_pagina(n))
+                except Exception as e:
+                    resposta = e
+                motivo = _falha_http(resposta)
+                if motivo:
+                    print(f"   ⚠️ HTTP: página {n} falhou de novo ({motivo}) - listagem incompleta")
+                    return None
+            eventos_pagina = processar(resposta.texto(), n) if resposta.ok else None
+            if eventos_pagina is None:
+                numero = max_paginas + 1
+                break
+            todos_eventos.extend(eventos_pagina)
+            paginas_lidas += 1
+        else:
+            numero = numeros[-1] + 1
+
+    print(f"   ⚡ HTTP: {paginas_lidas} páginas em {time.monotonic() - inicio:.1f}s | {cliente.resumo()}")
+    return todos_eventos
@@ -0,0 +1,181 @@
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from .telemetria import cronometrar
+
+# Configurações
+TIMEOUT_CAPTURA = 15  # segundos esperando a primeira resposta JSON
+QUIETUDE_CAPTURA = 1.0  # segundos sem novas respostas para considerar a carga completa
+INTERVALO_VERIFICACAO = 0.05
+FUSO_BRASILIA = timezone(timedelta(hours=-3))
+
+# Apps Bubble.io: a listagem chega pelo Elasticsearch do app ou pela Data API
+PADROES_API_BUBBLE = [
+    r"/elasticsearch/(m?search|msearch)\b",
+    r"/api/1\.1/obj/",
+]
+
+class CapturaJSON:
+    """
+    Guarda as respostas JSON da página cujas URLs casam com os padrões da fonte
+    e converte cada payload em eventos com o mapeador da fonte
+    """
+
+    def __init__(self, padroes, mapeador):
+        self.padroes = [re.compile(p) for p in padroes]
+        self.mapeador = mapeador
+        self.payloads = []  # (url, dados) na ordem de chegada
+        self._consumidos = 0
+        self._mapeados = []  # eventos dos payloads já mapeados (cada payload é mapeado uma vez só)
+        self._mapeados_ate = 0
+        self._pendentes = set()
+        self._ultima_chegada = None
+
+    def casa(self, url):
+        """True se a URL é de um endpoint registrado pela fonte"""
+        return any(p.search(url) for p in self.padroes)
+
+    def _ao_receber(self, resposta):
+        if not self.casa(resposta.url) or not resposta.ok:
+            return
+        tarefa = asyncio.ensure_future(self._ler(resposta))
+        self._pendentes.add(tarefa)
+        tarefa.add_done_callback(self._pendentes.discard)
+
+    async def _ler(self, resposta):
+        try:
+            dados = await resposta.json()
+        except Exception:
+            return  # Não era JSON (ou o corpo já foi descartado)
+        self.payloads.append((resposta.url, dados))
+        self._ultima_chegada = time.monotonic()
+
+    @cronometrar("espera")
+    async def aguardar(self, timeout=TIMEOUT_CAPTURA, quietude=QUIETUDE_CAPTURA, minimo=None):
+        """
+        Aguarda chegar pelo menos `minimo` payloads (padrão: um além dos já capturados)
+        e a captura ficar `quietude` segundos sem novidades. Retorna False se nada chegou
+        """
+        alvo = len(self.payloads) + 1 if minimo is None else minimo
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite:
+            if (len(self.payloads) >= alvo and not self._pendentes
+                    and time.monotonic() - self._ultima_chegada >= quietude):
+                return True
+            await asyncio.sleep(INTERVALO_VERIFICACAO)
+        return len(self.payloads) >= alvo
+
+    @cronometrar("parse")
+    def _mapear(self, payloads):
+        eventos = []
+        for url, dados in payloads:
+            try:
+                eventos.extend(self.mapeador(dados) or [])
+            except Exception as e:
+                print(f"   ⚠️ Payload não reconhecido ({url[:60]}): {str(e)[:50]}...")
+        return eventos
+
+    async def eventos(self):
+        """Eventos de todos os payloads capturados até agora (mapeia só os que chegaram desde a última chamada)"""
+        if self._pendentes:
+            await asyncio.gather(*list(self._pendentes), return_exceptions=True)
+        if self._mapeados_ate < len(self.payloads):
+            fim = len(self.payloads)
+            self._mapeados.extend(self._mapear(self.payloads[self._mapeados_ate:fim]))
+            self._mapeados_ate = fim
+        return list(self._mapeados)
+
+    def descartar(self):
+        """Marca os payloads recebidos até aqui como consumidos (a página já foi lida pelo DOM)"""
+        self._consumidos = len(self.payloads)
+
+    async def novos_eventos(self):
+        """Eventos só dos payloads que chegaram desde a última chamada (paginação)"""
+        if self._pendentes:
+            await asyncio.gather(*list(self._pendentes), return_exceptions=True)
+        novos = self.payloads[self._consumidos:]
+        self._consumidos = len(self.payloads)
+        return self._mapear(novos)
+
+@asynccontextmanager
+async def capturar_json(page, padroes, mapeador):
+    """Registra a captura na página (antes da navegação) e remove o listener ao sair"""
+    captura = CapturaJSON(padroes, mapeador)
+    page.on("response", captura._ao_receber)
+    try:
+        yield captura
+    finally:
+        page.remove_listener("response", captura._ao_receber)
+
+def encontrar_registros(dados, chaves):
+    """Percorre o JSON e devolve todos os dicts que têm pelo menos uma das chaves"""
+    registros = []
+    pilha = [dados]
+    while pilha:
+        atual = pilha.pop()
+        if isinstance(atual, dict):
+            if any(chave in atual for chave in chaves):
+                registros.append(atual)
+            else:
+                pilha.extend(reversed(list(atual.values())))
+        elif isinstance(atual, list):
+            pilha.extend(reversed(atual))
+    return registros
+
+def valor(registro, *caminhos):
+    """Primeiro valor não vazio entre os caminhos ('local.city' navega em dicts aninhados)"""
+    for caminho in caminhos:
+        atual = registro
+        for parte in caminho.split("."):
+            if not isinstance(atual, dict):
+                atual = None
+                break
+            atual = atual.get(parte)
+        if atual not in (None, "", [], {}):
+            return atual
+    return None
+
+def converter_data_api(bruto):
+    """
+    Converte a data de um payload (ISO 8601 ou epoch em ms/s) em (data_obj, 'dd/mm/aaaa'),
+    no fuso de Brasília. Retorna (None, None) se não reconhecer o formato
+    """
+    if bruto in (None, ""):
+        return None, None
+    try:
+        if isinstance(bruto, (int, float)):
+            segundos = bruto / 1000 if bruto > 10 ** 11 else bruto
+            data_obj = datetime.fromtimestamp(segundos, FUSO_BRASILIA)
+        else:
+            texto = re.sub(r"\.\d+", "", str(bruto).strip()).replace("Z", "+00:00")
+            data_obj = datetime.fromisoformat(texto)
+            if data_obj.tzinfo:
+                data_obj = data_obj.astimezone(FUSO_BRASILIA)
+    except (ValueError, OverflowError, OSError):
+        return None, None
+    data_obj = datetime(data_obj.year, data_obj.month, data_obj.day)
+    return data_obj, data_obj.strftime("%d/%m/%Y")
+
+def registros_bubble(dados):
+    """Objetos de dados de uma resposta do Bubble (hits do Elasticsearch ou 'results' da Data API)"""
+    registros = [hit["_source"] for hit in encontrar_registros(dados, ("_source",))
+                 if isinstance(hit["_source"], dict)]
+    if not registros:
+        for resposta in encontrar_registros(dados, ("results",)):
+            if isinstance(resposta["results"], list):
+                registros.extend(r for r in resposta["results"] if isinstance(r, dict))
+    return registros
+
+def campo_bubble(registro, palavras, sufixos=("_text",)):
+    """
+    Valor do primeiro campo do Bubble cujo nome contém uma das palavras e termina
+    com um dos sufixos de tipo (ex.: 'nome_evento_text', 'data_inicio_date')
+    """
+    for palavra in palavras:
+        for chave, conteudo in registro.items():
+            chave_min = chave.lower()
+            if palavra in chave_min and chave_min.endswith(tuple(sufixos)) and conteudo not in (None, "", []):
+                return conteudo
+    return None
@@ -1,8 +1,12 @@
-import time
 import hashlib
 import re
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import aguardar_carregamento, rolar_ate_estabilizar
+from .datas import interpretar_datas
+from .telemetria import cronometrar
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,83 +21,51 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para CSV
     return texto
 
-def processar_data_liverun(data_str):
-    """Processa data do LIVE! Run: '14/09 - Domingo' -> '14/09/2025'"""
-    if not data_str:
-        return None, None
-    
-    try:
-        # Extrai apenas a parte da data: "14/09"
-        data_match = re.search(r'(\d{1,2})/(\d{1,2})', data_str)
-        if not data_match:
-            return None, None
-        
-        dia = data_match.group(1).zfill(2)
-        mes = data_match.group(2).zfill(2)
-        
-        # Assume ano atual ou próximo
-        ano_atual = datetime.now().year
-        data_str_formatada = f"{dia}/{mes}/{ano_atual}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            # Se a data já passou, assume ano seguinte
-            if data_obj < datetime.now():
-                data_obj = datetime.strptime(f"{dia}/{mes}/{ano_atual + 1}", '%d/%m/%Y')
-                data_str_formatada = f"{dia}/{mes}/{ano_atual + 1}"
-            
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
-    except:
-        pass
-    
-    return None, None
+# Campos de cada card disponível (não encerrado), extraídos em uma única chamada
+SELETOR_CARD_LIVERUN = ".event:not(:has(.subscription-closed))"
+CAMPOS_CARD_LIVERUN = {
+    "href": campo("a", atributo="href"),
+    "cidade": campo(".event-info h3"),
+    "data": campo(".event-date"),
+    "modalidades": campo(".event-modalities"),
+    "botao": campo(".btn-two"),
+}
 
-def coletar_eventos_liverun(page):
+@cronometrar("parse")
+async def coletar_eventos_liverun(page):
     """Coleta eventos do LIVE! Run disponíveis"""
     eventos = []
     
     try:
         # Scroll para carregar todos os eventos
         print("   🔄 Carregando todos os eventos...")
-        for i in range(5):
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(2)
+        await rolar_ate_estabilizar(page, ".event", max_rolagens=5)
         
-        # Seleciona todos os eventos disponíveis (não encerrados)
-        eventos_cards = page.query_selector_all(".event:not(:has(.subscription-closed))")
+        # Extrai todos os eventos disponíveis de uma vez
+        eventos_cards = await extrair_cards(page, SELETOR_CARD_LIVERUN, CAMPOS_CARD_LIVERUN)
         print(f"   📦 {len(eventos_cards)} eventos disponíveis encontrados")
         
+        # Todas as datas da página de uma vez, contra a mesma data de referência
+        datas = interpretar_datas([card["data"] for card in eventos_cards])
         for i, card in enumerate(eventos_cards):
             try:
                 # Link do evento
-                link_el = card.query_selector("a")
-                if not link_el:
-                    continue
-                
-                href = link_el.get_attribute("href")
+                href = card["href"]
                 if not href:
                     continue
                 
                 url_evento = href if href.startswith("http") else f"https://www.liverun.com.br/{href}"
                 
                 # Cidade/local
-                cidade_el = card.query_selector(".event-info h3")
-                if not cidade_el:
-                    continue
-                
-                cidade = limpar_texto(cidade_el.inner_text())
+                cidade = limpar_texto(card["cidade"])
                 if not cidade or len(cidade) < 3:
                     continue
                 
                 # Data do evento
-                data_el = card.query_selector(".event-date")
-                if not data_el:
+                if card["data"] is None:
                     continue
                 
-                data_str = limpar_texto(data_el.inner_text())
-                data_obj, data_formatada = processar_data_liverun(data_str)
+                data_obj, data_formatada = datas[i]
                 
                 if not data_obj:
                     continue
@@ -103,26 +75,14 @@ def coletar_eventos_liverun(page):
                     continue
                 
                 # Modalidades
-                modalidades_el = card.query_selector(".event-modalities")
-                modalidades = "Corrida de Rua"
-                if modalidades_el:
-                    mod_text = limpar_texto(modalidades_el.inner_text())
-                    if mod_text:
-                        modalidades = mod_text
+                modalidades = limpar_texto(card["modalidades"]) or "Corrida de Rua"
                 
                 # Título do evento (LIVE! Run + Cidade)
                 titulo = f"LIVE! Run {cidade} 2025"
                 
                 # Status do botão (verifica se está disponível)
-                btn_el = card.query_selector(".btn-two")
-                disponivel = True
-                if btn_el:
-                    btn_text = limpar_texto(btn_el.inner_text())
-                    if "encerrad" in btn_text.lower() or "breve" in btn_text.lower():
-                        disponivel = False
-                
-                # Só adiciona se estiver disponível
-                if not disponivel:
+                btn_text = limpar_texto(card["botao"]).lower()
+                if "encerrad" in btn_text or "breve" in btn_text:
                     continue
                 
                 # Hash para deduplicação
@@ -154,7 +114,7 @@ def coletar_eventos_liverun(page):
     
     return eventos
 
-def extrair_liverun(max_tentativas=3):
+async def extrair_liverun_async(max_tentativas=3):
     """Extrai eventos do LIVE! Run"""
     eventos = []
     
@@ -162,25 +122,19 @@ def extrair_liverun(max_tentativas=3):
         try:
             print(f"🔎 LIVE! Run - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("LIVE! Run") as sessao:
+                page = await sessao.nova_pagina()
                 
                 try:
                     print("📄 Carregando LIVE! Run...")
-                    page.goto("https://www.liverun.com.br/calendario", timeout=60000)
-                    time.sleep(5)
+                    await navegar(page, "https://www.liverun.com.br/calendario", timeout=60000)
                     
-                    # Aguarda os eventos aparecerem
-                    try:
-                        page.wait_for_selector(".event", timeout=20000)
-                    except TimeoutError:
+                    # Aguarda os eventos aparecerem e a rede sossegar
+                    if not await aguardar_carregamento(page, ".event", timeout=20):
                         print("   ⚠️ Eventos não carregaram no tempo esperado")
-                        browser.close()
                         continue
                     
-                    eventos = coletar_eventos_liverun(page)
-                    browser.close()
+                    eventos = await coletar_eventos_liverun(page)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -205,7 +159,6 @@ def extrair_liverun(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -214,4 +167,8 @@ def extrair_liverun(max_tentativas=3):
                 print("💀 LIVE! Run falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_liverun(max_tentativas=3):
+    """Extrai eventos do LIVE! Run (entrada síncrona)"""
+    return executar_sync(extrair_liverun_async(max_tentativas))
@@ -1,8 +1,14 @@
-import time
 import hashlib
 import re
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards, extrair_cards_html
+from .http_rapido import ClienteHTTP, percorrer_paginas_http, http_rapido_habilitado
+from .esperas import aguardar_carregamento, aguardar_troca_pagina
+from .datas import interpretar_datas
+from .classificador import classificador
+from .telemetria import cronometrar, medir
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,66 +23,7 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para não quebrar CSV
     return texto
 
-def eh_evento_de_corrida_minhas_inscricoes(titulo, categoria=""):
-    """Verifica se o evento é relacionado a corrida"""
-    if not titulo:
-        return False
-    
-    titulo_lower = titulo.lower()
-    categoria_lower = categoria.lower() if categoria else ""
-    
-    # Palavras-chave que indicam corrida
-    palavras_corrida = [
-        'corrida', 'maratona', 'run', 'running', 'atletismo', 
-        'cooper', 'caminhada', 'trote', 'meia maratona',
-        '5k', '10k', '21k', '42k', 'km', 'trail',
-        'night run', 'day run', 'street run', 'rustica'
-    ]
-    
-    # Categorias que indicam corrida
-    categorias_corrida = [
-        'corrida de rua', 'trail run', 'ultramaratona', 
-        'meia maratona', 'evento de corrida', 'corridas de montanha'
-    ]
-    
-    # Verifica na categoria primeiro (mais confiável)
-    for cat in categorias_corrida:
-        if cat in categoria_lower:
-            return True
-    
-    # Verifica no título
-    for palavra in palavras_corrida:
-        if palavra in titulo_lower:
-            return True
-    
-    return False
-
-def processar_data_minhas_inscricoes(data_str):
-    """Processa datas do formato: '09/08/2025'"""
-    if not data_str:
-        return None, None
-    
-    # Remove ícones e espaços extras
-    data_limpa = re.sub(r'<[^>]+>', '', data_str)  # Remove tags HTML
-    data_limpa = data_limpa.strip()
-    
-    # Padrão: "09/08/2025"
-    padrao = r'(\d{2})/(\d{2})/(\d{4})'
-    match = re.search(padrao, data_limpa)
-    
-    if match:
-        dia, mes, ano = match.groups()
-        data_str_formatada = f"{dia}/{mes}/{ano}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
-    
-    return None, data_str
-
-def navegar_paginas_minhas_inscricoes(page, max_paginas=16):
+async def navegar_paginas_minhas_inscricoes(page, max_paginas=16):
     """Navega pelas páginas do Minhas Inscrições"""
     todos_eventos = []
     
@@ -91,10 +38,11 @@ def navegar_paginas_minhas_inscricoes(page, max_paginas=16):
                 # Navega para próxima página
                 try:
                     # Procura pelo link da página específica
-                    link_pagina = page.query_selector(f"a[href*='pagina={pagina_atual}']")
-                    if link_pagina and link_pagina.is_visible():
-                        link_pagina.click()
-                        time.sleep(4)  # Aguarda carregar (AJAX)
+                    link_pagina = await page.query_selector(f"a[href*='pagina={pagina_atual}']")
+                    if link_pagina and await link_pagina.is_visible():
+                        # Aguarda os cards da página anterior serem substituídos (AJAX)
+                        if not await aguardar_troca_pagina(page, ".thumbnail.card-default", link_pagina.click):
+                            print(f"   ⚠️ Página {pagina_atual}: conteúdo não mudou no tempo esperado")
                     else:
                         print(f"   ❌ Link da página {pagina_atual} não encontrado")
                         break
@@ -104,22 +52,20 @@ def navegar_paginas_minhas_inscricoes(page, max_paginas=16):
             
             # Aguarda os cards carregarem
             try:
-                page.wait_for_selector(".thumbnail.card-default", timeout=10000)
+                with medir("espera"):
+                    await page.wait_for_selector(".thumbnail.card-default", timeout=10000)
             except TimeoutError:
                 print(f"   ⚠️ Página {pagina_atual}: Cards não carregaram")
                 continue
             
             # Coleta eventos da página atual
-            eventos_pagina = coletar_eventos_pagina_minhas_inscricoes(page, pagina_atual)
+            eventos_pagina = await coletar_eventos_pagina_minhas_inscricoes(page, pagina_atual)
             
             if eventos_pagina:
                 todos_eventos.extend(eventos_pagina)
                 print(f"   ✅ Página {pagina_atual}: {len(eventos_pagina)} corridas coletadas")
             else:
                 print(f"   ⚠️ Página {pagina_atual}: Nenhuma corrida encontrada")
-            
-            # Pequena pausa entre páginas
-            time.sleep(2)
                 
         except Exception as e:
             print(f"   ❌ Erro na página {pagina_atual}: {str(e)[:50]}...")
@@ -127,126 +73,170 @@ def navegar_paginas_minhas_inscricoes(page, max_paginas=16):
     
     return todos_eventos
 
-def coletar_eventos_pagina_minhas_inscricoes(page, pagina_num):
-    """Coleta eventos de corrida de uma página do Minhas Inscrições"""
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_MINHAS_INSCRICOES = ".thumbnail.card-default"
+CAMPOS_CARD_MINHAS_INSCRICOES = {
+    "titulo": campo(".titulo-destaque"),
+    "data": campo("p:has(i.fa-calendar-alt)"),
+    "local": campo("p:has(i.fa-map-marker) span"),
+    "paragrafos_sem_icone": campo("p:not(:has(i))", todos=True),
+    "href": campo(["a.btn.btn-warning", "a[href*='ClickEventos']"], atributo="href"),
+}
+
+@cronometrar("parse")
+def processar_cards_minhas_inscricoes(cards):
+    """Converte os cards extraídos (do navegador ou do HTML) em corridas"""
     eventos = []
     
-    try:
-        # Seleciona todos os cards de evento
-        cards = page.query_selector_all(".thumbnail.card-default")
-        
-        for i, card in enumerate(cards):
-            try:
-                # Título
-                titulo_el = card.query_selector(".titulo-destaque")
-                titulo = limpar_texto(titulo_el.inner_text()) if titulo_el else ""
-                
-                if not titulo:
-                    continue
-                
-                # Data
-                data_el = card.query_selector("p:has(i.fa-calendar-alt)")
-                data_raw = ""
-                if data_el:
-                    data_raw = limpar_texto(data_el.inner_text())
-                else:
-                    continue
-                
-                data_obj, data_formatada = processar_data_minhas_inscricoes(data_raw)
-                if not data_obj:
-                    continue
-                
-                # Só eventos futuros
-                if data_obj < datetime.now():
-                    continue
-                
-                # Local
-                local_el = card.query_selector("p:has(i.fa-map-marker) span")
-                local = limpar_texto(local_el.inner_text()) if local_el else "Local não informado"
-                
-                # Categoria (último <p> do card)
-                categoria_els = card.query_selector_all("p")
-                categoria = ""
-                for p in categoria_els:
-                    texto_p = limpar_texto(p.inner_text())
-                    # Se não tem ícone e não é data/local, provavelmente é categoria
-                    if not p.query_selector("i") and texto_p and "/" not in texto_p:
-                        categoria = texto_p
-                        break
-                
-                # Verifica se é evento de corrida
-                if not eh_evento_de_corrida_minhas_inscricoes(titulo, categoria):
-                    continue
-                
-                # Link
-                link_el = card.query_selector("a.btn.btn-warning")
-                if not link_el:
-                    link_el = card.query_selector("a[href*='ClickEventos']")
-                
-                link = ""
-                if link_el:
-                    href = link_el.get_attribute("href")
-                    if href:
-                        link = href if href.startswith("http") else f"https://minhasinscricoes.com.br{href}"
-                
-                # Validações básicas
-                if len(titulo.strip()) < 3:
-                    continue
-                
-                # Hash para deduplicação
-                evento_hash = gerar_hash_evento(titulo, data_formatada, local)
-                
-                eventos.append({
-                    "titulo": titulo,
-                    "data": data_formatada,
-                    "local": local,
-                    "link": link,
-                    "hash": evento_hash,
-                    "fonte": "MinhasInscricoes",
-                    "data_obj": data_obj,
-                    "categoria": categoria
-                })
-                
-                # Mostra detalhes dos primeiros 3 eventos
-                if len(eventos) <= 3:
-                    print(f"   ✅ Evento {len(eventos)}: {titulo[:35]}... | {data_formatada} | {local[:25]}...")
-                
-            except Exception as e:
+    # Todas as datas da página de uma vez, contra a mesma data de referência
+    datas = interpretar_datas([card["data"] for card in cards])
+    for i, card in enumerate(cards):
+        try:
+            # Título
+            titulo = limpar_texto(card["titulo"])
+            
+            if not titulo:
                 continue
-                
+            
+            # Data
+            if card["data"] is None:
+                continue
+            
+            data_obj, data_formatada = datas[i]
+            if not data_obj:
+                continue
+            
+            # Só eventos futuros
+            if data_obj < datetime.now():
+                continue
+            
+            # Local
+            local = limpar_texto(card["local"]) if card["local"] is not None else "Local não informado"
+            
+            # Categoria: primeiro <p> sem ícone que não é data/local
+            categoria = ""
+            for texto_p in card["paragrafos_sem_icone"]:
+                texto_p = limpar_texto(texto_p)
+                if texto_p and "/" not in texto_p:
+                    categoria = texto_p
+                    break
+            
+            # Verifica se é evento de corrida
+            if not classificador("MinhasInscricoes").eh_corrida(titulo, categoria):
+                continue
+            
+            # Link
+            link = ""
+            href = card["href"]
+            if href:
+                link = href if href.startswith("http") else f"https://minhasinscricoes.com.br{href}"
+            
+            # Validações básicas
+            if len(titulo.strip()) < 3:
+                continue
+            
+            # Hash para deduplicação
+            evento_hash = gerar_hash_evento(titulo, data_formatada, local)
+            
+            eventos.append({
+                "titulo": titulo,
+                "data": data_formatada,
+                "local": local,
+                "link": link,
+                "hash": evento_hash,
+                "fonte": "MinhasInscricoes",
+                "data_obj": data_obj,
+                "categoria": categoria
+            })
+            
+            # Mostra detalhes dos primeiros 3 eventos
+            if len(eventos) <= 3:
+                print(f"   ✅ Evento {len(eventos)}: {titulo[:35]}... | {data_formatada} | {local[:25]}...")
+            
+        except Exception as e:
+            continue
+    
+    return eventos
+
+async def coletar_eventos_pagina_minhas_inscricoes(page, pagina_num):
+    """Coleta eventos de corrida de uma página do Minhas Inscrições"""
+    try:
+        # Extrai todos os cards da página de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_MINHAS_INSCRICOES, CAMPOS_CARD_MINHAS_INSCRICOES)
+        return processar_cards_minhas_inscricoes(cards)
     except Exception as e:
         print(f"   ⚠️ Erro ao coletar página {pagina_num}: {str(e)[:50]}...")
+        return []
+
+def url_pagina_minhas_inscricoes(numero):
+    """URL da página `numero` do calendário"""
+    if numero == 1:
+        return "https://minhasinscricoes.com.br/pt-br/calendario"
+    return f"https://minhasinscricoes.com.br/pt-br/calendario?pagina={numero}"
+
+def processar_html_minhas_inscricoes(html, numero):
+    """Corridas de uma página baixada sem navegador; None se a página não tem cards (fim)"""
+    cards = extrair_cards_html(html, SELETOR_CARD_MINHAS_INSCRICOES, CAMPOS_CARD_MINHAS_INSCRICOES)
+    if not cards:
+        return None
+    eventos_pagina = processar_cards_minhas_inscricoes(cards)
+    print(f"   ✅ Página {numero}: {len(eventos_pagina)} corridas coletadas")
+    return eventos_pagina
+
+async def coletar_minhas_inscricoes_http(max_paginas=16):
+    """Percorre o calendário só com HTTP; None se o HTML não trouxer os cards"""
+    async with ClienteHTTP() as cliente:
+        return await percorrer_paginas_http(cliente, url_pagina_minhas_inscricoes, processar_html_minhas_inscricoes, max_paginas)
+
+def remover_duplicatas_minhas_inscricoes(eventos):
+    """Remove duplicatas internas e ordena por data"""
+    eventos_unicos = {}
+    for evento in eventos:
+        hash_evento = evento['hash']
+        if hash_evento not in eventos_unicos:
+            eventos_unicos[hash_evento] = evento
     
-    return eventos
+    eventos_finais = list(eventos_unicos.values())
+    eventos_finais.sort(key=lambda x: x['data_obj'])
+    
+    duplicatas = len(eventos) - len(eventos_finais)
+    
+    print(f"✅ Minhas Inscrições: {len(eventos_finais)} corridas únicas coletadas")
+    if duplicatas > 0:
+        print(f"🔄 {duplicatas} duplicatas internas removidas")
+    
+    return eventos_finais
 
-def extrair_minhas_inscricoes(max_tentativas=3):
+async def extrair_minhas_inscricoes_async(max_tentativas=3):
     """Extrai eventos de corrida do Minhas Inscrições"""
     eventos = []
     
+    # Páginas renderizadas no servidor: tenta primeiro sem navegador
+    if http_rapido_habilitado():
+        print("⚡ Minhas Inscrições - modo HTTP")
+        eventos = await coletar_minhas_inscricoes_http(max_paginas=16)
+        if eventos:
+            return remover_duplicatas_minhas_inscricoes(eventos)
+        print("↩️ Minhas Inscrições: modo HTTP sem corridas - usando o navegador")
+        eventos = []
+    
     for tentativa in range(max_tentativas):
         try:
             print(f"🔎 Minhas Inscrições - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("Minhas Inscrições") as sessao:
+                page = await sessao.nova_pagina()
                 
                 # URL do calendário com filtro para corridas
-                url = "https://minhasinscricoes.com.br/pt-br/calendario"
+                url = url_pagina_minhas_inscricoes(1)
                 
                 try:
                     print("📄 Carregando Minhas Inscrições...")
-                    page.goto(url, timeout=60000)
+                    await navegar(page, url, timeout=60000)
                     
-                    # Aguarda a página carregar completamente
-                    time.sleep(5)
-                    
-                    # Aguarda os cards aparecerem
-                    try:
-                        page.wait_for_selector(".thumbnail.card-default", timeout=20000)
-                    except TimeoutError:
+                    # Aguarda os cards aparecerem e a rede sossegar
+                    if not await aguardar_carregamento(page, ".thumbnail.card-default", timeout=20):
                         print("   ⚠️ Cards não carregaram no tempo esperado")
-                        browser.close()
                         continue
                     
                     # Verifica se há filtros ativos e aplicar se necessário
@@ -258,34 +248,15 @@ def extrair_minhas_inscricoes(max_tentativas=3):
                         print(f"   ⚠️ Erro ao aplicar filtros: {str(e)[:50]}...")
                     
                     # Navega por todas as páginas
-                    eventos = navegar_paginas_minhas_inscricoes(page, max_paginas=16)
-                    
-                    browser.close()
+                    eventos = await navegar_paginas_minhas_inscricoes(page, max_paginas=16)
                     
                     if eventos:
-                        # Remove duplicatas internas
-                        eventos_unicos = {}
-                        for evento in eventos:
-                            hash_evento = evento['hash']
-                            if hash_evento not in eventos_unicos:
-                                eventos_unicos[hash_evento] = evento
-                        
-                        eventos_finais = list(eventos_unicos.values())
-                        eventos_finais.sort(key=lambda x: x['data_obj'])
-                        
-                        duplicatas = len(eventos) - len(eventos_finais)
-                        
-                        print(f"✅ Minhas Inscrições: {len(eventos_finais)} corridas únicas coletadas")
-                        if duplicatas > 0:
-                            print(f"🔄 {duplicatas} duplicatas internas removidas")
-                        
-                        return eventos_finais
+                        return remover_duplicatas_minhas_inscricoes(eventos)
                     else:
                         print("⚠️ Nenhuma corrida encontrada")
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -294,4 +265,8 @@ def extrair_minhas_inscricoes(max_tentativas=3):
                 print("💀 Minhas Inscrições falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_minhas_inscricoes(max_tentativas=3):
+    """Extrai eventos de corrida do Minhas Inscrições (entrada síncrona)"""
+    return executar_sync(extrair_minhas_inscricoes_async(max_tentativas))
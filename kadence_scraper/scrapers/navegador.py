@@ -0,0 +1,236 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+from playwright.async_api import async_playwright
+from .bloqueio import EstatisticasBloqueio, aplicar_bloqueio, politica_para_fonte
+from .espelho import espelho_ativo, aplicar_espelho
+from .har import ReproducaoHAR, diretorio_reproducao, opcoes_har, reproduzir_har
+from .telemetria import telemetria, fonte_atual, em_fonte, medir
+
+# Configurações
+MAX_PAGINAS_POR_CONTEXTO = 40
+LIMITE_POR_HOST_PADRAO = 2
+VIEWPORT_PADRAO = {"width": 1366, "height": 900}
+
+class LimitadorHosts:
+    """Limita quantas navegações simultâneas cada host recebe"""
+
+    def __init__(self, limite_por_host=LIMITE_POR_HOST_PADRAO):
+        self.limite_por_host = max(1, limite_por_host)
+        self._semaforos = {}
+
+    def semaforo(self, url):
+        """Semáforo do host da URL (criado sob demanda)"""
+        host = urlsplit(url).hostname or ""
+        if host not in self._semaforos:
+            self._semaforos[host] = asyncio.Semaphore(self.limite_por_host)
+        return self._semaforos[host]
+
+class SessaoNavegador:
+    """Contexto isolado (cookies, storage, viewport) de uma fonte dentro do Chromium compartilhado"""
+
+    def __init__(self, browser, nome, max_paginas=MAX_PAGINAS_POR_CONTEXTO, politica_bloqueio=None, **opcoes_contexto):
+        self.browser = browser
+        self.nome = nome
+        self.max_paginas = max_paginas
+        self.politica_bloqueio = politica_bloqueio
+        self.estatisticas_bloqueio = EstatisticasBloqueio(nome)
+        self.opcoes_contexto = {"viewport": VIEWPORT_PADRAO, **opcoes_contexto}
+        self.reproducao_har = ReproducaoHAR(nome) if diretorio_reproducao() else None
+        self.contexto = None
+        self.paginas_no_contexto = 0
+        self.contextos_criados = 0
+        self._aposentados = []
+
+    async def _novo_contexto(self):
+        """Cria um BrowserContext novo para a fonte"""
+        self.contexto = await self.browser.new_context(**{**self.opcoes_contexto, **opcoes_har(self.nome)})
+        if self.reproducao_har is not None:
+            # Só o que está nos HAR da fonte; registrado antes do bloqueio, como o espelho
+            await reproduzir_har(self.contexto, self.reproducao_har)
+        elif espelho_ativo():
+            # Registrado antes do bloqueio: o Playwright consulta as rotas da última para a primeira
+            await aplicar_espelho(self.contexto)
+        if self.politica_bloqueio is not None:
+            await aplicar_bloqueio(self.contexto, self.politica_bloqueio, self.estatisticas_bloqueio)
+        self.paginas_no_contexto = 0
+        self.contextos_criados += 1
+        return self.contexto
+
+    async def _reciclar_contexto(self):
+        """Aposenta o contexto atual; ele é fechado assim que não tiver mais páginas abertas"""
+        if self.contexto:
+            self._aposentados.append(self.contexto)
+        await self._novo_contexto()
+        await self._fechar_aposentados_livres()
+
+    async def _fechar_aposentados_livres(self):
+        """Fecha contextos aposentados que já não têm páginas abertas"""
+        restantes = []
+        for contexto in self._aposentados:
+            if contexto.pages:
+                restantes.append(contexto)
+                continue
+            try:
+                await contexto.close()
+            except Exception:
+                pass
+        self._aposentados = restantes
+
+    async def nova_pagina(self):
+        """Abre uma página, reciclando o contexto a cada `max_paginas` páginas"""
+        if self.contexto is None:
+            await self._novo_contexto()
+        elif self.paginas_no_contexto >= self.max_paginas:
+            await self._reciclar_contexto()
+        self.paginas_no_contexto += 1
+        return await self.contexto.new_page()
+
+    async def fechar(self):
+        """Fecha todos os contextos da fonte (é no close que o Playwright grava o HAR)"""
+        for contexto in self._aposentados + ([self.contexto] if self.contexto else []):
+            try:
+                await contexto.close()
+            except Exception:
+                pass
+        self._aposentados = []
+        self.contexto = None
+        if self.reproducao_har is not None and self.reproducao_har.fora_do_har:
+            print(self.reproducao_har.resumo())
+
+class GerenciadorNavegador:
+    """Lança o Chromium uma única vez e entrega um contexto isolado por fonte"""
+
+    def __init__(self, headless=True, max_paginas_por_contexto=MAX_PAGINAS_POR_CONTEXTO,
+                 limite_por_host=LIMITE_POR_HOST_PADRAO, bloquear_recursos=True):
+        self.headless = headless
+        self.max_paginas_por_contexto = max_paginas_por_contexto
+        self.limitador = LimitadorHosts(limite_por_host)
+        self.bloquear_recursos = bloquear_recursos
+        self.estatisticas_bloqueio = {}  # nome da fonte -> EstatisticasBloqueio
+        self._playwright = None
+        self.browser = None
+        self.sessoes_abertas = 0
+        self._lock_inicio = asyncio.Lock()
+
+    async def iniciar(self):
+        """Lança o Chromium (preguiçoso: só na primeira sessão)"""
+        async with self._lock_inicio:
+            if self.browser is not None and not self.browser.is_connected():
+                # Chromium caiu: relança para não derrubar as próximas fontes
+                await self.fechar()
+            if self.browser is None:
+                with medir("navegador"):
+                    self._playwright = await async_playwright().start()
+                    self.browser = await self._playwright.chromium.launch(headless=self.headless)
+        return self.browser
+
+    async def fechar(self):
+        """Fecha o Chromium e o driver do Playwright"""
+        try:
+            if self.browser:
+                await self.browser.close()
+        except Exception:
+            pass
+        try:
+            if self._playwright:
+                await self._playwright.stop()
+        except Exception:
+            pass
+        self.browser = None
+        self._playwright = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.fechar()
+        return False
+
+    @asynccontextmanager
+    async def sessao(self, nome, politica_bloqueio=None, **opcoes_contexto):
+        """
+        Abre uma sessão isolada para a fonte e garante o fechamento dos contextos.
+        Sem `politica_bloqueio` explícita usa a política da fonte (se o bloqueio estiver ligado).
+        Cada sessão conta como uma tentativa da fonte na telemetria
+        """
+        if fonte_atual() is None:
+            # Scraper rodando fora do motor: a própria sessão identifica a fonte
+            with em_fonte(nome):
+                async with self.sessao(nome, politica_bloqueio, **opcoes_contexto) as sessao:
+                    yield sessao
+            return
+        telemetria().fonte(fonte_atual()).tentativas += 1
+        browser = await self.iniciar()
+        if politica_bloqueio is None and self.bloquear_recursos:
+            politica_bloqueio = politica_para_fonte(nome)
+        sessao = SessaoNavegador(browser, nome, self.max_paginas_por_contexto, politica_bloqueio, **opcoes_contexto)
+        self.sessoes_abertas += 1
+        try:
+            yield sessao
+        finally:
+            await sessao.fechar()
+            self.sessoes_abertas -= 1
+            self._acumular_estatisticas(sessao.estatisticas_bloqueio)
+            if politica_bloqueio is not None:
+                print(sessao.estatisticas_bloqueio.resumo())
+
+    def _acumular_estatisticas(self, estatisticas):
+        """Soma as estatísticas de bloqueio de cada sessão (tentativas) por fonte"""
+        total = self.estatisticas_bloqueio.setdefault(estatisticas.nome, EstatisticasBloqueio(estatisticas.nome))
+        total.somar(estatisticas)
+
+# Gerenciador compartilhado do loop atual (definido pelo main.py / motor)
+_gerenciador_ativo = ContextVar("gerenciador_navegador", default=None)
+
+@asynccontextmanager
+async def navegador_compartilhado(**opcoes):
+    """Lança um Chromium compartilhado por todas as fontes executadas neste loop"""
+    async with GerenciadorNavegador(**opcoes) as gerenciador:
+        token = _gerenciador_ativo.set(gerenciador)
+        try:
+            yield gerenciador
+        finally:
+            _gerenciador_ativo.reset(token)
+
+@asynccontextmanager
+async def sessao_navegador(nome, **opcoes_contexto):
+    """
+    Sessão de navegador para uma fonte.
+    Usa o Chromium compartilhado se houver um gerenciador ativo;
+    caso contrário lança um navegador próprio (uso isolado de um scraper)
+    """
+    gerenciador = _gerenciador_ativo.get()
+    if gerenciador is not None:
+        async with gerenciador.sessao(nome, **opcoes_contexto) as sessao:
+            yield sessao
+        return
+
+    async with navegador_compartilhado() as gerenciador:
+        async with gerenciador.sessao(nome, **opcoes_contexto) as sessao:
+            yield sessao
+
+async def navegar(page, url, **opcoes):
+    """page.goto respeitando o limite de navegações simultâneas por host"""
+    gerenciador = _gerenciador_ativo.get()
+    if gerenciador is None:
+        with medir("navegacao"):
+            return await page.goto(url, **opcoes)
+    semaforo = gerenciador.limitador.semaforo(url)
+    with medir("fila_host"):
+        await semaforo.acquire()
+    try:
+        with medir("navegacao"):
+            return await page.goto(url, **opcoes)
+    finally:
+        semaforo.release()
+
+def executar_sync(corrotina):
+    """Roda a corrotina de uma fonte em um loop próprio, com um Chromium para todas as tentativas"""
+    async def _rodar():
+        if _gerenciador_ativo.get() is not None:
+            return await corrotina
+        async with navegador_compartilhado():
+            return await corrotina
+    return asyncio.run(_rodar())
@@ -1,8 +1,12 @@
-import time
 import hashlib
 import re
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import aguardar_rede_ociosa, rolar_ate_estabilizar
+from .datas import interpretar_datas
+from .telemetria import cronometrar, medir
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,62 +21,58 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para CSV
     return texto
 
-def processar_data_oxyscrono(data_str):
-    """Processa data do OxyScrono: '10/08/2025' -> data_obj + data_formatada"""
-    if not data_str:
-        return None, None
-    
-    try:
-        data_obj = datetime.strptime(data_str, '%d/%m/%Y')
-        return data_obj, data_str
-    except ValueError:
-        return None, None
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_OXYSCRONO = ".elemnt.celement"
+CAMPOS_CARD_OXYSCRONO = {
+    "data": campo(".blckbox .number"),
+    "titulo": campo(".name.title-event"),
+    "local": campo("p:has(i.fa-map-marker)"),  # parágrafo com ícone fa-map-marker
+    "href": campo("a", atributo="href"),
+}
 
-def coletar_eventos_oxyscrono(page):
+@cronometrar("parse")
+async def coletar_eventos_oxyscrono(page):
     """Coleta eventos do OxyScrono.com.br"""
     eventos = []
     
     try:
         # Aguarda os cards aparecerem
-        page.wait_for_selector(".elemnt.celement", timeout=20000)
+        with medir("espera"):
+            await page.wait_for_selector(SELETOR_CARD_OXYSCRONO, timeout=20000)
         
         # Scroll para carregar todos os eventos
         print("   🔄 Fazendo scroll para carregar todos os eventos...")
-        for i in range(5):
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(2)
+        await rolar_ate_estabilizar(page, SELETOR_CARD_OXYSCRONO, max_rolagens=5)
         
-        # Seleciona todos os cards
-        cards = page.query_selector_all(".elemnt.celement")
+        # Extrai todos os cards de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_OXYSCRONO, CAMPOS_CARD_OXYSCRONO)
         print(f"   📦 {len(cards)} cards encontrados para processamento")
         
+        # Todas as datas da página de uma vez, contra a mesma data de referência
+        datas = interpretar_datas([card["data"] for card in cards])
         for i, card in enumerate(cards):
             try:
                 # Data do evento
-                data_el = card.query_selector(".blckbox .number")
-                if not data_el:
+                if card["data"] is None:
                     continue
                     
-                data_str = limpar_texto(data_el.inner_text())
-                data_obj, data_formatada = processar_data_oxyscrono(data_str)
+                data_obj, data_formatada = datas[i]
                 
                 if not data_obj or data_obj < datetime.now():
                     continue
                 
                 # Título do evento
-                titulo_el = card.query_selector(".name.title-event")
-                if not titulo_el:
+                if card["titulo"] is None:
                     continue
                     
-                titulo = limpar_texto(titulo_el.inner_text())
+                titulo = limpar_texto(card["titulo"])
                 if len(titulo) < 5:
                     continue
                 
-                # Local - CORREÇÃO: pega especificamente o parágrafo com ícone fa-map-marker
+                # Local
                 local = "Local não informado"
-                local_el = card.query_selector("p:has(i.fa-map-marker)")
-                if local_el:
-                    local_text = local_el.inner_text()
+                local_text = card["local"]
+                if local_text is not None:
                     # Remove o ícone e limpa o texto: "Abadia Dos Dourados - MG"
                     local_clean = re.sub(r'^\s*.*?fa-map-marker.*?\s*', '', local_text).strip()
                     if not local_clean:
@@ -83,12 +83,10 @@ def coletar_eventos_oxyscrono(page):
                         local = limpar_texto(local_clean)
                 
                 # Link do evento
-                link_el = card.query_selector("a")
                 link = ""
-                if link_el:
-                    href = link_el.get_attribute("href")
-                    if href:
-                        link = href if href.startswith("http") else f"https://www.oxyscrono.com.br/{href}"
+                href = card["href"]
+                if href:
+                    link = href if href.startswith("http") else f"https://www.oxyscrono.com.br/{href}"
                 
                 # Hash para deduplicação
                 evento_hash = gerar_hash_evento(titulo, data_formatada, local)
@@ -118,7 +116,7 @@ def coletar_eventos_oxyscrono(page):
     
     return eventos
 
-def extrair_oxyscrono(max_tentativas=3):
+async def extrair_oxyscrono_async(max_tentativas=3):
     """Extrai eventos do OxyScrono.com.br"""
     eventos = []
     
@@ -126,17 +124,15 @@ def extrair_oxyscrono(max_tentativas=3):
         try:
             print(f"🔎 OxyScrono - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("OxyScrono.com") as sessao:
+                page = await sessao.nova_pagina()
                 
                 try:
                     print("📄 Carregando OxyScrono.com.br...")
-                    page.goto("https://www.oxyscrono.com.br/eventos", timeout=60000)
-                    time.sleep(5)
+                    await navegar(page, "https://www.oxyscrono.com.br/eventos", timeout=60000)
+                    await aguardar_rede_ociosa(page)
                     
-                    eventos = coletar_eventos_oxyscrono(page)
-                    browser.close()
+                    eventos = await coletar_eventos_oxyscrono(page)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -161,7 +157,6 @@ def extrair_oxyscrono(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -170,4 +165,8 @@ def extrair_oxyscrono(max_tentativas=3):
                 print("💀 OxyScrono.com.br falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_oxyscrono(max_tentativas=3):
+    """Extrai eventos do OxyScrono.com.br (entrada síncrona)"""
+    return executar_sync(extrair_oxyscrono_async(max_tentativas))
@@ -1,8 +1,13 @@
-import time
 import hashlib
 import re
-from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from datetime import date, datetime
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import aguardar_rede_ociosa, aguardar_carregamento, rolar_ate_estabilizar
+from .detalhes import buscar_detalhes, CacheDetalhes
+from .datas import interpretar_data
+from .telemetria import cronometrar
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,141 +22,98 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para não quebrar CSV
     return texto
 
-def processar_data_sporttimer(titulo):
-    """Extrai e processa data do título SportTimer: '12/10 – Título' -> '12/10/2025'"""
-    if not titulo:
-        return None, None, titulo
-    
-    # Regex para capturar data no formato DD/MM no início do título
-    match = re.match(r'^(\d{1,2})/(\d{1,2})\s*[–-]\s*(.+)', titulo)
+def separar_data_sporttimer(titulo):
+    """Data no início do título SportTimer: '12/10 – Título' -> ('12/10', 'Título')"""
+    match = re.match(r'^(\d{1,2}/\d{1,2})\s*[–-]\s*(.+)', titulo or "")
     if not match:
-        return None, None, titulo
-    
-    try:
-        dia = match.group(1).zfill(2)
-        mes = match.group(2).zfill(2)
-        titulo_limpo = match.group(3).strip()
-        
-        # Assume ano atual ou próximo
-        ano_atual = datetime.now().year
-        data_str_formatada = f"{dia}/{mes}/{ano_atual}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            # Se a data já passou, assume ano seguinte
-            if data_obj < datetime.now():
-                data_obj = datetime.strptime(f"{dia}/{mes}/{ano_atual + 1}", '%d/%m/%Y')
-                data_str_formatada = f"{dia}/{mes}/{ano_atual + 1}"
-            
-            return data_obj, data_str_formatada, titulo_limpo
-        except ValueError:
-            pass
-    except:
-        pass
-    
-    return None, titulo, titulo
+        return None, titulo
+    return match.group(1), match.group(2).strip()
+
+# Páginas de detalhe: abas simultâneas e intervalo mínimo entre requisições ao site
+PAGINAS_DETALHE_SPORTTIMER = 4
+INTERVALO_DETALHE_SPORTTIMER = 0.5  # segundos
+LOCAL_PADRAO_SPORTTIMER = "Região Centro-Oeste"  # quando a página do evento falha ou não traz a cidade
 
-def extrair_detalhes_evento(browser, url_evento):
-    """Entra na página do evento em nova aba e extrai local detalhado"""
+# Campos da listagem e da página de detalhes (extraídos em uma única chamada cada)
+SELETOR_CARD_SPORTTIMER = ".col-sm-4.col-lg-3"
+CAMPOS_CARD_SPORTTIMER = {
+    "href": campo("a", atributo="href"),
+    "titulo": campo(".thumb-info-inner h2"),
+    "categoria": campo(".thumb-info-type"),
+}
+CAMPOS_DETALHE_SPORTTIMER = {
+    # Padrão: <li><i class="fas fa-check"></i>Cidade: São Luis de Montes Belos Goiás</li>
+    "itens": campo("li:has(i.fas.fa-check)", todos=True),
+}
+
+async def extrair_detalhes_evento(page_evento, url_evento):
+    """
+    Abre a página do evento (aba do pool de detalhes) e extrai local detalhado.
+    Retorna os campos do detalhe ({"local": ...}); erros sobem para o pool (e não entram no cache)
+    """
     local_detalhado = "Local não informado"
     
-    try:
-        print(f"     🔍 Acessando evento: {url_evento}")
-        # Cria nova página/aba para não perder a principal
-        page_evento = browser.new_page()
-        page_evento.goto(url_evento, timeout=30000)
-        time.sleep(3)  # Aguarda carregamento
-        
-        # Busca pela lista com ícones que contém as informações do evento
-        # Padrão: <li><i class="fas fa-check"></i>Cidade: São Luis de Montes Belos Goiás</li>
-        cidade_items = page_evento.query_selector_all("li:has(i.fas.fa-check)")
-        
-        for item in cidade_items:
-            texto = limpar_texto(item.inner_text())
-            
-            # Procura por padrões de cidade
-            if "cidade:" in texto.lower():
-                # Extrai depois de "Cidade:"
-                cidade_match = re.search(r'cidade:\s*(.+)', texto, re.IGNORECASE)
-                if cidade_match:
-                    local_detalhado = cidade_match.group(1).strip()
-                    break
-            elif "local:" in texto.lower():
-                # Extrai depois de "Local:"
-                local_match = re.search(r'local:\s*(.+)', texto, re.IGNORECASE)
-                if local_match:
-                    local_detalhado = local_match.group(1).strip()
-                    break
-        
-        # Se não encontrou na lista, tenta outras estratégias
-        if local_detalhado == "Local não informado":
-            # Busca em qualquer texto que mencione cidades conhecidas + estado
-            page_text = page_evento.inner_text()
-            
-            # Padrões de cidades do Centro-Oeste
-            padroes_cidade = [
-                r'([A-ZÁÊÇÕ\s]+(?:Goiás|Goias|GO))',
-                r'([A-ZÁÊÇÕ\s]+(?:Minas Gerais|MG))',
-                r'([A-ZÁÊÇÕ\s]+(?:Brasília|DF))',
-                r'([A-ZÁÊÇÕ\s]+(?:Mato Grosso|MT))',
-                r'([A-ZÁÊÇÕ\s]+(?:Mato Grosso do Sul|MS))',
-            ]
-            
-            for padrao in padroes_cidade:
-                match = re.search(padrao, page_text, re.IGNORECASE)
-                if match:
-                    possivel_local = match.group(1).strip()
-                    if len(possivel_local) > 5:  # Validação básica
-                        local_detalhado = possivel_local
-                        break
-        
-        print(f"     ✅ Local extraído: {local_detalhado}")
-        
-        # IMPORTANTE: Fecha a página do evento para não consumir memória
-        page_evento.close()
-        
-        return local_detalhado
+    print(f"     🔍 Acessando evento: {url_evento}")
+    await navegar(page_evento, url_evento, timeout=30000)
+    await aguardar_rede_ociosa(page_evento, timeout=5)  # Aguarda scripts tardios
+    
+    # Lista com ícones que contém as informações do evento, de uma vez
+    detalhes = (await extrair_cards(page_evento, "body", CAMPOS_DETALHE_SPORTTIMER))[0]
+    
+    for item in detalhes["itens"]:
+        texto = limpar_texto(item)
         
-    except Exception as e:
-        print(f"     ⚠️ Erro ao extrair detalhes: {str(e)[:50]}...")
-        try:
-            page_evento.close()  # Garante que fecha mesmo com erro
-        except:
-            pass
-        return "Região Centro-Oeste"
+        # Procura por padrões de cidade
+        if "cidade:" in texto.lower():
+            # Extrai depois de "Cidade:"
+            cidade_match = re.search(r'cidade:\s*(.+)', texto, re.IGNORECASE)
+            if cidade_match:
+                local_detalhado = cidade_match.group(1).strip()
+                break
+        elif "local:" in texto.lower():
+            # Extrai depois de "Local:"
+            local_match = re.search(r'local:\s*(.+)', texto, re.IGNORECASE)
+            if local_match:
+                local_detalhado = local_match.group(1).strip()
+                break
+    
+    # Sem item "Cidade:/Local:" fica a região padrão (o texto solto da página não identifica a cidade)
+    if local_detalhado == "Local não informado":
+        local_detalhado = LOCAL_PADRAO_SPORTTIMER
+    
+    print(f"     ✅ Local extraído: {local_detalhado}")
+    return {"local": local_detalhado}
 
-def coletar_eventos_sporttimer_detalhado(page, browser):
+@cronometrar("parse")
+async def coletar_eventos_sporttimer_detalhado(page, sessao):
     """Coleta eventos do SportTimer entrando em cada um para detalhes"""
     eventos = []
     
     try:
         # Scroll para carregar todos os eventos
         print("   🔄 Carregando todos os eventos da página principal...")
-        for i in range(5):
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(2)
+        await rolar_ate_estabilizar(page, SELETOR_CARD_SPORTTIMER, max_rolagens=5)
         
-        # Seleciona todos os cards de evento
-        cards = page.query_selector_all(".col-sm-4.col-lg-3")
+        # Extrai todos os cards de evento de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_SPORTTIMER, CAMPOS_CARD_SPORTTIMER)
         print(f"   📦 {len(cards)} cards encontrados")
         
+        # 1) Filtra os cards e prepara os eventos sem abrir nenhuma página
+        candidatos = []
+        referencia = date.today()  # a mesma para a página inteira
         for i, card in enumerate(cards):
             try:
-                print(f"   📋 Processando evento {i+1}/{len(cards)}")
-                
                 # Link e título do evento
-                link_el = card.query_selector("a")
-                titulo_el = card.query_selector(".thumb-info-inner h2")
-                
-                if not link_el or not titulo_el:
+                if card["href"] is None or card["titulo"] is None:
                     continue
                 
-                titulo_completo = limpar_texto(titulo_el.inner_text())
+                titulo_completo = limpar_texto(card["titulo"])
                 if not titulo_completo or len(titulo_completo) < 5:
                     continue
                 
                 # Extrai data e limpa título
-                data_obj, data_formatada, titulo_limpo = processar_data_sporttimer(titulo_completo)
+                data_raw, titulo_limpo = separar_data_sporttimer(titulo_completo)
+                data_obj, data_formatada = interpretar_data(data_raw, referencia)
                 if not data_obj:
                     continue
                 
@@ -160,47 +122,54 @@ def coletar_eventos_sporttimer_detalhado(page, browser):
                     continue
                 
                 # URL do evento
-                href = link_el.get_attribute("href")
+                href = card["href"]
                 if not href:
                     continue
                     
                 url_evento = href if href.startswith("http") else f"https://www.sporttimer.com.br{href}"
                 
                 # Categoria/modalidade
-                categoria_el = card.query_selector(".thumb-info-type")
-                categoria = limpar_texto(categoria_el.inner_text()) if categoria_el else "Corrida de Rua"
-                
-                # AQUI É A MAGIA: Entra no evento para extrair local detalhado
-                local_detalhado = extrair_detalhes_evento(browser, url_evento)
+                categoria = limpar_texto(card["categoria"]) if card["categoria"] is not None else "Corrida de Rua"
                 
                 # Validações básicas
                 if len(titulo_limpo.strip()) < 5:
                     continue
                 
-                # Hash para deduplicação
-                evento_hash = gerar_hash_evento(titulo_limpo, data_formatada, local_detalhado)
-                
-                eventos.append({
-                    "titulo": titulo_limpo,
-                    "data": data_formatada,
-                    "local": local_detalhado,
-                    "link": url_evento,
-                    "hash": evento_hash,
-                    "fonte": "SportTimer",
-                    "data_obj": data_obj,
-                    "categoria": categoria.title(),
-                    "modalidade": categoria.title()
-                })
-                
-                print(f"   ✅ Evento coletado: {titulo_limpo[:30]}... | {data_formatada} | {local_detalhado[:20]}...")
-                
-                # Pequena pausa para não sobrecarregar o servidor
-                time.sleep(1)
+                candidatos.append((titulo_limpo, data_formatada, data_obj, url_evento, categoria))
                 
             except Exception as e:
                 print(f"   ❌ Erro no evento {i+1}: {str(e)[:50]}...")
                 continue
         
+        # 2) AQUI É A MAGIA: entra nos eventos em paralelo (pool de abas + limite por host) para extrair o local
+        print(f"   📋 Buscando detalhes de {len(candidatos)} eventos ({PAGINAS_DETALHE_SPORTTIMER} abas em paralelo)")
+        # (páginas já visitadas vêm do cache em disco enquanto não vencerem)
+        detalhes = await buscar_detalhes(
+            sessao, [c[3] for c in candidatos], extrair_detalhes_evento,
+            paralelas=PAGINAS_DETALHE_SPORTTIMER, intervalo_por_host=INTERVALO_DETALHE_SPORTTIMER,
+            padrao={"local": LOCAL_PADRAO_SPORTTIMER}, cache=CacheDetalhes("sporttimer")
+        )
+        
+        # 3) Monta os eventos na ordem original dos cards
+        for (titulo_limpo, data_formatada, data_obj, url_evento, categoria), detalhe in zip(candidatos, detalhes):
+            local_detalhado = detalhe["local"]
+            # Hash para deduplicação
+            evento_hash = gerar_hash_evento(titulo_limpo, data_formatada, local_detalhado)
+            
+            eventos.append({
+                "titulo": titulo_limpo,
+                "data": data_formatada,
+                "local": local_detalhado,
+                "link": url_evento,
+                "hash": evento_hash,
+                "fonte": "SportTimer",
+                "data_obj": data_obj,
+                "categoria": categoria.title(),
+                "modalidade": categoria.title()
+            })
+            
+            print(f"   ✅ Evento coletado: {titulo_limpo[:30]}... | {data_formatada} | {local_detalhado[:20]}...")
+        
         print(f"   🎯 Total de eventos válidos coletados: {len(eventos)}")
                 
     except Exception as e:
@@ -208,7 +177,7 @@ def coletar_eventos_sporttimer_detalhado(page, browser):
     
     return eventos
 
-def extrair_sporttimer(max_tentativas=3):
+async def extrair_sporttimer_async(max_tentativas=3):
     """Extrai eventos de corrida do SportTimer.com.br com detalhes completos"""
     eventos = []
     
@@ -216,33 +185,24 @@ def extrair_sporttimer(max_tentativas=3):
         try:
             print(f"🔎 SportTimer.com.br (DETALHADO) - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("SportTimer.com") as sessao:
+                page = await sessao.nova_pagina()
                 
                 # URL da página principal do SportTimer
                 url = "https://www.sporttimer.com.br/"
                 
                 try:
                     print("📄 Carregando SportTimer.com.br...")
-                    page.goto(url, timeout=60000)
+                    await navegar(page, url, timeout=60000)
                     
-                    # Aguarda a página carregar completamente
-                    time.sleep(5)
-                    
-                    # Aguarda os cards aparecerem
-                    try:
-                        page.wait_for_selector(".col-sm-4.col-lg-3", timeout=20000)
-                    except TimeoutError:
+                    # Aguarda os cards aparecerem e a rede sossegar
+                    if not await aguardar_carregamento(page, ".col-sm-4.col-lg-3", timeout=20):
                         print("   ⚠️ Cards não carregaram no tempo esperado")
-                        browser.close()
                         continue
                     
                     # Coleta todos os eventos COM DETALHES
                     print(f"🔄 Processando eventos com detalhes completos...")
-                    eventos = coletar_eventos_sporttimer_detalhado(page, browser)
-                    
-                    browser.close()
+                    eventos = await coletar_eventos_sporttimer_detalhado(page, sessao)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -267,7 +227,6 @@ def extrair_sporttimer(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -276,4 +235,8 @@ def extrair_sporttimer(max_tentativas=3):
                 print("💀 SportTimer.com.br falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_sporttimer(max_tentativas=3):
+    """Extrai eventos de corrida do SportTimer.com.br com detalhes completos (entrada síncrona)"""
+    return executar_sync(extrair_sporttimer_async(max_tentativas))
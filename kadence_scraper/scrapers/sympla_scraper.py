@@ -1,8 +1,12 @@
-import time
 import hashlib
 import re
-from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import aguardar_troca_pagina
+from .interceptacao import capturar_json, encontrar_registros, valor, converter_data_api
+from .datas import interpretar_datas
+from .telemetria import cronometrar, medir
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,106 +21,124 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para não quebrar CSV
     return texto
 
-def processar_data_sympla(data_str):
-    """Processa diferentes formatos de data do Sympla"""
-    if not data_str:
-        return None, None
-    
-    # Remove textos extras e normaliza
-    data_limpa = re.sub(r'^[A-Za-z]+,\s*', '', data_str)  # Remove "Domingo, "
-    data_limpa = re.sub(r'\s+às.*$', '', data_limpa)      # Remove horário " às 06:00"
-    
-    # Mapeia meses em português
-    meses = {
-        'Jan': '01', 'Fev': '02', 'Mar': '03', 'Abr': '04',
-        'Mai': '05', 'Jun': '06', 'Jul': '07', 'Ago': '08', 
-        'Set': '09', 'Out': '10', 'Nov': '11', 'Dez': '12'
-    }
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_SYMPLA = ".sympla-card"
+CAMPOS_CARD_SYMPLA = {
+    "titulo": campo("h3"),
+    "local": campo("p.pn67h1c"),
+    "data": campo(".qtfy415"),
+    "href": campo(atributo="href"),  # o próprio card é o link
+}
+
+@cronometrar("parse")
+async def coletar_eventos_pagina_sympla(page):
+    """Coleta eventos de uma página do Sympla"""
+    eventos = []
     
-    # Padrão: "05 de Out" -> "05/10/2025"
-    padrao = r'(\d{1,2})\s+de\s+([A-Za-z]{3})'
-    match = re.search(padrao, data_limpa)
+    cards = await extrair_cards(page, SELETOR_CARD_SYMPLA, CAMPOS_CARD_SYMPLA)
     
-    if match:
-        dia = match.group(1).zfill(2)
-        mes_texto = match.group(2)
-        mes_num = meses.get(mes_texto, '01')
-        
-        # Assume ano atual ou próximo
-        ano_atual = datetime.now().year
-        data_str_formatada = f"{dia}/{mes_num}/{ano_atual}"
-        
+    # Todas as datas da página de uma vez, contra a mesma data de referência
+    datas = interpretar_datas([card["data"] for card in cards])
+    for i, card in enumerate(cards):
         try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            # Se a data já passou, assume ano seguinte
-            if data_obj < datetime.now():
-                data_obj = datetime.strptime(f"{dia}/{mes_num}/{ano_atual + 1}", '%d/%m/%Y')
-                data_str_formatada = f"{dia}/{mes_num}/{ano_atual + 1}"
+            # Título
+            titulo = limpar_texto(card["titulo"]) if card["titulo"] is not None else f"Evento {i+1}"
+            
+            # Local  
+            local = limpar_texto(card["local"]) if card["local"] is not None else "Local não informado"
             
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
+            # Data
+            data_obj, data_formatada = datas[i]
+            if not data_obj:
+                continue  # Pula eventos com data inválida
+            
+            # Link
+            href = card["href"]
+            link = href if href and href.startswith("http") else f"https://www.sympla.com.br{href}" if href else ""
+            
+            # Validações básicas
+            if len(titulo.strip()) < 3:
+                continue
+            
+            # Hash para deduplicação
+            evento_hash = gerar_hash_evento(titulo, data_formatada, local)
+            
+            eventos.append({
+                "titulo": titulo,
+                "data": data_formatada, 
+                "local": local,
+                "link": link,
+                "hash": evento_hash,
+                "fonte": "Sympla",
+                "data_obj": data_obj
+            })
+            
+        except Exception as e:
+            continue
     
-    return None, data_str
+    return eventos
+
+# Endpoints de busca chamados pela listagem a cada troca de página
+PADROES_API_SYMPLA = [
+    r"sympla\.com\.br/api/v\d+/search",
+    r"sympla\.com\.br/api/.*/events?\b",
+]
+
+def mapear_api_sympla(dados):
+    """Converte o JSON da busca do Sympla em eventos"""
+    eventos = []
+    for registro in encontrar_registros(dados, ("start_date",)):
+        titulo = limpar_texto(valor(registro, "name", "title") or "")
+        if len(titulo) < 3:
+            continue
+        
+        data_obj, data_formatada = converter_data_api(valor(registro, "start_date"))
+        if not data_obj:
+            continue
+        
+        nome_local = valor(registro, "location.name") or ""
+        cidade = valor(registro, "location.city") or ""
+        uf = valor(registro, "location.state") or ""
+        cidade_uf = ", ".join(p for p in (cidade, uf) if p)
+        local = limpar_texto(" - ".join(p for p in (nome_local, cidade_uf) if p)) or "Local não informado"
+        
+        href = valor(registro, "url") or ""
+        link = href if href.startswith("http") else f"https://www.sympla.com.br{href}" if href else ""
+        
+        eventos.append({
+            "titulo": titulo,
+            "data": data_formatada,
+            "local": local,
+            "link": link,
+            "hash": gerar_hash_evento(titulo, data_formatada, local),
+            "fonte": "Sympla",
+            "data_obj": data_obj
+        })
+    return eventos
 
-def navegar_paginas_sympla(page, max_paginas=17):
-    """Navega pelas páginas do Sympla coletando eventos"""
+async def navegar_paginas_sympla(page, max_paginas=17, captura=None):
+    """
+    Navega pelas páginas do Sympla coletando eventos.
+    Com `captura`, cada página vem do JSON da busca; quando a resposta não chega ou não traz
+    eventos, a troca é confirmada pelos cards e a página é lida do DOM
+    """
     todos_eventos = []
     
     pagina_atual = 1
+    # Eventos da API para a página atual (a primeira vem da carga inicial)
+    eventos_api = await captura.novos_eventos() if captura else []
+    usar_api = captura is not None  # desliga quando nenhuma resposta casou com PADROES_API_SYMPLA
     
     while pagina_atual <= max_paginas:
         try:
             print(f"   📄 Processando página {pagina_atual}")
             
-            # Aguarda cards carregarem
-            page.wait_for_selector(".sympla-card", timeout=15000)
-            
-            # Coleta eventos da página atual
-            cards = page.query_selector_all(".sympla-card")
-            eventos_pagina = []
-            
-            for i, card in enumerate(cards):
-                try:
-                    # Título
-                    titulo_el = card.query_selector("h3")
-                    titulo = limpar_texto(titulo_el.inner_text()) if titulo_el else f"Evento {i+1}"
-                    
-                    # Local  
-                    local_el = card.query_selector("p.pn67h1c")
-                    local = limpar_texto(local_el.inner_text()) if local_el else "Local não informado"
-                    
-                    # Data
-                    data_el = card.query_selector(".qtfy415")
-                    data_raw = data_el.inner_text() if data_el else ""
-                    
-                    data_obj, data_formatada = processar_data_sympla(data_raw)
-                    if not data_obj:
-                        continue  # Pula eventos com data inválida
-                    
-                    # Link
-                    href = card.get_attribute("href")
-                    link = href if href and href.startswith("http") else f"https://www.sympla.com.br{href}" if href else ""
-                    
-                    # Validações básicas
-                    if len(titulo.strip()) < 3:
-                        continue
-                    
-                    # Hash para deduplicação
-                    evento_hash = gerar_hash_evento(titulo, data_formatada, local)
-                    
-                    eventos_pagina.append({
-                        "titulo": titulo,
-                        "data": data_formatada, 
-                        "local": local,
-                        "link": link,
-                        "hash": evento_hash,
-                        "fonte": "Sympla",
-                        "data_obj": data_obj
-                    })
-                    
-                except Exception as e:
-                    continue
+            # Prefere o payload da API; sem ele, aguarda os cards e lê o DOM
+            eventos_pagina, eventos_api = eventos_api, []
+            if not eventos_pagina:
+                with medir("espera"):
+                    await page.wait_for_selector(".sympla-card", timeout=15000)
+                eventos_pagina = await coletar_eventos_pagina_sympla(page)
             
             todos_eventos.extend(eventos_pagina)
             print(f"   ✅ Página {pagina_atual}: {len(eventos_pagina)} eventos coletados")
@@ -136,8 +158,8 @@ def navegar_paginas_sympla(page, max_paginas=17):
                 botao_proximo = None
                 for seletor in seletores_proximo:
                     try:
-                        botao_proximo = page.query_selector(seletor)
-                        if botao_proximo and botao_proximo.is_visible() and not botao_proximo.is_disabled():
+                        botao_proximo = await page.query_selector(seletor)
+                        if botao_proximo and await botao_proximo.is_visible() and not await botao_proximo.is_disabled():
                             print(f"   🔍 Botão encontrado: {seletor}")
                             break
                     except:
@@ -145,20 +167,36 @@ def navegar_paginas_sympla(page, max_paginas=17):
                 
                 if botao_proximo:
                     print(f"   👉 Clicando para ir à página {pagina_atual + 1}")
-                    botao_proximo.click()
-                    time.sleep(4)  # Aguarda carregar
+                    recebidos = []
+                    
+                    async def pagina_pela_api():
+                        # Basta a resposta da busca trazer eventos; sem isso, espera os cards trocarem
+                        nonlocal usar_api
+                        if await captura.aguardar(timeout=10, quietude=0.3):
+                            recebidos.extend(await captura.novos_eventos())
+                        elif not captura.payloads:
+                            print("   ⚠️ Nenhuma resposta da API de busca - seguindo pelo DOM")
+                            usar_api = False
+                        return bool(recebidos)
+                    
+                    if usar_api:
+                        captura.descartar()  # respostas atrasadas da página já lida não contam para a próxima
+                    if not await aguardar_troca_pagina(page, ".sympla-card", botao_proximo.click,
+                                                       confirmar=pagina_pela_api if usar_api else None):
+                        print("   🏁 Página não mudou após o clique - fim das páginas")
+                        break
+                    eventos_api = recebidos
                     pagina_atual += 1
                 else:
                     print(f"   🔍 DEBUG: Buscando botão por texto...")
                     # Fallback: busca todos os botões
-                    todos_botoes = page.query_selector_all("button")
+                    todos_botoes = await page.query_selector_all("button")
                     for botao in todos_botoes:
                         try:
-                            texto = botao.inner_text().strip()
-                            if "Próximo" in texto and botao.is_visible() and not botao.is_disabled():
+                            texto = (await botao.inner_text()).strip()
+                            if "Próximo" in texto and await botao.is_visible() and not await botao.is_disabled():
                                 print(f"   🎯 Botão encontrado por texto: '{texto}'")
-                                botao.click()
-                                time.sleep(4)
+                                await aguardar_troca_pagina(page, ".sympla-card", botao.click)
                                 pagina_atual += 1
                                 break
                         except:
@@ -177,7 +215,7 @@ def navegar_paginas_sympla(page, max_paginas=17):
     
     return todos_eventos
 
-def extrair_sympla(max_tentativas=3):
+async def extrair_sympla_async(max_tentativas=3):
     """Extrai eventos de corrida do Sympla"""
     eventos = []
     
@@ -185,24 +223,25 @@ def extrair_sympla(max_tentativas=3):
         try:
             print(f"🔎 Sympla - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("Sympla") as sessao:
+                page = await sessao.nova_pagina()
                 
                 # URL do Sympla para eventos de corrida
                 url = "https://www.sympla.com.br/eventos/esportivo?c=corrida-e-competicoes&ordem=month_trending_score"
                 
                 try:
                     print("📄 Carregando Sympla...")
-                    page.goto(url, timeout=60000)
-                    
-                    # Verifica se carregou
-                    page.wait_for_selector(".sympla-card", timeout=20000)
-                    
-                    # Navega por todas as páginas
-                    eventos = navegar_paginas_sympla(page, max_paginas=17)
-                    
-                    browser.close()
+                    async with capturar_json(page, PADROES_API_SYMPLA, mapear_api_sympla) as captura:
+                        await navegar(page, url, timeout=60000)
+                        
+                        # Verifica se carregou
+                        with medir("espera"):
+                            await page.wait_for_selector(".sympla-card", timeout=20000)
+                        
+                        # Navega por todas as páginas
+                        eventos = await navegar_paginas_sympla(page, max_paginas=17, captura=captura)
+                        if captura.payloads:
+                            print(f"   📡 {len(captura.payloads)} respostas da API capturadas")
                     
                     if eventos:
                         # Remove duplicatas
@@ -227,7 +266,6 @@ def extrair_sympla(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -237,3 +275,7 @@ def extrair_sympla(max_tentativas=3):
             continue
     
     return eventos
+
+def extrair_sympla(max_tentativas=3):
+    """Extrai eventos de corrida do Sympla (entrada síncrona)"""
+    return executar_sync(extrair_sympla_async(max_tentativas))
@@ -0,0 +1,168 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Configurações
+FONTE_GERAL = "geral"  # fases fora de uma fonte (consolidação, persistência)
+
+class EstatisticasFase:
+    """Tempo de uma fase em uma fonte: total (com as fases internas), próprio (sem elas) e chamadas"""
+
+    def __init__(self, total=0.0, proprio=0.0, contagem=0, maximo=0.0):
+        self.total = total
+        self.proprio = proprio
+        self.contagem = contagem
+        self.maximo = maximo
+
+    def registrar(self, total, proprio):
+        self.total += total
+        self.proprio += proprio
+        self.contagem += 1
+        self.maximo = max(self.maximo, total)
+
+    def somar(self, outra):
+        self.total += outra.total
+        self.proprio += outra.proprio
+        self.contagem += outra.contagem
+        self.maximo = max(self.maximo, outra.maximo)
+
+    def para_dict(self):
+        return {"segundos": round(self.proprio, 4), "segundos_com_internas": round(self.total, 4),
+                "chamadas": self.contagem, "maior_chamada": round(self.maximo, 4)}
+
+    @classmethod
+    def de_dict(cls, dados):
+        return cls(dados["segundos_com_internas"], dados["segundos"], dados["chamadas"], dados["maior_chamada"])
+
+class EstatisticasFonte:
+    """Fases, tentativas e resultado de uma fonte na execução"""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.fases = {}  # fase -> EstatisticasFase
+        self.tentativas = 0  # sessões de navegador abertas (uma por tentativa)
+        self.duracao = 0.0
+        self.eventos = 0
+        self.erro = None
+
+    def fase(self, nome):
+        if nome not in self.fases:
+            self.fases[nome] = EstatisticasFase()
+        return self.fases[nome]
+
+    @property
+    def retentativas(self):
+        return max(0, self.tentativas - 1)
+
+    @property
+    def nao_medido(self):
+        """Tempo da fonte fora de qualquer fase (código dos scrapers sem span)"""
+        return max(0.0, self.duracao - sum(f.proprio for f in self.fases.values()))
+
+    def absorver(self, dados):
+        """Soma as fases e tentativas vindas de outro processo (motor 'processos')"""
+        for nome, fase in dados.get("fases", {}).items():
+            self.fase(nome).somar(EstatisticasFase.de_dict(fase))
+        self.tentativas += dados.get("tentativas", 0)
+
+    def para_dict(self):
+        return {
+            "duracao": round(self.duracao, 4),
+            "eventos": self.eventos,
+            "tentativas": self.tentativas,
+            "retentativas": self.retentativas,
+            "erro": self.erro,
+            "nao_medido": round(self.nao_medido, 4),
+            "fases": {nome: fase.para_dict() for nome, fase in self.fases.items()},
+        }
+
+class Telemetria:
+    """Estatísticas por fonte desta execução (uma por processo)"""
+
+    def __init__(self):
+        self.fontes = {}  # nome -> EstatisticasFonte
+
+    def fonte(self, nome):
+        if nome not in self.fontes:
+            self.fontes[nome] = EstatisticasFonte(nome)
+        return self.fontes[nome]
+
+    def para_dict(self):
+        return {nome: fonte.para_dict() for nome, fonte in self.fontes.items()}
+
+    def limpar(self):
+        self.fontes = {}
+
+_telemetria = Telemetria()
+_fonte_atual = ContextVar("fonte_telemetria", default=None)
+_span_atual = ContextVar("span_telemetria", default=None)
+
+def telemetria():
+    """Telemetria do processo atual"""
+    return _telemetria
+
+def fonte_atual():
+    return _fonte_atual.get()
+
+@contextmanager
+def em_fonte(nome):
+    """
+    Atribui à fonte `nome` as fases medidas dentro do bloco (inclusive nas tarefas criadas nele)
+    e mede a duração total. Devolve as EstatisticasFonte para o chamador anotar eventos e erro
+    """
+    estatisticas = _telemetria.fonte(nome)
+    token = _fonte_atual.set(nome)
+    inicio = time.perf_counter()
+    try:
+        yield estatisticas
+    finally:
+        estatisticas.duracao += time.perf_counter() - inicio
+        _fonte_atual.reset(token)
+
+class medir:
+    """
+    Mede um bloco como uma fase da fonte atual: `with medir("espera"): await ...`.
+    Fases aninhadas descontam o seu tempo do 'próprio' da fase de fora, assim a soma dos
+    próprios não conta nada duas vezes
+    """
+
+    def __init__(self, fase, fonte=None):
+        self.fase = fase
+        self.fonte = fonte
+        self.filhos = 0.0
+
+    def __enter__(self):
+        self._token = _span_atual.set(self)
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        total = time.perf_counter() - self._inicio
+        _span_atual.reset(self._token)
+        pai = _span_atual.get()
+        if pai is not None:
+            pai.filhos += total
+        # Tarefas paralelas dentro da fase podem somar mais que o tempo de parede dela
+        proprio = max(0.0, total - self.filhos)
+        fonte = self.fonte or _fonte_atual.get() or FONTE_GERAL
+        _telemetria.fonte(fonte).fase(self.fase).registrar(total, proprio)
+        return False
+
+def cronometrar(fase):
+    """Decorador: mede cada chamada da função (síncrona ou corrotina) como `fase`"""
+    def decorador(funcao):
+        if inspect.iscoroutinefunction(funcao):
+            @functools.wraps(funcao)
+            async def medida_async(*args, **kwargs):
+                with medir(fase):
+                    return await funcao(*args, **kwargs)
+            return medida_async
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            with medir(fase):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorador
@@ -1,8 +1,11 @@
-import time
 import hashlib
 import re
 from datetime import datetime
-from playwright.sync_api import Page, sync_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import contar_elementos, aguardar_mudanca_contagem
+from .telemetria import cronometrar, medir
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -18,110 +21,127 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para não quebrar CSV
     return texto
 
-def extrair_categoria_especifica(page, categoria_nome, url):
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_TICKET_SPORTS = ".card-evento"
+CAMPOS_CARD_TICKET_SPORTS = {
+    "titulo": campo(".titulo-card-evento"),
+    "data": campo(".data-card-evento"),
+    "local": campo(".local-card-evento"),
+    "href": campo("a", atributo="href"),
+}
+
+@cronometrar("paginacao")
+async def carregar_mais_ticket_sports(page, categoria_nome):
+    """Clica em "Mostrar Mais" até não vir nenhum card novo"""
+    ultimo_total = 0
+    tentativas_sem_novos = 0
+    max_tentativas_sem_novos = 5
+    
+    while tentativas_sem_novos < max_tentativas_sem_novos:
+        total_atual = await contar_elementos(page, ".card-evento")
+        
+        if total_atual > ultimo_total:
+            ultimo_total = total_atual
+            tentativas_sem_novos = 0
+            
+            try:
+                with medir("espera"):
+                    botao_mais = await page.wait_for_selector(".carregar-mais", timeout=3000)
+                if botao_mais and await botao_mais.is_visible() and not await botao_mais.is_disabled():
+                    await botao_mais.click()
+                    await aguardar_mudanca_contagem(page, ".card-evento", total_atual, timeout=8)  # Aguarda os novos cards
+                else:
+                    print(f"   🚫 {categoria_nome}: Botão não disponível")
+                    break
+            except:
+                print(f"   🏁 {categoria_nome}: Fim dos eventos")
+                break
+        else:
+            tentativas_sem_novos += 1
+            if tentativas_sem_novos <= 2:
+                await aguardar_mudanca_contagem(page, ".card-evento", total_atual, timeout=1)
+
+@cronometrar("parse")
+def processar_cards_ticket_sports(cards, categoria_nome):
+    """Converte os cards extraídos em eventos da categoria"""
+    eventos = []
+    
+    for i, card in enumerate(cards):
+        try:
+            # Título
+            titulo = limpar_texto(card["titulo"]) if card["titulo"] is not None else f"Evento {i+1}"
+            
+            # Data
+            if card["data"] is None:
+                continue
+            data_raw = limpar_texto(card["data"].split('\n')[0])
+            
+            # Valida data
+            try:
+                data_obj = datetime.strptime(data_raw, "%d/%m/%Y")
+                if data_obj < datetime.today():
+                    continue
+                data_formatada = data_raw
+            except ValueError:
+                continue
+            
+            # Local
+            local = limpar_texto(card["local"]) if card["local"] is not None else "Local não informado"
+            
+            # Link
+            link = ""
+            href = card["href"]
+            if href:
+                link = href if href.startswith("http") else f"https://www.ticketsports.com.br{href}"
+            
+            # Validações
+            if len(titulo.strip()) < 3:
+                continue
+            
+            # Hash para deduplicação
+            evento_hash = gerar_hash_evento(titulo, data_formatada, local)
+            
+            eventos.append({
+                "titulo": titulo,
+                "data": data_formatada,
+                "local": local,
+                "link": link,
+                "hash": evento_hash,
+                "fonte": f"TicketSports-{categoria_nome}",
+                "data_obj": data_obj,
+                "categoria": categoria_nome
+            })
+        
+        except Exception:
+            continue
+    
+    return eventos
+
+async def extrair_categoria_especifica(page, categoria_nome, url):
     """Extrai eventos de uma categoria específica"""
     eventos = []
     
     try:
         print(f"🔍 Processando categoria: {categoria_nome}")
-        page.goto(url, timeout=60000)
+        await navegar(page, url, timeout=60000)
         
         # Aguarda os primeiros cards carregarem
         try:
-            page.wait_for_selector(".titulo-card-evento", timeout=15000)
-            cards_iniciais = len(page.query_selector_all(".card-evento"))
+            with medir("espera"):
+                await page.wait_for_selector(".titulo-card-evento", timeout=15000)
+            cards_iniciais = await contar_elementos(page, ".card-evento")
             print(f"   📦 {cards_iniciais} cards iniciais")
         except TimeoutError:
             print(f"   ⚠️ {categoria_nome}: Cards não carregaram")
             return eventos
         
-        # Sistema de cliques no "Mostrar Mais"
-        ultimo_total = 0
-        tentativas_sem_novos = 0
-        max_tentativas_sem_novos = 5
+        await carregar_mais_ticket_sports(page, categoria_nome)
         
-        while tentativas_sem_novos < max_tentativas_sem_novos:
-            cards = page.query_selector_all(".card-evento")
-            total_atual = len(cards)
-            
-            if total_atual > ultimo_total:
-                ultimo_total = total_atual
-                tentativas_sem_novos = 0
-                
-                try:
-                    botao_mais = page.wait_for_selector(".carregar-mais", timeout=3000)
-                    if botao_mais and botao_mais.is_visible() and not botao_mais.is_disabled():
-                        botao_mais.click()
-                        time.sleep(2)  # Aguarda carregar
-                    else:
-                        print(f"   🚫 {categoria_nome}: Botão não disponível")
-                        break
-                except:
-                    print(f"   🏁 {categoria_nome}: Fim dos eventos")
-                    break
-            else:
-                tentativas_sem_novos += 1
-                if tentativas_sem_novos <= 2:
-                    time.sleep(1)
-        
-        # Coleta dos dados
-        cards = page.query_selector_all(".card-evento")
+        # Coleta dos dados (todos os cards em uma única chamada)
+        cards = await extrair_cards(page, SELETOR_CARD_TICKET_SPORTS, CAMPOS_CARD_TICKET_SPORTS)
         print(f"   🔄 {categoria_nome}: Processando {len(cards)} eventos")
         
-        for i, card in enumerate(cards):
-            try:
-                # Título
-                titulo_el = card.query_selector(".titulo-card-evento")
-                titulo = limpar_texto(titulo_el.inner_text()) if titulo_el else f"Evento {i+1}"
-                
-                # Data
-                data_el = card.query_selector(".data-card-evento")
-                if data_el:
-                    data_raw = limpar_texto(data_el.inner_text().split('\n')[0])
-                else:
-                    continue
-                
-                # Valida data
-                try:
-                    data_obj = datetime.strptime(data_raw, "%d/%m/%Y")
-                    if data_obj < datetime.today():
-                        continue
-                    data_formatada = data_raw
-                except ValueError:
-                    continue
-                
-                # Local
-                local_el = card.query_selector(".local-card-evento")
-                local = limpar_texto(local_el.inner_text()) if local_el else "Local não informado"
-                
-                # Link
-                link_el = card.query_selector("a")
-                link = ""
-                if link_el:
-                    href = link_el.get_attribute("href")
-                    if href:
-                        link = href if href.startswith("http") else f"https://www.ticketsports.com.br{href}"
-                
-                # Validações
-                if len(titulo.strip()) < 3:
-                    continue
-                
-                # Hash para deduplicação
-                evento_hash = gerar_hash_evento(titulo, data_formatada, local)
-                
-                eventos.append({
-                    "titulo": titulo,
-                    "data": data_formatada,
-                    "local": local,
-                    "link": link,
-                    "hash": evento_hash,
-                    "fonte": f"TicketSports-{categoria_nome}",
-                    "data_obj": data_obj,
-                    "categoria": categoria_nome
-                })
-            
-            except Exception:
-                continue
+        eventos = processar_cards_ticket_sports(cards, categoria_nome)
         
         print(f"   ✅ {categoria_nome}: {len(eventos)} eventos coletados")
         
@@ -130,7 +150,7 @@ def extrair_categoria_especifica(page, categoria_nome, url):
     
     return eventos
 
-def extrair_ticket_sports(max_tentativas=3):
+async def extrair_ticket_sports_async(max_tentativas=3):
     """Extrai eventos de múltiplas categorias de distância"""
     
     # URLs com filtros de distância específicos
@@ -150,20 +170,14 @@ def extrair_ticket_sports(max_tentativas=3):
             print(f"🔎 TicketSports - Tentativa {tentativa + 1}/{max_tentativas}")
             print(f"🎯 Processando {len(categorias)} categorias de distância...")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("TicketSports") as sessao:
+                page = await sessao.nova_pagina()
                 
                 eventos_por_categoria = []
                 
                 for categoria_nome, url in categorias.items():
-                    eventos_categoria = extrair_categoria_especifica(page, categoria_nome, url)
+                    eventos_categoria = await extrair_categoria_especifica(page, categoria_nome, url)
                     eventos_por_categoria.extend(eventos_categoria)
-                    
-                    # Pequena pausa entre categorias
-                    time.sleep(1)
-                
-                browser.close()
                 
                 if eventos_por_categoria:
                     print(f"\n🔄 Removendo duplicatas entre categorias...")
@@ -198,3 +212,7 @@ def extrair_ticket_sports(max_tentativas=3):
             continue
     
     return todos_eventos
+
+def extrair_ticket_sports(max_tentativas=3):
+    """Extrai eventos de múltiplas categorias de distância (entrada síncrona)"""
+    return executar_sync(extrair_ticket_sports_async(max_tentativas))
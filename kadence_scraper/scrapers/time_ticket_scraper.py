@@ -1,8 +1,14 @@
-import time
 import hashlib
 import re
-from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from datetime import date, datetime
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import contar_elementos, aguardar_rede_ociosa, aguardar_mudanca_contagem
+from .interceptacao import capturar_json, converter_data_api, registros_bubble, campo_bubble, PADROES_API_BUBBLE
+from .datas import interpretar_data
+from .classificador import classificador
+from .telemetria import cronometrar, medir
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,72 +23,29 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')
     return texto
 
-def eh_evento_de_corrida(titulo, descricao=""):
-    """Verifica se o evento é relacionado a corrida"""
-    if not titulo:
-        return False
-    
-    texto_completo = f"{titulo.lower()} {descricao.lower()}"
-    
-    palavras_corrida = [
-        'corrida', 'maratona', 'run', 'running', 'atletismo', 
-        'cooper', 'caminhada', 'trote', 'meia maratona',
-        '5k', '10k', '21k', '42k', 'km', 'trail',
-        'night run', 'day run', 'street run', 'rustica',
-        'travessia', 'mountain bike', 'mtb', 'bike'
-    ]
-    
-    for palavra in palavras_corrida:
-        if palavra in texto_completo:
-            return True
-    
-    return False
-
-def processar_data_timeticket(data_str):
-    """Processa datas do TimeTicket: 'Sab - 20/09/2025'"""
-    if not data_str:
-        return None, None
-    
-    # Remove prefixos de dia da semana e limpa
-    data_limpa = re.sub(r'^(Dom|Seg|Ter|Qua|Qui|Sex|Sáb|Sab)\s*-?\s*', '', data_str.strip())
-    
-    # Padrão: "20/09/2025"
-    padrao = r'(\d{1,2})/(\d{1,2})/(\d{4})'
-    match = re.search(padrao, data_limpa)
-    
-    if match:
-        dia = match.group(1).zfill(2)
-        mes = match.group(2).zfill(2)
-        ano = match.group(3)
-        
-        data_str_formatada = f"{dia}/{mes}/{ano}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
-    
-    return None, data_str
-
-def scroll_ate_o_fim(page, max_scrolls=20):
-    """Faz scroll até carregar todos os eventos"""
+@cronometrar("paginacao")
+async def scroll_ate_o_fim(page, max_scrolls=20, captura=None):
+    """
+    Faz scroll até carregar todos os eventos.
+    Com `captura`, cada rolagem espera só a resposta de dados do Bubble, não a renderização
+    """
     print("📜 Fazendo scroll para carregar todos os eventos...")
     
     scrolls_realizados = 0
     scrolls_sem_novos_cards = 0
     ultimo_total_cards = 0
     
-    while scrolls_realizados < max_scrolls and scrolls_sem_novos_cards < 3:
-        # Conta cards antes do scroll
-        cards_antes = len(page.query_selector_all(".bubble-element.group-item"))
-        
-        # Faz scroll
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        time.sleep(2)  # Aguarda carregar
-        
-        # Conta cards depois do scroll
-        cards_depois = len(page.query_selector_all(".bubble-element.group-item"))
+    while scrolls_realizados < max_scrolls and scrolls_sem_novos_cards < 2:
+        # Faz scroll e aguarda novos dados (no máximo 5s)
+        if captura:
+            cards_antes = len(await captura.eventos())
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            chegou = await captura.aguardar(timeout=5, quietude=0.3)
+            cards_depois = len(await captura.eventos()) if chegou else cards_antes
+        else:
+            cards_antes = await contar_elementos(page, ".bubble-element.group-item")
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            cards_depois = await aguardar_mudanca_contagem(page, ".bubble-element.group-item", cards_antes, timeout=5)
         
         scrolls_realizados += 1
         
@@ -91,60 +54,90 @@ def scroll_ate_o_fim(page, max_scrolls=20):
             print(f"   📈 Scroll {scrolls_realizados}: {cards_depois} cards total (+{cards_depois - cards_antes} novos)")
         else:
             scrolls_sem_novos_cards += 1
-            print(f"   ⏳ Scroll {scrolls_realizados}: Sem novos cards ({scrolls_sem_novos_cards}/3)")
+            print(f"   ⏳ Scroll {scrolls_realizados}: Sem novos cards ({scrolls_sem_novos_cards}/2)")
         
         ultimo_total_cards = cards_depois
     
     print(f"🏁 Scroll finalizado: {ultimo_total_cards} cards encontrados")
     return ultimo_total_cards
 
-def coletar_eventos_timeticket(page):
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_TIMETICKET = ".bubble-element.group-item"
+CAMPOS_CARD_TIMETICKET = {
+    "textos": campo(".bubble-element.Text", todos=True),
+    "onclick": campo(".clickable-element", atributo="onclick"),
+}
+
+def mapear_api_timeticket(dados):
+    """Converte as respostas de dados do Bubble do TimeTicket em corridas"""
+    eventos = []
+    for registro in registros_bubble(dados):
+        titulo = limpar_texto(campo_bubble(registro, ("nome", "titulo", "title", "name")) or "")
+        descricao = limpar_texto(campo_bubble(registro, ("descricao", "description", "modalidade")) or "")
+        if len(titulo) < 3 or not classificador("TimeTicket").eh_corrida(titulo, descricao):
+            continue
+        
+        data_obj, data_formatada = converter_data_api(campo_bubble(registro, ("data", "date", "inicio"), ("_date",)))
+        if not data_obj or data_obj < datetime.now():
+            continue
+        
+        cidade = campo_bubble(registro, ("cidade", "city", "local")) or ""
+        uf = campo_bubble(registro, ("estado", "uf")) or ""
+        local = limpar_texto(" | ".join(p for p in (cidade, uf) if p)) or "Local não informado"
+        
+        eventos.append({
+            "titulo": titulo,
+            "data": data_formatada,
+            "local": local,
+            "link": "https://timeticket.com.br/",
+            "hash": gerar_hash_evento(titulo, data_formatada, local),
+            "fonte": "TimeTicket",
+            "data_obj": data_obj
+        })
+    return eventos
+
+@cronometrar("parse")
+async def coletar_eventos_timeticket(page):
     """Coleta eventos da página do TimeTicket"""
     eventos = []
     
     try:
-        # Seleciona todos os cards de evento
-        cards = page.query_selector_all(".bubble-element.group-item")
+        # Extrai os textos de todos os cards de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_TIMETICKET, CAMPOS_CARD_TIMETICKET)
         print(f"🔍 Analisando {len(cards)} cards...")
         
+        referencia = date.today()  # a mesma para a página inteira
         for i, card in enumerate(cards):
             try:
                 # Título - busca pelo texto principal do evento
-                titulo_elements = card.query_selector_all(".bubble-element.Text")
+                textos = card["textos"]
                 titulo = ""
                 descricao = ""
                 
-                for el in titulo_elements:
-                    try:
-                        texto = limpar_texto(el.inner_text())
-                        if len(texto) > 10 and not titulo:  # Primeiro texto longo é o título
-                            titulo = texto
-                        elif len(texto) > 20 and not descricao:  # Segundo texto longo é descrição
-                            descricao = texto
-                    except:
-                        continue
+                for texto in textos:
+                    texto = limpar_texto(texto)
+                    if len(texto) > 10 and not titulo:  # Primeiro texto longo é o título
+                        titulo = texto
+                    elif len(texto) > 20 and not descricao:  # Segundo texto longo é descrição
+                        descricao = texto
                 
                 if not titulo:
                     continue
                 
                 # Filtra apenas eventos de corrida
-                if not eh_evento_de_corrida(titulo, descricao):
+                if not classificador("TimeTicket").eh_corrida(titulo, descricao):
                     continue
                 
                 # Data - busca por texto que contenha data
-                data_el = None
                 data_raw = ""
                 
-                for el in titulo_elements:
-                    try:
-                        texto = el.inner_text().strip()
-                        if re.search(r'\d{1,2}/\d{1,2}/\d{4}', texto):
-                            data_raw = texto
-                            break
-                    except:
-                        continue
+                for texto in textos:
+                    texto = (texto or "").strip()
+                    if re.search(r'\d{1,2}/\d{1,2}/\d{4}', texto):
+                        data_raw = texto
+                        break
                 
-                data_obj, data_formatada = processar_data_timeticket(data_raw)
+                data_obj, data_formatada = interpretar_data(data_raw, referencia)
                 if not data_obj:
                     continue
                 
@@ -154,31 +147,23 @@ def coletar_eventos_timeticket(page):
                 
                 # Local - busca por texto que parece ser local
                 local = "Local não informado"
-                for el in titulo_elements:
-                    try:
-                        texto = limpar_texto(el.inner_text())
-                        # Procura por padrões de cidade: "Cidade | Estado" ou similar
-                        if re.search(r'[A-Z][a-z]+\s*\|\s*[A-Z]{2}', texto) or 'MG' in texto or 'SP' in texto:
-                            local = texto
-                            break
-                    except:
-                        continue
+                for texto in textos:
+                    texto = limpar_texto(texto)
+                    # Procura por padrões de cidade: "Cidade | Estado" ou similar
+                    if re.search(r'[A-Z][a-z]+\s*\|\s*[A-Z]{2}', texto) or 'MG' in texto or 'SP' in texto:
+                        local = texto
+                        break
                 
-                # Link - tenta encontrar link clicável
+                # Link - tenta extrair a URL do onclick do elemento clicável
                 link = "https://timeticket.com.br/"
-                try:
-                    link_el = card.query_selector(".clickable-element")
-                    if link_el:
-                        onclick = link_el.get_attribute("onclick") or ""
-                        if "navigate" in onclick:
-                            # Extrai URL do JavaScript se possível
-                            url_match = re.search(r'["\']([^"\']+)["\']', onclick)
-                            if url_match:
-                                relative_url = url_match.group(1)
-                                if relative_url.startswith('/'):
-                                    link = f"https://timeticket.com.br{relative_url}"
-                except:
-                    pass
+                onclick = card["onclick"] or ""
+                if "navigate" in onclick:
+                    # Extrai URL do JavaScript se possível
+                    url_match = re.search(r'["\']([^"\']+)["\']', onclick)
+                    if url_match:
+                        relative_url = url_match.group(1)
+                        if relative_url.startswith('/'):
+                            link = f"https://timeticket.com.br{relative_url}"
                 
                 # Validações básicas
                 if len(titulo.strip()) < 3:
@@ -209,7 +194,7 @@ def coletar_eventos_timeticket(page):
     
     return eventos
 
-def extrair_timeticket(max_tentativas=3):
+async def extrair_timeticket_async(max_tentativas=3):
     """Extrai eventos de corrida do TimeTicket"""
     eventos = []
     
@@ -217,12 +202,11 @@ def extrair_timeticket(max_tentativas=3):
         try:
             print(f"🔎 TimeTicket - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("TimeTicket") as sessao:
+                page = await sessao.nova_pagina()
                 
                 # Headers para parecer mais humano
-                page.set_extra_http_headers({
+                await page.set_extra_http_headers({
                     'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
                 })
                 
@@ -230,21 +214,25 @@ def extrair_timeticket(max_tentativas=3):
                 
                 try:
                     print("📄 Carregando TimeTicket...")
-                    page.goto(url, timeout=60000)
-                    
-                    # Aguarda a página carregar (Bubble é SPA)
-                    time.sleep(5)
-                    
-                    # Aguarda os primeiros cards aparecerem
-                    page.wait_for_selector(".bubble-element.group-item", timeout=20000)
-                    
-                    # Faz scroll para carregar todos os eventos
-                    total_cards = scroll_ate_o_fim(page, max_scrolls=20)
-                    
-                    # Coleta os eventos
-                    eventos = coletar_eventos_timeticket(page)
-                    
-                    browser.close()
+                    async with capturar_json(page, PADROES_API_BUBBLE, mapear_api_timeticket) as captura:
+                        await navegar(page, url, timeout=60000)
+                        
+                        # Com os dados chegando pela API, não é preciso esperar a renderização dos cards
+                        if await captura.aguardar(timeout=20, quietude=1.0) and await captura.eventos():
+                            await scroll_ate_o_fim(page, max_scrolls=20, captura=captura)
+                            eventos = await captura.eventos()
+                            print(f"   📡 {len(eventos)} corridas lidas de {len(captura.payloads)} respostas da API")
+                        else:
+                            # Fallback: aguarda os primeiros cards e o Bubble terminar as requisições de dados
+                            with medir("espera"):
+                                await page.wait_for_selector(".bubble-element.group-item", timeout=20000)
+                            await aguardar_rede_ociosa(page, quietude=1.0)
+                            
+                            # Faz scroll para carregar todos os eventos
+                            await scroll_ate_o_fim(page, max_scrolls=20)
+                            
+                            # Coleta os eventos
+                            eventos = await coletar_eventos_timeticket(page)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -269,7 +257,6 @@ def extrair_timeticket(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"⌛ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -279,3 +266,7 @@ def extrair_timeticket(max_tentativas=3):
             continue
     
     return eventos
+
+def extrair_timeticket(max_tentativas=3):
+    """Extrai eventos de corrida do TimeTicket (entrada síncrona)"""
+    return executar_sync(extrair_timeticket_async(max_tentativas))
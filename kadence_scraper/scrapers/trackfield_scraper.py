@@ -1,8 +1,12 @@
-import time
 import hashlib
 import re
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import contar_elementos, aguardar_rede_ociosa, aguardar_carregamento, aguardar_mudanca_contagem
+from .datas import interpretar_datas
+from .telemetria import cronometrar
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,77 +21,34 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para CSV
     return texto
 
-def processar_data_trackfield(data_str):
-    """Processa data do Track&Field: '27 de jul' -> '27/07/2025'"""
-    if not data_str:
-        return None, None
-    
-    try:
-        # Mapeia meses em português
-        meses = {
-            'jan': '01', 'fev': '02', 'mar': '03', 'abr': '04',
-            'mai': '05', 'jun': '06', 'jul': '07', 'ago': '08',
-            'set': '09', 'out': '10', 'nov': '11', 'dez': '12'
-        }
-        
-        # Regex para capturar "27 de jul"
-        match = re.search(r'(\d{1,2})\s+de\s+(\w{3})', data_str.lower())
-        if not match:
-            return None, None
-        
-        dia = match.group(1).zfill(2)
-        mes_texto = match.group(2)
-        
-        if mes_texto not in meses:
-            return None, None
-        
-        mes_num = meses[mes_texto]
-        
-        # Assume ano atual ou próximo
-        ano_atual = datetime.now().year
-        data_str_formatada = f"{dia}/{mes_num}/{ano_atual}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            # Se a data já passou, assume ano seguinte
-            if data_obj < datetime.now():
-                data_obj = datetime.strptime(f"{dia}/{mes_num}/{ano_atual + 1}", '%d/%m/%Y')
-                data_str_formatada = f"{dia}/{mes_num}/{ano_atual + 1}"
-            
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
-    except:
-        pass
-    
-    return None, None
-
-def carregar_mais_eventos(page, max_cliques=10):
+@cronometrar("paginacao")
+async def carregar_mais_eventos(page, max_cliques=10):
     """Clica no botão 'carregar mais provas' para carregar todos os eventos"""
     cliques = 0
     
     while cliques < max_cliques:
         try:
             # Procura pelo botão "carregar mais provas"
-            botao = page.query_selector("button:has-text('carregar mais provas')")
+            botao = await page.query_selector("button:has-text('carregar mais provas')")
             
             if not botao:
                 print(f"   📝 Botão não encontrado após {cliques} cliques")
                 break
             
             # Verifica se está habilitado
-            disabled = botao.get_attribute("disabled")
+            disabled = await botao.get_attribute("disabled")
             if disabled is not None:
                 print(f"   📝 Botão desabilitado após {cliques} cliques")
                 break
             
             # Clica no botão
-            botao.click()
+            cards_antes = await contar_elementos(page, ".run-series-card")
+            await botao.click()
             cliques += 1
             print(f"   🔄 Clique {cliques} - Carregando mais eventos...")
             
-            # Aguarda carregamento
-            time.sleep(3)
+            # Aguarda os novos cards (no máximo 8s)
+            await aguardar_mudanca_contagem(page, ".run-series-card", cards_antes, timeout=8)
             
         except Exception as e:
             print(f"   ⚠️ Erro ao clicar no botão: {str(e)[:50]}...")
@@ -96,29 +57,41 @@ def carregar_mais_eventos(page, max_cliques=10):
     print(f"   ✅ Carregamento concluído após {cliques} cliques")
     return cliques
 
-def coletar_eventos_trackfield(page):
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_TRACKFIELD = ".run-series-card"
+CAMPOS_CARD_TRACKFIELD = {
+    "links": campo("a", todos=True),  # o local é o link com 📍
+    "titulo": campo("h2 a"),
+    "href": campo("h2 a", atributo="href"),
+    "data": campo("strong"),
+}
+
+@cronometrar("parse")
+async def coletar_eventos_trackfield(page):
     """Coleta eventos do Track&Field Run Series"""
     eventos = []
     
     try:
         # Primeiro, carrega todos os eventos clicando no botão
-        carregar_mais_eventos(page, max_cliques=15)
+        await carregar_mais_eventos(page, max_cliques=15)
         
-        # Aguarda um pouco mais para garantir carregamento
-        time.sleep(3)
+        # Aguarda as últimas requisições terminarem
+        await aguardar_rede_ociosa(page, timeout=3)
         
-        # Seleciona todos os cards de evento
-        cards = page.query_selector_all(".run-series-card")
+        # Extrai todos os cards de evento de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_TRACKFIELD, CAMPOS_CARD_TRACKFIELD)
         print(f"   📦 {len(cards)} cards encontrados para processamento")
         
+        # Todas as datas da página de uma vez, contra a mesma data de referência
+        datas = interpretar_datas([card["data"] for card in cards])
         for i, card in enumerate(cards):
             try:
-                # Local com ícone 📍
-                local_el = card.query_selector("a:has-text('📍')")
-                if not local_el:
+                # Local com ícone 📍 (primeiro link que contém o emoji)
+                local_text = next((t for t in card["links"] if t and '📍' in t), None)
+                if local_text is None:
                     continue
                 
-                local_text = limpar_texto(local_el.inner_text())
+                local_text = limpar_texto(local_text)
                 # Remove o emoji 📍 e limpa
                 local = re.sub(r'^📍\s*', '', local_text).strip()
                 
@@ -126,21 +99,18 @@ def coletar_eventos_trackfield(page):
                     continue
                 
                 # Título do evento
-                titulo_el = card.query_selector("h2 a")
-                if not titulo_el:
+                if card["titulo"] is None:
                     continue
                 
-                titulo = limpar_texto(titulo_el.inner_text())
+                titulo = limpar_texto(card["titulo"])
                 if not titulo or len(titulo) < 5:
                     continue
                 
                 # Data do evento
-                data_el = card.query_selector("strong")
-                if not data_el:
+                if card["data"] is None:
                     continue
                 
-                data_str = limpar_texto(data_el.inner_text())
-                data_obj, data_formatada = processar_data_trackfield(data_str)
+                data_obj, data_formatada = datas[i]
                 
                 if not data_obj:
                     continue
@@ -150,12 +120,10 @@ def coletar_eventos_trackfield(page):
                     continue
                 
                 # Link do evento
-                link_el = card.query_selector("h2 a")
                 link = ""
-                if link_el:
-                    href = link_el.get_attribute("href")
-                    if href:
-                        link = href if href.startswith("http") else f"https://www.tfsports.com.br{href}"
+                href = card["href"]
+                if href:
+                    link = href if href.startswith("http") else f"https://www.tfsports.com.br{href}"
                 
                 # Título completo (Track&Field Run Series + Local)
                 titulo_completo = f"Track&Field Run Series {titulo}"
@@ -189,7 +157,7 @@ def coletar_eventos_trackfield(page):
     
     return eventos
 
-def extrair_trackfield(max_tentativas=3):
+async def extrair_trackfield_async(max_tentativas=3):
     """Extrai eventos do Track&Field Run Series"""
     eventos = []
     
@@ -197,25 +165,19 @@ def extrair_trackfield(max_tentativas=3):
         try:
             print(f"🔎 Track&Field Run Series - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("Track&Field") as sessao:
+                page = await sessao.nova_pagina()
                 
                 try:
                     print("📄 Carregando Track&Field Run Series...")
-                    page.goto("https://www.tfsports.com.br/run-series/", timeout=60000)
-                    time.sleep(8)  # Site Next.js precisa de mais tempo
+                    await navegar(page, "https://www.tfsports.com.br/run-series/", timeout=60000)
                     
-                    # Aguarda os cards aparecerem
-                    try:
-                        page.wait_for_selector(".run-series-card", timeout=30000)
-                    except TimeoutError:
+                    # Aguarda os cards aparecerem e o Next.js terminar a hidratação
+                    if not await aguardar_carregamento(page, ".run-series-card", timeout=30):
                         print("   ⚠️ Cards não carregaram no tempo esperado")
-                        browser.close()
                         continue
                     
-                    eventos = coletar_eventos_trackfield(page)
-                    browser.close()
+                    eventos = await coletar_eventos_trackfield(page)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -240,7 +202,6 @@ def extrair_trackfield(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -249,4 +210,8 @@ def extrair_trackfield(max_tentativas=3):
                 print("💀 Track&Field Run Series falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_trackfield(max_tentativas=3):
+    """Extrai eventos do Track&Field Run Series (entrada síncrona)"""
+    return executar_sync(extrair_trackfield_async(max_tentativas))
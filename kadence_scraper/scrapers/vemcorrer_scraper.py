@@ -1,8 +1,12 @@
-import time
 import hashlib
 import re
-from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from datetime import date, datetime
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards
+from .esperas import aguardar_carregamento, rolar_ate_estabilizar
+from .datas import interpretar_data
+from .telemetria import cronometrar
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,118 +21,54 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para não quebrar CSV
     return texto
 
-def processar_data_vemcorrer(dia_str, mes_str, ano_atual=None):
-    """Processa data do formato VemCorrer: dia='16', mês='Ago' -> '16/08/2025'"""
-    if not dia_str or not mes_str:
-        return None, None
-    
-    # Mapeia meses em português (abreviado)
-    meses = {
-        'jan': '01', 'fev': '02', 'mar': '03', 'abr': '04',
-        'mai': '05', 'jun': '06', 'jul': '07', 'ago': '08',
-        'set': '09', 'out': '10', 'nov': '11', 'dez': '12'
-    }
-    
-    try:
-        dia = dia_str.strip().zfill(2)
-        mes_texto = mes_str.strip().lower()
-        mes_num = meses.get(mes_texto, '01')
-        
-        # Se não foi passado ano, assume ano atual ou próximo
-        if not ano_atual:
-            ano_atual = datetime.now().year
-        
-        data_str_formatada = f"{dia}/{mes_num}/{ano_atual}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            # Se a data já passou, assume ano seguinte
-            if data_obj < datetime.now():
-                data_obj = datetime.strptime(f"{dia}/{mes_num}/{ano_atual + 1}", '%d/%m/%Y')
-                data_str_formatada = f"{dia}/{mes_num}/{ano_atual + 1}"
-            
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
-    except:
-        pass
-    
-    return None, f"{dia_str}/{mes_str}"
-
-def extrair_data_do_datetime(datetime_str):
-    """Extrai ano do atributo datetime se disponível"""
-    if not datetime_str:
-        return None
-    
-    # Formato: "2025-08-16" ou "2025-08-16/2025-08-17"
-    try:
-        # Pega a primeira data se for um range
-        primeira_data = datetime_str.split('/')[0] if '/' in datetime_str else datetime_str
-        return datetime.strptime(primeira_data, '%Y-%m-%d').year
-    except:
-        return None
+# Campos de cada card da listagem (extraídos em uma única chamada)
+SELETOR_CARD_VEMCORRER = ".evento"
+CAMPOS_CARD_VEMCORRER = {
+    "titulo": campo(".evento__nome"),
+    "data_dupla": campo(".evento__data--dupla"),  # evento de múltiplos dias
+    "dia_inicio": campo(".evento__comeco .evento__dia"),
+    "mes_inicio": campo(".evento__comeco .evento__mes"),
+    "datetime_inicio": campo(".evento__comeco", atributo="datetime"),
+    "dia": campo(".evento__data .evento__dia"),
+    "mes": campo(".evento__data .evento__mes"),
+    "datetime": campo(".evento__data time", atributo="datetime"),
+    "local": campo(".evento__local"),
+    "href": campo("a[href*='evento/']", atributo="href"),  # botão "Saiba Mais"
+}
 
-def coletar_eventos_vemcorrer(page):
+@cronometrar("parse")
+async def coletar_eventos_vemcorrer(page):
     """Coleta eventos de corrida do VemCorrer"""
     eventos = []
     
     try:
-        # Seleciona todos os cards de evento
-        cards = page.query_selector_all(".evento")
+        # Extrai todos os cards de evento de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_VEMCORRER, CAMPOS_CARD_VEMCORRER)
         print(f"   📦 {len(cards)} cards encontrados para processamento")
         
+        referencia = date.today()  # a mesma para a página inteira
         for i, card in enumerate(cards):
             try:
                 # Título
-                titulo_el = card.query_selector(".evento__nome")
-                titulo = limpar_texto(titulo_el.inner_text()) if titulo_el else ""
+                titulo = limpar_texto(card["titulo"])
                 
                 if not titulo:
                     continue
                 
                 # Data - pode ser simples ou dupla
-                # Primeiro tenta data dupla (evento de múltiplos dias)
-                data_dupla = card.query_selector(".evento__data--dupla")
-                if data_dupla:
-                    # Data de início
-                    dia_inicio = card.query_selector(".evento__comeco .evento__dia")
-                    mes_inicio = card.query_selector(".evento__comeco .evento__mes")
-                    
-                    if dia_inicio and mes_inicio:
-                        # Tenta extrair ano do datetime se disponível
-                        datetime_attr = card.query_selector(".evento__comeco")
-                        ano = None
-                        if datetime_attr:
-                            datetime_value = datetime_attr.get_attribute("datetime")
-                            ano = extrair_data_do_datetime(datetime_value)
-                        
-                        data_obj, data_formatada = processar_data_vemcorrer(
-                            dia_inicio.inner_text(), 
-                            mes_inicio.inner_text(),
-                            ano
-                        )
-                    else:
-                        continue
+                # Primeiro tenta data dupla (evento de múltiplos dias), usando a data de início
+                if card["data_dupla"] is not None:
+                    dia, mes, datetime_value = card["dia_inicio"], card["mes_inicio"], card["datetime_inicio"]
                 else:
-                    # Data simples
-                    dia_el = card.query_selector(".evento__data .evento__dia")
-                    mes_el = card.query_selector(".evento__data .evento__mes")
-                    
-                    if dia_el and mes_el:
-                        # Tenta extrair ano do datetime se disponível
-                        datetime_attr = card.query_selector(".evento__data time")
-                        ano = None
-                        if datetime_attr:
-                            datetime_value = datetime_attr.get_attribute("datetime")
-                            ano = extrair_data_do_datetime(datetime_value)
-                        
-                        data_obj, data_formatada = processar_data_vemcorrer(
-                            dia_el.inner_text(), 
-                            mes_el.inner_text(),
-                            ano
-                        )
-                    else:
-                        continue
+                    dia, mes, datetime_value = card["dia"], card["mes"], card["datetime"]
+                
+                if dia is None or mes is None:
+                    continue
+                
+                # O atributo datetime ('2025-08-16' ou '2025-08-16/2025-08-17') já traz o ano
+                data_obj, data_formatada = interpretar_data(datetime_value, referencia)
+                if not data_obj:
+                    data_obj, data_formatada = interpretar_data(f"{dia} {mes}", referencia)
                 
                 if not data_obj:
                     continue
@@ -138,27 +78,24 @@ def coletar_eventos_vemcorrer(page):
                     continue
                 
                 # Local - remove o ícone e pega só o texto
-                local_el = card.query_selector(".evento__local")
                 local = "Local não informado"
-                if local_el:
-                    local_text = limpar_texto(local_el.inner_text())
+                if card["local"] is not None:
+                    local_text = limpar_texto(card["local"])
                     # Remove ícone (primeiro caractere geralmente)
                     local = re.sub(r'^[^\w\s]*\s*', '', local_text).strip()
                     local = limpar_texto(local)
                 
                 # Link - extrai do href do botão "Saiba Mais"
-                link_el = card.query_selector("a[href*='evento/']")
                 link = ""
-                if link_el:
-                    href = link_el.get_attribute("href")
-                    if href:
-                        # Converte para URL completa se necessário
-                        if href.startswith("evento/"):
-                            link = f"https://vemcorrer.com/{href}"
-                        elif href.startswith("/evento/"):
-                            link = f"https://vemcorrer.com{href}"
-                        else:
-                            link = href
+                href = card["href"]
+                if href:
+                    # Converte para URL completa se necessário
+                    if href.startswith("evento/"):
+                        link = f"https://vemcorrer.com/{href}"
+                    elif href.startswith("/evento/"):
+                        link = f"https://vemcorrer.com{href}"
+                    else:
+                        link = href
                 
                 # Validações básicas
                 if len(titulo.strip()) < 3:
@@ -191,7 +128,7 @@ def coletar_eventos_vemcorrer(page):
     
     return eventos
 
-def extrair_vemcorrer(max_tentativas=3):
+async def extrair_vemcorrer_async(max_tentativas=3):
     """Extrai eventos de corrida do VemCorrer"""
     eventos = []
     
@@ -199,40 +136,28 @@ def extrair_vemcorrer(max_tentativas=3):
         try:
             print(f"🔎 VemCorrer - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("VemCorrer.com") as sessao:
+                page = await sessao.nova_pagina()
                 
                 # URL dos eventos do VemCorrer
                 url = "https://vemcorrer.com/evento/"
                 
                 try:
                     print("📄 Carregando VemCorrer...")
-                    page.goto(url, timeout=60000)
+                    await navegar(page, url, timeout=60000)
                     
-                    # Aguarda a página carregar completamente
-                    time.sleep(3)
-                    
-                    # Aguarda os cards aparecerem
-                    try:
-                        page.wait_for_selector(".evento", timeout=15000)
-                    except TimeoutError:
+                    # Aguarda os cards aparecerem e a rede sossegar
+                    if not await aguardar_carregamento(page, ".evento", timeout=15):
                         print("   ⚠️ Cards não carregaram no tempo esperado")
-                        browser.close()
                         continue
                     
                     # Faz scroll para garantir que todos os eventos carregaram
                     print("🔄 Fazendo scroll para carregar todos os eventos...")
-                    for i in range(3):  # Scroll algumas vezes para garantir
-                        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                        time.sleep(1)
+                    total_cards = await rolar_ate_estabilizar(page, ".evento", max_rolagens=3)
                     
                     # Coleta todos os eventos
-                    total_cards = len(page.query_selector_all(".evento"))
                     print(f"🔄 Processando {total_cards} eventos...")
-                    eventos = coletar_eventos_vemcorrer(page)
-                    
-                    browser.close()
+                    eventos = await coletar_eventos_vemcorrer(page)
                     
                     if eventos:
                         # Remove duplicatas internas
@@ -257,7 +182,6 @@ def extrair_vemcorrer(max_tentativas=3):
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -266,4 +190,8 @@ def extrair_vemcorrer(max_tentativas=3):
                 print("💀 VemCorrer falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_vemcorrer(max_tentativas=3):
+    """Extrai eventos de corrida do VemCorrer (entrada síncrona)"""
+    return executar_sync(extrair_vemcorrer_async(max_tentativas))
@@ -1,8 +1,14 @@
-import time
 import hashlib
 import re
-from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from datetime import date, datetime
+from playwright.async_api import TimeoutError
+from .navegador import sessao_navegador, navegar, executar_sync
+from .extracao import campo, extrair_cards, extrair_cards_html
+from .http_rapido import ClienteHTTP, percorrer_paginas_http, http_rapido_habilitado
+from .esperas import aguardar_carregamento
+from .datas import interpretar_data
+from .classificador import classificador
+from .telemetria import cronometrar
 
 def gerar_hash_evento(titulo, data, local):
     """Gera hash único para evitar duplicatas"""
@@ -17,58 +23,7 @@ def limpar_texto(texto):
     texto = texto.replace(',', ' ')  # Remove vírgulas para não quebrar CSV
     return texto
 
-def processar_data_youmovin(data_str):
-    """Processa data do formato YouMovin: '09/08/2025 14:30' -> '09/08/2025'"""
-    if not data_str:
-        return None, None
-    
-    # Remove horário se presente
-    data_limpa = data_str.split(' ')[0].strip()
-    
-    # Padrão: "09/08/2025"
-    padrao = r'(\d{2})/(\d{2})/(\d{4})'
-    match = re.search(padrao, data_limpa)
-    
-    if match:
-        dia, mes, ano = match.groups()
-        data_str_formatada = f"{dia}/{mes}/{ano}"
-        
-        try:
-            data_obj = datetime.strptime(data_str_formatada, '%d/%m/%Y')
-            return data_obj, data_str_formatada
-        except ValueError:
-            pass
-    
-    return None, data_str
-
-def eh_evento_de_corrida_youmovin(titulo, categoria=""):
-    """Verifica se o evento é relacionado a corrida"""
-    if not titulo:
-        return False
-    
-    titulo_lower = titulo.lower()
-    categoria_lower = categoria.lower() if categoria else ""
-    
-    # Palavras-chave que indicam corrida
-    palavras_corrida = [
-        'corrida', 'maratona', 'run', 'running', 'atletismo', 
-        'cooper', 'caminhada', 'trote', 'meia maratona',
-        '5k', '10k', '21k', '42k', 'km', 'trail',
-        'night run', 'day run', 'street run', 'rustica'
-    ]
-    
-    # Verifica na categoria primeiro (mais confiável)
-    if 'corrida de rua' in categoria_lower or 'aventura' in categoria_lower:
-        return True
-    
-    # Verifica no título
-    for palavra in palavras_corrida:
-        if palavra in titulo_lower:
-            return True
-    
-    return False
-
-def navegar_paginas_youmovin(page, max_paginas=10):
+async def navegar_paginas_youmovin(page, max_paginas=10):
     """Navega pelas páginas do YouMovin usando paginação"""
     todos_eventos = []
     
@@ -82,22 +37,19 @@ def navegar_paginas_youmovin(page, max_paginas=10):
             else:
                 # Navega para próxima página
                 try:
-                    url_pagina = f"https://www.youmovin.com.br/calendario-de-eventos/{pagina_atual}?filtro=S"
-                    page.goto(url_pagina, timeout=30000)
-                    time.sleep(3)
+                    url_pagina = url_pagina_youmovin(pagina_atual)
+                    await navegar(page, url_pagina, timeout=30000)
                 except Exception as e:
                     print(f"   ⚠️ Erro ao navegar para página {pagina_atual}: {str(e)[:50]}...")
                     break
             
             # Aguarda os cards carregarem
-            try:
-                page.wait_for_selector(".content ul.calendario_tb", timeout=10000)
-            except TimeoutError:
+            if not await aguardar_carregamento(page, ".content ul.calendario_tb", timeout=10):
                 print(f"   ⚠️ Página {pagina_atual}: Cards não carregaram")
                 continue
             
             # Coleta eventos da página atual
-            eventos_pagina = coletar_eventos_pagina_youmovin(page, pagina_atual)
+            eventos_pagina = await coletar_eventos_pagina_youmovin(page, pagina_atual)
             
             if eventos_pagina:
                 todos_eventos.extend(eventos_pagina)
@@ -107,15 +59,12 @@ def navegar_paginas_youmovin(page, max_paginas=10):
             
             # Verifica se há próxima página
             try:
-                proximo_link = page.query_selector("a:has-text('Próxima')")
-                if not proximo_link or not proximo_link.is_visible():
+                proximo_link = await page.query_selector("a:has-text('Próxima')")
+                if not proximo_link or not await proximo_link.is_visible():
                     print(f"   🏁 Não há mais páginas")
                     break
             except:
                 break
-            
-            # Pequena pausa entre páginas
-            time.sleep(2)
                 
         except Exception as e:
             print(f"   ❌ Erro na página {pagina_atual}: {str(e)[:50]}...")
@@ -123,175 +72,195 @@ def navegar_paginas_youmovin(page, max_paginas=10):
     
     return todos_eventos
 
-def coletar_eventos_pagina_youmovin(page, pagina_num):
-    """Coleta eventos de corrida de uma página do YouMovin"""
+# Campos de cada card de evento válido (extraídos em uma única chamada)
+SELETOR_CARD_YOUMOVIN = ".content:has(ul.calendario_tb)"
+CAMPOS_CARD_YOUMOVIN = {
+    "titulo": campo(".t_calendario span[onclick]"),
+    "onclick": campo(".t_calendario span[onclick]", atributo="onclick"),
+    "infos": campo(".so_desktop li", todos=True),  # elementos da tabela
+}
+
+@cronometrar("parse")
+def processar_cards_youmovin(cards):
+    """Converte os cards extraídos (do navegador ou do HTML) em corridas"""
     eventos = []
     
-    try:
-        # Seleciona todos os cards de evento
-        cards = page.query_selector_all(".content")
-        
-        for i, card in enumerate(cards):
-            try:
-                # Verifica se é um card de evento válido
-                calendar_tb = card.query_selector("ul.calendario_tb")
-                if not calendar_tb:
-                    continue
-                
-                # Título - busca pelo span com onclick
-                titulo_el = card.query_selector(".t_calendario span[onclick]")
-                titulo = ""
-                link = ""
-                
-                if titulo_el:
-                    titulo = limpar_texto(titulo_el.inner_text())
-                    onclick_attr = titulo_el.get_attribute("onclick")
-                    if onclick_attr:
-                        # Extrai URL do onclick: document.location.href='URL'
-                        match = re.search(r"document\.location\.href='([^']+)'", onclick_attr)
-                        if match:
-                            url = match.group(1)
-                            link = url if url.startswith("http") else f"https://www.youmovin.com.br{url}"
-                
-                if not titulo:
-                    continue
-                
-                # Busca informações nos elementos da tabela (so_desktop)
-                info_elements = card.query_selector_all(".so_desktop li")
-                
-                data_raw = ""
-                categoria = ""
-                modalidade = ""
-                local = "Local não informado"
-                
-                # Processa elementos de informação (ignora headers)
-                for j, info_el in enumerate(info_elements):
-                    try:
-                        texto = limpar_texto(info_el.inner_text())
-                        
-                        # Pula headers
-                        if texto in ["Data Hora", "Categoria", "Modalidade", "Local"]:
-                            continue
-                        
-                        # Primeira info válida é a data
-                        if not data_raw and "/" in texto:
-                            data_raw = texto
-                        # Segunda info é categoria
-                        elif not categoria and "corrida" in texto.lower():
-                            categoria = texto
-                        # Terceira info é modalidade (contém KM geralmente)
-                        elif not modalidade and ("km" in texto.lower() or "k" in texto.lower()):
-                            modalidade = texto
-                        # Local geralmente contém " - " (cidade - estado)
-                        elif " - " in texto and not local.endswith(" - RS"):
-                            local = texto
-                        
-                    except Exception:
-                        continue
-                
-                # Verifica se é evento de corrida
-                if not eh_evento_de_corrida_youmovin(titulo, categoria):
-                    continue
-                
-                # Processa a data
-                data_obj, data_formatada = processar_data_youmovin(data_raw)
-                if not data_obj:
-                    continue
-                
-                # Só eventos futuros
-                if data_obj < datetime.now():
-                    continue
+    referencia = date.today()  # a mesma para a página inteira
+    for i, card in enumerate(cards):
+        try:
+            # Título - span com onclick
+            titulo = limpar_texto(card["titulo"])
+            link = ""
+            
+            onclick_attr = card["onclick"]
+            if onclick_attr:
+                # Extrai URL do onclick: document.location.href='URL'
+                match = re.search(r"document\.location\.href='([^']+)'", onclick_attr)
+                if match:
+                    url = match.group(1)
+                    link = url if url.startswith("http") else f"https://www.youmovin.com.br{url}"
+            
+            if not titulo:
+                continue
+            
+            data_raw = ""
+            categoria = ""
+            modalidade = ""
+            local = "Local não informado"
+            
+            # Processa elementos de informação (ignora headers)
+            for texto in card["infos"]:
+                texto = limpar_texto(texto)
                 
-                # Validações básicas
-                if len(titulo.strip()) < 3:
+                # Pula headers
+                if texto in ["Data Hora", "Categoria", "Modalidade", "Local"]:
                     continue
                 
-                # Hash para deduplicação
-                evento_hash = gerar_hash_evento(titulo, data_formatada, local)
-                
-                eventos.append({
-                    "titulo": titulo,
-                    "data": data_formatada,
-                    "local": local,
-                    "link": link,
-                    "hash": evento_hash,
-                    "fonte": "YouMovin",
-                    "data_obj": data_obj,
-                    "categoria": categoria,
-                    "modalidade": modalidade
-                })
-                
-                # Mostra detalhes dos primeiros 3 eventos
-                if len(eventos) <= 3:
-                    print(f"   ✅ Evento {len(eventos)}: {titulo[:35]}... | {data_formatada} | {local[:25]}...")
-                
-            except Exception as e:
+                # Primeira info válida é a data
+                if not data_raw and "/" in texto:
+                    data_raw = texto
+                # Segunda info é categoria
+                elif not categoria and "corrida" in texto.lower():
+                    categoria = texto
+                # Terceira info é modalidade (contém KM geralmente)
+                elif not modalidade and ("km" in texto.lower() or "k" in texto.lower()):
+                    modalidade = texto
+                # Local geralmente contém " - " (cidade - estado)
+                elif " - " in texto and not local.endswith(" - RS"):
+                    local = texto
+            
+            # Verifica se é evento de corrida
+            if not classificador("YouMovin").eh_corrida(titulo, categoria):
                 continue
-                
+            
+            # Processa a data
+            data_obj, data_formatada = interpretar_data(data_raw, referencia)
+            if not data_obj:
+                continue
+            
+            # Só eventos futuros
+            if data_obj < datetime.now():
+                continue
+            
+            # Validações básicas
+            if len(titulo.strip()) < 3:
+                continue
+            
+            # Hash para deduplicação
+            evento_hash = gerar_hash_evento(titulo, data_formatada, local)
+            
+            eventos.append({
+                "titulo": titulo,
+                "data": data_formatada,
+                "local": local,
+                "link": link,
+                "hash": evento_hash,
+                "fonte": "YouMovin",
+                "data_obj": data_obj,
+                "categoria": categoria,
+                "modalidade": modalidade
+            })
+            
+            # Mostra detalhes dos primeiros 3 eventos
+            if len(eventos) <= 3:
+                print(f"   ✅ Evento {len(eventos)}: {titulo[:35]}... | {data_formatada} | {local[:25]}...")
+            
+        except Exception as e:
+            continue
+    
+    return eventos
+
+async def coletar_eventos_pagina_youmovin(page, pagina_num):
+    """Coleta eventos de corrida de uma página do YouMovin"""
+    try:
+        # Extrai todos os cards de evento de uma vez
+        cards = await extrair_cards(page, SELETOR_CARD_YOUMOVIN, CAMPOS_CARD_YOUMOVIN)
+        return processar_cards_youmovin(cards)
     except Exception as e:
         print(f"   ⚠️ Erro ao coletar página {pagina_num}: {str(e)[:50]}...")
+        return []
+
+def url_pagina_youmovin(numero):
+    """URL da página `numero` do calendário (a primeira aplica o filtro de corridas na sessão)"""
+    if numero == 1:
+        return "https://www.youmovin.com.br/calendario-de-eventos?categoria=1"
+    return f"https://www.youmovin.com.br/calendario-de-eventos/{numero}?filtro=S"
+
+def processar_html_youmovin(html, numero):
+    """Corridas de uma página baixada sem navegador; None se a página não tem cards (fim)"""
+    cards = extrair_cards_html(html, SELETOR_CARD_YOUMOVIN, CAMPOS_CARD_YOUMOVIN)
+    if not cards:
+        return None
+    eventos_pagina = processar_cards_youmovin(cards)
+    print(f"   ✅ Página {numero}: {len(eventos_pagina)} corridas coletadas")
+    return eventos_pagina
+
+async def coletar_youmovin_http(max_paginas=10):
+    """Percorre o calendário só com HTTP; None se o HTML não trouxer os cards"""
+    async with ClienteHTTP() as cliente:
+        return await percorrer_paginas_http(cliente, url_pagina_youmovin, processar_html_youmovin, max_paginas)
+
+def remover_duplicatas_youmovin(eventos):
+    """Remove duplicatas internas e ordena por data"""
+    eventos_unicos = {}
+    for evento in eventos:
+        hash_evento = evento['hash']
+        if hash_evento not in eventos_unicos:
+            eventos_unicos[hash_evento] = evento
     
-    return eventos
+    eventos_finais = list(eventos_unicos.values())
+    eventos_finais.sort(key=lambda x: x['data_obj'])
+    
+    duplicatas = len(eventos) - len(eventos_finais)
+    
+    print(f"✅ YouMovin: {len(eventos_finais)} corridas únicas coletadas")
+    if duplicatas > 0:
+        print(f"🔄 {duplicatas} duplicatas internas removidas")
+    
+    return eventos_finais
 
-def extrair_youmovin(max_tentativas=3):
+async def extrair_youmovin_async(max_tentativas=3):
     """Extrai eventos de corrida do YouMovin"""
     eventos = []
     
+    # Páginas renderizadas no servidor: tenta primeiro sem navegador
+    if http_rapido_habilitado():
+        print("⚡ YouMovin - modo HTTP")
+        eventos = await coletar_youmovin_http(max_paginas=10)
+        if eventos:
+            return remover_duplicatas_youmovin(eventos)
+        print("↩️ YouMovin: modo HTTP sem corridas - usando o navegador")
+        eventos = []
+    
     for tentativa in range(max_tentativas):
         try:
             print(f"🔎 YouMovin - Tentativa {tentativa + 1}/{max_tentativas}")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            async with sessao_navegador("YouMovin.com") as sessao:
+                page = await sessao.nova_pagina()
                 
                 # URL do calendário com filtro para corridas (categoria=1)
                 url = "https://www.youmovin.com.br/calendario-de-eventos?categoria=1"
                 
                 try:
                     print("📄 Carregando YouMovin...")
-                    page.goto(url, timeout=60000)
-                    
-                    # Aguarda a página carregar completamente
-                    time.sleep(5)
+                    await navegar(page, url, timeout=60000)
                     
-                    # Aguarda os cards aparecerem
-                    try:
-                        page.wait_for_selector(".content ul.calendario_tb", timeout=20000)
-                    except TimeoutError:
+                    # Aguarda os cards aparecerem e a rede sossegar
+                    if not await aguardar_carregamento(page, ".content ul.calendario_tb", timeout=20):
                         print("   ⚠️ Cards não carregaram no tempo esperado")
-                        browser.close()
                         continue
                     
                     # Navega por todas as páginas
-                    eventos = navegar_paginas_youmovin(page, max_paginas=10)
-                    
-                    browser.close()
+                    eventos = await navegar_paginas_youmovin(page, max_paginas=10)
                     
                     if eventos:
-                        # Remove duplicatas internas
-                        eventos_unicos = {}
-                        for evento in eventos:
-                            hash_evento = evento['hash']
-                            if hash_evento not in eventos_unicos:
-                                eventos_unicos[hash_evento] = evento
-                        
-                        eventos_finais = list(eventos_unicos.values())
-                        eventos_finais.sort(key=lambda x: x['data_obj'])
-                        
-                        duplicatas = len(eventos) - len(eventos_finais)
-                        
-                        print(f"✅ YouMovin: {len(eventos_finais)} corridas únicas coletadas")
-                        if duplicatas > 0:
-                            print(f"🔄 {duplicatas} duplicatas internas removidas")
-                        
-                        return eventos_finais
+                        return remover_duplicatas_youmovin(eventos)
                     else:
                         print("⚠️ Nenhuma corrida encontrada")
                         
                 except TimeoutError:
                     print(f"❌ Timeout na tentativa {tentativa + 1}")
-                    browser.close()
                     continue
                     
         except Exception as e:
@@ -300,4 +269,8 @@ def extrair_youmovin(max_tentativas=3):
                 print("💀 YouMovin falhou após todas as tentativas")
             continue
     
-    return eventos
\ No newline at end of file
+    return eventos
+
+def extrair_youmovin(max_tentativas=3):
+    """Extrai eventos de corrida do YouMovin (entrada síncrona)"""
+    return executar_sync(extrair_youmovin_async(max_tentativas))
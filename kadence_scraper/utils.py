@@ -1,6 +1,5 @@
 import csv
 import os
-import shutil
 import re
 from datetime import datetime
 from typing import List, Dict, Set, Tuple, Optional
@@ -16,39 +15,36 @@ def garantir_diretorio():
     os.makedirs(BACKUP_DIR, exist_ok=True)
 
 def criar_backup() -> Optional[str]:
-    """Cria backup do CSV atual com timestamp"""
-    if not os.path.exists(CSV_PATH):
-        print("📄 Nenhum CSV para fazer backup")
-        return None
-    
+    """
+    Registra um snapshot deduplicado e comprimido do CSV e do banco (ver backups.py)
+    e aplica a retenção por gerações; retorna o manifesto
+    """
+    from backups import criar_snapshot, aplicar_retencao
+
     garantir_diretorio()
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"corridas_backup_{timestamp}.csv"
-    backup_path = os.path.join(BACKUP_DIR, backup_filename)
-    
     try:
-        shutil.copy2(CSV_PATH, backup_path)
-        print(f"💾 Backup criado: {backup_filename}")
-        return backup_path
+        manifesto = criar_snapshot()
+        aplicar_retencao()
+        return manifesto
     except Exception as e:
         print(f"❌ Erro ao criar backup: {e}")
         return None
 
-def limpar_csv():
+def limpar_csv(caminho: str = CSV_PATH):
     """Inicializa o CSV com headers corretos"""
     garantir_diretorio()
-    with open(CSV_PATH, "w", newline="", encoding="utf-8") as f:
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(HEADERS)
 
-def carregar_eventos_existentes() -> Set[str]:
+def carregar_eventos_existentes(caminho: str = CSV_PATH) -> Set[str]:
     """Carrega hashes dos eventos já existentes no CSV"""
-    if not os.path.exists(CSV_PATH):
+    if not os.path.exists(caminho):
         return set()
     
     hashes_existentes = set()
     try:
-        with open(CSV_PATH, "r", newline="", encoding="utf-8") as f:
+        with open(caminho, "r", newline="", encoding="utf-8") as f:
             reader = csv.DictReader(f)
             for row in reader:
                 if 'Hash' in row and row['Hash']:
@@ -72,63 +68,34 @@ def gerar_hash_evento(titulo: str, data: str, local: str) -> str:
     conteudo = f"{titulo.lower().strip()}{data.strip()}{local.lower().strip()}"
     return hashlib.md5(conteudo.encode()).hexdigest()[:8]
 
-def salvar_eventos(eventos: List[Dict]) -> int:
+def salvar_eventos(eventos: List[Dict], armazenamento: Optional[str] = None) -> int:
     """
-    Salva eventos no CSV, evitando duplicatas
-    Retorna o número de eventos realmente salvos
+    Salva eventos no armazenamento (SQLite por padrão, ver armazenamento.py): insere os novos
+    e atualiza os que mudaram. Retorna o número de eventos novos
     """
+    from armazenamento import abrir_armazenamento
+
     if not eventos:
         print("⚠️ Nenhum evento para salvar")
         return 0
     
-    garantir_diretorio()
-    
-    # Carrega hashes existentes
-    hashes_existentes = carregar_eventos_existentes()
-    
-    # Se CSV não existe, cria com headers
-    csv_existe = os.path.exists(CSV_PATH)
-    if not csv_existe:
-        limpar_csv()
-    
-    eventos_salvos = 0
-    eventos_duplicados = 0
-    
     try:
-        with open(CSV_PATH, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            
-            for evento in eventos:
-                hash_evento = evento.get('hash', '')
-                
-                # Pula duplicatas
-                if hash_evento in hashes_existentes:
-                    eventos_duplicados += 1
-                    continue
-                
-                # Prepara dados para CSV
-                row = [
-                    evento.get('titulo', 'Sem título'),
-                    evento.get('data', 'Data não informada'),
-                    evento.get('local', 'Local não informado'),
-                    evento.get('link', ''),
-                    evento.get('fonte', 'Fonte desconhecida'),
-                    hash_evento
-                ]
-                
-                writer.writerow(row)
-                hashes_existentes.add(hash_evento)
-                eventos_salvos += 1
-        
-        print(f"💾 {eventos_salvos} novos eventos salvos no CSV")
-        if eventos_duplicados > 0:
-            print(f"🔄 {eventos_duplicados} duplicatas ignoradas")
-            
+        with abrir_armazenamento(armazenamento) as banco:
+            resultado = banco.gravar(eventos)
+            destino = banco.descricao()
     except Exception as e:
         print(f"❌ Erro ao salvar eventos: {e}")
         return 0
     
-    return eventos_salvos
+    print(f"💾 {destino}: {resultado.resumo()}")
+    return len(resultado.inseridas)
+
+def limpar_eventos(armazenamento: Optional[str] = None):
+    """Apaga os eventos salvos (banco e CSV exportado)"""
+    from armazenamento import abrir_armazenamento
+
+    with abrir_armazenamento(armazenamento) as banco:
+        banco.limpar()
 
 def formatar_data(data_str: str) -> str:
     """
@@ -242,25 +209,12 @@ def estatisticas_csv() -> Dict:
     
     return estatisticas
 
-def limpar_backups_antigos(manter_dias: int = 30):
-    """Remove backups mais antigos que X dias"""
-    if not os.path.exists(BACKUP_DIR):
-        return
-    
-    limite = datetime.now().timestamp() - (manter_dias * 24 * 3600)
-    removidos = 0
-    
+def limpar_backups_antigos(horarios: int = 24, diarios: int = 7, semanais: int = 4, mensais: int = 12):
+    """Aplica a retenção por gerações aos backups (ver backups.aplicar_retencao)"""
+    from backups import aplicar_retencao
+
     try:
-        for arquivo in os.listdir(BACKUP_DIR):
-            if arquivo.startswith("corridas_backup_") and arquivo.endswith(".csv"):
-                caminho = os.path.join(BACKUP_DIR, arquivo)
-                if os.path.getmtime(caminho) < limite:
-                    os.remove(caminho)
-                    removidos += 1
-        
-        if removidos > 0:
-            print(f"🧹 {removidos} backups antigos removidos")
-            
+        aplicar_retencao({"horarios": horarios, "diarios": diarios, "semanais": semanais, "mensais": mensais})
     except Exception as e:
         print(f"⚠️ Erro ao limpar backups: {e}")
 